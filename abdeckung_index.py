@@ -0,0 +1,336 @@
+# Dieses Python-Skript verwaltet einen dauerhaften räumlichen und zeitlichen Abfrage-Index der Abdeckung eines Meridians
+# als SQLite-Datenbank mit R-Tree ("{meridian}_abdeckung_index.sqlite" im Speicherort, neben der globalen Geodatabase).
+# Der Index enthält je Bild aus "punkte_sammlung" Schlüssel, Operat, Flugjahr, Flugstreifen und die genäherte
+# Bodenabdeckung (achsparalleles Quadrat um das Projektionszentrum, Seitenlänge aus "stereo_pruefung_info") sowie die
+# Operatsflächen aus "flaechen_sammlung" (alle Flugjahre) und "flaechen_sammlung_final" (aktuelle Zuordnung). Abfragen
+# nach Punkt, Rechteck und allen Flugjahren an einem Ort beantwortet er ohne arcpy in Millisekunden: der R-Tree liefert
+# die Kandidaten, Flächen werden exakt geprüft ("numpy_geometrie.punkte_in_polygon"). Nach jedem Einfügen von
+# Operaten werden nur die geänderten Bilder und Flächen entfernt bzw. eingefügt (Bilder anhand des Deltas von
+# "punkte_sammlung", neu geladene Operate mit gleichen Bildnamen sind dort entfernt und wieder eingefügt).
+# Der Workflow wird durch das Starten von "main.py" initiiert, "abdeckung_index.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import arcpy
+import hashlib
+import json
+import sqlite3
+import numpy as np
+import abdeckung_karte
+import bild_schluessel
+import numpy_geometrie
+import vektor_global
+import vektor_lokal
+from info_wrapper import *
+
+
+TABELLEN = [
+    "CREATE TABLE IF NOT EXISTS stand (schluessel TEXT PRIMARY KEY, wert TEXT)",
+    "CREATE TABLE IF NOT EXISTS bilder (id INTEGER PRIMARY KEY, schluessel TEXT UNIQUE, img_name TEXT, operat TEXT, "
+    "jahr INTEGER, flugstreifen TEXT, x REAL, y REAL)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS bilder_rtree USING rtree(id, xmin, xmax, ymin, ymax)",
+    "CREATE TABLE IF NOT EXISTS flaechen (id INTEGER PRIMARY KEY, schluessel TEXT UNIQUE, art TEXT, operat TEXT, "
+    "jahr INTEGER, laengen BLOB, koordinaten BLOB)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS flaechen_rtree USING rtree(id, xmin, xmax, ymin, ymax)"
+]
+
+
+def index_datei(speicherort: str, meridian: str) -> str:
+    """
+    Die Funktion liefert den Pfad des Index neben der globalen Geodatabase ("{meridian}_abdeckung_index.sqlite").
+    """
+    return rf"{speicherort}\{meridian}_abdeckung_index.sqlite"
+
+
+def index_oeffnen(speicherort: str, meridian: str) -> sqlite3.Connection:
+    """
+    Die Funktion öffnet den Index des Meridians (bzw. erstellt einen leeren Index).
+    """
+    verbindung = sqlite3.connect(index_datei(speicherort, meridian))
+    with verbindung:
+        for tabelle in TABELLEN:
+            verbindung.execute(tabelle)
+    return verbindung
+
+
+def _stand_lesen(verbindung: sqlite3.Connection, schluessel: str) -> str:
+    zeile = verbindung.execute("SELECT wert FROM stand WHERE schluessel = ?", (schluessel,)).fetchone()
+    return zeile[0] if zeile else None
+
+
+def _stand_schreiben(verbindung: sqlite3.Connection, schluessel: str, wert: str):
+    verbindung.execute("INSERT OR REPLACE INTO stand (schluessel, wert) VALUES (?, ?)", (schluessel, wert))
+
+
+def ringe_kodieren(ringe: list) -> tuple:
+    """
+    Die Funktion kodiert die Ringe eines Polygons als zwei Byte-Folgen (Anzahl der Stützpunkte je Ring und
+    Koordinaten).
+    """
+    laengen = np.array([len(ring) for ring in ringe], dtype=np.int64)
+    koordinaten = np.concatenate(ringe).astype(np.float64) if ringe else np.empty((0, 2))
+    return laengen.tobytes(), koordinaten.tobytes()
+
+
+def ringe_dekodieren(laengen: bytes, koordinaten: bytes) -> list:
+    """
+    Die Funktion liefert die mit "ringe_kodieren" kodierten Ringe eines Polygons.
+    """
+    grenzen = np.cumsum(np.frombuffer(laengen, dtype=np.int64))[:-1]
+    return np.split(np.frombuffer(koordinaten, dtype=np.float64).reshape(-1, 2), grenzen)
+
+
+def _flaechen_abgleichen(verbindung: sqlite3.Connection, art: str, flaechen: list) -> tuple:
+    """
+    Gleicht die Flächen einer Art ("sammlung" bzw. "final") mit dem Index ab. Der Schlüssel einer Fläche ist der
+    Hash aus Art, Operat, Flugjahr und Koordinaten, unveränderte Flächen bleiben unberührt.
+    Rückgabewerte (tuple): Anzahl der entfernten und der eingefügten Flächen
+    """
+    neu = {}
+    for operat_nr, jahr, ringe in flaechen:
+        laengen, koordinaten = ringe_kodieren(ringe)
+        schluessel = hashlib.sha1(f"{art}|{operat_nr}|{jahr}|".encode("utf-8") + laengen + koordinaten).hexdigest()
+        neu[schluessel] = [operat_nr, jahr, laengen, koordinaten, np.concatenate(ringe)]
+
+    bisher = dict(verbindung.execute("SELECT schluessel, id FROM flaechen WHERE art = ?", (art,)).fetchall())
+    entfernen = [(bisher[schluessel],) for schluessel in bisher if schluessel not in neu]
+    verbindung.executemany("DELETE FROM flaechen WHERE id = ?", entfernen)
+    verbindung.executemany("DELETE FROM flaechen_rtree WHERE id = ?", entfernen)
+
+    einfuegen = [schluessel for schluessel in neu if schluessel not in bisher]
+    for schluessel in einfuegen:
+        operat_nr, jahr, laengen, koordinaten, alle = neu[schluessel]
+        cursor = verbindung.execute(
+            "INSERT INTO flaechen (schluessel, art, operat, jahr, laengen, koordinaten) VALUES (?, ?, ?, ?, ?, ?)",
+            (schluessel, art, operat_nr, jahr, laengen, koordinaten)
+        )
+        verbindung.execute("INSERT INTO flaechen_rtree VALUES (?, ?, ?, ?, ?)", (
+            cursor.lastrowid, float(alle[:, 0].min()), float(alle[:, 0].max()), float(alle[:, 1].min()),
+            float(alle[:, 1].max())))
+    return len(entfernen), len(einfuegen)
+
+
+def _zahl_lesen(wert: str) -> float:
+    try:
+        return float(wert)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _flaechen_lesen(featureclass: str, operat_jahr: dict) -> list:
+    """
+    Liest die Polygone einer Featureclass mit dem Feld "operat_nr" als Liste [Operat, Flugjahr, Ringe].
+    """
+    flaechen = []
+    if not arcpy.Exists(featureclass):
+        return flaechen
+    with arcpy.da.SearchCursor(featureclass, ["operat_nr", "SHAPE@"]) as cursor:
+        for operat_nr, geometrie in cursor:
+            if operat_nr is None or geometrie is None:
+                continue
+            ringe = vektor_global.polygon_ringe(geometrie)
+            if ringe and sum(len(ring) for ring in ringe):
+                flaechen.append([operat_nr, operat_jahr.get(operat_nr, abdeckung_karte.jahr_lesen(None, operat_nr)),
+                                 ringe])
+    return flaechen
+
+
+def _bilder_entfernen(verbindung: sqlite3.Connection, schluessel_liste: list) -> int:
+    """
+    Entfernt die Bilder mit den angegebenen Schlüsseln aus dem Index und liefert deren Anzahl.
+    """
+    ids = [zeile for schluessel in schluessel_liste
+           for zeile in verbindung.execute("SELECT id FROM bilder WHERE schluessel = ?", (schluessel,)).fetchall()]
+    verbindung.executemany("DELETE FROM bilder WHERE id = ?", ids)
+    verbindung.executemany("DELETE FROM bilder_rtree WHERE id = ?", ids)
+    return len(ids)
+
+
+def _bilder_einfuegen(verbindung: sqlite3.Connection, bildpunkte: np.ndarray, operat_jahr: dict,
+                      stereo_pruefung_info: list):
+    """
+    Fügt Bildpunkte (siehe "vektor_lokal.bildpunkte_lesen") mit ihrer genäherten Bodenabdeckung in den Index ein.
+    """
+    # halbe Bodenlänge je Bild (Maßstabszahl * Bildformat / 2)
+    halbe_seite = np.zeros(len(bildpunkte))
+    if stereo_pruefung_info and len(bildpunkte):
+        brennweite, bildformat_laengs, gelaendehoehe, mindest_ueberlappung = stereo_pruefung_info
+        flughoehe = np.array([_zahl_lesen(wert) for wert in bildpunkte["flughoehe"]])
+        halbe_seite = np.maximum(flughoehe - gelaendehoehe, 0) * bildformat_laengs / brennweite / 2
+    for bild, halb in zip(bildpunkte, halbe_seite):
+        x, y = float(bild["x"]), float(bild["y"])
+        img_name, operat_nr = str(bild["img_name"]), str(bild["operat"])
+        cursor = verbindung.execute(
+            "INSERT INTO bilder (schluessel, img_name, operat, jahr, flugstreifen, x, y) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (bild_schluessel.schluessel_bilden(img_name, operat_nr), img_name, operat_nr,
+             operat_jahr.get(operat_nr, abdeckung_karte.jahr_lesen(None, operat_nr)), str(bild["flugstreifen"]), x, y)
+        )
+        verbindung.execute("INSERT INTO bilder_rtree VALUES (?, ?, ?, ?, ?)",
+                           (cursor.lastrowid, x - halb, x + halb, y - halb, y + halb))
+
+
+@func_info
+def index_fortfuehren(global_info: list, workspace_info: list, loesch_punkte_liste: list, hinzugefuegt_punkte: dict,
+                      stereo_pruefung_info: list = None) -> dict:
+    """
+    Die Funktion führt den Index des Meridians mit dem Delta von "punkte_sammlung" fort: die entfernten Bilder werden
+    aus dem Index gelöscht, die eingefügten Bilder (nur diese werden aus "punkte_sammlung" gelesen) eingetragen, ebenso
+    die geänderten Flächen aus "flaechen_sammlung" und "flaechen_sammlung_final". Die Bodenabdeckung eines Bildes ist
+    ein achsparalleles Quadrat mit der Bodenlänge in Flugrichtung ("stereo_pruefung_info", ohne Kameradaten nur das
+    Projektionszentrum). Beim ersten Fortführen und bei geänderten Kameradaten werden alle Bilder neu eingefügt.
+    Parameter:
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - loesch_punkte_liste (list): Schlüssel der aus "punkte_sammlung" entfernten Punkte
+        - hinzugefuegt_punkte (dict): key = Operat, value = Bildnamen der in "punkte_sammlung" eingefügten Punkte
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m),
+                                       Mindest-Längsüberdeckung (0-1)
+    Rückgabewert:
+        - aenderungen (dict): Anzahl der entfernten und eingefügten Bilder bzw. Flächen
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    # Flugjahr je Operat aus "flaechen_sammlung"
+    operat_jahr = abdeckung_karte.operat_jahre(flaechen_sammlung)
+
+    verbindung = index_oeffnen(speicherort, meridian)
+    aenderungen = {}
+    with verbindung:
+        kamera = json.dumps(stereo_pruefung_info)
+        if _stand_lesen(verbindung, "kamera") != kamera:
+            # neuer Index oder Kameradaten geändert: alle Bilder neu einfügen
+            entfernt = verbindung.execute("SELECT COUNT(*) FROM bilder").fetchone()[0]
+            verbindung.execute("DELETE FROM bilder")
+            verbindung.execute("DELETE FROM bilder_rtree")
+            _stand_schreiben(verbindung, "kamera", kamera)
+            abfragen, eingefuegt = [None], None
+        else:
+            # nur die eingefügten Bilder der betroffenen Operate werden gelesen, bereits vorhandene Schlüssel (neu
+            # geladene Operate) werden vorher entfernt
+            eingefuegt = {bild_schluessel.schluessel_bilden(img_name, operat_nr)
+                          for operat_nr, img_namen in hinzugefuegt_punkte.items() for img_name in img_namen}
+            abfragen = bild_schluessel.text_abfragen(operat_nr for operat_nr, img_namen in hinzugefuegt_punkte.items()
+                                                     if img_namen)
+            entfernt = _bilder_entfernen(verbindung, set(loesch_punkte_liste) | eingefuegt)
+        anzahl = 0
+        for abfrage in abfragen:
+            bildpunkte = vektor_lokal.bildpunkte_lesen(punkte_sammlung, "operat_nr", abfrage)
+            if eingefuegt is not None:
+                bildpunkte = bildpunkte[np.array([bild_schluessel.schluessel_bilden(img_name, operat_nr) in eingefuegt
+                                                  for img_name, operat_nr
+                                                  in zip(bildpunkte["img_name"], bildpunkte["operat"])], dtype=bool)]
+            _bilder_einfuegen(verbindung, bildpunkte, operat_jahr, stereo_pruefung_info)
+            anzahl += len(bildpunkte)
+        aenderungen["bilder"] = [entfernt, anzahl]
+
+        # Operatsflächen aller Flugjahre und aktuelle Zuordnung
+        aenderungen["flaechen_sammlung"] = list(_flaechen_abgleichen(
+            verbindung, "sammlung", _flaechen_lesen(flaechen_sammlung, operat_jahr)))
+        aenderungen["flaechen_sammlung_final"] = list(_flaechen_abgleichen(
+            verbindung, "final", _flaechen_lesen(rf"{fds_output_global}\flaechen_sammlung_final", operat_jahr)))
+    verbindung.close()
+
+    print(f"Abdeckungs-Index {meridian}: " + ", ".join(
+        f"{art} -{entfernt}/+{eingefuegt}" for art, (entfernt, eingefuegt) in aenderungen.items()))
+    return aenderungen
+
+
+def _bilder_abfragen(verbindung: sqlite3.Connection, xmin: float, ymin: float, xmax: float, ymax: float,
+                     jahr_von: int = None, jahr_bis: int = None) -> list:
+    """
+    Liefert alle Bilder, deren Bodenabdeckung das Rechteck berührt (optional nur Flugjahre "jahr_von" bis "jahr_bis").
+    """
+    sql = ("SELECT b.schluessel, b.img_name, b.operat, b.jahr, b.flugstreifen, b.x, b.y FROM bilder_rtree r "
+           "JOIN bilder b ON b.id = r.id WHERE r.xmax >= ? AND r.xmin <= ? AND r.ymax >= ? AND r.ymin <= ?")
+    parameter = [xmin, xmax, ymin, ymax]
+    if jahr_von is not None:
+        sql += " AND b.jahr >= ?"
+        parameter.append(jahr_von)
+    if jahr_bis is not None:
+        sql += " AND b.jahr <= ?"
+        parameter.append(jahr_bis)
+    felder = ["schluessel", "img_name", "operat", "jahr", "flugstreifen", "x", "y"]
+    return [dict(zip(felder, zeile)) for zeile in verbindung.execute(sql + " ORDER BY b.jahr DESC, b.schluessel",
+                                                                       parameter)]
+
+
+def _flaechen_kandidaten(verbindung: sqlite3.Connection, art: str, xmin: float, ymin: float, xmax: float,
+                         ymax: float) -> list:
+    """
+    Liefert Operat, Flugjahr und Ringe aller Flächen einer Art, deren Ausdehnung das Rechteck berührt.
+    """
+    zeilen = verbindung.execute(
+        "SELECT f.operat, f.jahr, f.laengen, f.koordinaten FROM flaechen_rtree r JOIN flaechen f ON f.id = r.id "
+        "WHERE f.art = ? AND r.xmax >= ? AND r.xmin <= ? AND r.ymax >= ? AND r.ymin <= ?",
+        (art, xmin, xmax, ymin, ymax)
+    )
+    return [[operat_nr, jahr, ringe_dekodieren(laengen, koordinaten)] for operat_nr, jahr, laengen, koordinaten
+            in zeilen]
+
+
+def _enthaelt(ringe: list, x: float, y: float) -> bool:
+    return bool(numpy_geometrie.punkte_in_polygon(np.array([x], dtype=float), np.array([y], dtype=float), ringe)[0])
+
+
+def punkt_abfragen(verbindung: sqlite3.Connection, x: float, y: float, radius: float = 0.0) -> dict:
+    """
+    Die Funktion beantwortet, welche Bilder und welches Operat einen Punkt abdecken.
+    Parameter:
+        - verbindung (sqlite3.Connection): Index (siehe "index_oeffnen")
+        - x, y (float): Koordinaten im Koordinatensystem des Meridians
+        - radius (float): Suchradius in Metern um die Bodenabdeckung der Bilder (z.B. ohne Kameradaten im Index)
+    Rückgabewert:
+        - ergebnis (dict): "bilder" (Liste), "operat" und "jahr" der aktuellen Zuordnung ("None" außerhalb) und
+                           "jahre" (alle Flugjahre an diesem Ort)
+    """
+    aktuell = [[operat_nr, jahr] for operat_nr, jahr, ringe in _flaechen_kandidaten(verbindung, "final", x, y, x, y)
+               if _enthaelt(ringe, x, y)]
+    return {
+        "bilder": _bilder_abfragen(verbindung, x - radius, y - radius, x + radius, y + radius),
+        "operat": aktuell[0][0] if aktuell else None,
+        "jahr": aktuell[0][1] if aktuell else None,
+        "jahre": jahre_abfragen(verbindung, x, y)
+    }
+
+
+def bbox_abfragen(verbindung: sqlite3.Connection, xmin: float, ymin: float, xmax: float, ymax: float,
+                  jahr_von: int = None, jahr_bis: int = None) -> dict:
+    """
+    Die Funktion beantwortet, welche Bilder, Flugstreifen und Operate ein Rechteck abdecken.
+    Parameter:
+        - verbindung (sqlite3.Connection): Index (siehe "index_oeffnen")
+        - xmin, ymin, xmax, ymax (float): Rechteck im Koordinatensystem des Meridians
+        - jahr_von, jahr_bis (int): optionaler Bereich der Flugjahre der Bilder
+    Rückgabewert:
+        - ergebnis (dict): "bilder" (Liste), "flugstreifen" (Operat, Flugstreifen, Flugjahr, Anzahl der Bilder) und
+                           "operate" (Operat und Flugjahr der aktuellen Zuordnung, deren Ausdehnung das Rechteck
+                           berührt)
+    """
+    bilder = _bilder_abfragen(verbindung, xmin, ymin, xmax, ymax, jahr_von, jahr_bis)
+    flugstreifen = {}
+    for bild in bilder:
+        eintrag = (bild["operat"], bild["flugstreifen"], bild["jahr"])
+        flugstreifen[eintrag] = flugstreifen.get(eintrag, 0) + 1
+    operate = sorted({(operat_nr, jahr) for operat_nr, jahr, ringe
+                      in _flaechen_kandidaten(verbindung, "final", xmin, ymin, xmax, ymax)},
+                     key=lambda eintrag: eintrag[1])
+    return {
+        "bilder": bilder,
+        "flugstreifen": [list(eintrag) + [anzahl] for eintrag, anzahl in sorted(flugstreifen.items())],
+        "operate": [list(eintrag) for eintrag in operate]
+    }
+
+
+def jahre_abfragen(verbindung: sqlite3.Connection, x: float, y: float) -> list:
+    """
+    Die Funktion liefert alle Flugjahre an einem Ort: je Operat aus "flaechen_sammlung", dessen Fläche den Punkt
+    enthält, Flugjahr und Operat (neuestes Flugjahr zuerst).
+    """
+    treffer = {(jahr, operat_nr) for operat_nr, jahr, ringe
+               in _flaechen_kandidaten(verbindung, "sammlung", x, y, x, y) if _enthaelt(ringe, x, y)}
+    return [list(eintrag) for eintrag in sorted(treffer, reverse=True)]
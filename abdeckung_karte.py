@@ -0,0 +1,418 @@
+# Dieses Python-Skript erstellt eine Übersicht über Alter und Dichte der Bildabdeckung eines Meridians als NumPy-Gitter
+# ("{meridian}_abdeckung_karte.npz" im Speicherort): je Zelle das neueste Flugjahr und die Anzahl der Bildpunkte aus
+# "punkte_sammlung" sowie die Anzahl der konkurrierenden Operate (überlappende Operatsflächen aus "flaechen_sammlung").
+# Das Gitter ist an Vielfachen der Zellgröße ausgerichtet und wächst mit neuen Operaten mit. Nach jedem Einfügen von
+# Operaten werden nur die neuen Operatsflächen rasterisiert, die Bildpunkte werden mit einem einzigen NumPy-Lesevorgang
+# neu gezählt. Die Gitter werden in Kacheln als komprimierte GeoTIFFs ("{meridian}_abdeckung_karte" im Speicherort)
+# mit einer Zusammenfassung als json-Datei geschrieben, nur geänderte Kacheln werden neu geschrieben. Die Karten aller
+# Meridiane werden nur auf Wunsch zu einer Gesamtkarte zusammengeführt ("gesamtkarte_erstellen").
+# Der Workflow wird durch das Starten von "main.py" initiiert, "abdeckung_karte.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import arcpy
+import glob
+import json
+import os
+import numpy as np
+import numpy_geometrie
+import vektor_global
+from info_wrapper import *
+from time import localtime
+
+
+# Version des Aufbaus der Karten-Datei
+KARTE_FORMAT = 1
+
+# Ebenen der Karte mit Datentyp und Methode beim Zusammenführen der Meridiane
+EBENEN = {
+    "neuestes_jahr": [np.int16, "16_BIT_UNSIGNED"],
+    "bildanzahl": [np.int32, "32_BIT_UNSIGNED"],
+    "operate_anzahl": [np.int16, "16_BIT_UNSIGNED"]
+}
+
+# Koordinatensystem der Gesamtkarte aller Meridiane (MGI / Austria Lambert)
+GESAMT_EPSG = 31287
+
+# Kantenlänge der Rasterkacheln in Zellen (Kacheln sind an Vielfachen von KACHEL_ZELLEN * Zellgröße ausgerichtet)
+KACHEL_ZELLEN = 500
+
+
+def karte_datei(workspace_info: list) -> str:
+    """
+    Die Funktion liefert den Pfad der Karte neben der globalen Geodatabase ("{meridian}_abdeckung_karte.npz").
+    """
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    return rf"{speicherort}\{meridian}_abdeckung_karte.npz"
+
+
+def karte_erstellen(zellgroesse: float) -> dict:
+    """
+    Die Funktion erstellt eine leere Karte. "spalte0" und "zeile0" sind die Indizes der linken unteren Zelle im an der
+    Zellgröße ausgerichteten Gitter (Zeile 0 der Arrays liegt im Süden).
+    """
+    karte = {"format": KARTE_FORMAT, "zellgroesse": float(zellgroesse), "spalte0": 0, "zeile0": 0,
+             "operate": np.empty(0, dtype=str), "zeitpunkte": np.empty(0, dtype=str)}
+    for ebene, (datentyp, pixeltyp) in EBENEN.items():
+        karte[ebene] = np.zeros((0, 0), dtype=datentyp)
+    return karte
+
+
+def gitter_erweitern(karte: dict, xmin: float, ymin: float, xmax: float, ymax: float) -> dict:
+    """
+    Die Funktion erweitert die Gitter der Karte, sodass sie das Rechteck enthalten (neue Zellen mit 0).
+    """
+    zellgroesse = karte["zellgroesse"]
+    zeilen, spalten = karte["bildanzahl"].shape
+    spalte_min, zeile_min = int(np.floor(xmin / zellgroesse)), int(np.floor(ymin / zellgroesse))
+    spalte_max, zeile_max = int(np.floor(xmax / zellgroesse)), int(np.floor(ymax / zellgroesse))
+    if zeilen and spalten:
+        spalte_min, zeile_min = min(spalte_min, karte["spalte0"]), min(zeile_min, karte["zeile0"])
+        spalte_max = max(spalte_max, karte["spalte0"] + spalten - 1)
+        zeile_max = max(zeile_max, karte["zeile0"] + zeilen - 1)
+    else:
+        karte["spalte0"], karte["zeile0"] = spalte_min, zeile_min
+
+    unten, links = karte["zeile0"] - zeile_min, karte["spalte0"] - spalte_min
+    oben = zeile_max - zeile_min + 1 - unten - zeilen
+    rechts = spalte_max - spalte_min + 1 - links - spalten
+    if unten or links or oben or rechts:
+        for ebene in EBENEN:
+            karte[ebene] = np.pad(karte[ebene], ((unten, oben), (links, rechts)))
+        karte["spalte0"], karte["zeile0"] = spalte_min, zeile_min
+    return karte
+
+
+def punkte_zaehlen(karte: dict, x: np.ndarray, y: np.ndarray, jahr: np.ndarray) -> dict:
+    """
+    Die Funktion zählt die Bildpunkte je Zelle neu ("bildanzahl") und bestimmt das neueste Flugjahr ("neuestes_jahr").
+    Die Gitter müssen die Punkte bereits enthalten (siehe "gitter_erweitern").
+    """
+    zeilen, spalten = karte["bildanzahl"].shape
+    spalte = np.floor(np.asarray(x, dtype=float) / karte["zellgroesse"]).astype(np.int64) - karte["spalte0"]
+    zeile = np.floor(np.asarray(y, dtype=float) / karte["zellgroesse"]).astype(np.int64) - karte["zeile0"]
+    zelle = zeile * spalten + spalte
+
+    karte["bildanzahl"] = np.bincount(zelle, minlength=zeilen * spalten).reshape(zeilen, spalten).astype(np.int32)
+    neuestes_jahr = np.zeros(zeilen * spalten, dtype=np.int16)
+    np.maximum.at(neuestes_jahr, zelle, np.asarray(jahr, dtype=np.int16))
+    karte["neuestes_jahr"] = neuestes_jahr.reshape(zeilen, spalten)
+    return karte
+
+
+def flaeche_addieren(karte: dict, polygone: list) -> dict:
+    """
+    Die Funktion erhöht "operate_anzahl" in allen Zellen, deren Mittelpunkt innerhalb der Fläche eines Operates (Liste
+    von Polygonen, je Polygon eine Liste von Ringen) liegt. Rasterisiert wird nur der Ausschnitt der Ausdehnung der
+    Fläche, sich überlappende Polygone desselben Operates werden einmal gezählt.
+    """
+    alle = [ring for ringe in polygone for ring in ringe]
+    alle = np.concatenate(alle) if alle else np.empty((0, 2))
+    if len(alle) == 0:
+        return karte
+    zellgroesse = karte["zellgroesse"]
+    zeilen, spalten = karte["operate_anzahl"].shape
+    spalte_von = max(int(np.floor(alle[:, 0].min() / zellgroesse)) - karte["spalte0"], 0)
+    spalte_bis = min(int(np.floor(alle[:, 0].max() / zellgroesse)) - karte["spalte0"] + 1, spalten)
+    zeile_von = max(int(np.floor(alle[:, 1].min() / zellgroesse)) - karte["zeile0"], 0)
+    zeile_bis = min(int(np.floor(alle[:, 1].max() / zellgroesse)) - karte["zeile0"] + 1, zeilen)
+    if spalte_von >= spalte_bis or zeile_von >= zeile_bis:
+        return karte
+
+    maske = np.zeros((zeile_bis - zeile_von, spalte_bis - spalte_von), dtype=bool)
+    for ringe in polygone:
+        maske |= numpy_geometrie.polygon_rasterisieren(
+            ringe,
+            (karte["spalte0"] + spalte_von) * zellgroesse,
+            (karte["zeile0"] + zeile_von) * zellgroesse,
+            zellgroesse,
+            zeile_bis - zeile_von,
+            spalte_bis - spalte_von
+        )
+    karte["operate_anzahl"][zeile_von:zeile_bis, spalte_von:spalte_bis] += maske.astype(np.int16)
+    return karte
+
+
+def statistik_berechnen(karte: dict, bezugsjahr: int = None) -> dict:
+    """
+    Die Funktion berechnet die Zusammenfassung der Karte: abgedeckte Fläche (Zellen mit Bildpunkten), Fläche je
+    neuestem Flugjahr, Alter der Abdeckung, Bilddichte und Fläche mit mehreren konkurrierenden Operaten.
+    Parameter:
+        - karte (dict): Karte (siehe "karte_erstellen")
+        - bezugsjahr (int): Jahr, auf das sich das Alter bezieht (None = aktuelles Jahr)
+    Rückgabewert:
+        - statistik (dict): Zusammenfassung
+    """
+    bezugsjahr = bezugsjahr or localtime().tm_year
+    zellflaeche = karte["zellgroesse"] ** 2 / 1e6
+    abgedeckt = karte["bildanzahl"] > 0
+    jahre, anzahl = np.unique(karte["neuestes_jahr"][abgedeckt], return_counts=True)
+    alter = bezugsjahr - karte["neuestes_jahr"][abgedeckt & (karte["neuestes_jahr"] > 0)].astype(int)
+
+    return {
+        "zellgroesse": karte["zellgroesse"],
+        "bezugsjahr": int(bezugsjahr),
+        "flaeche_km2": round(float(abgedeckt.sum() * zellflaeche), 2),
+        "bildanzahl": int(karte["bildanzahl"].sum()),
+        "operate": int(len(karte["operate"])),
+        "flaeche_je_jahr_km2": {str(int(jahr)): round(float(n * zellflaeche), 2) for jahr, n in zip(jahre, anzahl)},
+        "alter_median_jahre": float(np.median(alter)) if len(alter) else None,
+        "alter_max_jahre": int(alter.max()) if len(alter) else None,
+        "bilder_je_km2": round(float(karte["bildanzahl"][abgedeckt].mean() / zellflaeche), 2)
+        if abgedeckt.any() else None,
+        "flaeche_mehrere_operate_km2": round(float((karte["operate_anzahl"] > 1).sum() * zellflaeche), 2),
+        "max_operate": int(karte["operate_anzahl"].max()) if karte["operate_anzahl"].size else 0
+    }
+
+
+def karte_laden(workspace_info: list) -> dict:
+    """
+    Die Funktion lädt die Karte des Meridians ("None", falls keine bzw. eine Karte eines älteren Formats vorliegt).
+    """
+    datei = karte_datei(workspace_info)
+    if not os.path.exists(datei):
+        return None
+    with np.load(datei, allow_pickle=False) as gespeichert:
+        if int(gespeichert["format"]) != KARTE_FORMAT:
+            return None
+        karte = {schluessel: gespeichert[schluessel] for schluessel in gespeichert.files}
+    for schluessel in ("format", "spalte0", "zeile0"):
+        karte[schluessel] = int(karte[schluessel])
+    karte["zellgroesse"] = float(karte["zellgroesse"])
+    return karte
+
+
+def karte_speichern(karte: dict, workspace_info: list):
+    """
+    Die Funktion speichert die Karte (zuerst in eine temporäre Datei, damit ein Abbruch keine halbe Karte hinterlässt).
+    """
+    datei = karte_datei(workspace_info)
+    temp_datei = datei.replace(".npz", "_temp.npz")
+    np.savez_compressed(temp_datei, **karte)
+    os.replace(temp_datei, datei)
+
+
+def jahr_lesen(jahr: str, operat_nr: str) -> int:
+    """
+    Liefert das Flugjahr aus dem Feld "jahr" (Text), ersatzweise aus den ersten vier Ziffern der Operatsnummer.
+    """
+    try:
+        return int(float(jahr))
+    except (TypeError, ValueError):
+        return int(operat_nr[:4]) if operat_nr[:4].isdigit() else 0
+
+
+def operat_jahre(flaechen_sammlung: str) -> dict:
+    """
+    Liefert das Flugjahr je Operat aus "flaechen_sammlung" (neuestes Jahr seiner Flächen). Für Operate ohne Fläche gilt
+    "jahr_lesen(None, operat_nr)".
+    """
+    operat_jahr = {}
+    with arcpy.da.SearchCursor(flaechen_sammlung, ["operat_nr", "jahr"]) as cursor:
+        for operat_nr, jahr in cursor:
+            operat_jahr[operat_nr] = max(operat_jahr.get(operat_nr, 0), jahr_lesen(jahr, operat_nr))
+    return operat_jahr
+
+
+def _fenster_lesen(karte: dict, ebene: str, zeile_von: int, spalte_von: int, zeilen: int, spalten: int) -> np.ndarray:
+    """
+    Liefert den Ausschnitt einer Ebene für ein Fenster im ausgerichteten Gitter (Zellen außerhalb der Karte = 0).
+    """
+    fenster = np.zeros((zeilen, spalten), dtype=EBENEN[ebene][0])
+    if karte is None:
+        return fenster
+    karte_zeilen, karte_spalten = karte[ebene].shape
+    von_i, bis_i = max(zeile_von, karte["zeile0"]), min(zeile_von + zeilen, karte["zeile0"] + karte_zeilen)
+    von_j, bis_j = max(spalte_von, karte["spalte0"]), min(spalte_von + spalten, karte["spalte0"] + karte_spalten)
+    if von_i < bis_i and von_j < bis_j:
+        fenster[von_i - zeile_von:bis_i - zeile_von, von_j - spalte_von:bis_j - spalte_von] = karte[ebene][
+            von_i - karte["zeile0"]:bis_i - karte["zeile0"], von_j - karte["spalte0"]:bis_j - karte["spalte0"]]
+    return fenster
+
+
+def _raster_schreiben(gitter: np.ndarray, zeile0: int, spalte0: int, zellgroesse: float, epsg: int, datei: str):
+    """
+    Schreibt ein Gitter (linke untere Zelle "zeile0", "spalte0") als komprimiertes GeoTIFF (0 = NoData).
+    """
+    raster = arcpy.NumPyArrayToRaster(
+        np.flipud(gitter),
+        arcpy.Point(spalte0 * zellgroesse, zeile0 * zellgroesse),
+        zellgroesse,
+        zellgroesse,
+        0
+    )
+    if arcpy.Exists(datei):
+        arcpy.Delete_management(datei)
+    with arcpy.EnvManager(compression="LZW"):
+        raster.save(datei)
+    arcpy.DefineProjection_management(datei, arcpy.SpatialReference(int(epsg)))
+
+
+def _kachel_bereich(karte: dict) -> list:
+    """
+    Liefert die Indizes (Kachelzeile, Kachelspalte) aller Kacheln, die das Gitter der Karte berührt.
+    """
+    if karte is None or not karte["bildanzahl"].size:
+        return []
+    zeilen, spalten = karte["bildanzahl"].shape
+    zeile_von, spalte_von = karte["zeile0"] // KACHEL_ZELLEN, karte["spalte0"] // KACHEL_ZELLEN
+    zeile_bis = (karte["zeile0"] + zeilen - 1) // KACHEL_ZELLEN
+    spalte_bis = (karte["spalte0"] + spalten - 1) // KACHEL_ZELLEN
+    return [(kachel_zeile, kachel_spalte) for kachel_zeile in range(zeile_von, zeile_bis + 1)
+            for kachel_spalte in range(spalte_von, spalte_bis + 1)]
+
+
+def kacheln_schreiben(karte: dict, alte_karte: dict, epsg: int, raster_ordner: str) -> int:
+    """
+    Die Funktion schreibt die Rasterkacheln der Karte ("{ebene}_{kachelzeile}_{kachelspalte}.tif"), deren Inhalt sich
+    gegenüber "alte_karte" (gleiche Zellgröße, None = alle Kacheln) geändert hat. Leere Kacheln werden nicht
+    geschrieben bzw. entfernt.
+    Rückgabewert:
+        - anzahl (int): Anzahl der geschriebenen bzw. entfernten Kacheln
+    """
+    anzahl = 0
+    for kachel_zeile, kachel_spalte in sorted(set(_kachel_bereich(karte)) | set(_kachel_bereich(alte_karte))):
+        fenster = [kachel_zeile * KACHEL_ZELLEN, kachel_spalte * KACHEL_ZELLEN, KACHEL_ZELLEN, KACHEL_ZELLEN]
+        for ebene in EBENEN:
+            gitter = _fenster_lesen(karte, ebene, *fenster)
+            datei = rf"{raster_ordner}\{ebene}_{kachel_zeile}_{kachel_spalte}.tif"
+            if alte_karte is not None and np.array_equal(gitter, _fenster_lesen(alte_karte, ebene, *fenster)):
+                continue
+            if gitter.any():
+                _raster_schreiben(gitter, fenster[0], fenster[1], karte["zellgroesse"], epsg, datei)
+            elif arcpy.Exists(datei):
+                arcpy.Delete_management(datei)
+            else:
+                continue
+            anzahl += 1
+    return anzahl
+
+
+@func_info
+def karte_aktualisieren(global_info: list, workspace_info: list, zellgroesse: float = 100.0) -> dict:
+    """
+    Die Funktion führt die Karte des Meridians fort: neue Operate aus "flaechen_sammlung" werden rasterisiert und zu
+    "operate_anzahl" addiert, die Bildpunkte aus "punkte_sammlung" werden neu gezählt. Wurden Operate entfernt oder
+    neu eingefügt (anderer Zeitpunkt) oder hat sich die Zellgröße geändert, werden alle Operatsflächen neu
+    rasterisiert. Danach werden die geänderten Rasterkacheln und die Zusammenfassung geschrieben.
+    Parameter:
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - zellgroesse (float): Kantenlänge der Zellen in Metern
+    Rückgabewert:
+        - statistik (dict): Zusammenfassung der Karte (siehe "statistik_berechnen")
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    # Operate und Flugjahre aus "flaechen_sammlung"
+    operat_jahr = operat_jahre(flaechen_sammlung)
+    operat_zeitpunkt = {}
+    with arcpy.da.SearchCursor(flaechen_sammlung, ["operat_nr", "zeitpunkt"]) as cursor:
+        for operat_nr, zeitpunkt in cursor:
+            operat_zeitpunkt[operat_nr] = str(zeitpunkt)
+
+    karte = karte_laden(workspace_info)
+    bisher = {} if karte is None else dict(zip(karte["operate"].tolist(), karte["zeitpunkte"].tolist()))
+    alte_karte = None if karte is None or karte["zellgroesse"] != float(zellgroesse) else \
+        {schluessel: wert.copy() if isinstance(wert, np.ndarray) else wert for schluessel, wert in karte.items()}
+    if alte_karte is None or \
+            any(operat_zeitpunkt.get(operat_nr) != zeitpunkt for operat_nr, zeitpunkt in bisher.items()):
+        karte = karte_erstellen(zellgroesse)
+        bisher = {}
+    neue_operate = [operat_nr for operat_nr in operat_zeitpunkt if operat_nr not in bisher]
+
+    # Ausdehnung der Bildpunkte und der neuen Operatsflächen
+    punkte = arcpy.da.FeatureClassToNumPyArray(punkte_sammlung, ["operat_nr", "SHAPE@X", "SHAPE@Y"], null_value="")
+    flaechen = {}
+    if neue_operate:
+        with arcpy.da.SearchCursor(flaechen_sammlung, ["operat_nr", "SHAPE@"]) as cursor:
+            for operat_nr, geometrie in cursor:
+                if operat_nr not in bisher and geometrie is not None:
+                    flaechen.setdefault(operat_nr, []).append(vektor_global.polygon_ringe(geometrie))
+    alle = np.concatenate([np.column_stack([punkte["SHAPE@X"], punkte["SHAPE@Y"]])] +
+                          [ring for polygone in flaechen.values() for ringe in polygone for ring in ringe])
+    if len(alle):
+        karte = gitter_erweitern(karte, alle[:, 0].min(), alle[:, 1].min(), alle[:, 0].max(), alle[:, 1].max())
+
+    # konkurrierende Operate (nur neue Flächen), Bildpunkte und neuestes Flugjahr
+    for polygone in flaechen.values():
+        karte = flaeche_addieren(karte, polygone)
+    karte = punkte_zaehlen(
+        karte,
+        punkte["SHAPE@X"],
+        punkte["SHAPE@Y"],
+        [operat_jahr.get(operat_nr, jahr_lesen(None, operat_nr)) for operat_nr in punkte["operat_nr"]]
+    )
+    karte["operate"] = np.array(list(operat_zeitpunkt.keys()), dtype=str)
+    karte["zeitpunkte"] = np.array(list(operat_zeitpunkt.values()), dtype=str)
+    karte_speichern(karte, workspace_info)
+
+    # Rasterdateien und Zusammenfassung
+    statistik = statistik_berechnen(karte)
+    with open(rf"{speicherort}\{meridian}_abdeckung_karte.json", "w") as datei:
+        json.dump(statistik, datei, indent=2)
+    raster_ordner = rf"{speicherort}\{meridian}_abdeckung_karte"
+    os.makedirs(raster_ordner, exist_ok=True)
+    if alte_karte is None:
+        # Kacheln einer anderen Zellgröße entfernen
+        for datei in glob.glob(rf"{raster_ordner}\*.tif"):
+            arcpy.Delete_management(datei)
+    kacheln = kacheln_schreiben(karte, alte_karte, epsg, raster_ordner)
+    print(f"Abdeckungskarte {meridian}: {len(neue_operate)} neue Operate rasterisiert, {kacheln} Kacheln geschrieben, "
+          f"{statistik['flaeche_km2']} km² abgedeckt, medianes Alter {statistik['alter_median_jahre']} Jahre")
+    return statistik
+
+
+@func_info
+def gesamtkarte_erstellen(speicherort: str, zellgroesse: float = 100.0) -> dict:
+    """
+    Die Funktion führt die Rasterkacheln aller Meridiane im Speicherort zu einer Gesamtkarte zusammen ("abdeckung_karte"
+    im Speicherort, EPSG 31287). In den Überlappungsbereichen der Meridianstreifen gilt der größere Wert. Die
+    Zusammenfassung der Gesamtkarte ist die Summe der Zusammenfassungen der Meridiane. Die Gesamtkarte wird nur auf
+    Wunsch erstellt (siehe "abdeckung_gesamtkarte_zellgroesse" in "main.py").
+    Parameter:
+        - speicherort (str): Pfad des Speicherorts sämtlicher Ergebnisse und Zwischenergebnisse
+        - zellgroesse (float): Kantenlänge der Zellen der Gesamtkarte in Metern
+    Rückgabewert:
+        - statistik (dict): Zusammenfassung der Gesamtkarte
+    """
+    gesamt_ordner = rf"{speicherort}\abdeckung_karte"
+    os.makedirs(gesamt_ordner, exist_ok=True)
+    raster_ordner = sorted(ordner for ordner in glob.glob(rf"{speicherort}\*_abdeckung_karte") if os.path.isdir(ordner))
+    for ebene, (datentyp, pixeltyp) in EBENEN.items():
+        raster = [datei for ordner in raster_ordner for datei in sorted(glob.glob(rf"{ordner}\{ebene}_*.tif"))]
+        if not raster:
+            continue
+        if arcpy.Exists(rf"{gesamt_ordner}\{ebene}.tif"):
+            arcpy.Delete_management(rf"{gesamt_ordner}\{ebene}.tif")
+        with arcpy.EnvManager(compression="LZW"):
+            arcpy.MosaicToNewRaster_management(
+                ";".join(raster),
+                gesamt_ordner,
+                f"{ebene}.tif",
+                arcpy.SpatialReference(GESAMT_EPSG),
+                pixeltyp,
+                zellgroesse,
+                1,
+                "MAXIMUM"
+            )
+
+    # Zusammenfassung: Summe der Meridiane
+    statistik = {"meridiane": [], "flaeche_km2": 0.0, "bildanzahl": 0, "operate": 0, "flaeche_je_jahr_km2": {},
+                 "flaeche_mehrere_operate_km2": 0.0}
+    for datei in sorted(glob.glob(rf"{speicherort}\*_abdeckung_karte.json")):
+        with open(datei, "r") as file:
+            meridian_statistik = json.load(file)
+        statistik["meridiane"].append(os.path.basename(datei).split("_")[0])
+        for schluessel in ("flaeche_km2", "bildanzahl", "operate", "flaeche_mehrere_operate_km2"):
+            statistik[schluessel] += meridian_statistik[schluessel]
+        for jahr, flaeche in meridian_statistik["flaeche_je_jahr_km2"].items():
+            statistik["flaeche_je_jahr_km2"][jahr] = round(statistik["flaeche_je_jahr_km2"].get(jahr, 0.0) + flaeche, 2)
+    with open(rf"{gesamt_ordner}\abdeckung_karte.json", "w") as datei:
+        json.dump(statistik, datei, indent=2)
+    return statistik
@@ -0,0 +1,546 @@
+# Dieses Python-Skript führt ein fortlaufendes Protokoll (Ledger) über alle Änderungen der Abdeckung eines Meridians.
+# Je eingefügtem Operat werden Operatsfläche, Flugjahr, Lade-Zeitpunkt, alle relevanten Bildpunkte, die gewonnenen
+# Flächen der Partition und das Delta von "punkte_sammlung" als json-Zeilen angehängt. Einträge werden nie verändert:
+# ein Operat wird zurückgesetzt, indem nur der betroffene Bereich aus den Ledger-Daten neu zugeordnet wird, und der
+# Stand der Abdeckung zu einem Stichtag wird ohne Neuberechnung der Operate aus dem Ledger erzeugt.
+# Ein Eintrag wird vor der Änderung begonnen und danach abgeschlossen. Bricht ein Durchlauf ab, bleibt der Eintrag
+# offen und gilt als nicht eingefügt, "operat_zuruecksetzen" stellt dann den Zustand vor dem Abbruch wieder her.
+# Der Workflow wird durch das Starten von "main.py" initiiert, "abdeckung_ledger.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import arcpy
+import bild_schluessel
+import json
+import os
+import numpy as np
+import numpy_geometrie
+import vektor_global
+from datetime import datetime
+from info_wrapper import *
+from time import time
+
+
+def ledger_datei(workspace_info: list) -> str:
+    """
+    Die Funktion liefert den Pfad zum Ledger des Meridians ("{meridian}_abdeckung_ledger.jsonl" im Speicherort).
+    Parameter:
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    Rückgabewert:
+        - ledger (str): Pfad zum Ledger
+    """
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    return rf"{speicherort}\{meridian}_abdeckung_ledger.jsonl"
+
+
+def ledger_lesen(ledger: str) -> list:
+    """
+    Die Funktion liest alle Zeilen des Ledgers (leere Liste, falls noch kein Ledger existiert).
+    """
+    if not os.path.exists(ledger):
+        return []
+    with open(ledger, "r") as datei:
+        return [json.loads(zeile) for zeile in datei if zeile.strip()]
+
+
+def _eintrag_anhaengen(ledger: str, eintrag: dict):
+    """
+    Hängt eine Zeile an den Ledger an und schreibt sie sofort auf die Festplatte.
+    """
+    with open(ledger, "a") as datei:
+        datei.write(json.dumps(eintrag) + "\n")
+        datei.flush()
+        os.fsync(datei.fileno())
+
+
+def geometrie_json(geometrie) -> dict:
+    """
+    Wandelt eine arcpy-Geometrie in ein json-Objekt (Esri JSON inklusive Raumbezug) um.
+    """
+    return json.loads(geometrie.JSON)
+
+
+def geometrie_laden(geometrie_json: dict):
+    """
+    Erstellt aus einem json-Objekt (siehe "geometrie_json") wieder eine arcpy-Geometrie.
+    """
+    return arcpy.AsShape(geometrie_json, True)
+
+
+def versionen_zusammenfuehren(eintraege: list) -> dict:
+    """
+    Die Funktion fasst begonnene und abgeschlossene Zeilen je Version zusammen.
+    Parameter:
+        - eintraege (list): Zeilen des Ledgers (siehe "ledger_lesen")
+    Rückgabewert:
+        - versionen (dict): key = Version, value = zusammengefasster Eintrag ("status" = "begonnen" bei Abbruch)
+    """
+    versionen = {}
+    for eintrag in eintraege:
+        versionen.setdefault(eintrag["version"], {}).update(eintrag)
+    return versionen
+
+
+def operat_stapel(versionen: dict, bis: float = None) -> dict:
+    """
+    Die Funktion ermittelt je Operat die eingefügten und nicht zurückgesetzten Versionen (älteste zuerst). Die letzte
+    Version eines Operates ist jene, die aktuell in der Abdeckung enthalten ist. Offene Einträge werden ignoriert.
+    Parameter:
+        - versionen (dict): Ergebnis von "versionen_zusammenfuehren"
+        - bis (float): nur Einträge, die bis zu diesem Zeitpunkt abgeschlossen wurden (None = alle)
+    Rückgabewert:
+        - stapel (dict): key = Operatsnummer, value = Liste der Versionen
+    """
+    stapel = {}
+    for version in sorted(versionen):
+        eintrag = versionen[version]
+        if eintrag["status"] != "abgeschlossen" or (bis is not None and eintrag["abgeschlossen"] > bis):
+            continue
+        if eintrag["art"] == "rueckgaengig":
+            if eintrag["version_rueckgaengig"] in stapel.get(eintrag["operat"], []):
+                stapel[eintrag["operat"]].remove(eintrag["version_rueckgaengig"])
+        else:
+            stapel.setdefault(eintrag["operat"], []).append(version)
+    return {operat: liste for operat, liste in stapel.items() if liste}
+
+
+def _version_speichern(ledger: str, version: int):
+    """
+    Speichert die zuletzt vergebene Version in "{ledger}.version", damit der Ledger dafür nicht gelesen werden muss.
+    """
+    with open(f"{ledger}.version.temp", "w") as datei:
+        datei.write(str(version))
+    os.replace(f"{ledger}.version.temp", f"{ledger}.version")
+
+
+def _version_vergeben(ledger: str) -> int:
+    """
+    Vergibt die nächste Version des Ledgers und speichert sie, bevor der Eintrag angehängt wird (ein Abbruch dazwischen
+    hinterlässt nur eine unbenutzte Version). Fehlt "{ledger}.version", wird die letzte Version einmalig aus dem
+    Ledger gelesen.
+    """
+    if os.path.exists(f"{ledger}.version"):
+        with open(f"{ledger}.version", "r") as datei:
+            version = int(datei.read()) + 1
+    else:
+        versionen = versionen_zusammenfuehren(ledger_lesen(ledger))
+        version = max(versionen) + 1 if versionen else 1
+    _version_speichern(ledger, version)
+    return version
+
+
+def _operat_abfrage(operat: str) -> str:
+    """
+    SQL-Abfrage auf die Zeilen eines Operates (siehe "bild_schluessel.text_abfragen").
+    """
+    return bild_schluessel.text_abfragen([operat])[0]
+
+
+def _bildpunkte_zeilen(bildpunkte_fc: str, where_clause: str = None) -> list:
+    """
+    Liest Bildpunkte als Zeilen [img_name, operat_nr, flugstreifen, flughoehe, x, y] (Feld "operat" oder "operat_nr").
+    """
+    felder = [feld.name for feld in arcpy.ListFields(bildpunkte_fc)]
+    operat_feld = "operat_nr" if "operat_nr" in felder else "operat"
+    with arcpy.da.SearchCursor(bildpunkte_fc, ["img_name", operat_feld, "flugstreifen", "flughoehe", "SHAPE@X",
+                                               "SHAPE@Y"], where_clause=where_clause) as cursor:
+        return [list(row) for row in cursor]
+
+
+def _operat_zeile(flaechen_sammlung: str, operat: str) -> list:
+    """
+    Liest ein Operat aus "flaechen_sammlung" als [operat_nr, jahr, zeitpunkt, SHAPE@] (None, falls nicht vorhanden).
+    """
+    with arcpy.da.SearchCursor(flaechen_sammlung, ["operat_nr", "jahr", "zeitpunkt", "SHAPE@"],
+                               where_clause=_operat_abfrage(operat)) as cursor:
+        zeilen = [list(row) for row in cursor]
+    if not zeilen:
+        return None
+    zeilen[0][3] = vektor_global.geometrien_vereinigen([row[3] for row in zeilen])
+    return zeilen[0]
+
+
+@func_info
+def ledger_initialisieren(global_info: list, workspace_info: list) -> str:
+    """
+    Die Funktion erstellt den Ledger eines bestehenden Meridians: für jedes Operat in "flaechen_sammlung" wird ein
+    abgeschlossener Basis-Eintrag angelegt. Als Bildpunkte werden "bildpunkte_extrahiert" aus der Geodatabase des
+    Operates verwendet, falls diese nicht mehr existiert, die Punkte des Operates in "punkte_sammlung" (nur die Punkte
+    seiner aktuellen Flächen, der Eintrag wird als unvollständig gekennzeichnet und solche Operate können beim
+    Zurücksetzen keine Flächen übernehmen). Existiert der Ledger bereits, passiert nichts.
+    Parameter:
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    Rückgabewert:
+        - ledger (str): Pfad zum Ledger
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    ledger = ledger_datei(workspace_info)
+    if os.path.exists(ledger):
+        return ledger
+
+    with arcpy.da.SearchCursor(flaechen_sammlung, ["operat_nr"]) as cursor:
+        operate = sorted(set(row[0] for row in cursor))
+
+    # Basis wird zuerst in eine temporäre Datei geschrieben, damit ein Abbruch keinen unvollständigen Ledger hinterlässt
+    ledger_temp = f"{ledger}.temp"
+    with open(ledger_temp, "w"):
+        pass
+    unvollstaendig = []
+    for version, basis_operat in enumerate(operate, start=1):
+        operat_nr, jahr, zeitpunkt, geometrie = _operat_zeile(flaechen_sammlung, basis_operat)
+        bildpunkte_lokal = rf"{meridian_ordner}\{basis_operat}\{basis_operat}.gdb\output" \
+                           rf"\bildpunkte_extrahiert_{basis_operat}"
+        if arcpy.Exists(bildpunkte_lokal):
+            bildpunkte = _bildpunkte_zeilen(bildpunkte_lokal)
+            bildpunkte_quelle = "lokal"
+        else:
+            bildpunkte = _bildpunkte_zeilen(punkte_sammlung, _operat_abfrage(basis_operat))
+            bildpunkte_quelle = "punkte_sammlung"
+            unvollstaendig.append(basis_operat)
+        _eintrag_anhaengen(ledger_temp, {
+            "version": version,
+            "art": "basis",
+            "status": "abgeschlossen",
+            "begonnen": time(),
+            "abgeschlossen": time(),
+            "operat": basis_operat,
+            "jahr": jahr,
+            "zeitpunkt": zeitpunkt,
+            "operatsflaeche": geometrie_json(geometrie),
+            "bildpunkte": bildpunkte,
+            "bildpunkte_quelle": bildpunkte_quelle
+        })
+
+    os.replace(ledger_temp, ledger)
+    _version_speichern(ledger, len(operate))
+
+    print(f"Ledger mit {len(operate)} bestehenden Operaten erstellt")
+    if unvollstaendig:
+        print(f"WARNUNG: für {len(unvollstaendig)} Operate fehlt die lokale Geodatabase, ihre Bildpunkte im Ledger "
+              f"sind unvollständig (Zurücksetzen in ihrem Bereich nicht möglich): {', '.join(unvollstaendig)}")
+    return ledger
+
+
+@func_info
+def einfuegen_beginnen(global_info: list, main_featureclasses_info: list, workspace_info: list) -> int:
+    """
+    Die Funktion beginnt den Ledger-Eintrag des Input-Operates, nachdem es in "flaechen_sammlung" eingefügt wurde und
+    bevor Partition und "punkte_sammlung" verändert werden.
+    Parameter:
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - main_featureclasses_info (list): Pfade zu den wichtigsten Featureclasses
+                                           (bildpunkte_unbearbeitet, bildpunkte_extrahiert)
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    Rückgabewert:
+        - version (int): Version des Eintrags
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+    bildpunkte_unbearbeitet, bildpunkte_extrahiert = main_featureclasses_info
+
+    ledger = ledger_datei(workspace_info)
+    version = _version_vergeben(ledger)
+    operat_nr, jahr, zeitpunkt, geometrie = _operat_zeile(flaechen_sammlung, operat)
+    _eintrag_anhaengen(ledger, {
+        "version": version,
+        "art": "einfuegen",
+        "status": "begonnen",
+        "begonnen": time(),
+        "operat": operat,
+        "jahr": jahr,
+        "zeitpunkt": zeitpunkt,
+        "operatsflaeche": geometrie_json(geometrie),
+        "bildpunkte": _bildpunkte_zeilen(bildpunkte_extrahiert)
+    })
+    return version
+
+
+@func_info
+def einfuegen_abschliessen(version: int, loesch_punkte_liste: list, hinzugefuegt_abgleich_liste: list,
+                           global_info: list, workspace_info: list):
+    """
+    Die Funktion schließt den Ledger-Eintrag des Input-Operates ab: gespeichert werden die Flächen der Partition, die
+    das Operat gewonnen hat, und das Delta von "punkte_sammlung" (Schlüssel wie in "bild_schluessel.py").
+    Parameter:
+        - version (int): Version des Eintrags (siehe "einfuegen_beginnen")
+        - loesch_punkte_liste (list): Schlüssel der aus "punkte_sammlung" entfernten Punkte
+        - hinzugefuegt_abgleich_liste (list): Schlüssel der in "punkte_sammlung" eingefügten Punkte
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    with arcpy.da.SearchCursor(rf"{fds_output_global}\flaechen_partition", ["SHAPE@"],
+                               where_clause=_operat_abfrage(operat)) as cursor:
+        flaechen = [geometrie_json(row[0]) for row in cursor]
+
+    _eintrag_anhaengen(ledger_datei(workspace_info), {
+        "version": version,
+        "status": "abgeschlossen",
+        "abgeschlossen": time(),
+        "flaechen": flaechen,
+        "punkte_entfernt": loesch_punkte_liste,
+        "punkte_hinzugefuegt": hinzugefuegt_abgleich_liste
+    })
+
+
+def _punkte_in_flaechen(flaechen: list, versionen: dict, stapel: dict) -> list:
+    """
+    Liefert die Bildpunkte des jeweils zugeordneten Operates innerhalb jeder Fläche aus den Ledger-Daten.
+    Parameter:
+        - flaechen (list): Zeilen [operat_nr, jahr, zeitpunkt, SHAPE@]
+        - versionen (dict): Ergebnis von "versionen_zusammenfuehren"
+        - stapel (dict): Ergebnis von "operat_stapel"
+    Rückgabewert:
+        - punkte (list): Zeilen [img_name, operat_nr, flugstreifen, flughoehe, x, y]
+    """
+    punkte = []
+    for operat_nr, jahr, zeitpunkt, flaeche in flaechen:
+        if operat_nr not in stapel:
+            print(f"Keine Bildpunkte von {operat_nr} im Ledger")
+            continue
+        bildpunkte = versionen[stapel[operat_nr][-1]]["bildpunkte"]
+        if not bildpunkte:
+            continue
+        xy = np.array([[row[4], row[5]] for row in bildpunkte], dtype=float)
+        # Vorauswahl über die Ausdehnung der Fläche, danach vektorisierter Test
+        ausdehnung = flaeche.extent
+        kandidaten = np.flatnonzero((xy[:, 0] >= ausdehnung.XMin) & (xy[:, 0] <= ausdehnung.XMax) &
+                                    (xy[:, 1] >= ausdehnung.YMin) & (xy[:, 1] <= ausdehnung.YMax))
+        innen = numpy_geometrie.punkte_in_polygon(xy[kandidaten, 0], xy[kandidaten, 1],
+                                                  vektor_global.polygon_ringe(flaeche))
+        punkte.extend(bildpunkte[i] for i in kandidaten[innen])
+    return punkte
+
+
+@func_info
+def operat_zuruecksetzen(operat: str, global_info: list, workspace_info: list) -> tuple:
+    """
+    Die Funktion setzt die letzte Version eines Operates zurück, ohne den Meridian neu zu berechnen. War das Operat
+    bereits früher eingefügt, gilt wieder die vorherige Version. Ist der letzte Eintrag des Operates offen (Abbruch
+    während des Einfügens), wird der Zustand vor dem Abbruch wiederhergestellt. Nur der Bereich, den das Operat abdeckt
+    oder gewonnen hat, wird aus den Operaten in "flaechen_sammlung" neu zugeordnet, die Bildpunkte der neuen Flächen
+    stammen aus dem Ledger. Das Delta wird im Änderungsprotokoll von "punkte_sammlung" gespeichert. Sind die
+    Bildpunkte eines Operates im betroffenen Bereich im Ledger unvollständig (siehe "ledger_initialisieren"), wird das
+    Zurücksetzen vor jeder Änderung mit einer Exception abgelehnt.
+    Parameter:
+        - operat (str): Operatsnummer des zurückzusetzenden Operates
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace des Meridians
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    Rückgabewerte (tuple):
+        - loesch_punkte_liste (list): Schlüssel der aus "punkte_sammlung" entfernten Punkte
+        - hinzugefuegt_abgleich_liste (list): Schlüssel der in "punkte_sammlung" eingefügten Punkte
+        - hinzugefuegt_punkte (dict): key = Operat, value = Bildnamen der in "punkte_sammlung" eingefügten Punkte
+    """
+
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    # benötigte Pfade
+    ledger = ledger_datei(workspace_info)
+    flaechen_partition = rf"{fds_output_global}\flaechen_partition"
+    flaechen_sammlung_final = rf"{fds_output_global}\flaechen_sammlung_final"
+    partition_layer = "flaechen_partition_ledger_layer"
+    sammlung_layer = "flaechen_sammlung_ledger_layer"
+    punkte_layer = "punkte_sammlung_ledger_layer"
+
+    # Version, die zurückgesetzt wird, und Version, die danach gilt
+    versionen = versionen_zusammenfuehren(ledger_lesen(ledger))
+    stapel = operat_stapel(versionen)
+    operat_versionen = stapel.get(operat, [])
+    offen = [version for version, eintrag in versionen.items()
+             if eintrag["operat"] == operat and eintrag["art"] == "einfuegen" and eintrag["status"] == "begonnen"]
+    if offen and (not operat_versionen or max(offen) > operat_versionen[-1]):
+        ziel_version = max(offen)
+        vorherige_version = operat_versionen[-1] if operat_versionen else None
+    elif operat_versionen:
+        ziel_version = operat_versionen[-1]
+        vorherige_version = operat_versionen[-2] if len(operat_versionen) > 1 else None
+        stapel[operat] = operat_versionen[:-1]
+        if not stapel[operat]:
+            del stapel[operat]
+    else:
+        print(f"{operat} ist im Ledger nicht enthalten")
+        return [], [], {}
+
+    # betroffener Bereich (Operat und berührte Flächen der Partition), noch ohne Änderung
+    bereich_teile = [geometrie_laden(versionen[ziel_version]["operatsflaeche"])]
+    with arcpy.da.SearchCursor(flaechen_sammlung, ["SHAPE@"], where_clause=_operat_abfrage(operat)) as cursor:
+        bereich_teile += [row[0] for row in cursor]
+    bereich = vektor_global.geometrien_vereinigen(bereich_teile)
+    arcpy.Delete_management(partition_layer)
+    arcpy.MakeFeatureLayer_management(flaechen_partition, partition_layer)
+    arcpy.SelectLayerByLocation_management(partition_layer, "INTERSECT", [bereich], selection_type="NEW_SELECTION")
+    arcpy.SelectLayerByAttribute_management(partition_layer, "ADD_TO_SELECTION", _operat_abfrage(operat))
+    alte_oids, alte_flaechen = [], []
+    for abfrage in vektor_global.auswahl_abfragen(partition_layer, flaechen_partition):
+        with arcpy.da.SearchCursor(flaechen_partition, ["OID@", "operat_nr", "SHAPE@"], where_clause=abfrage) as cursor:
+            for row in cursor:
+                alte_oids.append(row[0])
+                alte_flaechen.append(list(row[1:]))
+    bereich = vektor_global.geometrien_vereinigen([bereich] + [row[1] for row in alte_flaechen])
+
+    # Operate, die den Bereich übernehmen können, benötigen vollständige Bildpunkte im Ledger
+    arcpy.Delete_management(sammlung_layer)
+    arcpy.MakeFeatureLayer_management(flaechen_sammlung, sammlung_layer)
+    arcpy.SelectLayerByLocation_management(sammlung_layer, "INTERSECT", [bereich], selection_type="NEW_SELECTION")
+    kandidaten = {operat}
+    for abfrage in vektor_global.auswahl_abfragen(sammlung_layer, flaechen_sammlung):
+        with arcpy.da.SearchCursor(flaechen_sammlung, ["operat_nr"], where_clause=abfrage) as cursor:
+            kandidaten.update(row[0] for row in cursor)
+    unvollstaendig = sorted(operat_nr for operat_nr in kandidaten if operat_nr in stapel and
+                            versionen[stapel[operat_nr][-1]].get("bildpunkte_quelle") == "punkte_sammlung")
+    if unvollstaendig:
+        raise Exception(f"{operat} kann nicht zurückgesetzt werden: die Bildpunkte von {', '.join(unvollstaendig)} "
+                        f"sind im Ledger unvollständig (lokale Geodatabase fehlte beim Erstellen des Ledgers)")
+
+    version = _version_vergeben(ledger)
+    _eintrag_anhaengen(ledger, {
+        "version": version,
+        "art": "rueckgaengig",
+        "status": "begonnen",
+        "begonnen": time(),
+        "operat": operat,
+        "version_rueckgaengig": ziel_version
+    })
+
+    # "flaechen_sammlung": Operat entfernen, gegebenenfalls vorherige Version wiederherstellen
+    with arcpy.da.UpdateCursor(flaechen_sammlung, ["SHAPE@"], where_clause=_operat_abfrage(operat)) as cursor:
+        for row in cursor:
+            cursor.deleteRow()
+    if vorherige_version is not None:
+        vorherige = versionen[vorherige_version]
+        with arcpy.da.InsertCursor(flaechen_sammlung, ["operat_nr", "SHAPE@", "jahr", "zeitpunkt"]) as cursor:
+            cursor.insertRow([operat, geometrie_laden(vorherige["operatsflaeche"]), vorherige["jahr"],
+                              vorherige["zeitpunkt"]])
+
+    # Flächen der Partition im betroffenen Bereich und Flächen des Operates entfernen
+    for abfrage in vektor_global.oid_abfragen(flaechen_partition, alte_oids):
+        with arcpy.da.UpdateCursor(flaechen_partition, ["OID@"], where_clause=abfrage) as cursor:
+            for row in cursor:
+                cursor.deleteRow()
+
+    # Bereich aus den verbleibenden Operaten neu zuordnen
+    arcpy.Delete_management(sammlung_layer)
+    arcpy.MakeFeatureLayer_management(flaechen_sammlung, sammlung_layer)
+    arcpy.SelectLayerByLocation_management(sammlung_layer, "INTERSECT", [bereich], selection_type="NEW_SELECTION")
+    operate = []
+    for abfrage in vektor_global.auswahl_abfragen(sammlung_layer, flaechen_sammlung):
+        with arcpy.da.SearchCursor(flaechen_sammlung, ["operat_nr", "jahr", "zeitpunkt", "SHAPE@"],
+                                   where_clause=abfrage) as cursor:
+            operate.extend(list(row) for row in cursor)
+    neue_flaechen = vektor_global.flaechen_zuordnen(operate, bereich)
+    with arcpy.da.InsertCursor(flaechen_partition, ["operat_nr", "jahr", "zeitpunkt", "SHAPE@"]) as cursor:
+        for row in neue_flaechen:
+            cursor.insertRow(row)
+    vektor_global.flaechen_sammlung_final_anpassen(flaechen_sammlung_final, bereich, alte_flaechen, neue_flaechen)
+
+    # "punkte_sammlung": Punkte im Bereich und Punkte des Operates ersetzen
+    arcpy.Delete_management(punkte_layer)
+    arcpy.MakeFeatureLayer_management(punkte_sammlung, punkte_layer)
+    arcpy.SelectLayerByLocation_management(punkte_layer, "INTERSECT", [bereich], selection_type="NEW_SELECTION")
+    arcpy.SelectLayerByAttribute_management(punkte_layer, "ADD_TO_SELECTION", _operat_abfrage(operat))
+    loesch_punkte_liste = []
+    for abfrage in vektor_global.auswahl_abfragen(punkte_layer, punkte_sammlung):
+        with arcpy.da.UpdateCursor(punkte_sammlung, ["img_name", "operat_nr"], where_clause=abfrage) as cursor:
+            for row in cursor:
+                loesch_punkte_liste.append(bild_schluessel.schluessel_bilden(row[0], row[1]))
+                cursor.deleteRow()
+
+    neue_punkte = _punkte_in_flaechen(neue_flaechen, versionen, stapel)
+    with arcpy.da.InsertCursor(punkte_sammlung, ["img_name", "operat_nr", "flugstreifen", "flughoehe",
+                                                 "SHAPE@XY"]) as cursor:
+        for img_name, operat_nr, flugstreifen, flughoehe, x, y in neue_punkte:
+            cursor.insertRow([img_name, operat_nr, flugstreifen, flughoehe, (x, y)])
+    hinzugefuegt_abgleich_liste = [bild_schluessel.schluessel_bilden(row[0], row[1]) for row in neue_punkte]
+    hinzugefuegt_punkte = {}
+    for row in neue_punkte:
+        hinzugefuegt_punkte.setdefault(row[1], []).append(row[0])
+
+    vektor_global.aenderungsprotokoll_schreiben(
+        loesch_punkte_liste,
+        hinzugefuegt_abgleich_liste,
+        workspace_info,
+        operat
+    )
+    _eintrag_anhaengen(ledger, {
+        "version": version,
+        "status": "abgeschlossen",
+        "abgeschlossen": time(),
+        "flaechen": [[row[0], geometrie_json(row[3])] for row in neue_flaechen],
+        "punkte_entfernt": loesch_punkte_liste,
+        "punkte_hinzugefuegt": hinzugefuegt_abgleich_liste
+    })
+
+    print(f"{operat} (Version {ziel_version}) zurückgesetzt, {len(alte_flaechen)} Flächen der Partition ersetzt")
+    return loesch_punkte_liste, hinzugefuegt_abgleich_liste, hinzugefuegt_punkte
+
+
+@func_info
+def abdeckung_materialisieren(stichtag: str, global_info: list, workspace_info: list) -> tuple:
+    """
+    Die Funktion erzeugt den Stand der Abdeckung zu einem Stichtag ausschließlich aus dem Ledger: alle bis zum Ende
+    des Stichtags abgeschlossenen und nicht zurückgesetzten Operate werden nach dem Regelwerk zugeordnet und mit ihren
+    Bildpunkten in "fds_temp" der globalen Geodatabase gespeichert. Der aktuelle Stand ("flaechen_sammlung",
+    "punkte_sammlung") bleibt unverändert, Manifest, Karte und Abfrage-Index der Abdeckung bleiben daher gültig.
+    Parameter:
+        - stichtag (str): Datum in der Form "JJJJ-MM-TT"
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace des Meridians
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    Rückgabewerte (tuple):
+        - flaechen_stand (str): Pfad zur fc mit den zugeordneten Flächen zum Stichtag
+        - punkte_stand (str): Pfad zur fc mit den Bildpunkten zum Stichtag
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    # benötigte Pfade
+    datum = stichtag.replace("-", "")
+    flaechen_stand = rf"{fds_temp_global}\flaechen_stand_{datum}"
+    punkte_stand = rf"{fds_temp_global}\punkte_stand_{datum}"
+
+    # Stand des Ledgers am Ende des Stichtags
+    bis = datetime.strptime(stichtag, "%Y-%m-%d").timestamp() + 86400
+    versionen = versionen_zusammenfuehren(ledger_lesen(ledger_datei(workspace_info)))
+    stapel = operat_stapel(versionen, bis)
+    operate = []
+    for operat_nr, operat_versionen in stapel.items():
+        eintrag = versionen[operat_versionen[-1]]
+        operate.append([operat_nr, eintrag["jahr"], eintrag["zeitpunkt"],
+                        geometrie_laden(eintrag["operatsflaeche"])])
+
+    flaechen = vektor_global.flaechen_zuordnen(operate)
+    punkte = _punkte_in_flaechen(flaechen, versionen, stapel)
+
+    # Stand als Featureclasses schreiben
+    arcpy.CreateFeatureclass_management(fds_temp_global, f"flaechen_stand_{datum}", "POLYGON")
+    arcpy.AddFields_management(flaechen_stand, [["operat_nr", "TEXT"], ["jahr", "TEXT"], ["zeitpunkt", "TEXT"]])
+    with arcpy.da.InsertCursor(flaechen_stand, ["operat_nr", "jahr", "zeitpunkt", "SHAPE@"]) as cursor:
+        for row in flaechen:
+            cursor.insertRow(row)
+
+    arcpy.CreateFeatureclass_management(fds_temp_global, f"punkte_stand_{datum}", "POINT")
+    arcpy.AddFields_management(punkte_stand, [["img_name", "TEXT"], ["operat_nr", "TEXT"],
+                                              ["flugstreifen", "TEXT"], ["flughoehe", "TEXT"]])
+    with arcpy.da.InsertCursor(punkte_stand, ["img_name", "operat_nr", "flugstreifen", "flughoehe",
+                                              "SHAPE@XY"]) as cursor:
+        for img_name, operat_nr, flugstreifen, flughoehe, x, y in punkte:
+            cursor.insertRow([img_name, operat_nr, flugstreifen, flughoehe, (x, y)])
+
+    print(f"Stand {stichtag}: {len(operate)} Operate, {len(flaechen)} Flächen, {len(punkte)} Bildpunkte")
+    return flaechen_stand, punkte_stand
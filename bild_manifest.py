@@ -0,0 +1,277 @@
+# Dieses Python-Skript hält die maßgebliche Bildauswahl eines Meridians in einem kompakten Manifest fest
+# ("{meridian}_manifest.npz" im Speicherort, spaltenweise NumPy-Arrays): je Bild Schlüssel, bild_id, Pfad im
+# Netzwerk, Orientierung (Projektionszentrum), Operat und Flugjahr (wie in "abdeckung_karte.operat_jahre"), dazu je
+# Operat die Original-.prj-Dateien (komprimiert). Gespeichert wird nur der aktuelle Stand mit einer fortlaufenden
+# Versionsnummer. Nach jeder Änderung von "punkte_sammlung" wird das Manifest mit dem Delta fortgeführt, die
+# .prj-Dateien werden für neue und im aktuellen Durchlauf eingefügte Operate gelesen. Aus dem Manifest allein kann ein
+# beschädigtes Mosaic Dataset neu aufgebaut werden, ohne die Vektor-Bearbeitung erneut auszuführen (Einfügen je Operat
+# in Blöcken, auch parallel).
+# Der Workflow wird durch das Starten von "main.py" initiiert, "bild_manifest.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import arcpy
+import os
+import shutil
+import zlib
+import numpy as np
+import abdeckung_karte
+import bild_pruefung
+import bild_schluessel
+import mosaic_staging
+import prj_funktionen
+import raster_global
+import ueberschneidung_regeln
+import workspace_funktionen
+from info_wrapper import *
+from time import time
+
+
+# Version des Aufbaus der Manifest-Datei
+MANIFEST_FORMAT = 1
+
+
+def manifest_datei(workspace_info: list) -> str:
+    """
+    Die Funktion liefert den Pfad des Manifests im Speicherort ("{meridian}_manifest.npz").
+    """
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    return rf"{speicherort}\{meridian}_manifest.npz"
+
+
+def manifest_laden(workspace_info: list) -> dict:
+    """
+    Die Funktion lädt das Manifest des Meridians (None, falls es fehlt oder ein anderes Format hat).
+    """
+    datei = manifest_datei(workspace_info)
+    if not os.path.exists(datei):
+        return None
+    with np.load(datei, allow_pickle=False) as daten:
+        manifest = {name: daten[name] for name in daten.files}
+    if int(manifest["format"]) != MANIFEST_FORMAT:
+        return None
+    return manifest
+
+
+def prj_vorlagen_lesen(manifest: dict) -> dict:
+    """
+    Die Funktion entpackt die .prj-Dateien des Manifests: key = Operat, value = Liste [Dateiname, Inhalt].
+    """
+    vorlagen = {}
+    if manifest is None:
+        return vorlagen
+    versatz = manifest["prj_versatz"]
+    for i, (operat, name) in enumerate(zip(manifest["prj_operat"], manifest["prj_name"])):
+        inhalt = zlib.decompress(manifest["prj_daten"][versatz[i]:versatz[i + 1]].tobytes()).decode("utf-8")
+        vorlagen.setdefault(str(operat), []).append([str(name), inhalt])
+    return vorlagen
+
+
+def _prj_originale_lesen(operat_ordner: str) -> list:
+    vorlagen = []
+    if not os.path.exists(operat_ordner):
+        return vorlagen
+    for item in sorted(os.listdir(operat_ordner)):
+        if item.endswith(".prj") and not item.endswith("kopie.prj") and "_sync_" not in item:
+            with open(rf"{operat_ordner}\{item}", "r") as file:
+                vorlagen.append([item, file.read()])
+    return vorlagen
+
+
+def _bilder_spalten(punkte: np.ndarray, meridian: str, ist_stand: dict, register: dict, operat_jahr: dict) -> dict:
+    """
+    Bildet die Spalten des Manifests für Bildpunkte aus "punkte_sammlung" (Felder "img_name", "operat_nr",
+    "flughoehe", "SHAPE@X", "SHAPE@Y"), noch nicht registrierte Schlüssel erhalten eine neue bild_id.
+    """
+    img_namen = punkte["img_name"].astype(str)
+    operate = punkte["operat_nr"].astype(str)
+
+    # Pfade der Bilder im Netzwerk (leer, falls für das Operat keine .prj-Datei gefunden wurde)
+    netzwerk_pfad = prj_funktionen.NETZWERK_PFAD.replace("\\\\", "\\")
+    pfade = [rf"{netzwerk_pfad}\LB{ist_stand[operat_nr]}\TIFFJPEG_{meridian}\{operat_nr}"
+             rf"\{bild_schluessel.bild_dateiname(img_name)}" if operat_nr in ist_stand else ""
+             for img_name, operat_nr in zip(img_namen, operate)]
+    schluessel = [bild_schluessel.schluessel_bilden(img_name, operat_nr)
+                  for img_name, operat_nr in zip(img_namen, operate)]
+
+    return {
+        "schluessel": np.array(schluessel, dtype=str),
+        "bild_id": np.asarray(bild_schluessel.ids_vergeben(register, schluessel), dtype=np.int64),
+        "img_name": img_namen,
+        "pfad": np.array(pfade, dtype=str),
+        "orientierung": np.column_stack([punkte["SHAPE@X"], punkte["SHAPE@Y"],
+                                         ueberschneidung_regeln.zahlen_lesen(punkte["flughoehe"])]).astype(np.float64),
+        "operat": operate,
+        # Flugjahr je Operat (dieselbe Quelle wie Karte und Abfrage-Index der Abdeckung)
+        "jahr": np.array([operat_jahr.get(operat_nr, abdeckung_karte.jahr_lesen(None, operat_nr))
+                          for operat_nr in operate], dtype=np.int16)
+    }
+
+
+@func_info
+def manifest_schreiben(global_info: list, workspace_info: list, loesch_punkte_liste: list,
+                       hinzugefuegt_punkte: dict) -> str:
+    """
+    Die Funktion führt das Manifest des Meridians mit dem Delta von "punkte_sammlung" fort: die entfernten Bilder
+    werden aus dem Manifest gelöscht, die eingefügten Bilder (nur diese werden aus "punkte_sammlung" gelesen)
+    ergänzt. Fehlt das Manifest (oder hat es ein anderes Format), wird es vollständig aus "punkte_sammlung"
+    geschrieben. Die .prj-Dateien der im aktuellen Durchlauf eingefügten und neuer Operate werden aus den
+    Operats-Ordnern gelesen, die übrigen aus dem bisherigen Manifest übernommen. Das Manifest wird zuerst in eine
+    temporäre Datei geschrieben und ersetzt dann das bisherige (die Versionsnummer wird hochgezählt).
+    Parameter:
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - loesch_punkte_liste (list): Schlüssel der aus "punkte_sammlung" entfernten Punkte
+        - hinzugefuegt_punkte (dict): key = Operat, value = Bildnamen der in "punkte_sammlung" eingefügten Punkte
+                                      (alle eingefügten Operate, auch ohne eingefügte Punkte)
+    Rückgabewert:
+        - datei (str): Pfad des Manifests
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    felder = ["img_name", "operat_nr", "flughoehe", "SHAPE@X", "SHAPE@Y"]
+    vorheriges = manifest_laden(workspace_info)
+    if vorheriges is None:
+        punkte = [arcpy.da.FeatureClassToNumPyArray(punkte_sammlung, felder, null_value="")]
+        spalten = []
+    else:
+        # entfernte Bilder und bereits vorhandene Schlüssel der eingefügten Bilder (neu geladene Operate) entfernen,
+        # nur die eingefügten Bilder der betroffenen Operate werden gelesen
+        eingefuegt = {bild_schluessel.schluessel_bilden(img_name, operat_nr)
+                      for operat_nr, img_namen in hinzugefuegt_punkte.items() for img_name in img_namen}
+        behalten = ~np.isin(vorheriges["schluessel"], list(set(loesch_punkte_liste) | eingefuegt))
+        spalten = [{name: vorheriges[name][behalten] for name in ["schluessel", "bild_id", "img_name", "pfad",
+                                                                  "orientierung", "operat", "jahr"]}]
+        punkte = []
+        for abfrage in bild_schluessel.text_abfragen(operat_nr for operat_nr, img_namen in hinzugefuegt_punkte.items()
+                                                     if img_namen):
+            teil = arcpy.da.FeatureClassToNumPyArray(punkte_sammlung, felder, where_clause=abfrage, null_value="")
+            punkte.append(teil[np.array([bild_schluessel.schluessel_bilden(img_name, operat_nr) in eingefuegt
+                                         for img_name, operat_nr in zip(teil["img_name"], teil["operat_nr"])],
+                                        dtype=bool)])
+
+    # .prj-Dateien je Operat (bekannte, nicht erneut eingefügte Operate aus dem bisherigen Manifest)
+    vorlagen = prj_vorlagen_lesen(vorheriges)
+    neue_operate = set(str(operat_nr) for teil in punkte for operat_nr in np.unique(teil["operat_nr"]))
+    for operat_nr in neue_operate:
+        if operat_nr not in vorlagen or operat_nr in hinzugefuegt_punkte:
+            vorlagen[operat_nr] = _prj_originale_lesen(
+                workspace_funktionen.workspace_info_ermitteln(meridian, operat_nr, speicherort)[5])
+    ist_stand = {operat_nr: prj_funktionen.ist_stand_ermitteln(vorlagen[operat_nr][0][1])
+                 for operat_nr in neue_operate if vorlagen[operat_nr]}
+
+    # Spalten der eingefügten Bilder, danach nach Operat und Bildname sortiert
+    register = bild_schluessel.register_laden(workspace_info)
+    operat_jahr = abdeckung_karte.operat_jahre(flaechen_sammlung)
+    spalten += [_bilder_spalten(teil, meridian, ist_stand, register, operat_jahr) for teil in punkte]
+    bild_schluessel.register_speichern(register, workspace_info)
+    bilder = {name: np.concatenate([teil[name] for teil in spalten]) for name in spalten[0]}
+    reihenfolge = np.lexsort((bilder["img_name"], bilder["operat"]))
+    bilder = {name: werte[reihenfolge] for name, werte in bilder.items()}
+
+    # .prj-Dateien der Operate im Manifest komprimiert in einem Byte-Array mit Versatz je Datei
+    operate = set(bilder["operat"].tolist())
+    prj_operat, prj_name, prj_daten = [], [], []
+    for operat_nr in sorted(vorlagen):
+        if operat_nr not in operate:
+            continue
+        for name, inhalt in vorlagen[operat_nr]:
+            prj_operat.append(operat_nr)
+            prj_name.append(name)
+            prj_daten.append(np.frombuffer(zlib.compress(inhalt.encode("utf-8")), dtype=np.uint8))
+    prj_versatz = np.concatenate([[0], np.cumsum([len(daten) for daten in prj_daten], dtype=np.int64)])
+
+    manifest = {
+        "format": np.int64(MANIFEST_FORMAT),
+        "version": np.int64(0 if vorheriges is None else int(vorheriges["version"]) + 1),
+        "zeitpunkt": np.float64(time()),
+        **bilder,
+        "prj_operat": np.array(prj_operat, dtype=str),
+        "prj_name": np.array(prj_name, dtype=str),
+        "prj_versatz": prj_versatz,
+        "prj_daten": np.concatenate(prj_daten) if prj_daten else np.empty(0, dtype=np.uint8)
+    }
+
+    datei = manifest_datei(workspace_info)
+    temp_datei = datei.replace(".npz", "_temp.npz")
+    np.savez_compressed(temp_datei, **manifest)
+    os.replace(temp_datei, datei)
+    print(f"Manifest {meridian} (Version {int(manifest['version'])}): {len(bilder['schluessel'])} Bilder, "
+          f"{len(prj_name)} .prj-Dateien")
+    return datei
+
+
+@func_info
+def mosaic_aus_manifest_aufbauen(dgm_pfad: str, workspace_info: list, dgm_cache_info: list = None,
+                                 max_worker: int = 1, blockgroesse: int = 500) -> int:
+    """
+    Die Funktion baut das Mosaic Dataset des Meridians allein aus dem Manifest neu auf: das bestehende Mosaic Dataset
+    wird gelöscht und neu erstellt, je Operat und Block werden die .prj-Dateien des Manifests mit den Netzwerk-Pfaden
+    der Bilder des Manifests geschrieben und eingefügt (mit "max_worker" > 1 parallel, siehe "mosaic_staging.py"). Die
+    Bilder werden vorher auf Existenz und Lesbarkeit geprüft (Bericht "{meridian}_bild_pruefung.json" im Speicherort).
+    Parameter:
+        - dgm_pfad (str): Pfad zum digitalen Geländemodell
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - dgm_cache_info (list): Zellgröße (m, None = Zellgröße des DGM) und maximale Größe (GB) des lokalen DGM
+                                 (None = DGM aus "dgm_pfad")
+        - max_worker (int): Anzahl der Worker-Prozesse beim Einfügen (1 = seriell, None = Anzahl der Prozessorkerne)
+        - blockgroesse (int): maximale Anzahl an Bildern je Block
+    Rückgabewert:
+        - anzahl (int): Anzahl der Raster im neuen Mosaic Dataset
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+
+    manifest = manifest_laden(workspace_info)
+    if manifest is None:
+        raise Exception(f"kein Manifest für {meridian} vorhanden ({manifest_datei(workspace_info)})")
+    vorlagen = prj_vorlagen_lesen(manifest)
+
+    # Mosaic Dataset neu erstellen
+    mosaic_dataset = rf"{speicherort}\{meridian}_mosaic.gdb\mosaic"
+    if arcpy.Exists(mosaic_dataset):
+        arcpy.Delete_management(mosaic_dataset)
+    mosaic_dataset = raster_global.raster_workspace_erstellen(workspace_info)
+
+    # .prj-Dateien je Operat und Block mit den Bildern des Manifests
+    prj_ordner = rf"{speicherort}\{meridian}_manifest_prj"
+    if os.path.exists(prj_ordner):
+        shutil.rmtree(prj_ordner)
+    os.makedirs(prj_ordner)
+    bloecke = []
+    for operat_nr in np.unique(manifest["operat"]):
+        if str(operat_nr) not in vorlagen:
+            print(f"keine .prj-Datei für Operat {operat_nr} im Manifest")
+            continue
+        auswahl = np.flatnonzero(manifest["operat"] == operat_nr)
+        operat_workspace_info = workspace_funktionen.workspace_info_ermitteln(meridian, str(operat_nr), speicherort)
+        for i in range(0, len(auswahl), blockgroesse):
+            block = auswahl[i:i + blockgroesse]
+            bildnamen = [str(img_name) for img_name in manifest["img_name"][block]]
+            prj_dateien = []
+            for name, inhalt in vorlagen[str(operat_nr)]:
+                prj_datei = rf"{prj_ordner}\{operat_nr}_{i // blockgroesse}_{name}"
+                with open(prj_datei, "w") as file:
+                    file.write(prj_funktionen.prj_inhalt_anpassen(inhalt, bildnamen, meridian, str(operat_nr)))
+                prj_dateien.append(prj_datei)
+            bloecke.append([operat_workspace_info, manifest["orientierung"][block, :2], prj_dateien])
+
+    bild_pruefung.bilder_pruefen(
+        [str(pfad) for pfad in manifest["pfad"] if pfad],
+        workspace_info,
+        rf"{speicherort}\{meridian}_bild_pruefung.json"
+    )
+
+    mosaic_staging.bloecke_einfuegen(mosaic_dataset, bloecke, dgm_pfad, workspace_info,
+                                     dgm_cache_info=dgm_cache_info, max_worker=max_worker)
+
+    anzahl = int(arcpy.GetCount_management(mosaic_dataset)[0])
+    print(f"Mosaic {meridian} aus Manifest (Version {int(manifest['version'])}): {anzahl} von "
+          f"{len(manifest['schluessel'])} Bildern eingefügt")
+    return anzahl
@@ -0,0 +1,98 @@
+# Dieses Python-Skript prüft vor dem Befüllen des Mosaic Datasets, ob alle ausgewählten Luftbilder existieren und
+# lesbar sind. Die Bildpfade werden parallel (Thread-Pool mit begrenzter Anzahl an Threads) geprüft: Dateiinfo
+# ("os.stat") und Kopf der Datei (TIFF-Kennung). Vorübergehende Fehler im Netzwerk werden mit mehreren Versuchen
+# abgefangen. Lesbare Bilder werden je Pfad und Änderungszeitpunkt zwischengespeichert
+# ("{meridian}_bild_pruefung_cache.json" im Speicherort), bei einem erneuten Durchlauf wird nur mehr die Dateiinfo
+# gelesen. Fehlende und unlesbare Bilder werden als json-Bericht ausgegeben.
+# Der Workflow wird durch das Starten von "main.py" initiiert, "bild_pruefung.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from info_wrapper import *
+
+
+# Kennungen am Anfang einer TIFF- bzw. BigTIFF-Datei
+TIFF_KENNUNGEN = (b"II*\x00", b"MM\x00*", b"II+\x00", b"MM\x00+")
+
+
+def bild_pruefen(bildpfad: str, zwischenspeicher: dict, versuche: int = 3, wartezeit: float = 1.0) -> list:
+    """
+    Die Funktion prüft ein Bild: Existenz und Änderungszeitpunkt über "os.stat", Lesbarkeit über die TIFF-Kennung. Ist
+    das Bild mit gleichem Änderungszeitpunkt im Zwischenspeicher, wird der Kopf nicht gelesen.
+    Parameter:
+        - bildpfad (str): Pfad zum Bild
+        - zwischenspeicher (dict): key = Bildpfad, value = Änderungszeitpunkt eines lesbaren Bildes
+        - versuche (int): Anzahl an Versuchen bei Fehlern (außer bei fehlender Datei)
+        - wartezeit (float): Wartezeit in Sekunden vor dem nächsten Versuch (verdoppelt sich je Versuch)
+    Rückgabewert:
+        - ergebnis (list): [Bildpfad, Status ("ok", "fehlend", "unlesbar"), Änderungszeitpunkt, Meldung]
+    """
+    meldung = ""
+    for versuch in range(versuche):
+        try:
+            info = os.stat(bildpfad)
+            if zwischenspeicher.get(bildpfad) == info.st_mtime:
+                return [bildpfad, "ok", info.st_mtime, ""]
+            with open(bildpfad, "rb") as datei:
+                kennung = datei.read(4)
+            if kennung in TIFF_KENNUNGEN:
+                return [bildpfad, "ok", info.st_mtime, ""]
+            return [bildpfad, "unlesbar", info.st_mtime, "keine TIFF-Kennung"]
+        except FileNotFoundError:
+            return [bildpfad, "fehlend", None, "Datei nicht gefunden"]
+        except OSError as fehler:
+            meldung = str(fehler)
+            if versuch < versuche - 1:
+                time.sleep(wartezeit * 2 ** versuch)
+    return [bildpfad, "unlesbar", None, meldung]
+
+
+@func_info
+def bilder_pruefen(bildpfade: list, workspace_info: list, bericht_datei: str, max_threads: int = 16) -> dict:
+    """
+    Die Funktion prüft alle Bildpfade parallel und schreibt einen Bericht mit fehlenden und unlesbaren Bildern.
+    Parameter:
+        - bildpfade (list): Liste von Bildpfaden (z.B. "prj_funktionen.bildpfade_lesen")
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - bericht_datei (str): Pfad der json-Datei des Berichts
+        - max_threads (int): maximale Anzahl gleichzeitiger Prüfungen
+    Rückgabewert:
+        - bericht (dict): "geprueft" (Anzahl), "fehlend" und "unlesbar" (Listen [Bildpfad, Meldung])
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+
+    # Zwischenspeicher lesbarer Bilder (Pfad + Änderungszeitpunkt)
+    cache_datei = rf"{speicherort}\{meridian}_bild_pruefung_cache.json"
+    zwischenspeicher = {}
+    if os.path.exists(cache_datei):
+        with open(cache_datei, "r") as datei:
+            zwischenspeicher = json.load(datei)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_threads, len(bildpfade)))) as executor:
+        ergebnisse = list(executor.map(lambda bildpfad: bild_pruefen(bildpfad, zwischenspeicher), bildpfade))
+
+    bericht = {"geprueft": len(ergebnisse), "fehlend": [], "unlesbar": []}
+    for bildpfad, status, aenderung, meldung in ergebnisse:
+        if status == "ok":
+            zwischenspeicher[bildpfad] = aenderung
+        else:
+            zwischenspeicher.pop(bildpfad, None)
+            bericht[status].append([bildpfad, meldung])
+
+    with open(cache_datei + ".temp", "w") as datei:
+        json.dump(zwischenspeicher, datei)
+    os.replace(cache_datei + ".temp", cache_datei)
+    with open(bericht_datei, "w") as datei:
+        json.dump(bericht, datei, indent=2)
+
+    print(f"Bildprüfung: {bericht['geprueft']} Bilder geprüft, {len(bericht['fehlend'])} fehlend, "
+          f"{len(bericht['unlesbar'])} unlesbar (Bericht: {bericht_datei})")
+    return bericht
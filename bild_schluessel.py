@@ -0,0 +1,127 @@
+# Dieses Python-Skript verwaltet die Schlüssel der Bilder eines Meridians. Ein Bild ist durch Bildname und Operat
+# eindeutig bestimmt, der Text-Schlüssel trennt beide durch "|" (das Feld "abgleich" des Mosaic Datasets enthält
+# weiterhin Bildname + Operatsnummer ohne Trennzeichen und dient nicht als Schlüssel). Jeder Schlüssel erhält im
+# Register des Meridians ("{meridian}_bild_schluessel.json" im Speicherort) eine fortlaufende Ganzzahl ("bild_id").
+# Vergleiche, Deltas und Abfragen auf das Mosaic Dataset laufen über diese Ganzzahlen (numpy-Arrays bzw. Mengen) statt
+# über Listen von Texten. Vergebene Nummern bleiben unverändert.
+# Der Workflow wird durch das Starten von "main.py" initiiert, "bild_schluessel.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import json
+import os
+import numpy as np
+
+
+TRENNZEICHEN = "|"
+
+
+def schluessel_bilden(img_name: str, operat_nr: str) -> str:
+    """
+    Die Funktion liefert den Text-Schlüssel eines Bildes (Register, Änderungsprotokoll, Ledger). Das Trennzeichen kommt
+    in Dateinamen nicht vor, Bildname und Operatsnummer können daher nicht ineinander übergehen.
+    """
+    return f"{img_name}{TRENNZEICHEN}{operat_nr}"
+
+
+def abgleich_bilden(img_name: str, operat_nr: str) -> str:
+    """
+    Die Funktion liefert den Inhalt des Feldes "abgleich" des Mosaic Datasets (Bildname + Operatsnummer, bisheriges
+    Format). Nicht als Schlüssel verwenden, siehe "schluessel_bilden".
+    """
+    return img_name + operat_nr
+
+
+def bild_dateiname(img_name: str) -> str:
+    """
+    Die Funktion liefert den Dateinamen eines Bildes im Verzeichnis des Operates.
+    """
+    return f"{img_name}_rgb.tif"
+
+
+def register_datei(workspace_info: list) -> str:
+    """
+    Die Funktion liefert den Pfad des Registers ("{meridian}_bild_schluessel.json" im Speicherort).
+    """
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    return rf"{speicherort}\{meridian}_bild_schluessel.json"
+
+
+def register_laden(workspace_info: list) -> dict:
+    """
+    Die Funktion lädt das Register des Meridians. Existiert es noch nicht, wird ein leeres Register geliefert.
+    Parameter:
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    Rückgabewert:
+        - register (dict): "schluessel" (Liste, Position = bild_id - 1) und "ids" (key = Schlüssel, value = bild_id)
+    """
+    schluessel = []
+    datei = register_datei(workspace_info)
+    if os.path.exists(datei):
+        with open(datei, "r") as f:
+            schluessel = json.load(f)["schluessel"]
+    return {"schluessel": schluessel, "ids": {wert: i + 1 for i, wert in enumerate(schluessel)}}
+
+
+def register_speichern(register: dict, workspace_info: list):
+    """
+    Die Funktion speichert das Register (zuerst in eine temporäre Datei, damit ein Abbruch kein halbes Register
+    hinterlässt).
+    """
+    datei = register_datei(workspace_info)
+    with open(datei + ".temp", "w") as f:
+        json.dump({"trennzeichen": TRENNZEICHEN, "schluessel": register["schluessel"]}, f)
+    os.replace(datei + ".temp", datei)
+
+
+def ids_vergeben(register: dict, schluessel_liste: list) -> np.ndarray:
+    """
+    Die Funktion liefert die bild_ids der Schlüssel, noch nicht registrierte Schlüssel erhalten eine neue Nummer.
+    """
+    ids = np.empty(len(schluessel_liste), dtype=np.int64)
+    for i, schluessel in enumerate(schluessel_liste):
+        bild_id = register["ids"].get(schluessel)
+        if bild_id is None:
+            register["schluessel"].append(schluessel)
+            bild_id = len(register["schluessel"])
+            register["ids"][schluessel] = bild_id
+        ids[i] = bild_id
+    return ids
+
+
+def ids_suchen(register: dict, schluessel_liste: list) -> np.ndarray:
+    """
+    Die Funktion liefert die bild_ids der Schlüssel, ohne neue Nummern zu vergeben (nicht registriert = 0).
+    """
+    return np.fromiter((register["ids"].get(schluessel, 0) for schluessel in schluessel_liste), dtype=np.int64,
+                       count=len(schluessel_liste))
+
+
+def schluessel_nachschlagen(register: dict, ids) -> list:
+    """
+    Die Funktion liefert die Text-Schlüssel zu bild_ids.
+    """
+    return [register["schluessel"][int(bild_id) - 1] for bild_id in ids]
+
+
+def id_abfragen(ids, feld: str = "bild_id", blockgroesse: int = 1000) -> list:
+    """
+    Die Funktion liefert SQL-Abfragen "feld IN (...)" für die bild_ids, aufgeteilt in Blöcke, damit die Abfragen nicht
+    zu lang werden. Bei leerer Liste wird keine Abfrage geliefert.
+    """
+    ids = np.unique(np.asarray(ids, dtype=np.int64))
+    ids = ids[ids > 0]
+    return [f"{feld} IN ({', '.join(str(bild_id) for bild_id in ids[i:i + blockgroesse])})"
+            for i in range(0, len(ids), blockgroesse)]
+
+
+def text_abfragen(werte, feld: str = "operat_nr", blockgroesse: int = 1000) -> list:
+    """
+    Die Funktion liefert SQL-Abfragen "feld IN ('...')" für Texte (z.B. Operatsnummern), aufgeteilt in Blöcke wie
+    "id_abfragen". Hochkommas in den Texten werden verdoppelt. Bei leerer Liste wird keine Abfrage geliefert.
+    """
+    werte = ["'" + wert.replace("'", "''") + "'" for wert in sorted(set(str(wert) for wert in werte))]
+    return [f"{feld} IN ({', '.join(werte[i:i + blockgroesse])})" for i in range(0, len(werte), blockgroesse)]
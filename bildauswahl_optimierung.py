@@ -0,0 +1,258 @@
+# Dieses Python-Skript reduziert die Bildpunkte eines Operates nach den Löschschritten von "vektor_lokal.py" auf eine
+# nahezu minimale Auswahl, die die Operatsfläche weiterhin durchgehend stereoskopisch abdeckt. Kandidaten sind die
+# alle Stereomodelle aus zwei Bildern eines Flugstreifens (auch nicht benachbart) mit ausreichender Längsüberdeckung,
+# ihre Grundfläche wird als Rechteck in Flugrichtung genähert. Die Operatsfläche wird gerastert, gewählt wird mit einem
+# gierigen Mengenüberdeckungs-Verfahren ("lazy greedy"): je Schritt das Stereomodell mit den meisten noch nicht
+# abgedeckten Zellen je zusätzlichem Bild. Je Flugstreifen wächst dabei eine zusammenhängende Stereokette von einem
+# ersten Stereomodell aus an beiden Enden, nur danach noch nicht abgedeckte Zellen werden ohne diese Bedingung ergänzt.
+# Das Skript benötigt kein arcpy, Lesen und Löschen der Bildpunkte übernimmt "vektor_lokal.bildauswahl_anwenden".
+# Der Workflow wird durch das Starten von "main.py" initiiert, "bildauswahl_optimierung.py" kann vom User ignoriert
+# werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import heapq
+import numpy as np
+import numpy_geometrie
+import stereo_pruefung
+import ueberschneidung_regeln
+
+
+def stereomodelle_bilden(bildpunkte: np.ndarray, stereo_pruefung_info: list) -> dict:
+    """
+    Die Funktion bildet alle möglichen Stereomodelle der Bildpunkte: zwei Bilder desselben Operates und Flugstreifens
+    (nicht nur benachbarte) mit mindestens der Mindest-Längsüberdeckung. Die Grundfläche wird als Rechteck genähert:
+    Mitte zwischen den Projektionszentren, Länge = Bodenabdeckung in Flugrichtung abzüglich Basis, Breite =
+    Bodenabdeckung (quadratisches Bildformat).
+    Parameter:
+        - bildpunkte (np.ndarray): strukturiertes Array mit den Feldern "img_name", "operat", "flugstreifen",
+                                   "flughoehe", "x" und "y"
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m),
+                                       Mindest-Längsüberdeckung (0-1)
+    Rückgabewert:
+        - modelle (dict): "links", "rechts" (Indizes in "bildpunkte"), "mitte" (n x 2), "richtung" (n x 2,
+                          Einheitsvektor), "halbe_laenge", "halbe_breite" je Stereomodell sowie "position"
+                          (Reihung im Flugstreifen) und "streifen" (Nummer des Flugstreifens) je Bild
+    """
+    brennweite, bildformat_laengs, gelaendehoehe, mindest_ueberlappung = stereo_pruefung_info
+
+    flugstreifen = stereo_pruefung.ueberlappung_berechnen(bildpunkte, stereo_pruefung_info)[0]
+    index = flugstreifen["index"]
+    streifen = np.zeros(len(index), dtype=np.int64)
+    streifen[flugstreifen["anfang"][1:]] = 1
+    streifen = np.cumsum(streifen)
+
+    # Position im Flugstreifen und Flugstreifen je Bild
+    position = np.zeros(len(bildpunkte), dtype=np.int64)
+    position[index] = np.arange(len(index))
+    streifen_je_bild = np.zeros(len(bildpunkte), dtype=np.int64)
+    streifen_je_bild[index] = streifen
+
+    xy = np.column_stack([bildpunkte["x"], bildpunkte["y"]]).astype(float)
+    # Bilder ohne Flughöhe (NaN) bilden kein Stereomodell
+    flughoehe = ueberschneidung_regeln.zahlen_lesen(bildpunkte["flughoehe"])
+    bodenlaenge = np.maximum(flughoehe - gelaendehoehe, 0) * bildformat_laengs / brennweite
+
+    # Paare mit wachsendem Schritt innerhalb der Flugstreifen, bis kein Paar mehr die Mindest-Längsüberdeckung erreicht
+    links, rechts = [], []
+    for schritt in range(1, len(index)):
+        p = np.arange(len(index) - schritt)
+        q = p + schritt
+        i, j = index[p], index[q]
+        mittlere_bodenlaenge = (bodenlaenge[i] + bodenlaenge[j]) / 2
+        abstand = np.hypot(xy[j, 0] - xy[i, 0], xy[j, 1] - xy[i, 1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            paar = ((streifen[p] == streifen[q]) & (mittlere_bodenlaenge > 0) &
+                    (1 - abstand / mittlere_bodenlaenge >= mindest_ueberlappung))
+        if not paar.any():
+            break
+        links.append(i[paar])
+        rechts.append(j[paar])
+    links = np.concatenate(links).astype(np.int64) if links else np.empty(0, dtype=np.int64)
+    rechts = np.concatenate(rechts).astype(np.int64) if rechts else np.empty(0, dtype=np.int64)
+
+    basis = xy[rechts] - xy[links]
+    abstand = np.hypot(basis[:, 0], basis[:, 1])
+    mittlere_bodenlaenge = (bodenlaenge[links] + bodenlaenge[rechts]) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        richtung = np.where(abstand[:, None] > 0, basis / abstand[:, None], [1.0, 0.0])
+
+    return {
+        "links": links,
+        "rechts": rechts,
+        "mitte": (xy[links] + xy[rechts]) / 2,
+        "richtung": richtung,
+        "halbe_laenge": np.maximum(mittlere_bodenlaenge - abstand, 0) / 2,
+        "halbe_breite": mittlere_bodenlaenge / 2,
+        "position": position,
+        "streifen": streifen_je_bild
+    }
+
+
+def modelle_rastern(modelle: dict, maske: np.ndarray, x0: float, y0: float, zellgroesse: float) -> list:
+    """
+    Die Funktion liefert je Stereomodell die Nummern der Zellen der Operatsfläche ("maske"), deren Mittelpunkt im
+    Rechteck des Stereomodells liegt (Zellnummer = Zeile * Spalten + Spalte). Die Zellen der Ausdehnungen aller
+    Rechtecke werden vektorisiert in Blöcken von höchstens "numpy_geometrie.BLOCK_ELEMENTE" Zellen getestet.
+    """
+    zeilen, spalten = maske.shape
+    mitte, richtung = modelle["mitte"].reshape(-1, 2), modelle["richtung"].reshape(-1, 2)
+    halbe_laenge, halbe_breite = modelle["halbe_laenge"], modelle["halbe_breite"]
+
+    # Ausdehnung der gedrehten Rechtecke in Zellen
+    ausdehnung_x = np.abs(richtung[:, 0]) * halbe_laenge + np.abs(richtung[:, 1]) * halbe_breite
+    ausdehnung_y = np.abs(richtung[:, 1]) * halbe_laenge + np.abs(richtung[:, 0]) * halbe_breite
+    spalte_min = np.maximum(np.floor((mitte[:, 0] - ausdehnung_x - x0) / zellgroesse), 0).astype(np.int64)
+    spalte_max = np.minimum(np.floor((mitte[:, 0] + ausdehnung_x - x0) / zellgroesse) + 1, spalten).astype(np.int64)
+    zeile_min = np.maximum(np.floor((mitte[:, 1] - ausdehnung_y - y0) / zellgroesse), 0).astype(np.int64)
+    zeile_max = np.minimum(np.floor((mitte[:, 1] + ausdehnung_y - y0) / zellgroesse) + 1, zeilen).astype(np.int64)
+    breite = np.maximum(spalte_max - spalte_min, 0)
+    anzahl = breite * np.maximum(zeile_max - zeile_min, 0)
+    bis = np.cumsum(anzahl)
+
+    zellen = []
+    start = 0
+    while start < len(anzahl):
+        ende = max(int(np.searchsorted(bis, bis[start] - anzahl[start] + numpy_geometrie.BLOCK_ELEMENTE, "right")),
+                   start + 1)
+        # je Zelle der Ausdehnungen: Stereomodell und laufende Nummer innerhalb der Ausdehnung (zeilenweise)
+        m = np.repeat(np.arange(start, ende), anzahl[start:ende])
+        k = np.arange(len(m)) - np.repeat(bis[start:ende] - anzahl[start:ende] - (bis[start] - anzahl[start]),
+                                          anzahl[start:ende])
+        zeile = zeile_min[m] + k // breite[m]
+        spalte = spalte_min[m] + k % breite[m]
+        dx = x0 + (spalte + 0.5) * zellgroesse - mitte[m, 0]
+        dy = y0 + (zeile + 0.5) * zellgroesse - mitte[m, 1]
+        innen = ((np.abs(dx * richtung[m, 0] + dy * richtung[m, 1]) <= halbe_laenge[m]) &
+                 (np.abs(-dx * richtung[m, 1] + dy * richtung[m, 0]) <= halbe_breite[m]) & maske[zeile, spalte])
+        treffer = np.bincount(m[innen] - start, minlength=ende - start)
+        zellen += np.split((zeile[innen] * spalten + spalte[innen]).astype(np.int64), np.cumsum(treffer)[:-1])
+        start = ende
+    return zellen
+
+
+def gierig_waehlen(modelle: dict, zellen: list, abgedeckt: np.ndarray, gewaehlt: np.ndarray, kette: bool) -> int:
+    """
+    Die Funktion wählt Stereomodelle nach dem "lazy greedy"-Verfahren: Bewertung = neu abgedeckte Zellen je
+    zusätzlichem Bild, im Heap liegt die zuletzt berechnete Bewertung als obere Schranke (wird ein Bild gewählt,
+    werden die Stereomodelle dieses Bildes mit der Anzahl neuer Zellen als Schranke erneut eingereiht). "abgedeckt"
+    und "gewaehlt" werden fortgeschrieben. Mit "kette = True" bildet jeder Flugstreifen eine zusammenhängende
+    Stereokette: nach dem ersten Stereomodell eines Flugstreifens sind nur mehr Stereomodelle zulässig, die an einem
+    Ende der Kette anschließen.
+    Parameter:
+        - modelle (dict): Stereomodelle (siehe "stereomodelle_bilden")
+        - zellen (list): abgedeckte Zellen je Stereomodell (siehe "modelle_rastern")
+        - abgedeckt (np.ndarray): Bool-Array je Zelle
+        - gewaehlt (np.ndarray): Bool-Array je Bildpunkt
+        - kette (bool): Bedingung der zusammenhängenden Stereoketten je Flugstreifen
+    Rückgabewert:
+        - anzahl (int): Anzahl der gewählten Stereomodelle
+    """
+    links, rechts, position, streifen = modelle["links"], modelle["rechts"], modelle["position"], modelle["streifen"]
+    anfang, ende, wartend = {}, {}, {}
+    modelle_je_bild = {}
+    for m in range(len(links)):
+        modelle_je_bild.setdefault(links[m], []).append(m)
+        modelle_je_bild.setdefault(rechts[m], []).append(m)
+    # bei gleicher Bewertung zuerst das Stereomodell mit der längeren Basis (kürzeres Rechteck), die Kette reicht mit
+    # dem nächsten Stereomodell weiter
+    rang = modelle["halbe_laenge"]
+    heap = [(-len(zellen[m]), rang[m], m) for m in range(len(links)) if len(zellen[m])]
+    heapq.heapify(heap)
+    anzahl = 0
+    while heap:
+        eintrag = heapq.heappop(heap)
+        m = eintrag[2]
+        i, j, s = links[m], rechts[m], streifen[links[m]]
+
+        # Stereomodelle abseits der Kettenenden warten, bis die Kette sie erreicht (oder entfallen)
+        if kette and s in ende and position[i] != ende[s] and position[j] != anfang[s]:
+            if position[i] > ende[s] or position[j] < anfang[s]:
+                wartend.setdefault(s, []).append(eintrag)
+            continue
+
+        gewinn = int(np.count_nonzero(~abgedeckt[zellen[m]]))
+        if gewinn == 0:
+            continue
+        kosten = max(int(not gewaehlt[i]) + int(not gewaehlt[j]), 1)
+        if heap and (-gewinn / kosten, rang[m]) > heap[0][:2]:
+            heapq.heappush(heap, (-gewinn / kosten, rang[m], m))
+            continue
+
+        abgedeckt[zellen[m]] = True
+        for bild in (i, j):
+            if not gewaehlt[bild]:
+                gewaehlt[bild] = True
+                for n in modelle_je_bild[bild]:
+                    heapq.heappush(heap, (-len(zellen[n]), rang[n], n))
+        anzahl += 1
+        if kette:
+            anfang[s] = min(anfang.get(s, position[i]), position[i])
+            ende[s] = max(ende.get(s, position[j]), position[j])
+            for wartender_eintrag in wartend.pop(s, []):
+                heapq.heappush(heap, wartender_eintrag)
+    return anzahl
+
+
+def auswahl_optimieren(bildpunkte: np.ndarray, ringe: list, stereo_pruefung_info: list,
+                       zellgroesse: float = None) -> tuple:
+    """
+    Die Funktion wählt eine nahezu minimale Menge an Bildern, deren Stereomodelle dieselben Zellen der Operatsfläche
+    abdecken wie alle Stereomodelle der Kandidaten. Bilder ohne Stereopartner werden nicht verändert (behalten).
+    Parameter:
+        - bildpunkte (np.ndarray): strukturiertes Array mit den Feldern "img_name", "operat", "flugstreifen",
+                                   "flughoehe", "x" und "y"
+        - ringe (list): Ringe der Operatsfläche (siehe "vektor_global.polygon_ringe")
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m),
+                                       Mindest-Längsüberdeckung (0-1)
+        - zellgroesse (float): Zellgröße der Rasterung in Metern (None = 1/20 der mittleren Bodenabdeckung)
+    Rückgabewerte (tuple):
+        - behalten (np.ndarray): Bool-Array je Bildpunkt
+        - bericht (dict): Anzahl der Bilder vorher/nachher, gewählte Stereomodelle, Anteil der Operatsfläche mit
+                          Stereoabdeckung, Unterbrechungen der Stereoketten
+    """
+    modelle = stereomodelle_bilden(bildpunkte, stereo_pruefung_info)
+    anzahl_modelle = len(modelle["links"])
+    behalten = np.ones(len(bildpunkte), dtype=bool)
+    if anzahl_modelle == 0 or not ringe:
+        return behalten, {"anzahl_vorher": len(bildpunkte), "anzahl_nachher": len(bildpunkte), "stereomodelle": 0}
+
+    # Rasterung der Operatsfläche
+    if zellgroesse is None:
+        zellgroesse = max(float(np.mean(modelle["halbe_breite"])) / 10, 1.0)
+    alle = np.concatenate(ringe)
+    x0, y0 = alle.min(axis=0)
+    spalten = int(np.ceil((alle[:, 0].max() - x0) / zellgroesse))
+    zeilen = int(np.ceil((alle[:, 1].max() - y0) / zellgroesse))
+    maske = numpy_geometrie.polygon_rasterisieren(ringe, x0, y0, zellgroesse, zeilen, spalten)
+    zellen = modelle_rastern(modelle, maske, x0, y0, zellgroesse)
+
+    # zuerst nur zusammenhängende Stereoketten, danach verbleibende Zellen ohne Bedingung (Unterbrechungen)
+    abgedeckt = np.zeros(zeilen * spalten, dtype=bool)
+    gewaehlt = np.zeros(len(bildpunkte), dtype=bool)
+    in_modell = np.zeros(len(bildpunkte), dtype=bool)
+    in_modell[modelle["links"]] = True
+    in_modell[modelle["rechts"]] = True
+    gewaehlte_modelle = gierig_waehlen(modelle, zellen, abgedeckt, gewaehlt, kette=True)
+    gewaehlte_modelle += gierig_waehlen(modelle, zellen, abgedeckt, gewaehlt, kette=False)
+
+    behalten = gewaehlt | ~in_modell
+    flaeche = int(maske.sum())
+
+    # Unterbrechungen der Stereoketten in der Auswahl (Lücken zwischen abgedeckten Bereichen eines Flugstreifens)
+    ueberlappung = stereo_pruefung.ueberlappung_berechnen(bildpunkte[behalten], stereo_pruefung_info)[1]
+    unterbrechungen = int(np.count_nonzero(ueberlappung < stereo_pruefung_info[3]))
+    bericht = {
+        "anzahl_vorher": len(bildpunkte),
+        "anzahl_nachher": int(behalten.sum()),
+        "entfernt": int((~behalten).sum()),
+        "stereomodelle": gewaehlte_modelle,
+        "stereomodelle_kandidaten": anzahl_modelle,
+        "unterbrechungen": unterbrechungen,
+        "zellgroesse": round(zellgroesse, 1),
+        "anteil_stereoabdeckung": round(float(abgedeckt.sum()) / flaeche, 4) if flaeche else None
+    }
+    return behalten, bericht
+
@@ -0,0 +1,175 @@
+# Dieses Python-Skript stellt das digitale Geländemodell für das Befüllen der Mosaic Datasets lokal bereit. Statt des
+# österreichweiten DGM im Netzwerk wird für den Bereich der eingefügten Bilder (plus Rand) ein Satz von Kacheln eines
+# festen Rasters (Koordinatensystem des DGM) ausgeschnitten, optional auf eine gröbere Zellgröße umgerechnet und als
+# gekachelte, komprimierte GeoTIFFs im Speicherort abgelegt ("dgm_cache"). Je Zellgröße sind die Kacheln in einem
+# eigenen lokalen Mosaic Dataset mit eigenem Verzeichnis zusammengefasst (Kacheln unterschiedlicher Zellgröße werden
+# nie gemischt), das beim Einfügen der Luftbilder als DEM verwendet wird. Kacheln werden über Operate und Durchläufe
+# hinweg wiederverwendet, überschreitet der Zwischenspeicher einer Zellgröße die maximale Größe, werden die am längsten
+# nicht verwendeten Kacheln entfernt.
+# Der Workflow wird durch das Starten von "main.py" initiiert, "dgm_cache.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import arcpy
+import json
+import math
+import os
+import numpy as np
+from info_wrapper import *
+from time import time
+
+
+# Kantenlänge der Kacheln in Metern (Koordinatensystem des DGM)
+KACHEL_GROESSE = 10000.0
+
+
+def kacheln_im_bereich(xmin: float, ymin: float, xmax: float, ymax: float,
+                       kachel_groesse: float = KACHEL_GROESSE) -> list:
+    """
+    Die Funktion liefert alle Kacheln [zeile, spalte] des festen Rasters, die das Rechteck berühren.
+    """
+    spalten = range(math.floor(xmin / kachel_groesse), math.floor(xmax / kachel_groesse) + 1)
+    zeilen = range(math.floor(ymin / kachel_groesse), math.floor(ymax / kachel_groesse) + 1)
+    return [[zeile, spalte] for zeile in zeilen for spalte in spalten]
+
+
+def kacheln_verdraengen(kacheln: dict, max_groesse: float, benoetigt: set) -> list:
+    """
+    Die Funktion liefert die Kacheln, die entfernt werden müssen, damit die Summe der Dateigrößen höchstens
+    "max_groesse" (Bytes) beträgt. Entfernt werden die am längsten nicht verwendeten Kacheln, benötigte Kacheln werden
+    nie entfernt.
+    Parameter:
+        - kacheln (dict): key = Kachelname, value = {"groesse": Bytes, "zugriff": Zeitpunkt der letzten Verwendung}
+        - max_groesse (float): maximale Größe des Zwischenspeichers in Bytes
+        - benoetigt (set): Namen der Kacheln, die aktuell verwendet werden
+    Rückgabewert:
+        - entfernen (list): Namen der zu entfernenden Kacheln
+    """
+    gesamt = sum(eintrag["groesse"] for eintrag in kacheln.values())
+    entfernen = []
+    for name in sorted(kacheln, key=lambda name: kacheln[name]["zugriff"]):
+        if gesamt <= max_groesse:
+            break
+        if name in benoetigt:
+            continue
+        entfernen.append(name)
+        gesamt -= kacheln[name]["groesse"]
+    return entfernen
+
+
+@func_info
+def dgm_bereitstellen(dgm_pfad: str, bild_xy, dgm_cache_info: list, workspace_info: list,
+                      rand: float = 3000.0) -> str:
+    """
+    Die Funktion stellt das DGM für die Bilder mit den Projektionszentren "bild_xy" lokal bereit und liefert den Pfad
+    zum lokalen DGM-Mosaic Dataset. Fehlende Kacheln werden aus "dgm_pfad" ausgeschnitten. Alle Kacheln eines Aufrufs
+    werden gemeinsam bereitgestellt und sind vor dem Entfernen geschützt.
+    Parameter:
+        - dgm_pfad (str): Pfad zum digitalen Geländemodell (Netzwerk)
+        - bild_xy (np.ndarray | list): Projektionszentren der Bilder (n x 2, Koordinatensystem des Meridians) oder
+                                       Liste solcher Arrays (je Block ein eigener Bereich)
+        - dgm_cache_info (list): Zellgröße der Kacheln in Metern (None = Zellgröße des DGM) und maximale Größe des
+                                 Zwischenspeichers je Zellgröße in GB
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - rand (float): Rand um die Projektionszentren in Metern (Bodenabdeckung der Bilder)
+    Rückgabewert:
+        - dgm_lokal (str): Pfad zum lokalen DGM-Mosaic Dataset der Zellgröße (bzw. "dgm_pfad", falls keine Bilder
+                           übergeben wurden)
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    zellgroesse, max_groesse_gb = dgm_cache_info
+
+    bereiche = [bild_xy] if isinstance(bild_xy, np.ndarray) else list(bild_xy)
+    bereiche = [np.asarray(xy, dtype=float).reshape(-1, 2) for xy in bereiche]
+    bereiche = [xy for xy in bereiche if len(xy)]
+    if not bereiche:
+        return dgm_pfad
+
+    # benötigte Pfade
+    cache_ordner = rf"{speicherort}\dgm_cache"
+    cache_gdb = rf"{cache_ordner}\dgm_cache.gdb"
+    aufloesung = "original" if zellgroesse is None else f"{zellgroesse:g}m"
+    mosaic_name = f"dgm_{aufloesung}".replace(".", "_")
+    dgm_lokal = rf"{cache_gdb}\{mosaic_name}"
+    index_datei = rf"{cache_ordner}\{mosaic_name}.json"
+
+    dgm_raumbezug = arcpy.Describe(dgm_pfad).spatialReference
+    if not os.path.exists(cache_ordner):
+        os.makedirs(cache_ordner)
+    if not arcpy.Exists(cache_gdb):
+        arcpy.CreateFileGDB_management(cache_ordner, "dgm_cache")
+    if not arcpy.Exists(dgm_lokal):
+        arcpy.CreateMosaicDataset_management(cache_gdb, mosaic_name, dgm_raumbezug)
+
+    kacheln = {}
+    if os.path.exists(index_datei):
+        with open(index_datei, "r") as datei:
+            kacheln = json.load(datei)
+
+    # Kacheln der Bereiche der Bilder (plus Rand) im Koordinatensystem des DGM
+    kachel_liste = []
+    for xy in bereiche:
+        xmin, ymin = np.min(xy, axis=0) - rand
+        xmax, ymax = np.max(xy, axis=0) + rand
+        bereich = arcpy.Polygon(arcpy.Array([arcpy.Point(xmin, ymin), arcpy.Point(xmin, ymax),
+                                             arcpy.Point(xmax, ymax), arcpy.Point(xmax, ymin)]),
+                                arcpy.SpatialReference(epsg))
+        ausdehnung = bereich.projectAs(dgm_raumbezug).extent
+        for zeile, spalte in kacheln_im_bereich(ausdehnung.XMin, ausdehnung.YMin, ausdehnung.XMax, ausdehnung.YMax):
+            if [zeile, spalte] not in kachel_liste:
+                kachel_liste.append([zeile, spalte])
+
+    # fehlende Kacheln ausschneiden (gekachelte, komprimierte GeoTIFFs)
+    benoetigt = set()
+    neue_kacheln = []
+    for zeile, spalte in kachel_liste:
+        name = f"dgm_{aufloesung}_{zeile}_{spalte}"
+        benoetigt.add(name)
+        if name in kacheln:
+            continue
+        kachel = rf"{cache_ordner}\{name}.tif"
+        rechteck = (f"{spalte * KACHEL_GROESSE} {zeile * KACHEL_GROESSE} "
+                    f"{(spalte + 1) * KACHEL_GROESSE} {(zeile + 1) * KACHEL_GROESSE}")
+        try:
+            with arcpy.EnvManager(tileSize="256 256", compression="LZW"):
+                if zellgroesse is None:
+                    arcpy.Clip_management(dgm_pfad, rechteck, kachel, maintain_clipping_extent="NO_MAINTAIN_EXTENT")
+                else:
+                    kachel_temp = rf"{cache_ordner}\{name}_temp.tif"
+                    arcpy.Clip_management(dgm_pfad, rechteck, kachel_temp,
+                                          maintain_clipping_extent="NO_MAINTAIN_EXTENT")
+                    arcpy.Resample_management(kachel_temp, kachel, zellgroesse, "BILINEAR")
+                    arcpy.Delete_management(kachel_temp)
+        except arcpy.ExecuteError:
+            # Kachel außerhalb des DGM
+            print(f"DGM-Kachel {name} konnte nicht erstellt werden")
+            print(arcpy.GetMessages(2))
+            continue
+        kacheln[name] = {"groesse": os.path.getsize(kachel), "zugriff": time()}
+        neue_kacheln.append(kachel)
+
+    if neue_kacheln:
+        arcpy.AddRastersToMosaicDataset_management(dgm_lokal, "Raster Dataset", neue_kacheln,
+                                                   duplicate_items_action="EXCLUDE_DUPLICATES")
+    for name in benoetigt & set(kacheln):
+        kacheln[name]["zugriff"] = time()
+
+    # am längsten nicht verwendete Kacheln entfernen, falls der Zwischenspeicher zu groß ist
+    entfernen = kacheln_verdraengen(kacheln, max_groesse_gb * 1024 ** 3, benoetigt)
+    for i in range(0, len(entfernen), 500):
+        namen = ", ".join(f"'{name}'" for name in entfernen[i:i + 500])
+        arcpy.RemoveRastersFromMosaicDataset_management(dgm_lokal, f"Name IN ({namen})")
+    for name in entfernen:
+        arcpy.Delete_management(rf"{cache_ordner}\{name}.tif")
+        del kacheln[name]
+
+    with open(index_datei + ".temp", "w") as datei:
+        json.dump(kacheln, datei)
+    os.replace(index_datei + ".temp", index_datei)
+
+    print(f"DGM lokal: {len(benoetigt)} Kacheln verwendet, {len(neue_kacheln)} neu erstellt, {len(entfernen)} entfernt")
+    return dgm_lokal
@@ -0,0 +1,143 @@
+# Dieses Python-Skript simuliert das Einfügen eines Operates, ohne die globale Geodatabase zu verändern. Über
+# "flaechen_sammlung" und die aktuelle Zuordnung ("flaechen_partition") wird im Arbeitsspeicher eine Überlagerung
+# gelegt (copy-on-write): gelesen werden nur die Flächen und Bildpunkte im betroffenen Bereich, das Input-Operat
+# ersetzt darin seine bisherige Version. Darauf läuft dieselbe Zuordnung wie beim Einfügen
+# ("vektor_global.flaechen_zuordnen"). Ergebnis ist ein Bericht mit den Bildpunkten, die gelöscht bzw. hinzugefügt
+# würden, und den Flächenänderungen je Operat.
+# Der Workflow wird durch das Starten von "main.py" initiiert, "einfuege_simulation.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import arcpy
+import numpy as np
+import bild_schluessel
+import numpy_geometrie
+import vektor_global
+from info_wrapper import *
+from time import time
+
+
+def _punkte_in_flaeche(punkte: list, flaeche) -> list:
+    """
+    Liefert die Zeilen [img_name, operat_nr, x, y], deren Punkt in der Fläche liegt (Vorauswahl über die Ausdehnung,
+    danach "numpy_geometrie.punkte_in_polygon").
+    """
+    if not punkte or flaeche is None:
+        return []
+    xy = np.array([[row[2], row[3]] for row in punkte], dtype=float)
+    ausdehnung = flaeche.extent
+    kandidaten = np.flatnonzero((xy[:, 0] >= ausdehnung.XMin) & (xy[:, 0] <= ausdehnung.XMax) &
+                                (xy[:, 1] >= ausdehnung.YMin) & (xy[:, 1] <= ausdehnung.YMax))
+    innen = numpy_geometrie.punkte_in_polygon(xy[kandidaten, 0], xy[kandidaten, 1],
+                                              vektor_global.polygon_ringe(flaeche))
+    return [punkte[i] for i in kandidaten[innen]]
+
+
+@func_info
+def operat_simulieren(operatsflaeche: str, main_featureclasses_info: list, global_info: list,
+                      workspace_info: list) -> dict:
+    """
+    Die Funktion berechnet, was das Einfügen des Input-Operates bewirken würde, ohne in die globale Geodatabase zu
+    schreiben. Der betroffene Bereich ist die Fläche des Input-Operates inklusive aller Flächen der aktuellen Zuordnung,
+    die es schneidet oder die bisher dem Input-Operat gehört haben. Das Input-Operat erhält den spätesten
+    Lade-Zeitpunkt, wie beim tatsächlichen Einfügen.
+    Parameter:
+        - operatsflaeche (str): Pfad zur Featureclass mit der Operatsfläche des Input-Operates
+        - main_featureclasses_info (list): Pfade zu den wichtigsten Featureclasses
+                                           (bildpunkte_unbearbeitet, bildpunkte_extrahiert)
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    Rückgabewert:
+        - bericht (dict): "loesch_punkte_liste" (Schlüssel wie in "bild_schluessel.py"), "hinzugefuegt_punkte_liste"
+                          (Bildnamen), "flaechen" (je Operat Fläche im Bereich vorher und nachher in m²)
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+    bildpunkte_unbearbeitet, bildpunkte_extrahiert = main_featureclasses_info
+
+    # benötigte Pfade (Layer liegen nur im Arbeitsspeicher)
+    flaechen_partition = rf"{fds_output_global}\flaechen_partition"
+    flaechen_sammlung_final = rf"{fds_output_global}\flaechen_sammlung_final"
+    zuordnung_layer = "simulation_zuordnung_layer"
+    sammlung_layer = "simulation_sammlung_layer"
+    punkte_layer = "simulation_punkte_layer"
+
+    # Input-Operat, wie es in "flaechen_sammlung" eingefügt würde
+    with arcpy.da.SearchCursor(operatsflaeche, ["SHAPE@"]) as cursor:
+        input_geometrie = vektor_global.geometrien_vereinigen([row[0] for row in cursor])
+    input_operat = [operat, str(operat[0:4]), str(time()), input_geometrie]
+
+    # aktuelle Zuordnung im betroffenen Bereich (Partition, bei älteren Meridianen "flaechen_sammlung_final")
+    alte_flaechen = []
+    zuordnung = flaechen_partition if arcpy.Exists(flaechen_partition) else flaechen_sammlung_final
+    if arcpy.Exists(zuordnung):
+        arcpy.Delete_management(zuordnung_layer)
+        arcpy.MakeFeatureLayer_management(zuordnung, zuordnung_layer)
+        arcpy.SelectLayerByLocation_management(zuordnung_layer, "INTERSECT", [input_geometrie],
+                                               selection_type="NEW_SELECTION")
+        arcpy.SelectLayerByAttribute_management(zuordnung_layer, "ADD_TO_SELECTION",
+                                                bild_schluessel.text_abfragen([operat])[0])
+        for abfrage in vektor_global.auswahl_abfragen(zuordnung_layer, zuordnung):
+            with arcpy.da.SearchCursor(zuordnung, ["operat_nr", "SHAPE@"], where_clause=abfrage) as cursor:
+                alte_flaechen.extend(list(row) for row in cursor)
+    bereich = vektor_global.geometrien_vereinigen([input_geometrie] + [row[1] for row in alte_flaechen])
+
+    # Überlagerung von "flaechen_sammlung": Operate im Bereich, das Input-Operat ersetzt seine bisherige Version
+    arcpy.Delete_management(sammlung_layer)
+    arcpy.MakeFeatureLayer_management(flaechen_sammlung, sammlung_layer)
+    arcpy.SelectLayerByLocation_management(sammlung_layer, "INTERSECT", [bereich], selection_type="NEW_SELECTION")
+    operate = []
+    for abfrage in vektor_global.auswahl_abfragen(sammlung_layer, flaechen_sammlung):
+        with arcpy.da.SearchCursor(flaechen_sammlung, ["operat_nr", "jahr", "zeitpunkt", "SHAPE@"],
+                                   where_clause=abfrage) as cursor:
+            operate.extend(list(row) for row in cursor if row[0] != operat)
+    operate.append(input_operat)
+    neue_flaechen = vektor_global.flaechen_zuordnen(operate, bereich)
+
+    # Flächenänderungen je Operat im Bereich
+    flaechen = {}
+    for operat_nr, geometrie in alte_flaechen:
+        flaechen.setdefault(operat_nr, {"vorher": 0.0, "nachher": 0.0})["vorher"] += geometrie.area
+    for operat_nr, jahr, zeitpunkt, geometrie in neue_flaechen:
+        flaechen.setdefault(operat_nr, {"vorher": 0.0, "nachher": 0.0})["nachher"] += geometrie.area
+    for eintrag in flaechen.values():
+        eintrag["vorher"] = round(eintrag["vorher"], 1)
+        eintrag["nachher"] = round(eintrag["nachher"], 1)
+        eintrag["differenz"] = round(eintrag["nachher"] - eintrag["vorher"], 1)
+
+    # Bildpunkte: gelöscht würden alle Punkte in den gewonnenen Flächen und alte Punkte des Input-Operates
+    gewonnen = vektor_global.geometrien_vereinigen([row[3] for row in neue_flaechen if row[0] == operat])
+    loesch_punkte_liste = []
+    arcpy.Delete_management(punkte_layer)
+    arcpy.MakeFeatureLayer_management(punkte_sammlung, punkte_layer)
+    if gewonnen is not None:
+        arcpy.SelectLayerByLocation_management(punkte_layer, "INTERSECT", [gewonnen], selection_type="NEW_SELECTION")
+    arcpy.SelectLayerByAttribute_management(punkte_layer, "ADD_TO_SELECTION",
+                                            bild_schluessel.text_abfragen([operat])[0])
+    for abfrage in vektor_global.auswahl_abfragen(punkte_layer, punkte_sammlung):
+        with arcpy.da.SearchCursor(punkte_sammlung, ["img_name", "operat_nr"], where_clause=abfrage) as cursor:
+            for row in cursor:
+                loesch_punkte_liste.append(bild_schluessel.schluessel_bilden(row[0], row[1]))
+
+    # hinzugefügt würden die Punkte des Input-Operates in den gewonnenen Flächen
+    with arcpy.da.SearchCursor(bildpunkte_extrahiert, ["img_name", "operat", "SHAPE@X", "SHAPE@Y"]) as cursor:
+        input_punkte = [list(row) for row in cursor]
+    hinzugefuegt_punkte_liste = [row[0] for row in _punkte_in_flaeche(input_punkte, gewonnen)]
+
+    bericht = {
+        "operat": operat,
+        "loesch_punkte_liste": loesch_punkte_liste,
+        "hinzugefuegt_punkte_liste": hinzugefuegt_punkte_liste,
+        "flaechen": flaechen
+    }
+
+    print(f"Simulation {operat}: {len(loesch_punkte_liste)} Bildpunkte würden gelöscht, "
+          f"{len(hinzugefuegt_punkte_liste)} hinzugefügt")
+    for operat_nr, eintrag in sorted(flaechen.items(), key=lambda item: item[1]["differenz"]):
+        if operat_nr != operat and eintrag["differenz"] < 0:
+            print(f"    {operat_nr} verliert {-eintrag['differenz']:.0f} m²")
+    return bericht
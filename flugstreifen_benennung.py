@@ -7,11 +7,12 @@
 
 
 from __future__ import annotations
-import arcpy
 import json
 import os
 import re
 import csv
+import numpy as np
+from geometrie_backend import GeometrieBackend
 from info_wrapper import *
 
 
@@ -57,13 +58,14 @@ def benennung_info_check(json_benennung_datei: str, workspace_info: list) -> lis
 
 
 @func_info
-def benennung_struktur_erfassen(main_featureclasses_info: list) -> tuple:
+def benennung_struktur_erfassen(main_featureclasses_info: list, backend: GeometrieBackend) -> tuple:
     """
     Die Funktion ermittelt die Benennungsstruktur der Bildpunkte, damit erfasst werden kann, an welcher Stelle der
     Bildpunkt-Bezeichnung sich die relevante Flugstreifen-Nummer befindet.
     Parameter:
         - main_featureclasses_info (list): Pfade zu den wichtigsten Featureclasses
                                            (bildpunkte_unbearbeitet, bildpunkte_extrahiert)
+        - backend (GeometrieBackend): Backend, mit dem die Bildpunkte gelesen werden
     Rückgabewert:
         - bildpunkt_liste (list): Name und Shape der Bildpunkte als Liste
         - trennzeichen (str): Nicht-alphanumerisches Trennzeichen der Bildpunkt-Benennung
@@ -74,9 +76,8 @@ def benennung_struktur_erfassen(main_featureclasses_info: list) -> tuple:
 
     # Bildpunkte mit Benennung auslesen
     bildpunkt_liste = []
-    with arcpy.da.SearchCursor(bildpunkte_unbearbeitet, ["img_name", "SHAPE@XY"]) as cursor:
-        for row in cursor:
-            bildpunkt_liste.append(row)
+    for row in backend.lesen(bildpunkte_unbearbeitet, ["img_name", "x", "y"]):
+        bildpunkt_liste.append((str(row[0]), (float(row[1]), float(row[2]))))
 
     # Ermittlung der Bildbezeichnungen und der Trennzeichen
     split_liste = []
@@ -166,7 +167,7 @@ def match_subparts(split_liste: list, workspace_info: list) -> tuple:
 
 @func_info
 def flugstreifen_ermitteln(match_count_liste: list, sample: list, trennzeichen: str, bildpunkt_liste: list,
-                           workspace_info: list) -> list:
+                           workspace_info: list, backend: GeometrieBackend) -> list:
     """
     Diese Funktion ermittelt die Flugstreifen, anhand der Flugstreifen Benennung. In "punkte_auf_linie" wird dies
     dann überprüft.
@@ -175,6 +176,9 @@ def flugstreifen_ermitteln(match_count_liste: list, sample: list, trennzeichen:
         - sample (list): Sample von Bildpunkten, unterteilt in Subparts
         - trennzeichen (str): Nicht-alphanumerisches Trennzeichen der Bildpunkt-Benennung
         - bildpunkt_liste (list): Name und Shape der Bildpunkte als Liste
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - backend (GeometrieBackend): Backend, mit dem die Geometrie-Operationen ausgeführt werden
     Rückgabewert:
         - flugstreifen_info (list): Liste mit bereits ermittelter Flugstreifen Benennung, Subparts + Trennzeichen
     """
@@ -216,7 +220,8 @@ def flugstreifen_ermitteln(match_count_liste: list, sample: list, trennzeichen:
             # Test, ob sich die ermittelten Bildpunkte auf einer Linie befinden
             benennung_ermittelt = punkte_auf_linie_test(
                 temp_flugstreifen_bez_geo,
-                workspace_info
+                workspace_info,
+                backend
             )
 
             if benennung_ermittelt:
@@ -285,7 +290,7 @@ def geometrie_hinzufuegen(temp_flugstreifen_bezeichnung: list, bildpunkt_liste:
 
 
 @func_info
-def punkte_auf_linie_test(temp_flugstreifen_bez_geo: list, workspace_info: list) -> bool:
+def punkte_auf_linie_test(temp_flugstreifen_bez_geo: list, workspace_info: list, backend: GeometrieBackend) -> bool:
     """
     Die Funktion ermittelt, ob die Bildpunkte in einer Linie liegen. Dies geschieht durch das Dissolven der Punkte mit
     gleichem Wert bei "abgleich" (= flugstreifen-Bezeichnung). Anschließend wird die Minimum Bounding Geometry erstellt,
@@ -293,44 +298,33 @@ def punkte_auf_linie_test(temp_flugstreifen_bez_geo: list, workspace_info: list)
     muss die Flugstreifen-Bezeichnung weiter ermittelt werden.
     Parameter:
         - temp_flugstreifen_bezeichnung (list): Liste mit gekürzten Flugstreifen-Benennungen
-        - bildpunkt_liste (list): Name und Shape der Bildpunkte als Liste
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - backend (GeometrieBackend): Backend, mit dem die Geometrie-Operationen ausgeführt werden
     Rückgabewert:
         - status (bool): Flugstreifen-Bestimmung erfolgreich = True, Flugstreifen-Bestimmung fortfahren = False
     """
 
     meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
 
-    # Featuredataset "flugstreifenbestimmung" erstellen und befüllen
-    fc_flugstreifenbestimmung = arcpy.CreateFeatureclass_management(fds_temp, f"flugstreifenbestimmung_{operat}",
-                                                                    "POINT")
-    arcpy.AddFields_management(fc_flugstreifenbestimmung, [["img_name", "TEXT"], ["abgleich", "TEXT"]])
-    with arcpy.da.InsertCursor(fc_flugstreifenbestimmung, ["img_name", "SHAPE@XY", "abgleich"]) as cursor:
-        for item in temp_flugstreifen_bez_geo:
-            cursor.insertRow(item)
-
-    # Minimum Bounding Geometry von Bildpunkten mit gleichem Wert in "abgleich"erstellen
-    bounding_geometry_fc = rf"{fds_temp}\bounding_geometry_{operat}"
-    arcpy.MinimumBoundingGeometry_management(fc_flugstreifenbestimmung,
-                                             bounding_geometry_fc,
-                                             "CONVEX_HULL",
-                                             "LIST",
-                                             "abgleich")
-
-    # Bounding Geometry negativ Buffern
-    buffer_pfad = rf"{fds_temp}\bounding_buffer_{operat}"
-    arcpy.Buffer_analysis(bounding_geometry_fc,
-                          buffer_pfad,
-                          "-50 Meters",
-                          "FULL",
-                          "ROUND",
-                          "ALL",
-                          None,
-                          "PLANAR")
+    # Bildpunkte mit gekürzter Flugstreifen-Benennung ("abgleich") als Punkt-Layer erstellen
+    img_namen = np.array([item[0] for item in temp_flugstreifen_bez_geo], dtype=str)
+    abgleich = np.array([item[2] for item in temp_flugstreifen_bez_geo], dtype=str)
+    flugstreifenbestimmung = np.zeros(len(temp_flugstreifen_bez_geo),
+                                      dtype=[("img_name", img_namen.dtype), ("abgleich", abgleich.dtype),
+                                             ("x", "f8"), ("y", "f8")])
+    flugstreifenbestimmung["img_name"] = img_namen
+    flugstreifenbestimmung["abgleich"] = abgleich
+    flugstreifenbestimmung["x"] = [item[1][0] for item in temp_flugstreifen_bez_geo]
+    flugstreifenbestimmung["y"] = [item[1][1] for item in temp_flugstreifen_bez_geo]
+    punkte = backend.punkte_erstellen(flugstreifenbestimmung)
+
+    # Minimum Bounding Geometry von Bildpunkten mit gleichem Wert in "abgleich" negativ Buffern, Flächen, die dabei
+    # übrig bleiben
+    count = len(backend.huellen_nach_puffern(punkte, "abgleich", -50))
 
     # wenn durch das negative Puffern keine Flächen mehr vorhanden sind (count = 0), heißt dies, die Punkte lagen auf
     # einer Linie
-    count = int(arcpy.arcpy.GetCount_management(buffer_pfad).getOutput(0))
-
     if count == 0:
         # keine Flächen mehr, Punkte lagen auf einer Linie, Flugstreifen Name ist somit ermittelt
         print("Flugstreifen Name wurde ermittelt")
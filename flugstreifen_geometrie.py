@@ -0,0 +1,107 @@
+# Dieses Python-Skript erstellt die Flugstreifen (Polylinien) direkt aus den Bildpunkten im Arbeitsspeicher, ohne
+# "PointsToLine_management". Die Stützpunkte aller Flugstreifen werden mit einer einzigen Sortierung nach
+# (Flugstreifen, Bildreihenfolge) gebildet, Länge, Richtung und Abstände aufeinanderfolgender Bilder werden vektoriell
+# berechnet. Die Geometrie kann in mehreren Bearbeitungsschritten wiederverwendet und nur bei Bedarf als
+# Featureclass geschrieben werden (siehe "vektor_lokal.flugstreifen_schreiben").
+# Der Workflow wird durch das Starten von "main.py" initiiert, "flugstreifen_geometrie.py" kann vom User ignoriert
+# werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import numpy as np
+import numpy_geometrie
+
+
+def flugstreifen_aufbauen(bildpunkte: np.ndarray, linien_feld: str = "flugstreifen",
+                          reihenfolge_feld: str = None) -> dict:
+    """
+    Die Funktion bildet aus den Bildpunkten die Stützpunkte aller Flugstreifen. Die Bildpunkte werden mit einem
+    einzigen "lexsort" nach (Flugstreifen, Bildreihenfolge) sortiert, ohne "reihenfolge_feld" entspricht die
+    Bildreihenfolge der Reihenfolge in "bildpunkte" (wie bei "PointsToLine_management" ohne Sort_Field).
+    Parameter:
+        - bildpunkte (np.ndarray): strukturiertes Array mit den Feldern "x", "y" und "linien_feld"
+        - linien_feld (str): Feld mit dem Namen des Flugstreifens
+        - reihenfolge_feld (str): optionales Feld mit der Bildreihenfolge innerhalb eines Flugstreifens
+    Rückgabewert:
+        - flugstreifen (dict): Geometrie und Kennzahlen aller Flugstreifen
+            - "namen" (np.ndarray): Name je Flugstreifen (sortiert)
+            - "anfang" (np.ndarray): Index des ersten Stützpunktes je Flugstreifen
+            - "anzahl" (np.ndarray): Anzahl der Stützpunkte je Flugstreifen
+            - "x", "y" (np.ndarray): Stützpunkte aller Flugstreifen hintereinander
+            - "index" (np.ndarray): Index des Bildpunktes in "bildpunkte" je Stützpunkt
+            - "abstand" (np.ndarray): Abstand zum vorherigen Bild desselben Flugstreifens je Stützpunkt
+                                      (0 beim ersten Bild)
+            - "laenge" (np.ndarray): Länge je Flugstreifen
+            - "kompass_winkel" (np.ndarray): Richtung vom ersten zum letzten Bild (wie "CompassA")
+    """
+
+    schluessel = bildpunkte[linien_feld]
+    if reihenfolge_feld is None:
+        reihenfolge = np.arange(len(bildpunkte))
+    else:
+        reihenfolge = bildpunkte[reihenfolge_feld]
+
+    # eine Sortierung: primär Flugstreifen, sekundär Bildreihenfolge
+    index = np.lexsort((reihenfolge, schluessel))
+    sortiert = schluessel[index]
+    namen, anfang, anzahl = np.unique(sortiert, return_index=True, return_counts=True)
+    x = bildpunkte["x"][index].astype(float)
+    y = bildpunkte["y"][index].astype(float)
+
+    # Abstände aufeinanderfolgender Bilder, über Flugstreifen-Grenzen hinweg wird nicht gemessen
+    abstand = np.zeros(len(x))
+    if len(x) > 1:
+        abstand[1:] = np.hypot(np.diff(x), np.diff(y))
+    abstand[anfang] = 0
+    laenge = np.add.reduceat(abstand, anfang) if len(anfang) else np.empty(0)
+
+    ende = anfang + anzahl - 1
+    kompass_winkel = numpy_geometrie.kompasswinkel(x[ende] - x[anfang], y[ende] - y[anfang])
+
+    return {
+        "namen": namen,
+        "anfang": anfang,
+        "anzahl": anzahl,
+        "x": x,
+        "y": y,
+        "index": index,
+        "abstand": abstand,
+        "laenge": laenge,
+        "kompass_winkel": kompass_winkel
+    }
+
+
+def flugstreifen_auswaehlen(flugstreifen: dict, namen) -> dict:
+    """
+    Die Funktion liefert die Geometrie jener Flugstreifen, deren Name in "namen" enthalten ist.
+    Parameter:
+        - flugstreifen (dict): Ergebnis von "flugstreifen_aufbauen"
+        - namen: Namen der gewünschten Flugstreifen
+    Rückgabewert:
+        - flugstreifen_auswahl (dict): Geometrie und Kennzahlen der ausgewählten Flugstreifen
+    """
+
+    auswahl = np.isin(flugstreifen["namen"], list(namen))
+    # Stützpunkte je Flugstreifen auswählen
+    stuetzpunkt_auswahl = np.repeat(auswahl, flugstreifen["anzahl"])
+    anzahl = flugstreifen["anzahl"][auswahl]
+    anfang = np.concatenate(([0], np.cumsum(anzahl)[:-1])).astype(int) if len(anzahl) else np.empty(0, dtype=int)
+
+    flugstreifen_auswahl = {schluessel: flugstreifen[schluessel][stuetzpunkt_auswahl]
+                            for schluessel in ("x", "y", "index", "abstand")}
+    flugstreifen_auswahl.update({schluessel: flugstreifen[schluessel][auswahl]
+                                 for schluessel in ("namen", "anzahl", "laenge", "kompass_winkel")})
+    flugstreifen_auswahl["anfang"] = anfang
+    return flugstreifen_auswahl
+
+
+def stuetzpunkte(flugstreifen: dict) -> list:
+    """
+    Die Funktion liefert die Stützpunkte je Flugstreifen als Liste von (n, 2)-Arrays (z.B. zum Schreiben).
+    """
+    if len(flugstreifen["anfang"]) == 0:
+        return []
+    xy = np.column_stack((flugstreifen["x"], flugstreifen["y"]))
+    return np.split(xy, flugstreifen["anfang"][1:])
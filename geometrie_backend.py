@@ -0,0 +1,528 @@
+# Dieses Python-Skript definiert eine Schnittstelle für die Geometrie-Operationen, die von den lokalen
+# Bearbeitungsschritten ("vektor_lokal.py", "flugstreifen_benennung.py") benötigt werden: Punkte zu Linien,
+# Puffern, Ausschneiden, Löschen, Auswahl nach Lage, Richtungsmittel und Cursor (Lesen/Filtern).
+# Es gibt zwei Implementierungen: "ArcpyBackend" arbeitet mit Featureclasses im "memory"-Workspace, "NumpyBackend"
+# arbeitet ausschließlich mit NumPy-Arrays im Arbeitsspeicher und benötigt kein arcpy (z.B. Linux-Worker).
+# Der Workflow wird durch das Starten von "main.py" initiiert, "geometrie_backend.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+from __future__ import annotations
+import itertools
+from abc import ABC, abstractmethod
+import numpy as np
+import bild_schluessel
+import flugstreifen_geometrie
+import numpy_geometrie
+
+
+class GeometrieBackend(ABC):
+    """
+    Schnittstelle der Geometrie-Operationen. Layer sind für den Aufrufer undurchsichtige Objekte (Pfad zu einer
+    Featureclass beim ArcpyBackend, Python-Objekte beim NumpyBackend). Attribute werden immer als strukturierte
+    NumPy-Arrays ausgetauscht, Punktkoordinaten stehen in den Feldern "x" und "y".
+    """
+
+    @abstractmethod
+    def punkte_erstellen(self, daten: np.ndarray):
+        """Erstellt einen Punkt-Layer aus einem strukturierten Array mit den Feldern "x", "y" und Attributen."""
+
+    @abstractmethod
+    def flaeche_laden(self, quelle):
+        """Lädt eine Fläche (Featureclass-Pfad beim ArcpyBackend, Liste von Ringen beim NumpyBackend)."""
+
+    @abstractmethod
+    def lesen(self, layer, felder: list) -> np.ndarray:
+        """Liest die Attribute "felder" aller Features (SearchCursor), sortiert nach Feature-Reihenfolge."""
+
+    @abstractmethod
+    def filtern(self, layer, maske: np.ndarray):
+        """Liefert einen neuen Layer mit jenen Features, bei denen "maske" True ist (UpdateCursor.deleteRow)."""
+
+    @abstractmethod
+    def anzahl(self, layer) -> int:
+        """Anzahl der Features eines Layers (GetCount)."""
+
+    @abstractmethod
+    def punkte_zu_linien(self, punkte, linien_feld: str):
+        """Verbindet Punkte mit gleichem Wert in "linien_feld" zu Linien (PointsToLine). Felder: linien_feld, laenge"""
+
+    @abstractmethod
+    def richtungsmittel(self, linien, linien_feld: str):
+        """Richtungsmittel je Linie (DirectionalMean, DIRECTION). Felder: linien_feld, kompass_winkel, laenge"""
+
+    @abstractmethod
+    def puffern(self, layer, distanz: float):
+        """Puffert alle Features und löst diese zu einer Fläche auf (Buffer, dissolve ALL), auch negativ."""
+
+    @abstractmethod
+    def ausschneiden(self, layer, flaeche):
+        """Schneidet einen Layer mit einer Fläche aus (Clip). Linien erhalten die Länge innerhalb der Fläche."""
+
+    @abstractmethod
+    def loeschen(self, flaeche, loesch_flaeche):
+        """Entfernt "loesch_flaeche" aus "flaeche" (Erase)."""
+
+    @abstractmethod
+    def auswahl_nach_lage(self, layer, flaeche) -> np.ndarray:
+        """Bool-Array, ob ein Feature die Fläche schneidet (SelectLayerByLocation, INTERSECT)."""
+
+    @abstractmethod
+    def einzelteile(self, flaeche) -> list:
+        """Zerlegt eine Fläche in zusammenhängende Teilflächen (MultipartToSinglepart)."""
+
+    @abstractmethod
+    def vereinigen(self, flaechen: list):
+        """Vereinigt mehrere Flächen zu einer Fläche (Union + Dissolve)."""
+
+    @abstractmethod
+    def huellen_nach_puffern(self, punkte, gruppen_feld: str, distanz: float) -> np.ndarray:
+        """Gruppen, deren konvexe Hülle (MinimumBoundingGeometry) nach dem Puffern um "distanz" nicht leer ist."""
+
+    @abstractmethod
+    def ist_leer(self, flaeche) -> bool:
+        """True, wenn die Fläche keine Ausdehnung besitzt."""
+
+
+class ArcpyBackend(GeometrieBackend):
+    """
+    Implementierung der Schnittstelle mit arcpy-Geoverarbeitung. Zwischenergebnisse werden im "memory"-Workspace
+    abgelegt, ein Layer ist der Pfad zur jeweiligen Featureclass.
+    """
+
+    def __init__(self, epsg: int, workspace: str = "memory"):
+        import arcpy
+        self.arcpy = arcpy
+        self.epsg = epsg
+        self.workspace = workspace
+        self._zaehler = itertools.count()
+
+    def _name(self, praefix: str) -> str:
+        return rf"{self.workspace}\{praefix}_{next(self._zaehler)}"
+
+    def punkte_erstellen(self, daten):
+        punkte = self._name("punkte")
+        self.arcpy.da.NumPyArrayToFeatureClass(daten, punkte, ("x", "y"), self.arcpy.SpatialReference(self.epsg))
+        return punkte
+
+    def flaeche_laden(self, quelle):
+        flaeche = self._name("flaeche")
+        self.arcpy.PairwiseDissolve_analysis(quelle, flaeche)
+        return flaeche
+
+    def lesen(self, layer, felder):
+        cursor_felder = [{"x": "SHAPE@X", "y": "SHAPE@Y"}.get(feld, feld) for feld in felder]
+        daten = self.arcpy.da.FeatureClassToNumPyArray(layer, cursor_felder, null_value="")
+        daten.dtype.names = tuple(felder)
+        return daten
+
+    def filtern(self, layer, maske):
+        oids = self.arcpy.da.FeatureClassToNumPyArray(layer, ["OID@"])["OID@"][np.asarray(maske, dtype=bool)]
+        gefiltert = self._name("auswahl")
+        oid_feld = self.arcpy.Describe(layer).OIDFieldName
+        if not len(oids):
+            self.arcpy.Select_analysis(layer, gefiltert, f"{oid_feld} < 0")
+            return gefiltert
+        # Auswahl in Blöcken von höchstens 1000 OBJECTIDs (siehe "bild_schluessel.id_abfragen")
+        layer_name = self._name("layer").split("\\")[-1]
+        self.arcpy.MakeFeatureLayer_management(layer, layer_name)
+        for abfrage in bild_schluessel.id_abfragen(oids, oid_feld):
+            self.arcpy.SelectLayerByAttribute_management(layer_name, "ADD_TO_SELECTION", abfrage)
+        self.arcpy.CopyFeatures_management(layer_name, gefiltert)
+        self.arcpy.Delete_management(layer_name)
+        return gefiltert
+
+    def anzahl(self, layer):
+        return int(self.arcpy.GetCount_management(layer).getOutput(0))
+
+    def punkte_zu_linien(self, punkte, linien_feld):
+        linien = self._name("linien")
+        self.arcpy.PointsToLine_management(punkte, linien, Line_Field=linien_feld)
+        self.arcpy.AddField_management(linien, "laenge", "DOUBLE")
+        self.arcpy.CalculateGeometryAttributes_management(linien, [["laenge", "LENGTH"]])
+        return linien
+
+    def richtungsmittel(self, linien, linien_feld):
+        richtung = self._name("richtung")
+        self.arcpy.DirectionalMean_stats(linien, richtung, Orientation_Only="DIRECTION", Case_Field=linien_feld)
+        self.arcpy.AddFields_management(richtung, [["kompass_winkel", "DOUBLE"], ["laenge", "DOUBLE"]])
+        self.arcpy.CalculateField_management(richtung, "kompass_winkel", "!CompassA!", "PYTHON3")
+        self.arcpy.CalculateGeometryAttributes_management(richtung, [["laenge", "LENGTH"]])
+        return richtung
+
+    def puffern(self, layer, distanz):
+        puffer = self._name("puffer")
+        self.arcpy.Buffer_analysis(layer, puffer, f"{distanz} Meters", dissolve_option="ALL")
+        return puffer
+
+    def ausschneiden(self, layer, flaeche):
+        ausgeschnitten = self._name("clip")
+        self.arcpy.PairwiseClip_analysis(layer, flaeche, ausgeschnitten)
+        if self.arcpy.Describe(ausgeschnitten).shapeType == "Polyline":
+            self.arcpy.CalculateGeometryAttributes_management(ausgeschnitten, [["laenge", "LENGTH"]])
+        return ausgeschnitten
+
+    def loeschen(self, flaeche, loesch_flaeche):
+        ergebnis = self._name("erase")
+        self.arcpy.PairwiseErase_analysis(flaeche, loesch_flaeche, ergebnis)
+        return ergebnis
+
+    def auswahl_nach_lage(self, layer, flaeche):
+        layer_name = self._name("layer").split("\\")[-1]
+        self.arcpy.MakeFeatureLayer_management(layer, layer_name)
+        self.arcpy.SelectLayerByLocation_management(layer_name, "INTERSECT", flaeche, selection_type="NEW_SELECTION")
+        ausgewaehlt = set(self.arcpy.da.FeatureClassToNumPyArray(layer_name, ["OID@"])["OID@"])
+        alle = self.arcpy.da.FeatureClassToNumPyArray(layer, ["OID@"])["OID@"]
+        self.arcpy.Delete_management(layer_name)
+        return np.array([oid in ausgewaehlt for oid in alle], dtype=bool)
+
+    def einzelteile(self, flaeche):
+        singlepart = self._name("singlepart")
+        self.arcpy.MultipartToSinglepart_management(flaeche, singlepart)
+        return [self.filtern(singlepart, np.arange(self.anzahl(singlepart)) == i)
+                for i in range(self.anzahl(singlepart))]
+
+    def vereinigen(self, flaechen):
+        zusammengefuehrt = self._name("merge")
+        vereinigt = self._name("vereinigt")
+        self.arcpy.Merge_management(flaechen, zusammengefuehrt)
+        self.arcpy.PairwiseDissolve_analysis(zusammengefuehrt, vereinigt)
+        return vereinigt
+
+    def huellen_nach_puffern(self, punkte, gruppen_feld, distanz):
+        huellen = self._name("huellen")
+        self.arcpy.MinimumBoundingGeometry_management(punkte, huellen, "CONVEX_HULL", "LIST", gruppen_feld)
+        huellen_buffer = self._name("huellen_buffer")
+        self.arcpy.Buffer_analysis(huellen, huellen_buffer, f"{distanz} Meters", "FULL", "ROUND", "NONE", None,
+                                   "PLANAR")
+        return self.arcpy.da.FeatureClassToNumPyArray(huellen_buffer, [gruppen_feld])[gruppen_feld]
+
+    def ist_leer(self, flaeche):
+        return self.anzahl(flaeche) == 0
+
+
+class PunktLayer:
+    """Punkte des NumpyBackends: strukturiertes Array mit den Feldern "x", "y" und Attributen."""
+
+    def __init__(self, daten: np.ndarray):
+        self.daten = daten
+
+
+class LinienLayer:
+    """
+    Linien des NumpyBackends: Stützpunkte aller Linien hintereinander ("x", "y"), "anfang" enthält den Index des
+    ersten Stützpunktes jeder Linie (CSR-Format), "attribute" ein strukturiertes Array mit einer Zeile je Linie.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, anfang: np.ndarray, attribute: np.ndarray):
+        self.x = x
+        self.y = y
+        self.anfang = anfang
+        self.attribute = attribute
+
+    def ende(self) -> np.ndarray:
+        """Index nach dem letzten Stützpunkt jeder Linie."""
+        return np.append(self.anfang[1:], len(self.x)).astype(int) if len(self.anfang) else np.empty(0, dtype=int)
+
+    def strecken(self) -> tuple:
+        """Liefert alle Strecken (ax, ay, bx, by) und den Linien-Index jeder Strecke."""
+        ende = self.ende()
+        linie = np.repeat(np.arange(len(self.anfang)), ende - self.anfang)
+        # Die letzte Strecke einer Linie verbindet sich nicht mit der nächsten Linie
+        gueltig = np.ones(len(self.x), dtype=bool)
+        gueltig[ende - 1] = False
+        index = np.flatnonzero(gueltig)
+        einzelpunkt = np.flatnonzero(ende - self.anfang == 1)
+        ax = np.concatenate((self.x[index], self.x[self.anfang[einzelpunkt]]))
+        ay = np.concatenate((self.y[index], self.y[self.anfang[einzelpunkt]]))
+        bx = np.concatenate((self.x[index + 1], self.x[self.anfang[einzelpunkt]]))
+        by = np.concatenate((self.y[index + 1], self.y[self.anfang[einzelpunkt]]))
+        return ax, ay, bx, by, np.concatenate((linie[index], einzelpunkt))
+
+
+class Flaeche(ABC):
+    """Basisklasse der Flächen des NumpyBackends."""
+
+    @abstractmethod
+    def enthaelt(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Bool-Maske der Punkte innerhalb der Fläche"""
+
+    @abstractmethod
+    def ausdehnung(self) -> tuple:
+        """(xmin, ymin, xmax, ymax) oder None, falls leer"""
+
+    @abstractmethod
+    def rastern(self, zellgroesse: float) -> RasterFlaeche:
+        """Fläche als RasterFlaeche mit der angegebenen Zellgröße"""
+
+
+class PolygonFlaeche(Flaeche):
+    """Exakte Fläche aus Ringen (z.B. Meridianstreifen, gepuffertes Staatsgebiet)."""
+
+    def __init__(self, ringe: list):
+        self.ringe = [np.asarray(ring, dtype=float) for ring in ringe]
+
+    def enthaelt(self, x, y):
+        return numpy_geometrie.punkte_in_polygon(x, y, self.ringe)
+
+    def ausdehnung(self):
+        if not self.ringe:
+            return None
+        alle = np.concatenate(self.ringe)
+        return alle[:, 0].min(), alle[:, 1].min(), alle[:, 0].max(), alle[:, 1].max()
+
+    def rastern(self, zellgroesse):
+        ausdehnung = self.ausdehnung()
+        if ausdehnung is None:
+            return RasterFlaeche.leer(zellgroesse)
+        i0, j0, zeilen, spalten = RasterFlaeche.fenster(ausdehnung, zellgroesse)
+        maske = numpy_geometrie.polygon_rasterisieren(self.ringe, j0 * zellgroesse, i0 * zellgroesse, zellgroesse,
+                                                      zeilen, spalten)
+        return RasterFlaeche(i0, j0, maske, zellgroesse)
+
+
+class PufferFlaeche(Flaeche):
+    """Exakte Pufferfläche um Strecken (Punkte sind Strecken der Länge 0) mit positiver Distanz."""
+
+    def __init__(self, ax, ay, bx, by, distanz: float):
+        self.ax, self.ay, self.bx, self.by = ax, ay, bx, by
+        self.distanz = distanz
+
+    def enthaelt(self, x, y):
+        return numpy_geometrie.abstand_zu_strecken(x, y, self.ax, self.ay, self.bx, self.by) <= self.distanz
+
+    def ausdehnung(self):
+        if len(self.ax) == 0:
+            return None
+        return (min(self.ax.min(), self.bx.min()) - self.distanz, min(self.ay.min(), self.by.min()) - self.distanz,
+                max(self.ax.max(), self.bx.max()) + self.distanz, max(self.ay.max(), self.by.max()) + self.distanz)
+
+    def rastern(self, zellgroesse):
+        ausdehnung = self.ausdehnung()
+        if ausdehnung is None:
+            return RasterFlaeche.leer(zellgroesse)
+        i0, j0, zeilen, spalten = RasterFlaeche.fenster(ausdehnung, zellgroesse)
+        # Strecken als Saat-Zellen rastern, danach über das Abstandsfeld aufweiten
+        x, y, _, _ = numpy_geometrie.strecken_abtasten(self.ax, self.ay, self.bx, self.by, zellgroesse / 2)
+        saat = np.zeros((zeilen, spalten), dtype=bool)
+        saat[np.floor(y / zellgroesse).astype(int) - i0, np.floor(x / zellgroesse).astype(int) - j0] = True
+        maske = numpy_geometrie.abstandsfeld(saat, self.distanz / zellgroesse) <= self.distanz / zellgroesse
+        return RasterFlaeche(i0, j0, maske, zellgroesse)
+
+
+class RasterFlaeche(Flaeche):
+    """
+    Gerasterte Fläche für zusammengesetzte Operationen (negativer Puffer, Erase, Einzelteile). Das Raster ist an
+    einem globalen Gitter mit Ursprung (0, 0) ausgerichtet, Zelle (i, j) hat die linke untere Ecke
+    (j * zellgroesse, i * zellgroesse).
+    """
+
+    def __init__(self, i0: int, j0: int, maske: np.ndarray, zellgroesse: float):
+        self.i0 = i0
+        self.j0 = j0
+        self.maske = maske
+        self.zellgroesse = zellgroesse
+
+    @staticmethod
+    def leer(zellgroesse: float) -> RasterFlaeche:
+        return RasterFlaeche(0, 0, np.zeros((0, 0), dtype=bool), zellgroesse)
+
+    @staticmethod
+    def fenster(ausdehnung: tuple, zellgroesse: float) -> tuple:
+        """Gitter-Fenster (i0, j0, zeilen, spalten), das "ausdehnung" vollständig abdeckt (+1 Zelle Rand)."""
+        xmin, ymin, xmax, ymax = ausdehnung
+        j0 = int(np.floor(xmin / zellgroesse)) - 1
+        i0 = int(np.floor(ymin / zellgroesse)) - 1
+        spalten = int(np.floor(xmax / zellgroesse)) + 2 - j0
+        zeilen = int(np.floor(ymax / zellgroesse)) + 2 - i0
+        return i0, j0, zeilen, spalten
+
+    def enthaelt(self, x, y):
+        i = np.floor(np.asarray(y, dtype=float) / self.zellgroesse).astype(int) - self.i0
+        j = np.floor(np.asarray(x, dtype=float) / self.zellgroesse).astype(int) - self.j0
+        zeilen, spalten = self.maske.shape
+        innerhalb = (i >= 0) & (i < zeilen) & (j >= 0) & (j < spalten)
+        ergebnis = np.zeros(len(i), dtype=bool)
+        ergebnis[innerhalb] = self.maske[i[innerhalb], j[innerhalb]]
+        return ergebnis
+
+    def ausdehnung(self):
+        if not self.maske.any():
+            return None
+        zeilen = np.flatnonzero(self.maske.any(axis=1))
+        spalten = np.flatnonzero(self.maske.any(axis=0))
+        z = self.zellgroesse
+        return ((self.j0 + spalten[0]) * z, (self.i0 + zeilen[0]) * z,
+                (self.j0 + spalten[-1] + 1) * z, (self.i0 + zeilen[-1] + 1) * z)
+
+    def rastern(self, zellgroesse):
+        if zellgroesse != self.zellgroesse:
+            raise ValueError("Flächen mit unterschiedlicher Zellgröße können nicht kombiniert werden")
+        return self
+
+    def auf_fenster(self, i0: int, j0: int, zeilen: int, spalten: int) -> np.ndarray:
+        """Liefert die Maske ausgeschnitten bzw. aufgefüllt auf das angegebene Gitter-Fenster."""
+        maske = np.zeros((zeilen, spalten), dtype=bool)
+        eigene_zeilen, eigene_spalten = self.maske.shape
+        von_i, bis_i = max(i0, self.i0), min(i0 + zeilen, self.i0 + eigene_zeilen)
+        von_j, bis_j = max(j0, self.j0), min(j0 + spalten, self.j0 + eigene_spalten)
+        if von_i < bis_i and von_j < bis_j:
+            maske[von_i - i0:bis_i - i0, von_j - j0:bis_j - j0] = \
+                self.maske[von_i - self.i0:bis_i - self.i0, von_j - self.j0:bis_j - self.j0]
+        return maske
+
+
+class NumpyBackend(GeometrieBackend):
+    """
+    Implementierung der Schnittstelle ohne arcpy. Punkte und Linien werden exakt behandelt, Pufferflächen von Punkten
+    und Linien bleiben exakt, solange sie nur für Punkt- und Linien-Tests verwendet werden. Zusammengesetzte Flächen
+    (negativer Puffer, Erase, Einzelteile, Vereinigung) werden auf einem Raster mit "zellgroesse" berechnet.
+    """
+
+    def __init__(self, zellgroesse: float = 25.0):
+        self.zellgroesse = zellgroesse
+
+    def punkte_erstellen(self, daten):
+        return PunktLayer(daten)
+
+    def flaeche_laden(self, quelle):
+        return PolygonFlaeche(quelle)
+
+    def lesen(self, layer, felder):
+        if isinstance(layer, PunktLayer):
+            return layer.daten[felder]
+        return layer.attribute[felder]
+
+    def filtern(self, layer, maske):
+        maske = np.asarray(maske, dtype=bool)
+        if isinstance(layer, PunktLayer):
+            return PunktLayer(layer.daten[maske])
+        ende = layer.ende()
+        laenge = (ende - layer.anfang)[maske]
+        index = np.concatenate([np.arange(a, e) for a, e in zip(layer.anfang[maske], ende[maske])] or
+                               [np.empty(0, dtype=int)])
+        anfang = np.concatenate(([0], np.cumsum(laenge)[:-1])).astype(int) if len(laenge) else np.empty(0, int)
+        return LinienLayer(layer.x[index], layer.y[index], anfang, layer.attribute[maske])
+
+    def anzahl(self, layer):
+        if isinstance(layer, PunktLayer):
+            return len(layer.daten)
+        return len(layer.attribute)
+
+    def punkte_zu_linien(self, punkte, linien_feld):
+        # Reihenfolge innerhalb einer Linie entspricht der Reihenfolge der Punkte
+        flugstreifen = flugstreifen_geometrie.flugstreifen_aufbauen(punkte.daten, linien_feld)
+        attribute = np.zeros(len(flugstreifen["namen"]), dtype=[(linien_feld, flugstreifen["namen"].dtype),
+                                                                ("laenge", "f8")])
+        attribute[linien_feld] = flugstreifen["namen"]
+        attribute["laenge"] = flugstreifen["laenge"]
+        return LinienLayer(flugstreifen["x"], flugstreifen["y"], flugstreifen["anfang"], attribute)
+
+    def richtungsmittel(self, linien, linien_feld):
+        ende = linien.ende() - 1
+        dx = linien.x[ende] - linien.x[linien.anfang]
+        dy = linien.y[ende] - linien.y[linien.anfang]
+        laenge = linien.attribute["laenge"]
+        # Gerade Linie mit gleicher Länge und Richtung, zentriert im Mittelpunkt der Stützpunkte
+        mitte_x = np.add.reduceat(linien.x, linien.anfang) / (ende + 1 - linien.anfang)
+        mitte_y = np.add.reduceat(linien.y, linien.anfang) / (ende + 1 - linien.anfang)
+        norm = np.hypot(dx, dy)
+        norm = np.where(norm > 0, norm, 1.0)
+        halb_x = dx / norm * laenge / 2
+        halb_y = dy / norm * laenge / 2
+        x = np.column_stack((mitte_x - halb_x, mitte_x + halb_x)).ravel()
+        y = np.column_stack((mitte_y - halb_y, mitte_y + halb_y)).ravel()
+        attribute = np.zeros(len(laenge), dtype=[(linien_feld, linien.attribute[linien_feld].dtype),
+                                                 ("kompass_winkel", "f8"), ("laenge", "f8")])
+        attribute[linien_feld] = linien.attribute[linien_feld]
+        attribute["kompass_winkel"] = numpy_geometrie.kompasswinkel(dx, dy)
+        attribute["laenge"] = laenge
+        return LinienLayer(x, y, np.arange(0, 2 * len(laenge), 2), attribute)
+
+    def puffern(self, layer, distanz):
+        if isinstance(layer, Flaeche):
+            raster = layer.rastern(self.zellgroesse)
+            zellen = abs(distanz) / self.zellgroesse
+            rand = int(np.ceil(zellen)) + 1
+            zeilen, spalten = raster.maske.shape
+            i0, j0 = raster.i0 - rand, raster.j0 - rand
+            maske = raster.auf_fenster(i0, j0, zeilen + 2 * rand, spalten + 2 * rand)
+            if distanz >= 0:
+                maske = numpy_geometrie.abstandsfeld(maske, zellen) <= zellen
+            else:
+                maske = numpy_geometrie.abstandsfeld(~maske, zellen) > zellen
+            return RasterFlaeche(i0, j0, maske, self.zellgroesse)
+        if isinstance(layer, PunktLayer):
+            x = layer.daten["x"].astype(float)
+            y = layer.daten["y"].astype(float)
+            return PufferFlaeche(x, y, x, y, distanz)
+        ax, ay, bx, by, _ = layer.strecken()
+        return PufferFlaeche(ax, ay, bx, by, distanz)
+
+    def ausschneiden(self, layer, flaeche):
+        if isinstance(layer, PunktLayer):
+            return self.filtern(layer, flaeche.enthaelt(layer.daten["x"], layer.daten["y"]))
+        if isinstance(layer, Flaeche):
+            return self._kombinieren(layer, flaeche, np.logical_and)
+        # Linien: Länge innerhalb der Fläche über abgetastete Strecken ermitteln
+        ax, ay, bx, by, linie = layer.strecken()
+        x, y, strecke, anteil = numpy_geometrie.strecken_abtasten(ax, ay, bx, by, self.zellgroesse / 2)
+        innen = flaeche.enthaelt(x, y)
+        laenge_innen = np.bincount(linie[strecke[innen]], weights=anteil[innen], minlength=self.anzahl(layer))
+        beruehrt = np.bincount(linie[strecke[innen]], minlength=self.anzahl(layer)) > 0
+        ausgeschnitten = self.filtern(layer, beruehrt)
+        ausgeschnitten.attribute = ausgeschnitten.attribute.copy()
+        ausgeschnitten.attribute["laenge"] = laenge_innen[beruehrt]
+        return ausgeschnitten
+
+    def loeschen(self, flaeche, loesch_flaeche):
+        return self._kombinieren(flaeche, loesch_flaeche, lambda a, b: a & ~b)
+
+    def _kombinieren(self, flaeche_a, flaeche_b, operation) -> RasterFlaeche:
+        a = flaeche_a.rastern(self.zellgroesse)
+        b = flaeche_b.rastern(self.zellgroesse)
+        zeilen, spalten = a.maske.shape
+        return RasterFlaeche(a.i0, a.j0, operation(a.maske, b.auf_fenster(a.i0, a.j0, zeilen, spalten)),
+                             self.zellgroesse)
+
+    def auswahl_nach_lage(self, layer, flaeche):
+        if isinstance(layer, PunktLayer):
+            return flaeche.enthaelt(layer.daten["x"], layer.daten["y"])
+        ax, ay, bx, by, linie = layer.strecken()
+        x, y, strecke, _ = numpy_geometrie.strecken_abtasten(ax, ay, bx, by, self.zellgroesse / 2)
+        innen = flaeche.enthaelt(x, y)
+        return np.bincount(linie[strecke[innen]], minlength=self.anzahl(layer)) > 0
+
+    def einzelteile(self, flaeche):
+        raster = flaeche.rastern(self.zellgroesse)
+        beschriftung, anzahl = numpy_geometrie.komponenten_beschriften(raster.maske)
+        return [RasterFlaeche(raster.i0, raster.j0, beschriftung == nummer, self.zellgroesse)
+                for nummer in range(1, anzahl + 1)]
+
+    def vereinigen(self, flaechen):
+        raster = [flaeche.rastern(self.zellgroesse) for flaeche in flaechen]
+        raster = [r for r in raster if r.maske.size]
+        if not raster:
+            return RasterFlaeche.leer(self.zellgroesse)
+        i0 = min(r.i0 for r in raster)
+        j0 = min(r.j0 for r in raster)
+        zeilen = max(r.i0 + r.maske.shape[0] for r in raster) - i0
+        spalten = max(r.j0 + r.maske.shape[1] for r in raster) - j0
+        maske = np.zeros((zeilen, spalten), dtype=bool)
+        for r in raster:
+            maske |= r.auf_fenster(i0, j0, zeilen, spalten)
+        return RasterFlaeche(i0, j0, maske, self.zellgroesse)
+
+    def huellen_nach_puffern(self, punkte, gruppen_feld, distanz):
+        daten = punkte.daten
+        namen, gruppe = np.unique(daten[gruppen_feld], return_inverse=True)
+        gruppe = gruppe.ravel()
+        xy = np.column_stack((daten["x"].astype(float), daten["y"].astype(float)))
+        bleibt = [len(numpy_geometrie.huelle_puffern(numpy_geometrie.konvexe_huelle(xy[gruppe == i]), distanz)) >= 3
+                  for i in range(len(namen))]
+        return namen[np.array(bleibt, dtype=bool)]
+
+    def ist_leer(self, flaeche):
+        return flaeche.ausdehnung() is None
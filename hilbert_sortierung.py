@@ -0,0 +1,179 @@
+# Dieses Python-Skript ordnet Features entlang einer Hilbert-Kurve. Der Hilbert-Schlüssel des Schwerpunkts bildet
+# räumlich benachbarte Features auf benachbarte Schlüssel ab. Werden Features in dieser Reihenfolge geschrieben, liegen
+# nahe Bilder bzw. Flächen auch in der Datei nahe beieinander, räumlich begrenzte Abfragen (Clip, Erase, Katalog-Scans)
+# lesen weniger verstreute Blöcke. Sortiert wird vor dem Schreiben der Bildpunkte in "punkte_sammlung" und beim
+# Neuaufbau eines Meridians sowie in regelmäßigen Abständen ("Kompaktierung": "punkte_sammlung" und
+# "flaechen_sammlung" werden sortiert neu geschrieben und die globale Geodatabase komprimiert).
+# Der Workflow wird durch das Starten von "main.py" initiiert, "hilbert_sortierung.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import arcpy
+import json
+import os
+import numpy as np
+import punkt_index
+from info_wrapper import *
+
+
+# Ordnung der Hilbert-Kurve (2^16 x 2^16 Zellen je Ausdehnung)
+HILBERT_ORDNUNG = 16
+
+
+def hilbert_schluessel(x: np.ndarray, y: np.ndarray, ausdehnung: tuple = None,
+                       ordnung: int = HILBERT_ORDNUNG) -> np.ndarray:
+    """
+    Die Funktion berechnet den Hilbert-Schlüssel je Koordinate (vektorisiert, Bit für Bit von der gröbsten Ebene an).
+    Parameter:
+        - x, y (np.ndarray): Koordinaten
+        - ausdehnung (tuple): (xmin, ymin, xmax, ymax) des Rasters der Kurve (None = Ausdehnung der Koordinaten)
+        - ordnung (int): Ordnung der Kurve (höchstens 31)
+    Rückgabewert:
+        - schluessel (np.ndarray): Hilbert-Schlüssel (int64)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) == 0:
+        return np.empty(0, dtype=np.int64)
+    if ausdehnung is None:
+        ausdehnung = (x.min(), y.min(), x.max(), y.max())
+    xmin, ymin, xmax, ymax = ausdehnung
+
+    n = 1 << ordnung
+    groesse = max(xmax - xmin, ymax - ymin) or 1.0
+    xi = np.clip(((x - xmin) / groesse * n).astype(np.int64), 0, n - 1)
+    yi = np.clip(((y - ymin) / groesse * n).astype(np.int64), 0, n - 1)
+
+    schluessel = np.zeros(len(x), dtype=np.int64)
+    s = n >> 1
+    while s > 0:
+        rx = (xi & s) > 0
+        ry = (yi & s) > 0
+        schluessel += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        # Quadrant drehen bzw. spiegeln
+        spiegeln = ~ry & rx
+        xi = np.where(spiegeln, n - 1 - xi, xi)
+        yi = np.where(spiegeln, n - 1 - yi, yi)
+        xi, yi = np.where(ry, xi, yi), np.where(ry, yi, xi)
+        s >>= 1
+    return schluessel
+
+
+def hilbert_reihenfolge(x: np.ndarray, y: np.ndarray, ausdehnung: tuple = None) -> np.ndarray:
+    """
+    Die Funktion liefert die Indizes der Koordinaten in Reihenfolge der Hilbert-Kurve (stabil bei gleichen Schlüsseln).
+    """
+    return np.argsort(hilbert_schluessel(x, y, ausdehnung), kind="stable")
+
+
+def lokalitaet_messen(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    Die Funktion liefert den mittleren Abstand aufeinanderfolgender Features (Maß für die räumliche Ordnung der Datei).
+    """
+    if len(x) < 2:
+        return 0.0
+    return float(np.mean(np.hypot(np.diff(np.asarray(x, dtype=float)), np.diff(np.asarray(y, dtype=float)))))
+
+
+def _felder(featureclass: str) -> list:
+    return [feld.name for feld in arcpy.ListFields(featureclass) if feld.type not in ("OID", "Geometry")
+            and feld.editable]
+
+
+def _wiederherstellen(featureclass: str, sicherung: str):
+    """
+    Ersetzt die Featureclass durch die Sicherung (Copy behält die OBJECTIDs) und entfernt die Sicherung.
+    """
+    if arcpy.Exists(featureclass):
+        arcpy.Delete_management(featureclass)
+    arcpy.Copy_management(sicherung, featureclass)
+    arcpy.Delete_management(sicherung)
+
+
+@func_info
+def featureclass_sortieren(featureclass: str) -> int:
+    """
+    Die Funktion schreibt alle Features einer Featureclass in Reihenfolge der Hilbert-Kurve (Schwerpunkt) neu. Vor dem
+    Löschen wird eine Sicherung der Featureclass angelegt, die nach dem Schreiben entfernt wird. Schlägt das Schreiben
+    fehl, wird die Featureclass aus der Sicherung wiederhergestellt, ebenso beim nächsten Aufruf, falls ein vorheriger
+    Durchlauf abgebrochen wurde (Sicherung noch vorhanden). Die OBJECTIDs ändern sich.
+    Parameter:
+        - featureclass (str): Pfad zur Featureclass
+    Rückgabewert:
+        - anzahl (int): Anzahl der sortierten Features
+    """
+    sicherung = f"{featureclass}_hilbert_sicherung"
+    if arcpy.Exists(sicherung):
+        print(f"{os.path.basename(featureclass)}: abgebrochene Sortierung, Wiederherstellung aus der Sicherung")
+        _wiederherstellen(featureclass, sicherung)
+
+    felder = _felder(featureclass) + ["SHAPE@"]
+    with arcpy.da.SearchCursor(featureclass, felder + ["SHAPE@XY"]) as cursor:
+        zeilen = [list(row) for row in cursor]
+    if len(zeilen) < 2:
+        return len(zeilen)
+
+    x = np.array([row[-1][0] for row in zeilen], dtype=float)
+    y = np.array([row[-1][1] for row in zeilen], dtype=float)
+    reihenfolge = hilbert_reihenfolge(x, y)
+
+    arcpy.Copy_management(featureclass, sicherung)
+    try:
+        arcpy.DeleteRows_management(featureclass)
+        with arcpy.da.InsertCursor(featureclass, felder) as cursor:
+            for i in reihenfolge:
+                cursor.insertRow(zeilen[i][:-1])
+    except Exception:
+        _wiederherstellen(featureclass, sicherung)
+        raise
+    arcpy.Delete_management(sicherung)
+
+    print(f"{os.path.basename(featureclass)}: {len(zeilen)} Features in Hilbert-Reihenfolge, mittlerer Abstand "
+          f"aufeinanderfolgender Features {lokalitaet_messen(x, y):.0f} m -> "
+          f"{lokalitaet_messen(x[reihenfolge], y[reihenfolge]):.0f} m")
+    return len(zeilen)
+
+
+@func_info
+def sammlungen_kompaktieren(global_info: list, workspace_info: list, intervall: int, anzahl_operate: int = 1) -> bool:
+    """
+    Die Funktion zählt die eingefügten Operate des Meridians ("{meridian}_hilbert_status.json" im Speicherort) und
+    schreibt nach "intervall" Operaten "punkte_sammlung" und "flaechen_sammlung" in Hilbert-Reihenfolge neu und
+    komprimiert die globale Geodatabase. Der Gitter-Index von "punkte_sammlung" wird verworfen (neue OBJECTIDs) und
+    beim nächsten Laden neu erstellt.
+    Parameter:
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - intervall (int): Anzahl eingefügter Operate zwischen zwei Kompaktierungen
+        - anzahl_operate (int): Anzahl der soeben eingefügten Operate
+    Rückgabewert:
+        - kompaktiert (bool): "True", falls kompaktiert wurde
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    status_datei = rf"{speicherort}\{meridian}_hilbert_status.json"
+    status = {"operate_seit_kompaktierung": 0}
+    if os.path.exists(status_datei):
+        with open(status_datei, "r") as datei:
+            status = json.load(datei)
+    status["operate_seit_kompaktierung"] += anzahl_operate
+
+    kompaktiert = status["operate_seit_kompaktierung"] >= intervall
+    if kompaktiert:
+        featureclass_sortieren(punkte_sammlung)
+        featureclass_sortieren(flaechen_sammlung)
+        if os.path.exists(punkt_index.index_datei(workspace_info)):
+            os.remove(punkt_index.index_datei(workspace_info))
+        arcpy.Compact_management(geodatabase_global)
+        status["operate_seit_kompaktierung"] = 0
+
+    with open(status_datei + ".temp", "w") as datei:
+        json.dump(status, datei)
+    os.replace(status_datei + ".temp", status_datei)
+    return kompaktiert
+
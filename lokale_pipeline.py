@@ -0,0 +1,287 @@
+# Dieses Python-Skript führt die lokalen Bearbeitungsschritte eines Operates (analog zu "vektor_lokal.py") über die
+# Schnittstelle aus "geometrie_backend.py" aus. Mit dem "NumpyBackend" läuft die Ermittlung der relevanten Bildpunkte
+# ohne arcpy im Arbeitsspeicher, z.B. parallel auf Linux-Workern. Nur Mosaic Dataset und Stereo Modell benötigen
+# danach noch arcpy.
+# Der Workflow wird durch das Starten von "main.py" initiiert, "lokale_pipeline.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from geometrie_backend import GeometrieBackend, NumpyBackend
+from info_wrapper import *
+
+
+def ist_vertikal(kompass_winkel: np.ndarray) -> np.ndarray:
+    """Nord-Süd-Ausdehnung (± 3 Grad), analog zu "vektor_lokal.vertikale_flugstreifen"."""
+    return (kompass_winkel >= 357) | (kompass_winkel <= 3) | ((kompass_winkel >= 177) & (kompass_winkel <= 183))
+
+
+def ist_horizontal(kompass_winkel: np.ndarray) -> np.ndarray:
+    """Ost-West-Ausdehnung (± 3 Grad), analog zu "vektor_lokal.horizontale_flugstreifen"."""
+    return ((kompass_winkel >= 267) & (kompass_winkel <= 273)) | ((kompass_winkel >= 87) & (kompass_winkel <= 93))
+
+
+@func_info
+def bildpunkte_array(bild_info: dict, flugstreifen_info: list, operat: str) -> np.ndarray:
+    """
+    Die Funktion erstellt die Bildpunkte inklusive Flugstreifen-Benennung als strukturiertes Array, analog zu
+    "vektor_lokal.bildpunkte_inkl_flugstreifen_info".
+    Parameter:
+        - bild_info (dict): Dictionary mit key = Bildnummer und value = [Orientierungsparameter]
+        - flugstreifen_info (list): Liste mit bereits ermittelter Flugstreifen Benennung, Subparts + Trennzeichen
+        - operat (str): Operatsnummer
+    Rückgabewert:
+        - bildpunkte (np.ndarray): Felder "img_name", "operat", "flugstreifen", "flughoehe", "x", "y"
+    """
+
+    subparts, trennzeichen = flugstreifen_info
+    name_indices = [int(x) for x in subparts.keys()]
+    max_index = max(name_indices) + 1
+    min_index = min(name_indices)
+
+    namen = list(bild_info.keys())
+    flugstreifen = [trennzeichen.join(name.split(trennzeichen)[min_index:max_index]) for name in namen]
+    orientierung = np.array([bild_info[name][:3] for name in namen], dtype=float).reshape(-1, 3)
+
+    namen = np.array(namen, dtype=str)
+    flugstreifen = np.array(flugstreifen, dtype=str)
+    bildpunkte = np.zeros(len(namen), dtype=[("img_name", namen.dtype), ("operat", f"U{max(len(operat), 1)}"),
+                                             ("flugstreifen", flugstreifen.dtype), ("flughoehe", "f8"),
+                                             ("x", "f8"), ("y", "f8")])
+    bildpunkte["img_name"] = namen
+    bildpunkte["operat"] = operat
+    bildpunkte["flugstreifen"] = flugstreifen
+    bildpunkte["x"] = orientierung[:, 0]
+    bildpunkte["y"] = orientierung[:, 1]
+    bildpunkte["flughoehe"] = orientierung[:, 2]
+    return bildpunkte
+
+
+@func_info
+def flugstreifen_klassifizieren(backend: GeometrieBackend, bildpunkte: np.ndarray, oesterreich_buffer,
+                                meridianstreifen) -> tuple:
+    """
+    Die Funktion trifft alle Entscheidungen, die ganze Flugstreifen betreffen (Flugstreifen außerhalb von Ö, Richtung,
+    schräge Randstreifen, benötigte vertikale Flugstreifen). Die Entscheidungen hängen nur von der Geometrie ganzer
+    Flugstreifen ab und werden daher einmal pro Operat ermittelt, ebenso das Richtungsmittel ganzer Flugstreifen, das
+    für die Bereiche der vertikalen Flugstreifen gepuffert wird.
+    Parameter:
+        - backend (GeometrieBackend): Backend, mit dem die Geometrie-Operationen ausgeführt werden
+        - bildpunkte (np.ndarray): Bildpunkte inklusive Flugstreifen-Benennung (siehe "bildpunkte_array")
+        - oesterreich_buffer: Fläche von Österreich mit Puffer (mit "backend.flaeche_laden" geladen)
+        - meridianstreifen: Fläche des Meridianstreifens
+    Rückgabewerte (tuple):
+        - klassifikation (dict): Namen der Flugstreifen je Klasse ("ausserhalb", "ungunst", "vertikal",
+                                 "vertikal_benoetigt", "horizontal", "schraeg")
+        - richtung: Richtungsmittel der Flugstreifen innerhalb von Ö (Layer des Backends)
+    """
+
+    # Flugstreifen erstellen, Flugstreifen außerhalb von Ö ermitteln
+    flugstreifen = backend.punkte_zu_linien(backend.punkte_erstellen(bildpunkte), "flugstreifen")
+    innerhalb = backend.auswahl_nach_lage(flugstreifen, oesterreich_buffer)
+    ausserhalb_namen = backend.lesen(flugstreifen, ["flugstreifen"])["flugstreifen"][~innerhalb]
+    flugstreifen = backend.filtern(flugstreifen, innerhalb)
+
+    # Richtung der Flugstreifen ermitteln und in schräg, vertikal und horizontal einteilen
+    richtung = backend.richtungsmittel(flugstreifen, "flugstreifen")
+    richtung_info = backend.lesen(richtung, ["flugstreifen", "kompass_winkel", "laenge"])
+    vertikal = ist_vertikal(richtung_info["kompass_winkel"])
+    horizontal = ist_horizontal(richtung_info["kompass_winkel"])
+    schraeg = ~(vertikal | horizontal)
+    # lange schräge Flugstreifen sind mit Sicherheit nicht relevant
+    ungunst_schraeg = richtung_info["flugstreifen"][schraeg & (richtung_info["laenge"] > 30000)]
+    schraege_flugstreifen_liste = richtung_info["flugstreifen"][schraeg & (richtung_info["laenge"] <= 30000)]
+
+    # schräge Randstreifen: weniger als 50 % der Länge innerhalb des Meridianstreifens
+    streifen_clip = backend.ausschneiden(backend.filtern(richtung, schraeg), meridianstreifen)
+    clip_info = backend.lesen(streifen_clip, ["flugstreifen", "laenge"])
+    laenge_gesamt = dict(zip(richtung_info["flugstreifen"], richtung_info["laenge"]))
+    flugstreifen_ungunst = [name for name, laenge in clip_info if laenge < laenge_gesamt[name] / 2]
+    flugstreifen_ungunst.extend(ungunst_schraeg)
+
+    # Vertikale Flugstreifen, deren gepufferter Bereich mindestens 6 vertikale Linien enthält (sonst wahrscheinlich
+    # Randstreifen). Der Bereich eines solchen Puffers entspricht der Vereinigung der Puffer seiner Linien.
+    flugstreifen_vertikal = backend.filtern(richtung, vertikal)
+    vertikal_benoetigt = np.zeros(int(np.count_nonzero(vertikal)), dtype=bool)
+    for teil in backend.einzelteile(backend.puffern(flugstreifen_vertikal, 1500)):
+        linien_im_teil = backend.auswahl_nach_lage(flugstreifen_vertikal, teil)
+        if np.count_nonzero(linien_im_teil) >= 6:
+            vertikal_benoetigt |= linien_im_teil
+
+    klassifikation = {
+        "ausserhalb": list(ausserhalb_namen),
+        "ungunst": list(flugstreifen_ungunst),
+        "vertikal": list(richtung_info["flugstreifen"][vertikal]),
+        "vertikal_benoetigt": list(richtung_info["flugstreifen"][vertikal][vertikal_benoetigt]),
+        "horizontal": list(richtung_info["flugstreifen"][horizontal]),
+        "schraeg": list(schraege_flugstreifen_liste)
+    }
+    return klassifikation, richtung
+
+
+@func_info
+def bildpunkte_auswaehlen(backend: GeometrieBackend, bildpunkte: np.ndarray, klassifikation: dict, richtung,
+                          meridianstreifen_buffer) -> np.ndarray:
+    """
+    Die Funktion trifft die Entscheidungen je Bildpunkt anhand der Klassifikation der Flugstreifen: Löschen der
+    Bildpunkte außerhalb, schräger Randstreifen und vertikaler Flugstreifen, Einfügen vertikaler Bildpunkte in Bereichen
+    ohne horizontale Flugstreifen und Freischneiden der Talstreifen. Jede Entscheidung hängt nur von Flugstreifen in
+    höchstens 3000 Metern Entfernung ab.
+    Parameter:
+        - backend (GeometrieBackend): Backend, mit dem die Geometrie-Operationen ausgeführt werden
+        - bildpunkte (np.ndarray): Bildpunkte inklusive Flugstreifen-Benennung, schräge Flugstreifen vollständig
+        - klassifikation (dict): Klassifikation aus "flugstreifen_klassifizieren"
+        - richtung: Richtungsmittel ganzer Flugstreifen aus "flugstreifen_klassifizieren"
+        - meridianstreifen_buffer: Fläche des gepufferten Meridianstreifens
+    Rückgabewert:
+        - extrahiert (np.ndarray): Bool-Maske über "bildpunkte", True = relevanter Bildpunkt
+    """
+
+    bildpunkte_unbearbeitet = backend.punkte_erstellen(bildpunkte)
+    streifen = bildpunkte["flugstreifen"]
+
+    # Bildpunkte außerhalb von Ö, schräger Randstreifen und (vorerst) vertikaler Flugstreifen löschen
+    extrahiert = ~np.isin(streifen, klassifikation["ausserhalb"] + klassifikation["ungunst"] +
+                          klassifikation["vertikal"])
+
+    # Bereiche ohne horizontale Flugstreifen ermitteln, in denen vertikale Flugstreifen benötigt werden
+    namen = backend.lesen(richtung, ["flugstreifen"])["flugstreifen"]
+    flugstreifen_vertikal = backend.filtern(richtung, np.isin(namen, klassifikation["vertikal_benoetigt"]))
+    if backend.anzahl(flugstreifen_vertikal) > 0:
+        flugstreifen_horizontal = backend.filtern(richtung, np.isin(namen, klassifikation["horizontal"]))
+        horizontal_buffer_reduced = backend.puffern(backend.puffern(flugstreifen_horizontal, 1500), -1150)
+        vertikal_streifen_bereich = backend.loeschen(backend.puffern(flugstreifen_vertikal, 1500),
+                                                     horizontal_buffer_reduced)
+        vertikal_streifen_bereich_inland = backend.ausschneiden(vertikal_streifen_bereich, meridianstreifen_buffer)
+        if not backend.ist_leer(vertikal_streifen_bereich_inland):
+            # Bildpunkte im Bereich einfügen, die nicht von schrägen Streifen stammen
+            im_bereich = backend.auswahl_nach_lage(bildpunkte_unbearbeitet, vertikal_streifen_bereich_inland)
+            extrahiert |= im_bereich & ~np.isin(streifen, klassifikation["schraeg"])
+
+    # Bildpunkte im Bereich eines Talstreifens, die nicht Teil von diesem sind, werden gelöscht (schräge Flugstreifen
+    # werden nur als Ganzes gelöscht, ein Talstreifen besteht daher immer aus allen seinen Bildpunkten)
+    talstreifen = backend.punkte_zu_linien(backend.filtern(bildpunkte_unbearbeitet, extrahiert), "flugstreifen")
+    talstreifen_namen = backend.lesen(talstreifen, ["flugstreifen"])["flugstreifen"]
+    ist_talstreifen = np.isin(talstreifen_namen, klassifikation["schraeg"])
+    if ist_talstreifen.any():
+        talstreifen_buffer = backend.puffern(backend.filtern(talstreifen, ist_talstreifen), 200)
+        im_buffer = backend.auswahl_nach_lage(bildpunkte_unbearbeitet, talstreifen_buffer)
+        extrahiert &= ~(im_buffer & ~np.isin(streifen, talstreifen_namen[ist_talstreifen]))
+
+    return extrahiert
+
+
+def _kachel_ausfuehren(auftrag: tuple) -> np.ndarray:
+    """
+    Führt "bildpunkte_auswaehlen" für eine Kachel (Kern + schräge Flugstreifen im Rand) in einem Worker-Prozess aus
+    und liefert die Maske der Kern-Bildpunkte.
+    """
+    bildpunkte, kern, klassifikation, richtung, meridianstreifen_buffer, zellgroesse = auftrag
+    backend = NumpyBackend(zellgroesse)
+    extrahiert = bildpunkte_auswaehlen(
+        backend,
+        bildpunkte,
+        klassifikation,
+        richtung,
+        backend.flaeche_laden(meridianstreifen_buffer)
+    )
+    return extrahiert[kern]
+
+
+@func_info
+def lokale_bildauswahl_gekachelt(bildpunkte: np.ndarray, oesterreich_buffer, meridianstreifen,
+                                 meridianstreifen_buffer, kachelgroesse: float = 10000.0, rand: float = 3000.0,
+                                 zellgroesse: float = 25.0, max_worker: int = None) -> np.ndarray:
+    """
+    Die Funktion ermittelt die relevanten Bildpunkte sehr großer Operate in räumlichen Kacheln. Die Entscheidungen,
+    die ganze Flugstreifen betreffen, und deren Richtungsmittel werden einmal für das ganze Operat ermittelt
+    ("flugstreifen_klassifizieren"). Jeder Bildpunkt gehört anhand seiner Lage genau einer Kachel (Kern, am Gitter mit
+    Ursprung (0, 0) ausgerichtet). Die Flugstreifen werden auf die Kachel zugeschnitten: eine Kachel enthält nur die
+    Bildpunkte des Kerns und zusätzlich alle Bildpunkte der schrägen Flugstreifen (höchstens 30 km lang), die den Kern
+    inklusive "rand" berühren, da diese als ganze Talstreifen gepuffert werden. Da jede Entscheidung je Bildpunkt nur
+    von Flugstreifen in höchstens 3000 Metern Entfernung abhängt, ist das Ergebnis unabhängig von der Kachelgröße.
+    Parameter:
+        - bildpunkte (np.ndarray): Bildpunkte inklusive Flugstreifen-Benennung (siehe "bildpunkte_array")
+        - oesterreich_buffer, meridianstreifen, meridianstreifen_buffer: Flächen als Liste von Ringen
+        - kachelgroesse (float): Kantenlänge der Kacheln in Metern
+        - rand (float): Randbreite in Metern, mindestens 3000
+        - zellgroesse (float): Zellgröße der gerasterten Flächen in Metern
+        - max_worker (int): Anzahl der Worker-Prozesse (None = Anzahl der Prozessorkerne)
+    Rückgabewert:
+        - bildpunkte_extrahiert (np.ndarray): relevante Bildpunkte in der Reihenfolge von "bildpunkte"
+    """
+
+    if rand < 3000:
+        raise ValueError("Der Rand der Kacheln muss mindestens 3000 Meter betragen")
+
+    # Entscheidungen je Flugstreifen für das ganze Operat
+    backend = NumpyBackend(zellgroesse)
+    klassifikation, richtung = flugstreifen_klassifizieren(
+        backend,
+        bildpunkte,
+        backend.flaeche_laden(oesterreich_buffer),
+        backend.flaeche_laden(meridianstreifen)
+    )
+
+    # Zuordnung der Bildpunkte zu Kacheln, die Bildpunkte werden einmal nach Kachel und nach Flugstreifen sortiert,
+    # damit jede Kachel nur ihre eigenen Bildpunkte und die ihrer Nachbarkacheln durchsucht
+    x = bildpunkte["x"].astype(float)
+    y = bildpunkte["y"].astype(float)
+    kachel_spalte = np.floor(x / kachelgroesse).astype(np.int64)
+    kachel_zeile = np.floor(y / kachelgroesse).astype(np.int64)
+    kacheln, kachel = np.unique(np.column_stack((kachel_zeile, kachel_spalte)), axis=0, return_inverse=True)
+    kachel = kachel.ravel()
+    kachel_ordnung = np.argsort(kachel, kind="stable")
+    kachel_grenzen = np.searchsorted(kachel[kachel_ordnung], np.arange(len(kacheln) + 1))
+    streifen_namen, streifen = np.unique(bildpunkte["flugstreifen"], return_inverse=True)
+    streifen = streifen.ravel()
+    streifen_ordnung = np.argsort(streifen, kind="stable")
+    streifen_grenzen = np.searchsorted(streifen[streifen_ordnung], np.arange(len(streifen_namen) + 1))
+
+    # Bildpunkte schräger Flugstreifen je Kachel
+    schraeg = np.isin(bildpunkte["flugstreifen"], klassifikation["schraeg"])
+    schraeg_sortiert = kachel_ordnung[schraeg[kachel_ordnung]]
+    schraeg_kacheln, schraeg_anfang = np.unique(kachel[schraeg_sortiert], return_index=True)
+    schraeg_je_kachel = {tuple(kacheln[nummer]): teil for nummer, teil in
+                         zip(schraeg_kacheln, np.split(schraeg_sortiert, schraeg_anfang[1:]))}
+    nachbarn = int(np.ceil(rand / kachelgroesse))
+    leer = np.empty(0, dtype=np.int64)
+
+    # Richtungsmittel (gerade Linien aus 2 Stützpunkten) als Begrenzungsrechtecke
+    richtung_x = richtung.x.reshape(-1, 2)
+    richtung_y = richtung.y.reshape(-1, 2)
+
+    # Kachel = Kern + alle vollständigen schrägen Flugstreifen, die den Kern inklusive Rand berühren. An die Worker
+    # werden nur diese Bildpunkte und die Richtungsmittel im Bereich der Kachel übergeben.
+    auftraege = []
+    kern_indices = []
+    for nummer, (zeile, spalte) in enumerate(kacheln):
+        x_min, x_max = spalte * kachelgroesse - rand, (spalte + 1) * kachelgroesse + rand
+        y_min, y_max = zeile * kachelgroesse - rand, (zeile + 1) * kachelgroesse + rand
+        im_kern = kachel_ordnung[kachel_grenzen[nummer]:kachel_grenzen[nummer + 1]]
+        kandidaten = np.concatenate([schraeg_je_kachel.get((zeile + zeile_versatz, spalte + spalte_versatz), leer)
+                                     for zeile_versatz in range(-nachbarn, nachbarn + 1)
+                                     for spalte_versatz in range(-nachbarn, nachbarn + 1)])
+        im_fenster = kandidaten[(x[kandidaten] >= x_min) & (x[kandidaten] < x_max) &
+                                (y[kandidaten] >= y_min) & (y[kandidaten] < y_max)]
+        kontext = np.union1d(im_kern, np.concatenate(
+            [streifen_ordnung[streifen_grenzen[i]:streifen_grenzen[i + 1]] for i in np.unique(streifen[im_fenster])]
+            or [leer]))
+        kern = kachel[kontext] == nummer
+        richtung_im_bereich = ((richtung_x.max(axis=1) >= x_min) & (richtung_x.min(axis=1) < x_max) &
+                               (richtung_y.max(axis=1) >= y_min) & (richtung_y.min(axis=1) < y_max))
+        auftraege.append((bildpunkte[kontext], kern, klassifikation, backend.filtern(richtung, richtung_im_bereich),
+                          meridianstreifen_buffer, zellgroesse))
+        kern_indices.append(kontext[kern])
+    print(f"{len(bildpunkte)} Bildpunkte, {len(streifen_namen)} Flugstreifen, {len(kacheln)} Kacheln")
+
+    # Kacheln parallel berechnen und Kern-Ergebnisse in der ursprünglichen Reihenfolge zusammenfügen
+    extrahiert = np.zeros(len(bildpunkte), dtype=bool)
+    with ProcessPoolExecutor(max_workers=max_worker) as executor:
+        for indices, ergebnis in zip(kern_indices, executor.map(_kachel_ausfuehren, auftraege)):
+            extrahiert[indices] = ergebnis
+
+    return bildpunkte[extrahiert]
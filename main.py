@@ -24,6 +24,41 @@ mehrere_operate = False
 mehrere_operate_input = [["M31", "2022470"], ["M31", "2021260"], ["M31", "2023350"]]
 
 
+# Bei "mehrere_operate_batch = True" werden zuerst alle Operate lokal bearbeitet und danach je Meridian in einem
+# einzigen globalen Durchgang zusammengeführt (gleiches Ergebnis wie das Einfügen in der angegebenen Reihenfolge).
+mehrere_operate_batch = False
+
+
+# Zurücksetzen von Operaten anhand des Ledgers (z.B. fehlerhaftes Operat oder abgebrochener Durchlauf), die vorherige
+# Abdeckung wird ohne Neuberechnung des Meridians wiederhergestellt. Leere Liste = kein Zurücksetzen.
+# Form: "zuruecksetzen_input = [["M31", "2022470"], ...]"
+zuruecksetzen_input = []
+
+
+# Stand der Abdeckung (Flächen und Bildpunkte) zu einem Stichtag aus dem Ledger erzeugen. Leere Liste = kein Stand.
+# Form: "stichtag_input = [["M31", "2024-01-20"], ...]"
+# Sind "zuruecksetzen_input" oder "stichtag_input" befüllt, werden keine Operate eingefügt.
+stichtag_input = []
+
+
+# Bei "simulation = True" wird das Einfügen der Operate nur simuliert: ausgegeben wird, welche Bildpunkte gelöscht bzw.
+# hinzugefügt würden und welche Operate Fläche verlieren. Die globale Geodatabase bleibt unverändert.
+simulation = False
+
+
+# Neuaufbau ganzer Meridiane aus allen Operaten in "flaechen_sammlung" (gekachelt, parallel auf allen Prozessorkernen).
+# Leere Liste = kein Neuaufbau. Form: "neuaufbau_input = ["M28", "M31", "M34"]"
+# Ist "neuaufbau_input" befüllt, werden keine Operate eingefügt.
+neuaufbau_input = []
+neuaufbau_kachelgroesse = 20000.0
+
+
+# Abgleich der Mosaic Datasets mit "punkte_sammlung": nur fehlende Bilder werden eingefügt und nicht mehr benötigte
+# entfernt (auch nach einem Abbruch erneut ausführbar). Leere Liste = kein Abgleich. Form: "synchronisierung_input =
+# ["M28", "M31"]". Ist "synchronisierung_input" befüllt, werden keine Operate eingefügt.
+synchronisierung_input = []
+
+
 # [["M28", "2020260"], ["M28", "2022370"], ["M28", "2019370"], ["M28", "2020550"],
 # ["M28", "2020160"], ["M31", "2020460"], ["M31", "2022650"], ["M31", "2020150"],
 # ["M31", "2021160"], ["M31", "2021250"], ["M31", "2021360"], ["M31", "2022160"],
@@ -50,10 +85,86 @@ meridianstreifen_pfad = r"C:\Users\43664\OneDrive\Desktop\Praktikum_Projekt\Oper
 dgm_pfad = r"\\RZ0-FIL-25\ALS$\ALS_BEV\Mosaik_2022_09_15\Lieferung\DGM\OeRect_01m_gt_31287.img"
 
 
+# Lokaler Zwischenspeicher des DGM für den Abgleich der Mosaic Datasets (Kacheln im Speicherort, über Operate und
+# Durchläufe wiederverwendet). Form: [Zellgröße in Metern (None = Zellgröße des DGM), maximale Größe in GB (je
+# Zellgröße)], z.B. [None, 50.0].
+# Bei "dgm_cache_info = None" wird das DGM direkt aus "dgm_pfad" verwendet.
+dgm_cache_info = None
+
+
+# Meridiane, deren Mosaic Dataset allein aus dem Manifest der Bildauswahl ("{meridian}_manifest.npz" im Speicherort,
+# wird nach jedem Einfügen von Operaten fortgeführt) neu aufgebaut werden soll, z.B. nach einer Beschädigung.
+# Es werden keine Operate eingefügt. Form: ["M28", "M31"]
+manifest_input = []
+
+
+# Anzahl der Worker-Prozesse beim Einfügen der Bilder in die Mosaic Datasets (Abgleich und Aufbau aus dem Manifest):
+# die Blöcke werden parallel in eigene Staging-Mosaics geladen und danach in einem Schritt übernommen.
+# Bei "mosaic_worker = 1" wird seriell eingefügt, bei "mosaic_worker = None" mit allen Prozessorkernen.
+mosaic_worker = 1
+
+
+# Toleranz (in Metern) der Vereinfachung der Operatsflächen, bevor diese in "flaechen_sammlung", "flaechen_partition"
+# und "flaechen_sammlung_final" gespeichert werden. Bei "vereinfachung_toleranz = 0" wird nicht vereinfacht (z.B. 5).
+# "max_stuetzpunkte" begrenzt die Anzahl an Stützpunkten je Polygon (die Toleranz wird bei Bedarf erhöht).
+vereinfachung_toleranz = 0
+max_stuetzpunkte = 2000
+
+
+# Stereo-Prüfung der verbleibenden Bildpunkte je Flugstreifen (Ergebnis als json-Datei im Operats-Ordner bzw. im
+# Speicherort). Form: [Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m),
+# Mindest-Längsüberdeckung (0-1)], z.B. [100.5, 68.0, 600, 0.5]. Bei "stereo_pruefung_info = None" wird nicht geprüft.
+# Bildpaare ohne Flughöhe werden nicht bewertet, sondern im Bericht gezählt.
+stereo_pruefung_info = None
+
+
+# Reduktion der Bildpunkte je Operat auf eine nahezu minimale Auswahl, die die Operatsfläche weiterhin durchgehend
+# stereoskopisch abdeckt (Bericht als json-Datei im Operats-Ordner). Benötigt "stereo_pruefung_info".
+bildauswahl_optimieren = False
+
+
+# Bildpunkte werden in Hilbert-Reihenfolge (räumlich benachbarte Bilder nebeneinander in der Datei) in
+# "punkte_sammlung" geschrieben, nach "hilbert_kompaktierung" eingefügten Operaten je Meridian werden
+# "punkte_sammlung" und "flaechen_sammlung" sortiert neu geschrieben und die globale Geodatabase komprimiert.
+# Bei "hilbert_kompaktierung = 0" wird nicht sortiert. Der Nutzen ist noch nicht gemessen, daher ausgeschaltet.
+hilbert_kompaktierung = 0
+
+
+# Sehr große Operate: die relevanten Bildpunkte werden in räumlichen Kacheln (Kantenlänge in Metern) parallel auf allen
+# Prozessorkernen ermittelt (ohne arcpy). Das Ergebnis ist unabhängig von der Kachelgröße, die Flächen (Puffer, Erase)
+# werden dabei aber auf einem Raster berechnet und können an den Rändern vom Ergebnis ohne Kacheln (arcpy) abweichen.
+# Bei "lokal_kachelgroesse = 0" wird jedes Operat in einem Schritt mit arcpy bearbeitet.
+lokal_kachelgroesse = 0
+
+
+# Karte von Alter und Dichte der Bildabdeckung je Meridian (neuestes Flugjahr, Anzahl der Bildpunkte und Anzahl der
+# konkurrierenden Operate je Zelle), wird nach jedem Einfügen von Operaten fortgeführt ("{meridian}_abdeckung_karte" im
+# Speicherort, nur geänderte Kacheln werden neu geschrieben). Zellgröße in Metern, z.B. 100.0, bei
+# "abdeckung_zellgroesse = None" keine Karte.
+abdeckung_zellgroesse = None
+
+# Gesamtkarte aller Meridiane ("abdeckung_karte" im Speicherort), wird nur auf Wunsch am Ende des Ablaufs aus den Karten
+# der Meridiane zusammengeführt. Zellgröße in Metern, z.B. 100.0, bei "abdeckung_gesamtkarte_zellgroesse = None" keine
+# Gesamtkarte.
+abdeckung_gesamtkarte_zellgroesse = None
+
+
+# Abfrage-Index der Abdeckung je Meridian ("{meridian}_abdeckung_index.sqlite" im Speicherort): welche Bilder,
+# Flugstreifen und Operate einen Punkt bzw. ein Rechteck abdecken und aus welchen Flugjahren (Python-Funktionen in
+# "abdeckung_index.py"), wird nach jedem Einfügen von Operaten fortgeführt. Bei "False" wird kein Index geführt.
+abdeckung_index_erstellen = False
+
+
 # Bei Existenz eines Verzeichnisses mit zusätzlichen .prj-Dateien (Bildorientierungsdateien) ist der Verzeichnis-Pfad
 # hier anzuführen.
 externe_prj_sammlung = r"C:\Users\43664\OneDrive\Desktop\BA_Praxis\Operate\Operate\prj-files_2019-20"
 
 
-input_parameter(speicherort, dgm_pfad, mehrere_operate, mehrere_operate_input, stereo_modell_erstellen,
-                meridianstreifen_pfad, externe_prj_sammlung, datenquelle)
+# Der Ablauf wird nur beim direkten Start von "main.py" ausgeführt (nicht in den Worker-Prozessen des Neuaufbaus)
+if __name__ == "__main__":
+    input_parameter(speicherort, dgm_pfad, mehrere_operate, mehrere_operate_input, stereo_modell_erstellen,
+                    meridianstreifen_pfad, externe_prj_sammlung, datenquelle, vereinfachung_toleranz, max_stuetzpunkte,
+                    stereo_pruefung_info, mehrere_operate_batch, zuruecksetzen_input, stichtag_input, neuaufbau_input,
+                    neuaufbau_kachelgroesse, simulation, synchronisierung_input, dgm_cache_info, bildauswahl_optimieren,
+                    hilbert_kompaktierung, manifest_input, mosaic_worker, abdeckung_zellgroesse,
+                    abdeckung_index_erstellen, lokal_kachelgroesse, abdeckung_gesamtkarte_zellgroesse)
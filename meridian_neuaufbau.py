@@ -0,0 +1,201 @@
+# Dieses Python-Skript baut "flaechen_partition", "flaechen_sammlung_final" und "punkte_sammlung" eines Meridians in
+# einem Durchgang aus allen Operaten in "flaechen_sammlung" neu auf, anstatt jedes Operat einzeln über
+# "skript_koordination.main" einzufügen. Der Meridian wird in Kacheln zerlegt, die Überschneidungen werden je Kachel in
+# einem Prozess-Pool nach dem Regelwerk aus "ueberschneidung_regeln" (Flugjahr, Lade-Zeitpunkt) aufgelöst und die
+# Ergebnisse der Kacheln danach zusammengeführt. Der Aufwand wächst mit der Anzahl der Kacheln je Prozessorkern, nicht
+# mit dem Quadrat der Anzahl der Operate. Die Bildpunkte der Operate stammen aus dem Ledger ("abdeckung_ledger.py").
+# Der Workflow wird durch das Starten von "main.py" initiiert, "meridian_neuaufbau.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import arcpy
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import abdeckung_ledger
+import bild_schluessel
+import hilbert_sortierung
+import numpy_geometrie
+import ueberschneidung_regeln
+import vektor_global
+from info_wrapper import *
+
+
+def _kachel_aufloesen(auftrag: tuple) -> tuple:
+    """
+    Löst die Überschneidungen einer Kachel in einem Worker-Prozess auf (Operate nach Rang gereiht).
+    Flächen: jedes Operat erhält innerhalb der Kachel seine Fläche abzüglich der bereits abgedeckten Fläche aller
+    aktuelleren Operate, die laufend vereinigt wird (eine Differenz und eine Vereinigung je Operat).
+    Bildpunkte: ein Bildpunkt bleibt erhalten, wenn sein Operat das aktuellste Operat an seiner Lage ist.
+    Rückgabewert (tuple):
+        - flaechen (list): Zeilen [operat_nr, jahr, zeitpunkt, Geometrie als json] innerhalb der Kachel
+        - behalten (np.ndarray): Bool-Array je Bildpunkt der Kachel
+    """
+    kachel, epsg, operate, punkte_x, punkte_y, punkte_operat = auftrag
+    xmin, ymin, xmax, ymax = kachel
+
+    # Flächen innerhalb der Kachel
+    raumbezug = arcpy.SpatialReference(epsg)
+    rechteck = arcpy.Polygon(arcpy.Array([arcpy.Point(xmin, ymin), arcpy.Point(xmin, ymax), arcpy.Point(xmax, ymax),
+                                          arcpy.Point(xmax, ymin), arcpy.Point(xmin, ymin)]), raumbezug)
+    operate = sorted(operate, key=lambda operat: operat[0])
+    flaechen = []
+    abgedeckt = None
+    for rang, operat_nr, jahr, zeitpunkt, geometrie_json, ringe in operate:
+        teil = abdeckung_ledger.geometrie_laden(geometrie_json)
+        if teil.disjoint(rechteck):
+            continue
+        teil = teil.intersect(rechteck, 4)
+        neu = teil.difference(abgedeckt) if abgedeckt is not None else teil
+        abgedeckt = abgedeckt.union(teil) if abgedeckt is not None else teil
+        if neu.area > 0:
+            flaechen.append([operat_nr, jahr, zeitpunkt, abdeckung_ledger.geometrie_json(neu)])
+
+    # Aktuellstes Operat je Bildpunkt
+    index = numpy_geometrie.erstes_polygon(punkte_x, punkte_y, [operat[5] for operat in operate])
+    raenge = np.array([operat[0] for operat in operate] + [-1], dtype=np.int64)
+    return flaechen, raenge[index] == punkte_operat
+
+
+@func_info
+def meridian_neu_aufbauen(global_info: list, workspace_info: list, kachelgroesse: float = 20000.0,
+                          max_worker: int = None, vereinfachung_toleranz: float = 0,
+                          max_stuetzpunkte: int = 2000, hilbert_sortieren: bool = False) -> tuple:
+    """
+    Die Funktion baut die Zuordnung aller Operate eines Meridians neu auf. Jede Kachel (Gitter mit Ursprung (0, 0))
+    wird mit allen Operaten berechnet, deren Ausdehnung sie berührt, jeder Bildpunkt gehört anhand seiner Lage genau
+    einer Kachel. Die Flächen der Kacheln werden je Operat zusammengeführt (ohne Kachelgrenzen) und ersetzen
+    "flaechen_partition" und "flaechen_sammlung_final" (gegebenenfalls vereinfacht wie in
+    "skript_koordination.ueberschneidungen_aufloesen"), die erhaltenen Bildpunkte ersetzen "punkte_sammlung"
+    (gegebenenfalls in Hilbert-Reihenfolge). Das Delta von "punkte_sammlung" wird im Änderungsprotokoll gespeichert.
+    Parameter:
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace des Meridians
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - kachelgroesse (float): Kantenlänge der Kacheln in Metern
+        - max_worker (int): Anzahl der Worker-Prozesse (None = Anzahl der Prozessorkerne)
+        - vereinfachung_toleranz (float): Toleranz der Vereinfachung der Partition in Metern (0 = keine)
+        - max_stuetzpunkte (int): maximale Anzahl an Stützpunkten je Polygon nach der Vereinfachung
+        - hilbert_sortieren (bool): bei "True" werden die Bildpunkte in Hilbert-Reihenfolge geschrieben
+    Rückgabewerte (tuple):
+        - flaechen_sammlung_final (str): Pfad zur fc mit allen korrekt zugeordneten Operaten
+        - loesch_punkte_liste (list): Schlüssel der aus "punkte_sammlung" entfernten Punkte
+        - hinzugefuegt_abgleich_liste (list): Schlüssel der in "punkte_sammlung" eingefügten Punkte
+        - hinzugefuegt_punkte (dict): key = Operat, value = Bildnamen der in "punkte_sammlung" eingefügten Punkte
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    # benötigte Pfade
+    flaechen_kacheln = rf"{fds_temp_global}\neuaufbau_flaechen_kacheln"
+    flaechen_dissolve = rf"{fds_temp_global}\neuaufbau_flaechen_dissolve"
+    flaechen_partition_vereinfacht = rf"{fds_temp_global}\neuaufbau_flaechen_partition_vereinfacht"
+    flaechen_partition = rf"{fds_output_global}\flaechen_partition"
+    flaechen_sammlung_final = rf"{fds_output_global}\flaechen_sammlung_final"
+
+    # Operate aus "flaechen_sammlung", gereiht nach dem Regelwerk (Rang 0 = aktuellstes Operat)
+    operate = {}
+    with arcpy.da.SearchCursor(flaechen_sammlung, ["operat_nr", "jahr", "zeitpunkt", "SHAPE@"]) as cursor:
+        for operat_nr, jahr, zeitpunkt, geometrie in cursor:
+            if operat_nr in operate:
+                operate[operat_nr][3] = operate[operat_nr][3].union(geometrie)
+            else:
+                operate[operat_nr] = [operat_nr, jahr, zeitpunkt, geometrie]
+    operate = list(operate.values())
+    reihenfolge = ueberschneidung_regeln.operate_reihen([str(row[1]) for row in operate],
+                                                        [str(row[2]) for row in operate])
+    operate = [operate[i] for i in reihenfolge]
+    ausdehnung = np.array([[row[3].extent.XMin, row[3].extent.YMin, row[3].extent.XMax, row[3].extent.YMax]
+                           for row in operate]).reshape(-1, 4)
+    operate_info = [(rang, row[0], row[1], row[2], abdeckung_ledger.geometrie_json(row[3]),
+                     vektor_global.polygon_ringe(row[3])) for rang, row in enumerate(operate)]
+
+    # Bildpunkte aller Operate aus dem Ledger (aktuelle Version je Operat)
+    abdeckung_ledger.ledger_initialisieren(global_info, workspace_info)
+    versionen = abdeckung_ledger.versionen_zusammenfuehren(
+        abdeckung_ledger.ledger_lesen(abdeckung_ledger.ledger_datei(workspace_info)))
+    stapel = abdeckung_ledger.operat_stapel(versionen)
+    bildpunkte = []
+    bildpunkte_rang = []
+    for rang, row in enumerate(operate):
+        if row[0] not in stapel:
+            print(f"Keine Bildpunkte von {row[0]} im Ledger")
+            continue
+        operat_punkte = versionen[stapel[row[0]][-1]]["bildpunkte"]
+        bildpunkte += operat_punkte
+        bildpunkte_rang += [rang] * len(operat_punkte)
+    x = np.array([row[4] for row in bildpunkte], dtype=float)
+    y = np.array([row[5] for row in bildpunkte], dtype=float)
+    bildpunkte_rang = np.array(bildpunkte_rang, dtype=np.int64)
+
+    # Kacheln: alle Gitterzellen, die von der Ausdehnung eines Operates berührt werden
+    auftraege = []
+    punkt_indices = []
+    for kachel, beruehrt, indices in numpy_geometrie.kacheln_einteilen(ausdehnung, x, y, kachelgroesse):
+        auftraege.append((kachel, epsg, [operate_info[i] for i in beruehrt], x[indices], y[indices],
+                          bildpunkte_rang[indices]))
+        punkt_indices.append(indices)
+    print(f"{len(operate)} Operate, {len(bildpunkte)} Bildpunkte, {len(auftraege)} Kacheln")
+
+    # Kacheln parallel auflösen
+    flaechen = []
+    behalten = np.zeros(len(bildpunkte), dtype=bool)
+    with ProcessPoolExecutor(max_workers=max_worker) as executor:
+        for indices, (kachel_flaechen, kachel_behalten) in zip(punkt_indices,
+                                                               executor.map(_kachel_aufloesen, auftraege)):
+            flaechen += kachel_flaechen
+            behalten[indices] = kachel_behalten
+
+    # Flächen der Kacheln je Operat zusammenführen: Partition (Einzelteile) und "flaechen_sammlung_final"
+    arcpy.Delete_management(flaechen_kacheln)
+    arcpy.CreateFeatureclass_management(fds_temp_global, "neuaufbau_flaechen_kacheln", "POLYGON")
+    arcpy.AddFields_management(flaechen_kacheln, [["operat_nr", "TEXT"], ["jahr", "TEXT"], ["zeitpunkt", "TEXT"]])
+    with arcpy.da.InsertCursor(flaechen_kacheln, ["operat_nr", "jahr", "zeitpunkt", "SHAPE@"]) as cursor:
+        for operat_nr, jahr, zeitpunkt, geometrie_json in flaechen:
+            cursor.insertRow([operat_nr, jahr, zeitpunkt, abdeckung_ledger.geometrie_laden(geometrie_json)])
+    arcpy.Dissolve_management(flaechen_kacheln, flaechen_dissolve, ["operat_nr", "jahr", "zeitpunkt"])
+    arcpy.MultipartToSinglepart_management(flaechen_dissolve, flaechen_partition)
+    if vereinfachung_toleranz > 0:
+        # "flaechen_sammlung_final" aus der vereinfachten Partition, damit beide dieselben Grenzen haben
+        vektor_global.flaechen_vereinfachen(flaechen_partition, flaechen_partition_vereinfacht,
+                                            vereinfachung_toleranz, max_stuetzpunkte)
+        arcpy.CopyFeatures_management(flaechen_partition_vereinfacht, flaechen_partition)
+        arcpy.Dissolve_management(flaechen_partition, flaechen_sammlung_final, dissolve_field="operat_nr")
+    else:
+        arcpy.Dissolve_management(flaechen_kacheln, flaechen_sammlung_final, dissolve_field="operat_nr")
+
+    # "punkte_sammlung" ersetzen, das Delta wird über die bild_ids des Registers berechnet
+    register = bild_schluessel.register_laden(workspace_info)
+    with arcpy.da.SearchCursor(punkte_sammlung, ["img_name", "operat_nr"]) as cursor:
+        alte_ids = bild_schluessel.ids_vergeben(
+            register, [bild_schluessel.schluessel_bilden(row[0], row[1]) for row in cursor])
+    arcpy.DeleteRows_management(punkte_sammlung)
+    neue_schluessel = []
+    behalten = np.flatnonzero(behalten)
+    if hilbert_sortieren:
+        # räumlich benachbarte Bilder liegen in der Datei nebeneinander
+        behalten = behalten[hilbert_sortierung.hilbert_reihenfolge(x[behalten], y[behalten])]
+    with arcpy.da.InsertCursor(punkte_sammlung, ["img_name", "operat_nr", "flugstreifen", "flughoehe",
+                                                 "SHAPE@XY"]) as cursor:
+        for i in behalten:
+            img_name, operat_nr, flugstreifen, flughoehe, punkt_x, punkt_y = bildpunkte[i]
+            cursor.insertRow([img_name, operat_nr, flugstreifen, flughoehe, (punkt_x, punkt_y)])
+            neue_schluessel.append(bild_schluessel.schluessel_bilden(img_name, operat_nr))
+    neue_ids = bild_schluessel.ids_vergeben(register, neue_schluessel)
+    bild_schluessel.register_speichern(register, workspace_info)
+
+    loesch_punkte_liste = bild_schluessel.schluessel_nachschlagen(register, np.setdiff1d(alte_ids, neue_ids))
+    hinzugefuegt_abgleich_liste = bild_schluessel.schluessel_nachschlagen(register, np.setdiff1d(neue_ids, alte_ids))
+    hinzugefuegt_punkte = {}
+    for i in behalten[~np.isin(neue_ids, alte_ids)]:
+        hinzugefuegt_punkte.setdefault(bildpunkte[i][1], []).append(bildpunkte[i][0])
+    vektor_global.aenderungsprotokoll_schreiben(
+        loesch_punkte_liste,
+        hinzugefuegt_abgleich_liste,
+        workspace_info,
+        "neuaufbau"
+    )
+
+    return flaechen_sammlung_final, loesch_punkte_liste, hinzugefuegt_abgleich_liste, hinzugefuegt_punkte
@@ -0,0 +1,173 @@
+# Dieses Python-Skript befüllt ein Mosaic Dataset blockweise, wahlweise seriell oder parallel über Staging-Mosaics. Im
+# parallelen Modus wird jeder Block (Bilder eines Operates, eigene .prj-Dateien) in einem eigenen Worker-Prozess in ein
+# eigenes Staging-Mosaic Dataset ("{meridian}_staging" im Speicherort) eingefügt, danach werden die Kataloge aller
+# Staging-Mosaics in einem einzigen Schritt (Rastertyp "Table") in das Mosaic Dataset des Meridians übernommen. Die
+# Raster werden mit demselben Rastertyp, DGM und denselben .prj-Dateien erstellt wie beim seriellen Einfügen, die
+# Reihenfolge der Blöcke bleibt erhalten. Das DGM aller Blöcke wird vorab in einem Schritt im Hauptprozess
+# bereitgestellt (der lokale DGM-Zwischenspeicher und das Register der bild_ids sind nicht für parallele Zugriffe
+# ausgelegt), die Attribute der übernommenen Raster werden über den vollständigen Pfad des Bildes aus den
+# Staging-Mosaics nachgetragen.
+# Der Workflow wird durch das Starten von "main.py" initiiert, "mosaic_staging.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import arcpy
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+import bild_schluessel
+import dgm_cache
+import raster_global
+from info_wrapper import *
+
+
+def _raster_einfuegen(mosaic_dataset: str, prj_dateien: list, dem: str, epsg: int) -> list:
+    """
+    Fügt die Bilder der .prj-Dateien mit dem DGM "dem" ein und liefert die Fehlermeldungen der .prj-Dateien, aus
+    denen kein Bild eingefügt wurde.
+    """
+    value_table = arcpy.ValueTable(2)
+    value_table.addRow(["DEM", dem])
+    meldungen = []
+    for prj_datei in prj_dateien:
+        try:
+            arcpy.AddRastersToMosaicDataset_management(
+                mosaic_dataset,
+                "Match-AT",
+                prj_datei,
+                aux_inputs=value_table,
+                spatial_reference=epsg,
+                duplicate_items_action="EXCLUDE_DUPLICATES"
+            )
+        except arcpy.ExecuteError:
+            meldungen.append(f"kein Bild aus {prj_datei} wurde eingefügt\n{arcpy.GetMessages(2)}")
+    return meldungen
+
+
+def _raster_pfade(mosaic_dataset: str, where_clause: str = "") -> dict:
+    """
+    Liefert den vollständigen Pfad des Bildes je Raster des Mosaic Datasets (key = OID, value = normierter Pfad).
+    """
+    pfade_tabelle = r"memory\raster_pfade"
+    arcpy.ExportMosaicDatasetPaths_management(mosaic_dataset, pfade_tabelle, where_clause, "ALL", "RASTER")
+    pfade = {}
+    with arcpy.da.SearchCursor(pfade_tabelle, ["SourceOID", "Path"]) as cursor:
+        for oid, pfad in cursor:
+            pfade.setdefault(oid, os.path.normcase(os.path.normpath(pfad)))
+    arcpy.Delete_management(pfade_tabelle)
+    return pfade
+
+
+def _staging_befuellen(auftrag: tuple) -> list:
+    """
+    Worker: erstellt das Staging-Mosaic eines Blocks, fügt die Bilder ein und befüllt "abgleich" und "operat_nr"
+    ("bild_id" wird erst nach dem Zusammenführen im Hauptprozess vergeben).
+    Parameter:
+        - auftrag (tuple): Staging-Ordner, Nummer des Blocks, epsg-Nummer, .prj-Dateien, DGM, Operat
+    Rückgabewert:
+        - ergebnis (list): Pfad des Staging-Mosaics, Anzahl der Raster, Fehlermeldungen
+    """
+    staging_ordner, nummer, epsg, prj_dateien, dem, operat = auftrag
+    arcpy.env.overwriteOutput = True
+
+    staging_gdb = rf"{staging_ordner}\staging_{nummer}.gdb"
+    if arcpy.Exists(staging_gdb):
+        arcpy.Delete_management(staging_gdb)
+    arcpy.CreateFileGDB_management(staging_ordner, f"staging_{nummer}")
+    staging_mosaic = rf"{staging_gdb}\mosaic"
+    arcpy.CreateMosaicDataset_management(staging_gdb, "mosaic", coordinate_system=epsg)
+    arcpy.AddFields_management(staging_mosaic, [["abgleich", "TEXT"], ["operat_nr", "TEXT"], ["bild_id", "LONG"]])
+
+    meldungen = _raster_einfuegen(staging_mosaic, prj_dateien, dem, epsg)
+
+    with arcpy.da.UpdateCursor(staging_mosaic, ["name", "abgleich", "operat_nr"]) as cursor:
+        for row in cursor:
+            cursor.updateRow([row[0], bild_schluessel.abgleich_bilden(row[0], operat), operat])
+    return [staging_mosaic, int(arcpy.GetCount_management(staging_mosaic)[0]), meldungen]
+
+
+@func_info
+def bloecke_einfuegen(mosaic_dataset: str, bloecke: list, dgm_pfad: str, workspace_info: list,
+                      dgm_cache_info: list = None, max_worker: int = 1):
+    """
+    Die Funktion fügt die Bilder aller Blöcke in das Mosaic Dataset ein und befüllt "abgleich", "operat_nr" und
+    "bild_id". Mit "max_worker = 1" wird jeder Block direkt eingefügt und sofort abgeschlossen, sonst werden die Blöcke
+    parallel in Staging-Mosaics eingefügt und in einem Schritt übernommen.
+    Parameter:
+        - mosaic_dataset (str): Pfad zum Mosaic Dataset mit allen Bildern des Meridians
+        - bloecke (list): Liste von Blöcken [workspace_info des Operates, Projektionszentren (n x 2), .prj-Dateien]
+        - dgm_pfad (str): Pfad zum digitalen Geländemodell
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - dgm_cache_info (list): Zellgröße (m, None = Zellgröße des DGM) und maximale Größe (GB) des lokalen DGM
+                                 (None = DGM aus "dgm_pfad")
+        - max_worker (int): Anzahl der Worker-Prozesse (1 = seriell, None = Anzahl der Prozessorkerne)
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+
+    if max_worker == 1:
+        for operat_workspace_info, bild_xy, prj_dateien in bloecke:
+            dem = dgm_cache.dgm_bereitstellen(dgm_pfad, bild_xy, dgm_cache_info, workspace_info) \
+                if dgm_cache_info else dgm_pfad
+            for meldung in _raster_einfuegen(mosaic_dataset, prj_dateien, dem, epsg):
+                print(meldung)
+            # jeder Block wird sofort abgeschlossen, ein Abbruch betrifft nur den laufenden Block
+            raster_global.abgleich_befuellen(mosaic_dataset, operat_workspace_info)
+        return
+
+    # DGM aller Blöcke in einem Schritt im Hauptprozess (keine Kachel eines Blocks wird vor Ende der Worker entfernt)
+    dem = dgm_cache.dgm_bereitstellen(dgm_pfad, [block[1] for block in bloecke], dgm_cache_info, workspace_info) \
+        if dgm_cache_info else dgm_pfad
+    staging_ordner = rf"{speicherort}\{meridian}_staging"
+    if os.path.exists(staging_ordner):
+        shutil.rmtree(staging_ordner)
+    os.makedirs(staging_ordner)
+    auftraege = [(staging_ordner, nummer, epsg, prj_dateien, dem, operat_workspace_info[2])
+                 for nummer, (operat_workspace_info, bild_xy, prj_dateien) in enumerate(bloecke)]
+
+    # Staging-Mosaics parallel befüllen
+    with ProcessPoolExecutor(max_workers=max_worker) as executor:
+        ergebnisse = list(executor.map(_staging_befuellen, auftraege))
+    staging_mosaics = []
+    for staging_mosaic, anzahl, meldungen in ergebnisse:
+        for meldung in meldungen:
+            print(meldung)
+        if anzahl > 0:
+            staging_mosaics.append(staging_mosaic)
+    print(f"{len(bloecke)} Blöcke in {len(staging_mosaics)} Staging-Mosaics, "
+          f"{sum(ergebnis[1] for ergebnis in ergebnisse)} Raster")
+
+    # Kataloge in einem Schritt übernehmen
+    if staging_mosaics:
+        arcpy.AddRastersToMosaicDataset_management(
+            mosaic_dataset,
+            "Table",
+            ";".join(staging_mosaics),
+            duplicate_items_action="EXCLUDE_DUPLICATES"
+        )
+
+    # Attribute, die nicht übernommen wurden, über den vollständigen Pfad des Bildes aus den Staging-Katalogen
+    # nachtragen (Rasternamen sind nur innerhalb eines Operates eindeutig)
+    katalog = {}
+    for staging_mosaic in staging_mosaics:
+        staging_pfade = _raster_pfade(staging_mosaic)
+        with arcpy.da.SearchCursor(staging_mosaic, ["OID@", "abgleich", "operat_nr"]) as cursor:
+            for oid, abgleich, operat_nr in cursor:
+                if oid in staging_pfade:
+                    katalog[staging_pfade[oid]] = (abgleich, operat_nr)
+    pfade = _raster_pfade(mosaic_dataset, "abgleich IS NULL") if katalog else {}
+    ohne_zuordnung = 0
+    with arcpy.da.UpdateCursor(mosaic_dataset, ["OID@", "abgleich", "operat_nr"], "abgleich IS NULL") as cursor:
+        for row in cursor:
+            if pfade.get(row[0]) in katalog:
+                cursor.updateRow([row[0], *katalog[pfade[row[0]]]])
+            else:
+                ohne_zuordnung += 1
+    if ohne_zuordnung:
+        print(f"{ohne_zuordnung} Raster ohne Zuordnung zu einem Staging-Mosaic (Feld \"abgleich\" bleibt leer)")
+    raster_global.bild_ids_nachtragen(mosaic_dataset, workspace_info)
+
+    shutil.rmtree(staging_ordner, ignore_errors=True)
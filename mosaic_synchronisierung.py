@@ -0,0 +1,139 @@
+# Dieses Python-Skript gleicht das Mosaic Dataset eines Meridians mit "punkte_sammlung" ab. Der Soll-Stand (alle Bilder
+# in "punkte_sammlung") wird über die bild_ids (siehe "bild_schluessel.py") mit dem Katalog des Mosaic Datasets
+# verglichen, entfernt bzw. eingefügt wird nur die Differenz, in Blöcken begrenzter Größe. Ein erneuter Durchlauf nach
+# einem Abbruch bearbeitet daher nur mehr die verbleibende Differenz (Raster, die eingefügt, aber noch nicht mit
+# "abgleich" versehen wurden, werden zu Beginn entfernt und erneut eingefügt).
+# Der Workflow wird durch das Starten von "main.py" initiiert, "mosaic_synchronisierung.py" kann vom User ignoriert
+# werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import arcpy
+import numpy as np
+import bild_pruefung
+import bild_schluessel
+import mosaic_staging
+import prj_funktionen
+import raster_global
+import workspace_funktionen
+from info_wrapper import *
+
+
+def _raster_entfernen(mosaic_dataset: str, sql_statement: str):
+    arcpy.RemoveRastersFromMosaicDataset_management(
+        mosaic_dataset,
+        sql_statement,
+        "UPDATE_BOUNDARY",
+        "MARK_OVERVIEW_ITEMS",
+        "DELETE_OVERVIEW_IMAGES",
+        "DELETE_ITEM_CACHE",
+        "REMOVE_MOSAICDATASET_ITEMS",
+        "UPDATE_CELL_SIZES"
+    )
+
+
+def katalog_differenz(soll_ids: np.ndarray, ist_ids: np.ndarray) -> tuple:
+    """
+    Die Funktion liefert die bild_ids, die aus dem Mosaic Dataset entfernt bzw. eingefügt werden müssen.
+    Parameter:
+        - soll_ids (np.ndarray): bild_ids aller Bilder in "punkte_sammlung"
+        - ist_ids (np.ndarray): bild_ids aller Raster im Mosaic Dataset
+    Rückgabewerte (tuple):
+        - entfernen_ids (np.ndarray): bild_ids im Mosaic Dataset, die nicht mehr benötigt werden
+        - einfuegen_ids (np.ndarray): bild_ids aus "punkte_sammlung", die im Mosaic Dataset fehlen
+    """
+    soll_ids = np.asarray(soll_ids, dtype=np.int64)
+    ist_ids = np.asarray(ist_ids, dtype=np.int64)
+    return np.setdiff1d(ist_ids, soll_ids), np.setdiff1d(soll_ids, ist_ids)
+
+
+@func_info
+def mosaic_synchronisieren(dgm_pfad: str, global_info: list, workspace_info: list, blockgroesse: int = 500,
+                           dgm_cache_info: list = None, max_worker: int = 1) -> tuple:
+    """
+    Die Funktion synchronisiert das Mosaic Dataset des Meridians mit "punkte_sammlung": überzählige Raster werden in
+    Blöcken über das Feld "bild_id" entfernt, fehlende Raster werden je Operat in Blöcken über eigene .prj-Dateien
+    ("prj_funktionen.prj_auswahl_schreiben") eingefügt. Doppelte Raster werden beim Einfügen ausgeschlossen. Vor dem
+    Einfügen werden alle fehlenden Bilder auf Existenz und Lesbarkeit geprüft (Bericht
+    "{meridian}_bild_pruefung.json" im Speicherort). Mit "dgm_cache_info" wird je Operat ein lokales DGM verwendet
+    (siehe "dgm_cache.py"), mit "max_worker" > 1 werden die Blöcke parallel eingefügt (siehe "mosaic_staging.py").
+    Parameter:
+        - dgm_pfad (str): Pfad zum digitalen Geländemodell
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - blockgroesse (int): maximale Anzahl an Rastern je Entfernen bzw. Einfügen
+        - dgm_cache_info (list): Zellgröße (m, None = Zellgröße des DGM) und maximale Größe (GB) des lokalen DGM
+                                 (None = DGM aus "dgm_pfad")
+        - max_worker (int): Anzahl der Worker-Prozesse beim Einfügen (1 = seriell, None = Anzahl der Prozessorkerne)
+    Rückgabewerte (tuple):
+        - anzahl_entfernt (int): Anzahl der entfernten Raster
+        - anzahl_eingefuegt (int): Anzahl der Bilder, deren Einfügen versucht wurde
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    mosaic_dataset = raster_global.raster_workspace_erstellen(workspace_info)
+
+    # Raster eines abgebrochenen Durchlaufs (eingefügt, aber ohne "abgleich") entfernen, fehlende bild_ids nachtragen
+    with arcpy.da.SearchCursor(mosaic_dataset, ["OID@"], "abgleich IS NULL") as cursor:
+        unvollstaendig = [row[0] for row in cursor]
+    if unvollstaendig:
+        _raster_entfernen(mosaic_dataset, "abgleich IS NULL")
+    raster_global.bild_ids_nachtragen(mosaic_dataset, workspace_info)
+
+    # Soll-Stand aus "punkte_sammlung"
+    register = bild_schluessel.register_laden(workspace_info)
+    with arcpy.da.SearchCursor(punkte_sammlung, ["img_name", "operat_nr", "SHAPE@X", "SHAPE@Y"]) as cursor:
+        soll_bilder = [list(row) for row in cursor]
+    soll_ids = bild_schluessel.ids_vergeben(
+        register, [bild_schluessel.schluessel_bilden(row[0], row[1]) for row in soll_bilder])
+    bild_schluessel.register_speichern(register, workspace_info)
+
+    # Ist-Stand aus dem Katalog des Mosaic Datasets
+    with arcpy.da.SearchCursor(mosaic_dataset, ["bild_id"], "bild_id IS NOT NULL") as cursor:
+        ist_ids = np.fromiter((row[0] for row in cursor), dtype=np.int64)
+
+    entfernen_ids, einfuegen_ids = katalog_differenz(soll_ids, ist_ids)
+    print(f"Mosaic {meridian}: {len(entfernen_ids)} Raster werden entfernt, {len(einfuegen_ids)} eingefügt")
+
+    # überzählige Raster entfernen
+    for sql_statement in bild_schluessel.id_abfragen(entfernen_ids, blockgroesse=blockgroesse):
+        _raster_entfernen(mosaic_dataset, sql_statement)
+
+    # fehlende Raster je Operat einfügen
+    einfuegen = np.isin(soll_ids, einfuegen_ids)
+    einfuegen_je_operat = {}
+    for i in np.flatnonzero(einfuegen):
+        img_name, operat_nr, punkt_x, punkt_y = soll_bilder[i]
+        einfuegen_je_operat.setdefault(operat_nr, []).append([img_name, punkt_x, punkt_y])
+
+    # .prj-Dateien je Operat und Block, die Bilder aller Blöcke werden vor dem Einfügen gemeinsam geprüft
+    bloecke = []
+    for operat_nr, bilder in einfuegen_je_operat.items():
+        operat_workspace_info = workspace_funktionen.workspace_info_ermitteln(meridian, operat_nr, speicherort)
+        for i in range(0, len(bilder), blockgroesse):
+            bloecke.append([operat_workspace_info, bilder[i:i + blockgroesse], prj_funktionen.prj_auswahl_schreiben(
+                [bild[0] for bild in bilder[i:i + blockgroesse]], operat_workspace_info, i // blockgroesse)])
+    if bloecke:
+        bild_pruefung.bilder_pruefen(
+            prj_funktionen.bildpfade_lesen([prj_datei for block in bloecke for prj_datei in block[2]]),
+            workspace_info,
+            rf"{speicherort}\{meridian}_bild_pruefung.json"
+        )
+
+    # Einfügen seriell bzw. parallel über Staging-Mosaics, DGM lokal für den Bereich des Blocks
+    mosaic_staging.bloecke_einfuegen(
+        mosaic_dataset,
+        [[operat_workspace_info, np.array([bild[1:] for bild in bilder], dtype=float), prj_dateien]
+         for operat_workspace_info, bilder, prj_dateien in bloecke],
+        dgm_pfad,
+        workspace_info,
+        dgm_cache_info=dgm_cache_info,
+        max_worker=max_worker
+    )
+
+    return len(entfernen_ids), int(einfuegen.sum())
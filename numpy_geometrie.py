@@ -0,0 +1,368 @@
+# Dieses Python-Skript enthält reine NumPy-Geometriefunktionen (ohne arcpy), z.B. Punkt-in-Polygon-Tests, Abstände zu
+# Strecken, Rasterisierung und Abstandsfelder. Die Funktionen werden vom NumPy-Backend in "geometrie_backend.py"
+# verwendet, damit die lokalen Bearbeitungsschritte auch ohne ArcGIS-Lizenz (z.B. auf Linux) ausgeführt werden können.
+# Der Workflow wird durch das Starten von "main.py" initiiert, "numpy_geometrie.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import numpy as np
+
+
+# maximale Anzahl an Elementen einer Punkt x Kanten Matrix pro Block (begrenzt den Speicherbedarf)
+BLOCK_ELEMENTE = 4_000_000
+
+
+def _blockgroesse(anzahl_kanten: int) -> int:
+    """
+    Liefert die Anzahl an Punkten, die gemeinsam gegen "anzahl_kanten" Kanten getestet werden.
+    """
+    return max(1, BLOCK_ELEMENTE // max(1, anzahl_kanten))
+
+
+def ringe_zu_kanten(ringe: list) -> tuple:
+    """
+    Die Funktion wandelt eine Liste von Ringen (je ein (n, 2) Array mit Stützpunkten) in Kanten-Arrays um.
+    Parameter:
+        - ringe (list): Liste von (n, 2) Arrays, geschlossen oder offen
+    Rückgabewert (tuple):
+        - ax, ay, bx, by (np.ndarray): Anfangs- und Endpunkte aller Kanten
+    """
+    anfang = []
+    ende = []
+    for ring in ringe:
+        ring = np.asarray(ring, dtype=float)
+        if len(ring) < 2:
+            continue
+        anfang.append(ring)
+        ende.append(np.roll(ring, -1, axis=0))
+    if not anfang:
+        leer = np.empty(0)
+        return leer, leer, leer, leer
+    anfang = np.concatenate(anfang)
+    ende = np.concatenate(ende)
+    return anfang[:, 0], anfang[:, 1], ende[:, 0], ende[:, 1]
+
+
+def punkte_in_polygon(x: np.ndarray, y: np.ndarray, ringe: list) -> np.ndarray:
+    """
+    Vektorisierter Punkt-in-Polygon-Test nach der Even-Odd-Regel (Löcher werden dadurch korrekt behandelt).
+    Parameter:
+        - x, y (np.ndarray): Koordinaten der Punkte
+        - ringe (list): Liste von (n, 2) Arrays mit den Ringen des Polygons
+    Rückgabewert:
+        - innen (np.ndarray): Bool-Array, True für Punkte innerhalb des Polygons
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    ax, ay, bx, by = ringe_zu_kanten(ringe)
+    innen = np.zeros(len(x), dtype=bool)
+    if len(ax) == 0:
+        return innen
+
+    block = _blockgroesse(len(ax))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for start in range(0, len(x), block):
+            px = x[start:start + block, None]
+            py = y[start:start + block, None]
+            # Kante wird von einem Strahl in +x Richtung gekreuzt
+            spannt = (ay > py) != (by > py)
+            schnitt_x = (bx - ax) * (py - ay) / (by - ay) + ax
+            kreuzt = spannt & (px < schnitt_x)
+            innen[start:start + block] = np.count_nonzero(kreuzt, axis=1) % 2 == 1
+    return innen
+
+
+def erstes_polygon(x: np.ndarray, y: np.ndarray, polygone: list) -> np.ndarray:
+    """
+    Die Funktion liefert je Punkt den Index des ersten Polygons (in der gegebenen Reihenfolge), in dem er liegt. Bereits
+    zugeordnete Punkte werden für die folgenden Polygone nicht mehr getestet.
+    Parameter:
+        - x, y (np.ndarray): Koordinaten der Punkte
+        - polygone (list): Liste von Polygonen, jeweils als Liste von Ringen (siehe "punkte_in_polygon")
+    Rückgabewert:
+        - index (np.ndarray): Index des Polygons je Punkt (-1, falls der Punkt in keinem Polygon liegt)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    index = np.full(len(x), -1, dtype=np.int64)
+    for i, ringe in enumerate(polygone):
+        offen = np.flatnonzero(index < 0)
+        if len(offen) == 0:
+            break
+        index[offen[punkte_in_polygon(x[offen], y[offen], ringe)]] = i
+    return index
+
+
+def kacheln_einteilen(ausdehnung: np.ndarray, x: np.ndarray, y: np.ndarray, kachelgroesse: float) -> list:
+    """
+    Die Funktion teilt Flächen und Punkte in ein Gitter quadratischer Kacheln mit Ursprung (0, 0) ein. Erstellt werden
+    alle Kacheln, die von der Ausdehnung einer Fläche berührt werden, jeder Punkt gehört anhand seiner Lage genau einer
+    Kachel (Punkte außerhalb dieser Kacheln gehören zu keiner).
+    Parameter:
+        - ausdehnung (np.ndarray): (n, 4) Array mit (xmin, ymin, xmax, ymax) je Fläche
+        - x, y (np.ndarray): Koordinaten der Punkte
+        - kachelgroesse (float): Kantenlänge der Kacheln
+    Rückgabewert:
+        - kacheln (list): Tupel (Kachel (xmin, ymin, xmax, ymax), Indizes der berührten Flächen (aufsteigend),
+                          Indizes der Punkte) je Kachel, sortiert nach Zeile und Spalte
+    """
+    ausdehnung = np.asarray(ausdehnung, dtype=float).reshape(-1, 4)
+    zellen = set()
+    for xmin, ymin, xmax, ymax in ausdehnung:
+        for spalte in range(int(np.floor(xmin / kachelgroesse)), int(np.floor(xmax / kachelgroesse)) + 1):
+            for zeile in range(int(np.floor(ymin / kachelgroesse)), int(np.floor(ymax / kachelgroesse)) + 1):
+                zellen.add((zeile, spalte))
+
+    # Punkte einmal nach Kachel gruppieren (stabil, Indizes je Kachel aufsteigend)
+    punkt_zellen = np.floor(np.stack([np.asarray(y, dtype=float), np.asarray(x, dtype=float)], axis=1).reshape(-1, 2) /
+                            kachelgroesse).astype(np.int64)
+    punkt_zellen, kachel_nr = np.unique(punkt_zellen, axis=0, return_inverse=True)
+    kachel_nr = kachel_nr.ravel()
+    ordnung = np.argsort(kachel_nr, kind="stable")
+    grenzen = np.searchsorted(kachel_nr[ordnung], np.arange(len(punkt_zellen) + 1))
+    punkte_je_kachel = {(int(zeile), int(spalte)): ordnung[grenzen[i]:grenzen[i + 1]]
+                        for i, (zeile, spalte) in enumerate(punkt_zellen)}
+
+    kacheln = []
+    for zeile, spalte in sorted(zellen):
+        kachel = (spalte * kachelgroesse, zeile * kachelgroesse, (spalte + 1) * kachelgroesse,
+                  (zeile + 1) * kachelgroesse)
+        beruehrt = np.flatnonzero((ausdehnung[:, 0] <= kachel[2]) & (ausdehnung[:, 2] >= kachel[0]) &
+                                  (ausdehnung[:, 1] <= kachel[3]) & (ausdehnung[:, 3] >= kachel[1]))
+        kacheln.append((kachel, beruehrt, punkte_je_kachel.get((zeile, spalte), np.empty(0, dtype=np.int64))))
+    return kacheln
+
+
+def abstand_zu_strecken(x: np.ndarray, y: np.ndarray, ax: np.ndarray, ay: np.ndarray, bx: np.ndarray,
+                        by: np.ndarray) -> np.ndarray:
+    """
+    Die Funktion berechnet für jeden Punkt den kürzesten Abstand zu einer Menge von Strecken.
+    Parameter:
+        - x, y (np.ndarray): Koordinaten der Punkte
+        - ax, ay, bx, by (np.ndarray): Anfangs- und Endpunkte der Strecken
+    Rückgabewert:
+        - abstand (np.ndarray): kürzester Abstand jedes Punktes zu einer Strecke (inf, falls keine Strecken)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    abstand = np.full(len(x), np.inf)
+    if len(ax) == 0:
+        return abstand
+
+    dx = bx - ax
+    dy = by - ay
+    laenge2 = dx * dx + dy * dy
+    # Strecken der Länge 0 (doppelte Punkte) werden als Punkte behandelt
+    laenge2_sicher = np.where(laenge2 > 0, laenge2, 1.0)
+
+    block = _blockgroesse(len(ax))
+    for start in range(0, len(x), block):
+        px = x[start:start + block, None]
+        py = y[start:start + block, None]
+        t = ((px - ax) * dx + (py - ay) * dy) / laenge2_sicher
+        t = np.clip(np.where(laenge2 > 0, t, 0.0), 0.0, 1.0)
+        qx = ax + t * dx
+        qy = ay + t * dy
+        abstand[start:start + block] = np.hypot(px - qx, py - qy).min(axis=1)
+    return abstand
+
+
+def kompasswinkel(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    """
+    Die Funktion berechnet den Kompasswinkel (Grad, im Uhrzeigersinn von Norden) eines Richtungsvektors, analog zum
+    Feld "CompassA" von "DirectionalMean_stats".
+    """
+    return np.degrees(np.arctan2(dx, dy)) % 360
+
+
+def strecken_abtasten(ax: np.ndarray, ay: np.ndarray, bx: np.ndarray, by: np.ndarray, schrittweite: float) -> tuple:
+    """
+    Die Funktion tastet Strecken in regelmäßigen Abständen ab (inklusive Anfangs- und Endpunkt).
+    Parameter:
+        - ax, ay, bx, by (np.ndarray): Anfangs- und Endpunkte der Strecken
+        - schrittweite (float): maximaler Abstand zwischen zwei Abtastpunkten
+    Rückgabewert (tuple):
+        - x, y (np.ndarray): Koordinaten der Abtastpunkte
+        - strecke (np.ndarray): Index der Strecke, zu der ein Abtastpunkt gehört
+        - anteil (np.ndarray): Länge, die ein Abtastpunkt repräsentiert
+    """
+    laenge = np.hypot(bx - ax, by - ay)
+    anzahl = np.maximum(1, np.ceil(laenge / schrittweite).astype(int))
+    strecke = np.repeat(np.arange(len(ax)), anzahl)
+    # Position der Abtastpunkte in der Mitte der Teilstücke
+    offset = np.arange(len(strecke)) - np.repeat(np.cumsum(anzahl) - anzahl, anzahl)
+    t = (offset + 0.5) / anzahl[strecke]
+    x = ax[strecke] + t * (bx - ax)[strecke]
+    y = ay[strecke] + t * (by - ay)[strecke]
+    anteil = (laenge / anzahl)[strecke]
+    return x, y, strecke, anteil
+
+
+def abstandsfeld(saat: np.ndarray, max_abstand: float) -> np.ndarray:
+    """
+    Die Funktion berechnet für jede Zelle den euklidischen Abstand (in Zellen) zur nächsten Saat-Zelle. Zuerst wird
+    der Abstand innerhalb jeder Spalte ermittelt, anschließend werden die Zeilen über alle horizontalen Versätze bis
+    "max_abstand" kombiniert. Abstände über "max_abstand" sind nicht exakt, aber immer größer als "max_abstand".
+    Parameter:
+        - saat (np.ndarray): 2D Bool-Array mit den Saat-Zellen
+        - max_abstand (float): größter Abstand (in Zellen), der exakt berechnet werden muss
+    Rückgabewert:
+        - abstand (np.ndarray): 2D Array mit den Abständen in Zellen (inf ohne Saat-Zelle in Reichweite)
+    """
+    zeilen, spalten = saat.shape
+    index = np.arange(zeilen, dtype=float)[:, None]
+
+    # Abstand zur nächsten Saat-Zelle oberhalb und unterhalb innerhalb derselben Spalte
+    oben = np.maximum.accumulate(np.where(saat, index, -np.inf), axis=0)
+    unten = np.minimum.accumulate(np.where(saat, index, np.inf)[::-1], axis=0)[::-1]
+    spalten_abstand2 = np.minimum(index - oben, unten - index) ** 2
+
+    abstand2 = spalten_abstand2.copy()
+    for versatz in range(1, min(int(np.ceil(max_abstand)), spalten - 1) + 1):
+        versatz2 = versatz * versatz
+        np.minimum(abstand2[:, versatz:], spalten_abstand2[:, :-versatz] + versatz2, out=abstand2[:, versatz:])
+        np.minimum(abstand2[:, :-versatz], spalten_abstand2[:, versatz:] + versatz2, out=abstand2[:, :-versatz])
+    return np.sqrt(abstand2)
+
+
+def polygon_rasterisieren(ringe: list, x0: float, y0: float, zellgroesse: float, zeilen: int,
+                          spalten: int) -> np.ndarray:
+    """
+    Die Funktion rasterisiert ein Polygon zeilenweise (Scanline, Even-Odd-Regel). Eine Zelle ist innerhalb, wenn ihr
+    Mittelpunkt innerhalb des Polygons liegt.
+    Parameter:
+        - ringe (list): Liste von (n, 2) Arrays mit den Ringen des Polygons
+        - x0, y0 (float): Koordinaten der linken unteren Ecke des Rasters
+        - zellgroesse (float): Zellgröße in Metern
+        - zeilen, spalten (int): Größe des Rasters (Zeile 0 liegt bei y0)
+    Rückgabewert:
+        - maske (np.ndarray): 2D Bool-Array
+    """
+    maske = np.zeros((zeilen, spalten), dtype=bool)
+    ax, ay, bx, by = ringe_zu_kanten(ringe)
+    if len(ax) == 0:
+        return maske
+
+    mitte_x = x0 + (np.arange(spalten) + 0.5) * zellgroesse
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for zeile in range(zeilen):
+            py = y0 + (zeile + 0.5) * zellgroesse
+            spannt = (ay > py) != (by > py)
+            if not spannt.any():
+                continue
+            schnitt_x = np.sort(((bx - ax) * (py - ay) / (by - ay) + ax)[spannt])
+            # Anzahl der Schnittpunkte links jeder Zellmitte, ungerade = innerhalb
+            links = np.searchsorted(schnitt_x, mitte_x)
+            maske[zeile] = links % 2 == 1
+    return maske
+
+
+def komponenten_beschriften(maske: np.ndarray) -> tuple:
+    """
+    Die Funktion beschriftet zusammenhängende Bereiche (8er-Nachbarschaft) eines Bool-Rasters. Pro Zeile werden Läufe
+    (zusammenhängende True-Zellen) ermittelt und über eine Union-Find-Struktur mit den Läufen der Vorzeile verbunden.
+    Parameter:
+        - maske (np.ndarray): 2D Bool-Array
+    Rückgabewert (tuple):
+        - beschriftung (np.ndarray): 2D Int-Array, 0 = Hintergrund, 1..n = Bereich
+        - anzahl (int): Anzahl der Bereiche
+    """
+    zeilen, spalten = maske.shape
+    eltern = []
+
+    def wurzel(i):
+        while eltern[i] != i:
+            eltern[i] = eltern[eltern[i]]
+            i = eltern[i]
+        return i
+
+    laeufe = []
+    vorzeile = []
+    for zeile in range(zeilen):
+        rand = np.diff(np.concatenate(([0], maske[zeile].view(np.int8), [0])))
+        anfaenge = np.flatnonzero(rand == 1)
+        enden = np.flatnonzero(rand == -1)
+        aktuelle_zeile = []
+        for anfang, ende in zip(anfaenge, enden):
+            lauf_id = len(eltern)
+            eltern.append(lauf_id)
+            for vor_anfang, vor_ende, vor_id in vorzeile:
+                # 8er-Nachbarschaft: Läufe berühren sich auch diagonal
+                if anfang <= vor_ende and ende >= vor_anfang:
+                    wurzel_a, wurzel_b = wurzel(lauf_id), wurzel(vor_id)
+                    if wurzel_a != wurzel_b:
+                        eltern[max(wurzel_a, wurzel_b)] = min(wurzel_a, wurzel_b)
+            aktuelle_zeile.append((anfang, ende, lauf_id))
+            laeufe.append((zeile, anfang, ende, lauf_id))
+        vorzeile = aktuelle_zeile
+
+    beschriftung = np.zeros((zeilen, spalten), dtype=np.int32)
+    nummern = {}
+    for zeile, anfang, ende, lauf_id in laeufe:
+        nummer = nummern.setdefault(wurzel(lauf_id), len(nummern) + 1)
+        beschriftung[zeile, anfang:ende] = nummer
+    return beschriftung, len(nummern)
+
+
+def konvexe_huelle(punkte: np.ndarray) -> np.ndarray:
+    """
+    Die Funktion berechnet die konvexe Hülle einer Punktmenge (Monotone-Chain-Verfahren).
+    Parameter:
+        - punkte (np.ndarray): (n, 2) Array mit Koordinaten
+    Rückgabewert:
+        - huelle (np.ndarray): (m, 2) Array mit den Hüllpunkten gegen den Uhrzeigersinn
+    """
+    punkte = np.unique(np.asarray(punkte, dtype=float), axis=0)
+    if len(punkte) <= 2:
+        return punkte
+
+    def kreuz(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    unten = []
+    for p in punkte:
+        while len(unten) >= 2 and kreuz(unten[-2], unten[-1], p) <= 0:
+            unten.pop()
+        unten.append(p)
+    oben = []
+    for p in punkte[::-1]:
+        while len(oben) >= 2 and kreuz(oben[-2], oben[-1], p) <= 0:
+            oben.pop()
+        oben.append(p)
+    return np.array(unten[:-1] + oben[:-1])
+
+
+def huelle_puffern(huelle: np.ndarray, distanz: float) -> np.ndarray:
+    """
+    Die Funktion puffert eine konvexe Hülle negativ (Buffer mit "-distanz" Metern). Bei einem konvexen Polygon ist
+    dies exakt der Schnitt der um "distanz" nach innen verschobenen Halbebenen aller Kanten.
+    Parameter:
+        - huelle (np.ndarray): (m, 2) Array mit den Hüllpunkten gegen den Uhrzeigersinn (siehe "konvexe_huelle")
+        - distanz (float): Pufferdistanz in Metern (negativ)
+    Rückgabewert:
+        - verkleinert (np.ndarray): (k, 2) Array mit den Stützpunkten der verbleibenden Fläche, weniger als 3 Punkte =
+                                    keine Fläche übrig
+    """
+    huelle = np.asarray(huelle, dtype=float)
+    if len(huelle) < 3:
+        return huelle[:0]
+    kante = np.roll(huelle, -1, axis=0) - huelle
+    # Normalen nach innen (links der Kanten), Halbebene: normale * (p - anfang) >= -distanz
+    normale = np.column_stack((-kante[:, 1], kante[:, 0])) / np.hypot(kante[:, 0], kante[:, 1])[:, None]
+    verkleinert = huelle
+    for anfang, n in zip(huelle, normale):
+        abstand = (verkleinert - anfang) @ n + distanz
+        punkte = []
+        for i in range(len(verkleinert)):
+            j = (i + 1) % len(verkleinert)
+            if abstand[i] > 0:
+                punkte.append(verkleinert[i])
+            if (abstand[i] > 0) != (abstand[j] > 0):
+                t = abstand[i] / (abstand[i] - abstand[j])
+                punkte.append(verkleinert[i] + t * (verkleinert[j] - verkleinert[i]))
+        verkleinert = np.array(punkte).reshape(-1, 2)
+        if len(verkleinert) < 3:
+            return verkleinert[:0]
+    return verkleinert
@@ -11,9 +11,14 @@
 from __future__ import annotations
 import os
 import shutil
+import bild_schluessel
 from info_wrapper import *
 
 
+# Pfad der Luftbilder im Netzwerk, wie er in die .prj-Dateien geschrieben wird
+NETZWERK_PFAD = r"\\\\Rz0-fil-25\\bev_dlb$"
+
+
 @func_info
 def prj_datei_suchen(datenquelle: str, workspace_info: list) -> list | bool:
     """
@@ -230,7 +235,7 @@ def prj_umschreiben(hinzugefuegt_punkte_liste: list, workspace_info: list):
     meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
 
     # Bildnamen anpassen
-    hinzugefuegt_punkte_liste_korrigiert = [f"{item}_rgb.tif" for item in hinzugefuegt_punkte_liste]
+    hinzugefuegt_punkte_liste_korrigiert = [bild_schluessel.bild_dateiname(item) for item in hinzugefuegt_punkte_liste]
 
     # prj.-Datei(en) ermitteln
     prj_kopie_unedited = [item for item in os.listdir(operat_ordner) if item.endswith("kopie.prj")]
@@ -255,22 +260,116 @@ def prj_umschreiben(hinzugefuegt_punkte_liste: list, workspace_info: list):
             # Datei leeren
             file.truncate()
 
-            # Dictionary mit alter Pfad-Benennung als Key und neuer Pfad-Benennung als Value bei Bildern, die
-            # hinzugefügt werden sollten
-            pfadpaare = {}
-
-            # Pfade anpassen
-            for bild in hinzugefuegt_punkte_liste_korrigiert:
-                alter_pfad_name = rf"H:\LB{ist_stand}\TIFFJPEG_{meridian}\{operat}\{bild}"
-                neuer_pfad_name = alter_pfad_name.replace("H:", r"\\\\Rz0-fil-25\\bev_dlb$")
-                pfadpaare[alter_pfad_name] = neuer_pfad_name
-
             # neue Pfade anstelle der alten Pfade in der .prj-Datei einfügen
-            data = old_data
-            for alt_pfad, neu_pfad in pfadpaare.items():
-                data = data.replace(alt_pfad, neu_pfad)
+            data = _pfade_anpassen(old_data, hinzugefuegt_punkte_liste_korrigiert, ist_stand, meridian, operat)
 
             # .prj-Datei wieder befüllen
             file.write(data)
 
     return prj_dateien
+
+
+def _pfade_anpassen(data: str, bilder: list, ist_stand: str, meridian: str, operat: str) -> str:
+    """
+    Ersetzt in "data" die lokalen Pfade ("H:") der angegebenen Bilder durch die Pfade im Netzwerk, alle anderen Bilder
+    bleiben unverändert (und werden beim Einfügen in das Mosaic Dataset ignoriert).
+    """
+    # Dictionary mit alter Pfad-Benennung als Key und neuer Pfad-Benennung als Value bei Bildern, die
+    # hinzugefügt werden sollten
+    pfadpaare = {}
+
+    # Pfade anpassen
+    for bild in bilder:
+        alter_pfad_name = rf"H:\LB{ist_stand}\TIFFJPEG_{meridian}\{operat}\{bild}"
+        neuer_pfad_name = alter_pfad_name.replace("H:", NETZWERK_PFAD)
+        pfadpaare[alter_pfad_name] = neuer_pfad_name
+
+    for alt_pfad, neu_pfad in pfadpaare.items():
+        data = data.replace(alt_pfad, neu_pfad)
+    return data
+
+
+def ist_stand_ermitteln(data: str) -> str:
+    """
+    Die Funktion ermittelt aus dem Inhalt einer .prj-Datei den Stand der lokalen Pfade ("1" für "H:\LB1", "2" für
+    "H:\LB2").
+    """
+    if rf"H:\LB1\TIFFJPEG_" in data:
+        return "1"
+    if rf"H:\LB2\TIFFJPEG_" in data:
+        return "2"
+    raise Exception("Skript ist nicht an die Benennung im .prj-File angepasst")
+
+
+def prj_inhalt_anpassen(data: str, bildnamen: list, meridian: str, operat: str) -> str:
+    """
+    Die Funktion passt im Inhalt einer Original-.prj-Datei die Pfade der angegebenen Bilder (ohne Endung) auf die
+    Benennung im Verzeichnis an (siehe "_pfade_anpassen").
+    """
+    bilder = [bild_schluessel.bild_dateiname(item) for item in bildnamen]
+    return _pfade_anpassen(data, bilder, ist_stand_ermitteln(data), meridian, operat)
+
+
+def prj_auswahl_schreiben(bildnamen: list, workspace_info: list, block: int = 0) -> list:
+    """
+    Die Funktion schreibt für jede Original-.prj-Datei des Operates eine Kopie mit der Endung "_sync_{block}.prj", in
+    der nur die Pfade der angegebenen Bilder auf die Benennung im Verzeichnis angepasst sind. Im Gegensatz zu
+    "prj_umschreiben" bleiben die "_kopie.prj"-Dateien unverändert, die Funktion kann daher beliebig oft (z.B. je Block
+    der Mosaic-Synchronisierung) aufgerufen werden.
+    Parameter:
+        - bildnamen (list): Liste von Bildnamen (ohne Endung), die eingefügt werden sollen
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - block (int): Nummer des Blocks (eigene Dateien je Block)
+    Rückgabewert:
+        - prj_dateien (list): Liste mit Pfad(en) zu "_sync_{block}.prj"-Datei(en)
+    """
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+
+    bilder = [bild_schluessel.bild_dateiname(item) for item in bildnamen]
+    originale = [item for item in os.listdir(operat_ordner)
+                 if item.endswith(".prj") and not item.endswith("kopie.prj") and "_sync_" not in item]
+
+    prj_dateien = []
+    for item in originale:
+        with open(rf"{operat_ordner}\{item}", "r") as file:
+            data = file.read()
+        if rf"H:\LB1\TIFFJPEG_" in data:
+            ist_stand = "1"
+        elif rf"H:\LB2\TIFFJPEG_" in data:
+            ist_stand = "2"
+        else:
+            raise Exception("Skript ist nicht an die Benennung im .prj-File angepasst")
+
+        prj_sync = rf"{operat_ordner}\{item[:-4]}_sync_{block}.prj"
+        with open(prj_sync, "w") as file:
+            file.write(_pfade_anpassen(data, bilder, ist_stand, meridian, operat))
+        prj_dateien.append(prj_sync)
+
+    return prj_dateien
+
+
+def bildpfade_lesen(prj_dateien: list) -> list:
+    """
+    Die Funktion liest die Pfade aller Bilder, die in den .prj-Dateien auf das Netzwerk zeigen (d.h. beim Einfügen in
+    das Mosaic Dataset verwendet werden), als Pfade des Dateisystems.
+    Parameter:
+        - prj_dateien (list): Liste mit Pfad(en) zu prj-Datei(en)
+    Rückgabewert:
+        - bildpfade (list): Liste von Bildpfaden (ohne Duplikate)
+    """
+    netzwerk_pfad_dateisystem = NETZWERK_PFAD.replace("\\\\", "\\")
+    bildpfade = []
+    for item in prj_dateien:
+        with open(item, "r") as file:
+            data = file.read()
+        data_klein = data.lower()
+        anfang = data.find(NETZWERK_PFAD)
+        while anfang >= 0:
+            ende = data_klein.find(".tif", anfang)
+            if ende < 0:
+                break
+            ende += len(".tif")
+            bildpfade.append(netzwerk_pfad_dateisystem + data[anfang + len(NETZWERK_PFAD):ende])
+            anfang = data.find(NETZWERK_PFAD, ende)
+    return list(dict.fromkeys(bildpfade))
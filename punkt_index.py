@@ -0,0 +1,223 @@
+# Dieses Python-Skript verwaltet einen dauerhaften räumlichen Gitter-Index über die Bildpunkte in "punkte_sammlung".
+# Der Index wird als .npz-Datei neben der globalen Geodatabase gespeichert ("{meridian}_punkte_index.npz") und enthält
+# OBJECTID und Koordinaten aller Bildpunkte, sortiert nach Gitterzelle. Eine Abfrage mit einem Polygon liest nur die
+# Zellen innerhalb der Ausdehnung des Polygons und testet die Kandidaten exakt ("numpy_geometrie.punkte_in_polygon").
+# Nach jeder Änderung wird der Index inkrementell fortgeführt. Stimmen Anzahl und höchste OBJECTID nicht mehr mit
+# "punkte_sammlung" überein (z.B. nach Neuaufbau oder Zurücksetzen), wird er beim nächsten Laden neu erstellt.
+# Der Workflow wird durch das Starten von "main.py" initiiert, "punkt_index.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import arcpy
+import os
+import numpy as np
+import numpy_geometrie
+import vektor_global
+from info_wrapper import *
+
+
+# Standard-XY-Toleranz (m), falls die Flächen keinen Raumbezug liefern. Punkte, die höchstens um die XY-Toleranz
+# von der Begrenzung entfernt sind, gelten wie bei "PairwiseClip" als innerhalb.
+XY_TOLERANZ = 0.001
+
+# Zellen-Schlüssel = Zeile * SPALTEN_FAKTOR + Spalte + SPALTEN_VERSATZ (Spalten der Gauß-Krüger-Koordinaten sind klein)
+SPALTEN_VERSATZ = 2 ** 20
+SPALTEN_FAKTOR = 2 ** 21
+
+
+def _zellen(x: np.ndarray, y: np.ndarray, zellgroesse: float) -> np.ndarray:
+    spalte = np.floor(np.asarray(x, dtype=float) / zellgroesse).astype(np.int64)
+    zeile = np.floor(np.asarray(y, dtype=float) / zellgroesse).astype(np.int64)
+    return zeile * SPALTEN_FAKTOR + spalte + SPALTEN_VERSATZ
+
+
+def index_erstellen(oid: np.ndarray, x: np.ndarray, y: np.ndarray, zellgroesse: float = 1000.0) -> dict:
+    """
+    Die Funktion erstellt den Gitter-Index aus OBJECTIDs und Koordinaten.
+    Parameter:
+        - oid, x, y (np.ndarray): OBJECTID und Koordinaten der Bildpunkte
+        - zellgroesse (float): Kantenlänge der Gitterzellen in Metern
+    Rückgabewert:
+        - index (dict): "oid", "x", "y", "zelle" (sortiert nach Zelle) und "zellgroesse"
+    """
+    oid = np.asarray(oid, dtype=np.int64)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    zelle = _zellen(x, y, zellgroesse)
+    reihenfolge = np.argsort(zelle, kind="stable")
+    return {"oid": oid[reihenfolge], "x": x[reihenfolge], "y": y[reihenfolge], "zelle": zelle[reihenfolge],
+            "zellgroesse": float(zellgroesse)}
+
+
+def index_hinzufuegen(index: dict, oid: np.ndarray, x: np.ndarray, y: np.ndarray) -> dict:
+    """
+    Die Funktion fügt Bildpunkte in den Index ein (Einfügen in die sortierten Arrays, ohne Neusortierung).
+    """
+    oid = np.asarray(oid, dtype=np.int64)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    zelle = _zellen(x, y, index["zellgroesse"])
+    reihenfolge = np.argsort(zelle, kind="stable")
+    position = np.searchsorted(index["zelle"], zelle[reihenfolge], side="right")
+    return {"oid": np.insert(index["oid"], position, oid[reihenfolge]),
+            "x": np.insert(index["x"], position, x[reihenfolge]),
+            "y": np.insert(index["y"], position, y[reihenfolge]),
+            "zelle": np.insert(index["zelle"], position, zelle[reihenfolge]),
+            "zellgroesse": index["zellgroesse"]}
+
+
+def index_entfernen(index: dict, oid: np.ndarray) -> dict:
+    """
+    Die Funktion entfernt Bildpunkte anhand ihrer OBJECTID aus dem Index.
+    """
+    behalten = ~np.isin(index["oid"], np.asarray(oid, dtype=np.int64))
+    return {schluessel: (wert[behalten] if schluessel != "zellgroesse" else wert) for schluessel, wert in index.items()}
+
+
+def kandidaten(index: dict, xmin: float, ymin: float, xmax: float, ymax: float) -> np.ndarray:
+    """
+    Die Funktion liefert die Positionen im Index aller Bildpunkte in den Zellen, die das Rechteck berühren. Je
+    Zeile der Zellen ist der Bereich im sortierten Index zusammenhängend (eine binäre Suche je Zeile).
+    """
+    zellgroesse = index["zellgroesse"]
+    spalte_min = int(np.floor(xmin / zellgroesse))
+    spalte_max = int(np.floor(xmax / zellgroesse))
+    zeilen = np.arange(int(np.floor(ymin / zellgroesse)), int(np.floor(ymax / zellgroesse)) + 1, dtype=np.int64)
+    anfang = np.searchsorted(index["zelle"], zeilen * SPALTEN_FAKTOR + spalte_min + SPALTEN_VERSATZ, side="left")
+    ende = np.searchsorted(index["zelle"], zeilen * SPALTEN_FAKTOR + spalte_max + SPALTEN_VERSATZ, side="right")
+    if len(anfang) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate([np.arange(a, e) for a, e in zip(anfang, ende)]).astype(np.int64)
+
+
+def punkte_in_ringen(index: dict, ringe: list, toleranz: float = XY_TOLERANZ) -> np.ndarray:
+    """
+    Die Funktion liefert die OBJECTIDs aller Bildpunkte innerhalb eines Polygons (Liste von Ringen). Wie bei
+    "PairwiseClip" zählen auch Punkte auf der Begrenzung (Abstand höchstens "toleranz") zum Polygon, der
+    Even-Odd-Test allein ist für solche Punkte nicht eindeutig.
+    """
+    alle = np.concatenate(ringe) if ringe else np.empty((0, 2))
+    if len(alle) == 0 or len(index["oid"]) == 0:
+        return np.empty(0, dtype=np.int64)
+    position = kandidaten(index, alle[:, 0].min() - toleranz, alle[:, 1].min() - toleranz,
+                          alle[:, 0].max() + toleranz, alle[:, 1].max() + toleranz)
+    x = index["x"][position]
+    y = index["y"][position]
+    innen = numpy_geometrie.punkte_in_polygon(x, y, ringe)
+    aussen = np.flatnonzero(~innen)
+    if len(aussen):
+        abstand = numpy_geometrie.abstand_zu_strecken(x[aussen], y[aussen], *numpy_geometrie.ringe_zu_kanten(ringe))
+        innen[aussen[abstand <= toleranz]] = True
+    return index["oid"][position[innen]]
+
+
+def index_datei(workspace_info: list) -> str:
+    """
+    Die Funktion liefert den Pfad des Index neben der globalen Geodatabase ("{meridian}_punkte_index.npz").
+    """
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    return rf"{speicherort}\{meridian}_punkte_index.npz"
+
+
+def _zustand(punkte_sammlung: str) -> tuple:
+    """
+    Liefert Anzahl und höchste OBJECTID von "punkte_sammlung" (Prüfung, ob der Index noch aktuell ist).
+    """
+    anzahl = int(arcpy.GetCount_management(punkte_sammlung)[0])
+    max_oid = 0
+    oid_feld = arcpy.Describe(punkte_sammlung).OIDFieldName
+    with arcpy.da.SearchCursor(punkte_sammlung, ["OID@"], sql_clause=(None, f"ORDER BY {oid_feld} DESC")) as cursor:
+        for row in cursor:
+            max_oid = row[0]
+            break
+    return anzahl, max_oid
+
+
+def _punkte_lesen(punkte_sammlung: str, where_clause: str = None) -> tuple:
+    daten = arcpy.da.FeatureClassToNumPyArray(punkte_sammlung, ["OID@", "SHAPE@X", "SHAPE@Y"],
+                                              where_clause=where_clause)
+    return daten["OID@"], daten["SHAPE@X"], daten["SHAPE@Y"]
+
+
+@func_info
+def index_laden(punkte_sammlung: str, workspace_info: list, zellgroesse: float = 1000.0) -> dict:
+    """
+    Die Funktion lädt den Index von "punkte_sammlung". Fehlt er oder passt er nicht mehr zu "punkte_sammlung"
+    (Anzahl oder höchste OBJECTID), wird er neu erstellt und gespeichert.
+    Parameter:
+        - punkte_sammlung (str): Pfad zur Featureclass "punkte_sammlung"
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - zellgroesse (float): Kantenlänge der Gitterzellen in Metern (nur beim Erstellen)
+    Rückgabewert:
+        - index (dict): Gitter-Index (siehe "index_erstellen")
+    """
+    datei = index_datei(workspace_info)
+    anzahl, max_oid = _zustand(punkte_sammlung)
+    if os.path.exists(datei):
+        with np.load(datei) as gespeichert:
+            index = {schluessel: gespeichert[schluessel] for schluessel in ("oid", "x", "y", "zelle")}
+            index["zellgroesse"] = float(gespeichert["zellgroesse"])
+        if len(index["oid"]) == anzahl and (index["oid"].max() if anzahl else 0) == max_oid:
+            return index
+        print("Index von punkte_sammlung ist veraltet und wird neu erstellt")
+
+    index = index_erstellen(*_punkte_lesen(punkte_sammlung), zellgroesse)
+    index_speichern(index, workspace_info)
+    return index
+
+
+def index_speichern(index: dict, workspace_info: list):
+    """
+    Die Funktion speichert den Index (zuerst in eine temporäre Datei, damit ein Abbruch keinen halben Index
+    hinterlässt).
+    """
+    datei = index_datei(workspace_info)
+    temp_datei = datei.replace(".npz", "_temp.npz")
+    np.savez(temp_datei, **index)
+    os.replace(temp_datei, datei)
+
+
+def punkte_abfragen(index: dict, flaechen: str) -> np.ndarray:
+    """
+    Die Funktion liefert die OBJECTIDs aller Bildpunkte des Index innerhalb der Polygone einer Featureclass bzw. einer
+    Liste von Polygonen (arcpy-Geometrien), inklusive der Punkte auf der Begrenzung (XY-Toleranz des Raumbezugs).
+    """
+    if isinstance(flaechen, str):
+        with arcpy.da.SearchCursor(flaechen, ["SHAPE@"]) as cursor:
+            geometrien = [row[0] for row in cursor if row[0] is not None]
+    else:
+        geometrien = [geometrie for geometrie in flaechen if geometrie is not None]
+    if not geometrien:
+        return np.empty(0, dtype=np.int64)
+    oids = []
+    for geometrie in geometrien:
+        raumbezug = geometrie.spatialReference
+        toleranz = raumbezug.XYTolerance if raumbezug is not None and raumbezug.XYTolerance else XY_TOLERANZ
+        oids.append(punkte_in_ringen(index, vektor_global.polygon_ringe(geometrie), toleranz))
+    return np.unique(np.concatenate(oids))
+
+
+def index_fortfuehren(index: dict, punkte_sammlung: str, geloeschte_oids: np.ndarray,
+                      workspace_info: list) -> dict:
+    """
+    Die Funktion führt den Index nach einer Änderung von "punkte_sammlung" fort: gelöschte Punkte werden entfernt,
+    neue Punkte (OBJECTID größer als die bisher höchste im Index) werden gelesen und eingefügt. Danach wird der Index
+    gespeichert.
+    Parameter:
+        - index (dict): Index vor der Änderung
+        - punkte_sammlung (str): Pfad zur Featureclass "punkte_sammlung"
+        - geloeschte_oids (np.ndarray): OBJECTIDs der gelöschten Punkte
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    Rückgabewert:
+        - index (dict): fortgeführter Index
+    """
+    bisher_max_oid = int(index["oid"].max()) if len(index["oid"]) else 0
+    index = index_entfernen(index, geloeschte_oids)
+    oid_feld = arcpy.Describe(punkte_sammlung).OIDFieldName
+    index = index_hinzufuegen(index, *_punkte_lesen(punkte_sammlung, f"{oid_feld} > {bisher_max_oid}"))
+    index_speichern(index, workspace_info)
+    return index
@@ -7,13 +7,19 @@
 # Datum: 20. Jänner 2024
 
 import arcpy
+import bild_pruefung
+import bild_schluessel
+import dgm_cache
+import numpy as np
+import prj_funktionen
 from info_wrapper import *
 
 
 @func_info
 def raster_workspace_erstellen(workspace_info: list) -> str:
     """
-    Eine Geodatabase und ein Mosaicdataset wird erstellt, in dem sich das Mosaic Dataset befindet.
+    Eine Geodatabase und ein Mosaicdataset wird erstellt, in dem sich das Mosaic Dataset befindet. Fehlt einem
+    bestehenden Mosaic Dataset das Feld "bild_id", wird es ergänzt und aus dem Register befüllt.
     Parameter:
         - workspace_info (list): Liste aus Informationen zum Workspace
                                  (Meridian, Operatsnummer, Pfade, epsg-Nummer)
@@ -27,9 +33,8 @@ def raster_workspace_erstellen(workspace_info: list) -> str:
     mosaic_gdb = rf"{speicherort}\{meridian}_mosaic.gdb"
     mosaic_gdb_existiert = arcpy.Exists(mosaic_gdb)
     if not mosaic_gdb_existiert:
-        mosaic_gdb = arcpy.CreateFileGDB_management(speicherort, f"{meridian}_mosaic")
+        arcpy.CreateFileGDB_management(speicherort, f"{meridian}_mosaic")
         print("mosaic gdb wrd erstellt")
-        return mosaic_gdb
 
     # Erstelle Mosaic Dataset
     mosaic_dataset = rf"{mosaic_gdb}\mosaic"
@@ -37,26 +42,50 @@ def raster_workspace_erstellen(workspace_info: list) -> str:
     if not mosaic_existiert:
         mosaic_dataset = arcpy.CreateMosaicDataset_management(mosaic_gdb, "mosaic", coordinate_system=epsg)
         print("Mosaic Dataset wird erstellt")
-        arcpy.AddFields_management(mosaic_dataset, [["abgleich", "TEXT"], ["operat_nr", "TEXT"]])
+        arcpy.AddFields_management(mosaic_dataset, [["abgleich", "TEXT"], ["operat_nr", "TEXT"], ["bild_id", "LONG"]])
+    elif "bild_id" not in [feld.name for feld in arcpy.ListFields(mosaic_dataset)]:
+        arcpy.AddField_management(mosaic_dataset, "bild_id", "LONG")
+        bild_ids_nachtragen(mosaic_dataset, workspace_info)
 
     return mosaic_dataset
 
 
+def bild_ids_nachtragen(mosaic_dataset: str, workspace_info: list):
+    """
+    Die Funktion befüllt das Feld "bild_id" aller bereits abgeglichenen Raster, bei denen es leer ist, anhand der
+    Felder "name" und "operat_nr". Noch nicht registrierte Schlüssel werden im Register eingetragen.
+    Parameter:
+        - mosaic_dataset (str): Pfad zum Mosaic Dataset mit allen Bildern des Meridians
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    """
+
+    register = bild_schluessel.register_laden(workspace_info)
+    with arcpy.da.UpdateCursor(mosaic_dataset, ["name", "operat_nr", "bild_id"],
+                               "bild_id IS NULL AND abgleich IS NOT NULL") as cursor:
+        for row in cursor:
+            schluessel = bild_schluessel.schluessel_bilden(row[0], row[1])
+            cursor.updateRow([row[0], row[1], int(bild_schluessel.ids_vergeben(register, [schluessel])[0])])
+    bild_schluessel.register_speichern(register, workspace_info)
+
+
 @func_info
-def bilder_aus_mosaic_entfernen(mosaic_dataset: str, loesch_punkte_liste: list):
+def bilder_aus_mosaic_entfernen(mosaic_dataset: str, loesch_punkte_liste: list, workspace_info: list):
     """
     Die Funktion löscht alle bereits im Mosaic Dataset befindlichen Raster, die einem Namen aus "loesch_punkte_liste"
-    entsprechen.
+    entsprechen. Gefiltert wird über das Feld "bild_id" (Ganzzahlen aus dem Register, in Blöcken).
     Parameter:
         - mosaic_dataset (str): Pfad zum Mosaic Dataset mit allen Bildern des Meridians
         - loesch_punkte_liste (list): Liste mit allen Punkten die aus "punkte_sammlung" entfernt wurden
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
     """
 
-    loesch_punkte_tuple = tuple(loesch_punkte_liste)
+    # nicht registrierte Schlüssel können nicht im Mosaic Dataset sein
+    loesch_ids = bild_schluessel.ids_suchen(bild_schluessel.register_laden(workspace_info), loesch_punkte_liste)
 
     # Lösche Raster, falls dies nötig ist
-    if len(loesch_punkte_tuple) > 0:
-        sql_statement = f"abgleich IN {loesch_punkte_tuple}"
+    for sql_statement in bild_schluessel.id_abfragen(loesch_ids):
         arcpy.RemoveRastersFromMosaicDataset_management(
             mosaic_dataset,
             sql_statement,
@@ -70,21 +99,42 @@ def bilder_aus_mosaic_entfernen(mosaic_dataset: str, loesch_punkte_liste: list):
 
 
 @func_info
-def raster_zu_mosaic_hinzufuegen(mosaic_dataset: str, prj_dateien: list, dgm_pfad: str, workspace_info: list):
+def raster_zu_mosaic_hinzufuegen(mosaic_dataset: str, prj_dateien: list, dgm_pfad: str, workspace_info: list,
+                                 dgm_cache_info: list = None):
     """
     Mithilfe der Arcpy Funktion "AddRastersToMosaicDataset_management" werden alle Raster eingefügt, deren Pfad in
     der .prj-Datei korrekt angepasst wurden (alle Raster, die benötigt werden), der Rest wird ignoriert.
     Das DGM ermöglicht Terrain Following (Automatisches Anpassen des Fokus im Bildmittelpunkt).
+    Vorher werden alle ausgewählten Bilder auf Existenz und Lesbarkeit geprüft (Bericht "bild_pruefung.json" im
+    Operats-Ordner). Mit "dgm_cache_info" wird ein lokales DGM für den Bereich der Bilder verwendet (siehe
+    "dgm_cache.py").
     Parameter:
         - mosaic_dataset (str): Pfad zum Mosaic Dataset mit allen Bildern des Meridians
         - prj_dateien (list): Liste mit Pfad(en) zu prj-Datei(en)
         - dgm_pfad (str): Pfad zum digitalen Geländemodell
         - workspace_info (list): Liste aus Informationen zum Workspace
                                  (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - dgm_cache_info (list): Zellgröße (m, None = Zellgröße des DGM) und maximale Größe (GB) des lokalen DGM
+                                 (None = DGM aus "dgm_pfad")
     """
 
     meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
 
+    # lokales DGM für den Bereich der Projektionszentren aller Bilder des Operates
+    if dgm_cache_info:
+        bild_xy = [orientierung[0:2] for item in prj_dateien
+                   for orientierung in prj_funktionen.bild_info_editieren(
+                       prj_funktionen.bild_info_extrahieren(item)).values()]
+        dgm_pfad = dgm_cache.dgm_bereitstellen(dgm_pfad, np.array(bild_xy, dtype=float).reshape(-1, 2),
+                                               dgm_cache_info, workspace_info)
+
+    # Fehlende oder unlesbare Bilder werden vor dem Befüllen gemeldet
+    bild_pruefung.bilder_pruefen(
+        prj_funktionen.bildpfade_lesen(prj_dateien),
+        workspace_info,
+        rf"{operat_ordner}\bild_pruefung.json"
+    )
+
     # For Schleife, falls mehrere .prj-Dateien ausgelesen werden
     for item in prj_dateien:
         # Die ausgewählten Bilder werden hinzugefügt
@@ -104,17 +154,36 @@ def raster_zu_mosaic_hinzufuegen(mosaic_dataset: str, prj_dateien: list, dgm_pfa
                 spatial_reference=epsg,
                 )
 
-        except:
+        except arcpy.ExecuteError:
             print("kein Bild aus sub_Operat wurde ausgewählt")
+            print(arcpy.GetMessages(2))
         print("Das Mosaic Dataset wurde erfolgreich befüllt")
 
-    # Das Feld "abgleich" wird befüllt
-    with arcpy.da.UpdateCursor(mosaic_dataset, ["name", "abgleich", "operat_nr"]) as cursor:
+    # Die Felder "abgleich" und "bild_id" werden befüllt
+    abgleich_befuellen(mosaic_dataset, workspace_info)
+
+
+def abgleich_befuellen(mosaic_dataset: str, workspace_info: list):
+    """
+    Die Funktion befüllt die Felder "abgleich", "operat_nr" und "bild_id" der neu eingefügten Raster (Feld "abgleich"
+    leer) mit dem Operat aus "workspace_info".
+    Parameter:
+        - mosaic_dataset (str): Pfad zum Mosaic Dataset mit allen Bildern des Meridians
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+
+    register = bild_schluessel.register_laden(workspace_info)
+    with arcpy.da.UpdateCursor(mosaic_dataset, ["name", "abgleich", "operat_nr", "bild_id"],
+                               "abgleich IS NULL") as cursor:
         for row in cursor:
-            if row[1] is None:
-                name = row[0]
-                abgleich = name + operat
-                cursor.updateRow([name, abgleich, operat])
+            name = row[0]
+            abgleich = bild_schluessel.abgleich_bilden(name, operat)
+            bild_id = int(bild_schluessel.ids_vergeben(register, [bild_schluessel.schluessel_bilden(name, operat)])[0])
+            cursor.updateRow([name, abgleich, operat, bild_id])
+    bild_schluessel.register_speichern(register, workspace_info)
 
 
 @func_info
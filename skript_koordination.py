@@ -7,18 +7,35 @@
 
 
 import workspace_funktionen
+import bild_schluessel
 import prj_funktionen
 import vektor_lokal
 import flugstreifen_benennung
 import vektor_global
 import raster_global
+import stereo_pruefung
+import hilbert_sortierung
+import bild_manifest
+import abdeckung_karte
+import abdeckung_index
+import abdeckung_ledger
+import meridian_neuaufbau
+import einfuege_simulation
+import mosaic_synchronisierung
+from geometrie_backend import ArcpyBackend
 from info_wrapper import *
 import arcpy
+import os
 
 
 @func_info
 def input_parameter(speicherort, dgm_pfad, mehrere_operate, mehrere_operate_input, stereo_modell_erstellen,
-                    meridianstreifen_pfad, externe_prj_sammlung, datenquelle):
+                    meridianstreifen_pfad, externe_prj_sammlung, datenquelle, vereinfachung_toleranz,
+                    max_stuetzpunkte, stereo_pruefung_info, mehrere_operate_batch, zuruecksetzen_input,
+                    stichtag_input, neuaufbau_input, neuaufbau_kachelgroesse, simulation, synchronisierung_input,
+                    dgm_cache_info, bildauswahl_optimieren, hilbert_kompaktierung, manifest_input,
+                    mosaic_worker, abdeckung_zellgroesse, abdeckung_index_erstellen,
+                    lokal_kachelgroesse, abdeckung_gesamtkarte_zellgroesse):
     """
     Diese Funktion interpretiert die User-Inputs für den Ablauf.
     Parameter:
@@ -30,10 +47,117 @@ def input_parameter(speicherort, dgm_pfad, mehrere_operate, mehrere_operate_inpu
         - meridianstreifen_pfad (str): Pfad zur Meridianstreifen-Featureclass
         - externe_prj_sammlung (str): Pfad zu Verzeichnis mit zusätzlichen .prj-Dateien
         - datenquelle (str): Pfad des Verzeichnisses, in dem sich die Basisdaten, prj-Dateien und Luftbilder, befinden.
+        - vereinfachung_toleranz (float): Toleranz der Vereinfachung der Operatsflächen in Metern (0 = keine)
+        - max_stuetzpunkte (int): maximale Anzahl an Stützpunkten je Polygon nach der Vereinfachung
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m) und
+                                       Mindest-Längsüberdeckung der Stereo-Prüfung (None = keine Prüfung)
+        - mehrere_operate_batch (bool): bei "True" werden mehrere Operate im Batch-Modus zusammengeführt
+        - zuruecksetzen_input (list): Liste von Operaten (mit Meridian), die zurückgesetzt werden sollen
+        - stichtag_input (list): Liste von Stichtagen (mit Meridian), deren Stand der Abdeckung erzeugt werden soll
+        - neuaufbau_input (list): Liste von Meridianen, die aus allen Operaten neu aufgebaut werden sollen
+        - neuaufbau_kachelgroesse (float): Kantenlänge der Kacheln des Neuaufbaus in Metern
+        - simulation (bool): bei "True" wird das Einfügen der Operate nur simuliert (ohne Mosaic und Stereo-Modell)
+        - synchronisierung_input (list): Liste von Meridianen, deren Mosaic Dataset mit "punkte_sammlung"
+                                         abgeglichen werden soll
+        - dgm_cache_info (list): Zellgröße (m) und maximale Größe (GB) des lokalen DGM beim Abgleich der Mosaic
+                                 Datasets (None = DGM aus "dgm_pfad")
+        - bildauswahl_optimieren (bool): bei "True" werden die Bildpunkte je Operat auf eine nahezu minimale Auswahl
+                                         mit durchgehender Stereoabdeckung reduziert (benötigt "stereo_pruefung_info")
+        - hilbert_kompaktierung (int): Anzahl eingefügter Operate je Meridian, nach der "punkte_sammlung" und
+                                       "flaechen_sammlung" in Hilbert-Reihenfolge neu geschrieben werden
+                                       (0 = keine Hilbert-Sortierung)
+        - manifest_input (list): Liste von Meridianen, deren Mosaic Dataset allein aus dem Manifest der Bildauswahl
+                                 neu aufgebaut werden soll
+        - mosaic_worker (int): Anzahl der Worker-Prozesse beim Einfügen in die Mosaic Datasets (Abgleich und Aufbau
+                               aus dem Manifest, 1 = seriell, None = Anzahl der Prozessorkerne)
+        - abdeckung_zellgroesse (float): Zellgröße (m) der Karte von Alter und Dichte der Bildabdeckung, die nach
+                                         jedem Einfügen fortgeführt wird (None = keine Karte)
+        - abdeckung_index_erstellen (bool): bei "True" wird der Abfrage-Index der Abdeckung (Bilder, Flugstreifen,
+                                            Operate und Flugjahre) nach jedem Einfügen fortgeführt
+        - lokal_kachelgroesse (float): Kantenlänge (m) der Kacheln, in denen die relevanten Bildpunkte je Operat
+                                       parallel ermittelt werden (0 = ganzes Operat in einem Schritt)
+        - abdeckung_gesamtkarte_zellgroesse (float): Zellgröße (m) der Gesamtkarte aller Meridiane, die am Ende des
+                                                     Ablaufs zusammengeführt wird (None = keine Gesamtkarte)
     """
 
+    # Falls Meridiane neu aufgebaut werden sollen, werden keine Operate eingefügt
+    if neuaufbau_input:
+        arcpy.env.overwriteOutput = True
+        for meridian in neuaufbau_input:
+            neuaufbau(
+                speicherort,
+                meridian,
+                neuaufbau_kachelgroesse,
+                vereinfachung_toleranz,
+                max_stuetzpunkte,
+                stereo_pruefung_info,
+                abdeckung_zellgroesse,
+                abdeckung_index_erstellen,
+                hilbert_kompaktierung
+            )
+
+    # Falls Mosaic Datasets mit "punkte_sammlung" abgeglichen werden sollen, werden keine Operate eingefügt
+    elif synchronisierung_input:
+        arcpy.env.overwriteOutput = True
+        for meridian in synchronisierung_input:
+            mosaic_abgleichen(
+                speicherort,
+                meridian,
+                dgm_pfad,
+                dgm_cache_info,
+                mosaic_worker
+            )
+
+    # Falls Mosaic Datasets aus dem Manifest neu aufgebaut werden sollen, werden keine Operate eingefügt
+    elif manifest_input:
+        arcpy.env.overwriteOutput = True
+        for meridian in manifest_input:
+            mosaic_aus_manifest(
+                speicherort,
+                meridian,
+                dgm_pfad,
+                dgm_cache_info,
+                mosaic_worker
+            )
+
+    # Falls Operate zurückgesetzt oder Stände zu Stichtagen erzeugt werden sollen, werden keine Operate eingefügt
+    elif zuruecksetzen_input or stichtag_input:
+        arcpy.env.overwriteOutput = True
+        ledger_bearbeitung(
+            speicherort,
+            zuruecksetzen_input,
+            stichtag_input,
+            stereo_pruefung_info,
+            abdeckung_zellgroesse,
+            abdeckung_index_erstellen
+        )
+
+    # Falls mehrere Operate auf einmal im Batch-Modus eingefügt werden sollen
+    elif mehrere_operate and mehrere_operate_batch and not simulation:
+        arcpy.env.overwriteOutput = True
+        bearbeitete_meridiane = main_batch(
+            speicherort,
+            mehrere_operate_input,
+            meridianstreifen_pfad,
+            dgm_pfad,
+            externe_prj_sammlung,
+            datenquelle,
+            vereinfachung_toleranz,
+            max_stuetzpunkte,
+            stereo_pruefung_info,
+            bildauswahl_optimieren,
+            hilbert_kompaktierung,
+            abdeckung_zellgroesse,
+            abdeckung_index_erstellen,
+            lokal_kachelgroesse
+        )
+
+        # Berechne die Stereo-Modelle der Meridiane, deren Operate eingefügt wurden
+        for meridian in bearbeitete_meridiane:
+            stereo_modell_aktualisieren(speicherort, meridian, stereo_modell_erstellen)
+
     # Falls mehrere Operate auf einmal eingefügt werden sollen
-    if mehrere_operate:
+    elif mehrere_operate:
         # Füge alle Bilder zu den Mosaic Datasets hinzu
         for meridian_operat in mehrere_operate_input:
             main(
@@ -43,15 +167,23 @@ def input_parameter(speicherort, dgm_pfad, mehrere_operate, mehrere_operate_inpu
                 meridianstreifen_pfad,
                 dgm_pfad,
                 externe_prj_sammlung,
-                datenquelle
+                datenquelle,
+                vereinfachung_toleranz,
+                max_stuetzpunkte,
+                stereo_pruefung_info,
+                simulation,
+                bildauswahl_optimieren,
+                hilbert_kompaktierung,
+                abdeckung_zellgroesse,
+                abdeckung_index_erstellen,
+                lokal_kachelgroesse
             )
 
         # Berechne die Stereo-Modelle der Meridiane, deren Operate eingefügt wurden
-        if stereo_modell_erstellen:
+        if not simulation:
             bearbeitete_meridiane = set(item[0] for item in mehrere_operate_input)
             for meridian in bearbeitete_meridiane:
-                mosaic = rf"{speicherort}\{meridian}_mosaic.gdb\mosaic"
-                create_stereo_model(mosaic)
+                stereo_modell_aktualisieren(speicherort, meridian, stereo_modell_erstellen)
 
     # Falls nur ein Operat eingefügt wird
     elif not mehrere_operate:
@@ -62,31 +194,58 @@ def input_parameter(speicherort, dgm_pfad, mehrere_operate, mehrere_operate_inpu
             meridianstreifen_pfad,
             dgm_pfad,
             externe_prj_sammlung,
-            datenquelle
+            datenquelle,
+            vereinfachung_toleranz,
+            max_stuetzpunkte,
+            stereo_pruefung_info,
+            simulation,
+            bildauswahl_optimieren,
+            hilbert_kompaktierung,
+            abdeckung_zellgroesse,
+            abdeckung_index_erstellen,
+            lokal_kachelgroesse
         )
 
         # Berechne das Stereo-Modell
-        if stereo_modell_erstellen:
+        if not simulation:
             meridian, epsg, operat, speicherort, meridianordner, operatordner, gdb, fds_final, fds_temp = workspace_info
-            mosaic = rf"{speicherort}\{meridian}_mosaic.gdb\mosaic"
-            create_stereo_model(mosaic)
+            stereo_modell_aktualisieren(speicherort, meridian, stereo_modell_erstellen)
+
+    # Gesamtkarte aller Meridiane auf Wunsch aus den Karten der Meridiane zusammenführen
+    if abdeckung_gesamtkarte_zellgroesse:
+        abdeckung_karte.gesamtkarte_erstellen(speicherort, abdeckung_gesamtkarte_zellgroesse)
 
 
 @func_info
-def main(speicherort, mehrere_operate, mehrere_operate_input, meridianstreifen_pfad, dgm_pfad, externe_prj_sammlung, datenquelle):
+def lokale_bearbeitung(speicherort, mehrere_operate, mehrere_operate_input, meridianstreifen_pfad, externe_prj_sammlung,
+                       datenquelle, vereinfachung_toleranz, max_stuetzpunkte, stereo_pruefung_info,
+                       bildauswahl_optimieren=False, hilbert_kompaktierung=0, lokal_kachelgroesse=0) -> tuple:
     """
-    Diese Funktion steuert alle Skripts und darin enthaltene Funktionen an.
+    Diese Funktion steuert alle lokalen Bearbeitungsschritte eines Operates an (Bildpunkte, Flugstreifen, Auswahl der
+    relevanten Bildpunkte, Operatsfläche), d.h. alle Schritte ohne Berücksichtigung anderer Operate.
     Parameter:
         - speicherort (str): Pfad des Speicherorts sämtlicher Ergebnisse und Zwischenergebnisse
         - mehrere_operate (bool): bei "True" werden mehrere Operate anhand von "mehrere_operate_input" hinzugefügt
-        - mehrere_operate_input (list): Liste von Operaten, die auf einmal hinzugefügt werden sollen
+        - mehrere_operate_input (list): Meridian und Operat, falls "mehrere_operate = True"
         - meridianstreifen_pfad (str): Pfad zur Meridianstreifen-Featureclass
-        - dgm_pfad (str): Pfad zum aktuellen digitalen Geländemodell
         - externe_prj_sammlung (str): Pfad zu Verzeichnis mit zusätzlichen .prj-Dateien
         - datenquelle (str): Pfad des Verzeichnisses, in dem sich die Basisdaten, prj-Dateien und Luftbilder, befinden.
-    Rückgabewert:
+        - vereinfachung_toleranz (float): Toleranz der Vereinfachung der Operatsflächen in Metern (0 = keine)
+        - max_stuetzpunkte (int): maximale Anzahl an Stützpunkten je Polygon nach der Vereinfachung
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m) und
+                                       Mindest-Längsüberdeckung der Stereo-Prüfung (None = keine Prüfung)
+        - bildauswahl_optimieren (bool): bei "True" werden die Bildpunkte auf eine nahezu minimale Auswahl mit
+                                         durchgehender Stereoabdeckung reduziert (benötigt "stereo_pruefung_info")
+        - hilbert_kompaktierung (int): Anzahl eingefügter Operate je Meridian zwischen zwei Kompaktierungen in
+                                       Hilbert-Reihenfolge (0 = keine Hilbert-Sortierung)
+        - lokal_kachelgroesse (float): Kantenlänge (m) der Kacheln der Auswahl der relevanten Bildpunkte (0 = keine)
+    Rückgabewerte (tuple):
         - workspace_info (list): Liste aus Informationen zum Workspace
                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - main_featureclasses_info (list): Pfade zu den wichtigsten Featureclasses
+                                           (bildpunkte_unbearbeitet, bildpunkte_extrahiert)
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - operatsflaeche (str): Pfad zur Featureclass mit der (vereinfachten) Operatsfläche
     """
     arcpy.env.overwriteOutput = True
 
@@ -163,9 +322,13 @@ def main(speicherort, mehrere_operate, mehrere_operate_input, meridianstreifen_p
 
     # "flugstreifen_info" wurde noch nicht ermittelt
     if not flugstreifen_info:
+        # Geometrie-Operationen der Flugstreifen-Benennung werden mit arcpy ausgeführt
+        backend = ArcpyBackend(workspace_info[1])
+
         # Struktur der Benennung (Trennzeichen, Subparts) wird ermittelt
         trennzeichen, split_liste, bildpunkt_liste = flugstreifen_benennung.benennung_struktur_erfassen(
-            main_featureclasses_info
+            main_featureclasses_info,
+            backend
         )
 
         # Überprüfung, ob Code mit der aktuellen Flugstreifen-Benennung kompatibel ist
@@ -186,7 +349,8 @@ def main(speicherort, mehrere_operate, mehrere_operate_input, meridianstreifen_p
             sample,
             trennzeichen,
             bildpunkt_liste,
-            workspace_info
+            workspace_info,
+            backend
         )
 
         # Flugstreifen-Benennung wird in json-Datei geschrieben
@@ -204,103 +368,467 @@ def main(speicherort, mehrere_operate, mehrere_operate_input, meridianstreifen_p
         workspace_info
     )
 
-    # Flugstreifen wird auf Basis des Feldes "flugstreifen" in "bildpunkte_extrahiert" erstellt
-    flugstreifen_unbearbeitet = vektor_lokal.flugstreifen_erstellen(
-        main_featureclasses_info,
+    if lokal_kachelgroesse:
+        # sehr große Operate: relevante Bildpunkte werden in räumlichen Kacheln parallel ermittelt
+        vektor_lokal.bildpunkte_gekachelt_auswaehlen(
+            main_featureclasses_info,
+            oesterreich_buffer,
+            meridianstreifen,
+            lokal_kachelgroesse,
+            workspace_info
+        )
+
+    else:
+        # Flugstreifen wird auf Basis des Feldes "flugstreifen" in "bildpunkte_extrahiert" erstellt, die Geometrie wird
+        # für die Talstreifen wiederverwendet
+        flugstreifen_unbearbeitet, flugstreifen = vektor_lokal.flugstreifen_erstellen(
+            main_featureclasses_info,
+            workspace_info
+        )
+
+        # Flugstreifen außerhalb von Ö werden ermittelt und entsprechende Bildpunkte gelöscht
+        flugstreifen_ausserhalb = vektor_lokal.flugstreifen_ganz_ausserhalb(
+            flugstreifen_unbearbeitet,
+            oesterreich_buffer,
+            main_featureclasses_info,
+            workspace_info
+        )
+
+        # Flugstreifen Richtung wird ermittelt und in Featureclasses kopiert
+        flugstreifen_schraeg, flugstreifen_vertikal, flugstreifen_horizontal = \
+            vektor_lokal.flugstreifen_richtung_berechnen(
+                flugstreifen_unbearbeitet,
+                workspace_info
+            )
+
+        # Nur schräge Flugstreifen werden beibehalten, und je nach Relevanz entsprechender Liste hinzugefügt
+        schraege_flugstreifen_liste, ungunst_schraeg = vektor_lokal.schraege_flugstreifen(
+            flugstreifen_schraeg
+        )
+
+        # Nur vertikale Flugstreifen werden beibehalten
+        vektor_lokal.vertikale_flugstreifen(
+            flugstreifen_vertikal
+        )
+        # Nur horizontale Flugstreifen werden beibehalten
+        vektor_lokal.horizontale_flugstreifen(
+            flugstreifen_horizontal
+        )
+
+        # Namen der schrägen Flugstreifen, die gelöscht wurden, in "flugstreifen_ungunst" gespeichert
+        flugstreifen_ungunst = vektor_lokal.schraege_randstreifen_extrahieren(
+            flugstreifen_schraeg,
+            flugstreifen_ausserhalb,
+            meridianstreifen,
+            ungunst_schraeg,
+            workspace_info
+        )
+
+        # Bildpunkte in "bildpunkte_extrahiert" entsprechend flugstreifen_ungunst löschen
+        vektor_lokal.schraege_randstreifen_bildpunkte_loeschen(
+            main_featureclasses_info,
+            flugstreifen_ungunst
+        )
+
+        # Bildpunkte horizontaler Flugstreifen werden vorgezogen, vertikale Flugstreifen Bildpunkte werden vorerst
+        # gelöscht
+        vektor_lokal.vertikale_streifen_bildpunkte_loeschen(
+            main_featureclasses_info,
+            flugstreifen_vertikal
+        )
+
+        # benötigte vertikale Flugstreifen werden ermittelt
+        vertikale_punkte_notwendig, vertikal_streifen_bereich_inland = vektor_lokal.vertikale_flugstreifen_benoetigt(
+            flugstreifen_horizontal,
+            flugstreifen_vertikal,
+            workspace_info
+        )
+
+        if vertikale_punkte_notwendig:
+            # Einfügen vertikaler Punkte ist notwendig
+            # Bildpunkte werden entsprechend der benötigten vertikalen Flugstreifen eingefügt
+            vektor_lokal.vertikale_flugstreifen_punkte_einfuegen(
+                schraege_flugstreifen_liste,
+                vertikal_streifen_bereich_inland,
+                main_featureclasses_info,
+                workspace_info
+            )
+
+        # Talstreifen-Bildpunkte werden freigeschnitten
+        vektor_lokal.punkte_talstreifen_ausschneiden(
+            main_featureclasses_info,
+            schraege_flugstreifen_liste,
+            flugstreifen,
+            workspace_info
+        )
+
+    # Stereo-Prüfung der extrahierten Bildpunkte des Operates (Unterbrechungen der Stereoketten)
+    if stereo_pruefung_info:
+        meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+        bildpunkte_unbearbeitet, bildpunkte_extrahiert = main_featureclasses_info
+        stereo_bericht = stereo_pruefung.stereo_ketten_pruefen(
+            vektor_lokal.bildpunkte_lesen(bildpunkte_extrahiert, "operat"),
+            stereo_pruefung_info
+        )
+        stereo_pruefung.stereo_bericht_schreiben(
+            stereo_bericht,
+            rf"{operat_ordner}\stereo_pruefung_{operat}.json"
+        )
+
+    # Erstellung aller nötigen gdb, fds und fc für die Zusammenführung
+    global_info = workspace_funktionen.global_gdb_erstellen(
         workspace_info
     )
 
-    # Flugstreifen außerhalb von Ö werden ermittelt und entsprechende Bildpunkte gelöscht
-    flugstreifen_ausserhalb = vektor_lokal.flugstreifen_ganz_ausserhalb(
-        flugstreifen_unbearbeitet,
-        oesterreich_buffer,
+    # Erstellung der Operatsfläche des aktuellen Operates
+    operatsflaeche = vektor_global.operat_flaeche_erstellen(
         main_featureclasses_info,
         workspace_info
     )
 
-    # Flugstreifen Richtung wird ermittelt und in Featureclasses kopiert
-    flugstreifen_schraeg, flugstreifen_vertikal, flugstreifen_horizontal = vektor_lokal.flugstreifen_richtung_berechnen(
-        flugstreifen_unbearbeitet,
-        workspace_info
-    )
+    # Reduktion der Bildpunkte auf eine nahezu minimale Auswahl mit durchgehender Stereoabdeckung der Operatsfläche
+    if bildauswahl_optimieren and stereo_pruefung_info:
+        vektor_lokal.bildauswahl_anwenden(
+            main_featureclasses_info,
+            operatsflaeche,
+            stereo_pruefung_info,
+            workspace_info
+        )
+
+    # Vereinfachung der Operatsfläche, bevor diese in "flaechen_sammlung" gespeichert wird
+    if vereinfachung_toleranz > 0:
+        operatsflaeche_vereinfacht = f"{operatsflaeche}_vereinfacht"
+        vektor_global.flaechen_vereinfachen(
+            operatsflaeche,
+            operatsflaeche_vereinfacht,
+            vereinfachung_toleranz,
+            max_stuetzpunkte
+        )
+        operatsflaeche = operatsflaeche_vereinfacht
 
-    # Nur schräge Flugstreifen werden beibehalten, und je nach Relevanz entsprechender Liste hinzugefügt
-    schraege_flugstreifen_liste, ungunst_schraeg = vektor_lokal.schraege_flugstreifen(
-        flugstreifen_schraeg
+    # Bildpunkte in Hilbert-Reihenfolge, bevor sie in "punkte_sammlung" geschrieben werden
+    if hilbert_kompaktierung:
+        hilbert_sortierung.featureclass_sortieren(
+            main_featureclasses_info[1]
+        )
+
+    return workspace_info, main_featureclasses_info, global_info, operatsflaeche
+
+
+@func_info
+def main(speicherort, mehrere_operate, mehrere_operate_input, meridianstreifen_pfad, dgm_pfad, externe_prj_sammlung, datenquelle,
+         vereinfachung_toleranz, max_stuetzpunkte, stereo_pruefung_info, simulation=False,
+         bildauswahl_optimieren=False, hilbert_kompaktierung=0, abdeckung_zellgroesse=0,
+         abdeckung_index_erstellen=False, lokal_kachelgroesse=0):
+    """
+    Diese Funktion steuert alle Skripts und darin enthaltene Funktionen an.
+    Parameter:
+        - speicherort (str): Pfad des Speicherorts sämtlicher Ergebnisse und Zwischenergebnisse
+        - mehrere_operate (bool): bei "True" werden mehrere Operate anhand von "mehrere_operate_input" hinzugefügt
+        - mehrere_operate_input (list): Liste von Operaten, die auf einmal hinzugefügt werden sollen
+        - meridianstreifen_pfad (str): Pfad zur Meridianstreifen-Featureclass
+        - dgm_pfad (str): Pfad zum aktuellen digitalen Geländemodell
+        - externe_prj_sammlung (str): Pfad zu Verzeichnis mit zusätzlichen .prj-Dateien
+        - datenquelle (str): Pfad des Verzeichnisses, in dem sich die Basisdaten, prj-Dateien und Luftbilder, befinden.
+        - vereinfachung_toleranz (float): Toleranz der Vereinfachung der Operatsflächen in Metern (0 = keine)
+        - max_stuetzpunkte (int): maximale Anzahl an Stützpunkten je Polygon nach der Vereinfachung
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m) und
+                                       Mindest-Längsüberdeckung der Stereo-Prüfung (None = keine Prüfung)
+        - simulation (bool): bei "True" wird das Einfügen nur simuliert, die globale Geodatabase bleibt unverändert
+        - bildauswahl_optimieren (bool): bei "True" werden die Bildpunkte auf eine nahezu minimale Auswahl mit
+                                         durchgehender Stereoabdeckung reduziert (benötigt "stereo_pruefung_info")
+        - hilbert_kompaktierung (int): Anzahl eingefügter Operate je Meridian zwischen zwei Kompaktierungen in
+                                       Hilbert-Reihenfolge (0 = keine Hilbert-Sortierung)
+        - abdeckung_zellgroesse (float): Zellgröße (m) der Karte von Alter und Dichte der Bildabdeckung (0 = keine)
+        - abdeckung_index_erstellen (bool): bei "True" wird der Abfrage-Index der Abdeckung fortgeführt
+        - lokal_kachelgroesse (float): Kantenlänge (m) der Kacheln der Auswahl der relevanten Bildpunkte (0 = keine)
+    Rückgabewert:
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    """
+    # Lokale Bearbeitungsschritte des Operates
+    workspace_info, main_featureclasses_info, global_info, operatsflaeche = lokale_bearbeitung(
+        speicherort,
+        mehrere_operate,
+        mehrere_operate_input,
+        meridianstreifen_pfad,
+        externe_prj_sammlung,
+        datenquelle,
+        vereinfachung_toleranz,
+        max_stuetzpunkte,
+        stereo_pruefung_info,
+        bildauswahl_optimieren,
+        hilbert_kompaktierung,
+        lokal_kachelgroesse
     )
 
-    # Nur vertikale Flugstreifen werden beibehalten
-    vektor_lokal.vertikale_flugstreifen(
-        flugstreifen_vertikal
+    # Simulation: Bericht über gelöschte und hinzugefügte Bildpunkte sowie Flächenänderungen, ohne Schreibzugriff
+    if simulation:
+        einfuege_simulation.operat_simulieren(
+            operatsflaeche,
+            main_featureclasses_info,
+            global_info,
+            workspace_info
+        )
+        return workspace_info
+
+    # Hinzufügen der aktuellen Operatsfläche zu "flaechen_sammlung", Ledger-Eintrag vor der Änderung von Partition und
+    # "punkte_sammlung" beginnen
+    ledger_versionen = operate_eintragen(
+        [[workspace_info, main_featureclasses_info, global_info, operatsflaeche]],
+        global_info
     )
-    # Nur horizontale Flugstreifen werden beibehalten
-    vektor_lokal.horizontale_flugstreifen(
-        flugstreifen_horizontal
+
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+    if arcpy.Exists(rf"{fds_output_global}\flaechen_partition"):
+        # Die Partition der Operatsflächen existiert bereits, das Input-Operat wird nur lokal eingefügt
+        zu_input_anfuegen, nicht_zu_input_anfuegen, flaechen_sammlung_final, input_operat_ohne_ueberschneidungen = \
+            vektor_global.flaechen_partition_aktualisieren(
+                operatsflaeche,
+                global_info,
+                workspace_info
+            )
+
+    else:
+        # Überschneidungen aller Operate auflösen, die Partition der Operatsflächen wird einmalig erstellt und ab dem
+        # nächsten Operat lokal fortgeführt
+        zu_input_anfuegen, nicht_zu_input_anfuegen, flaechen_sammlung_final, input_operat_ohne_ueberschneidungen = \
+            ueberschneidungen_aufloesen(
+                global_info,
+                workspace_info,
+                vereinfachung_toleranz,
+                max_stuetzpunkte
+            )
+
+    # Featureclasses mit Information zu Flächen des Input-Operates werden erstellt
+    fc_zu_input_anfuegen, fc_input_operat_ohne_ueberschneidungen = vektor_global.input_operat_aufteilen(
+        zu_input_anfuegen,
+        input_operat_ohne_ueberschneidungen,
+        global_info
     )
 
-    # Namen der schrägen Flugstreifen, die gelöscht wurden, in "flugstreifen_ungunst" gespeichert
-    flugstreifen_ungunst = vektor_lokal.schraege_randstreifen_extrahieren(
-        flugstreifen_schraeg,
-        flugstreifen_ausserhalb,
-        meridianstreifen,
-        ungunst_schraeg,
+    # Alle Punkte, die gelöscht werden müssen, oder neu hinzugefügt werden, werden in Listen gespeichert
+    loesch_punkte_liste, hinzugefuegt_punkte_liste = vektor_global.punkte_ausschneiden_hinzufuegen(
+        fc_zu_input_anfuegen,
+        fc_input_operat_ohne_ueberschneidungen,
+        global_info,
+        main_featureclasses_info,
         workspace_info
     )
 
-    # Bildpunkte in "bildpunkte_extrahiert" entsprechend flugstreifen_ungunst löschen
-    vektor_lokal.schraege_randstreifen_bildpunkte_loeschen(
-        main_featureclasses_info,
-        flugstreifen_ungunst
+    # Ledger-Eintrag abschließen, Kompaktierung und Nachführung aller abgeleiteten Ergebnisse des Meridians
+    operate_ausserhalb, prj_dateien, mosaic_dataset = einfuegen_abschliessen(
+        [[workspace_info, main_featureclasses_info, global_info, operatsflaeche]],
+        ledger_versionen,
+        {workspace_info[2]: loesch_punkte_liste},
+        {workspace_info[2]: hinzugefuegt_punkte_liste},
+        flaechen_sammlung_final,
+        global_info,
+        workspace_info,
+        stereo_pruefung_info,
+        hilbert_kompaktierung,
+        abdeckung_zellgroesse,
+        abdeckung_index_erstellen
     )
 
-    # Bildpunkte horizontaler Flugstreifen werden vorgezogen, vertikale Flugstreifen Bildpunkte werden vorerst gelöscht
-    vektor_lokal.vertikale_streifen_bildpunkte_loeschen(
-        main_featureclasses_info,
-        flugstreifen_vertikal
+    """    
+    # Lösche veraltete Bilder aus Mosaic Dataset
+    raster_global.bilder_aus_mosaic_entfernen(
+        mosaic_dataset,
+        loesch_punkte_liste,
+        workspace_info
     )
 
-    # benötigte vertikale Flugstreifen werden ermittelt
-    vertikale_punkte_notwendig, vertikal_streifen_bereich_inland = vektor_lokal.vertikale_flugstreifen_benoetigt(
-        flugstreifen_horizontal,
-        flugstreifen_vertikal,
+    # Alle benötigten Raster werden zum Mosaic Dataset hinzugefügt
+    raster_global.raster_zu_mosaic_hinzufuegen(
+        mosaic_dataset,
+        prj_dateien,
+        dgm_pfad,
         workspace_info
     )
 
-    if vertikale_punkte_notwendig:
-        # Einfügen vertikaler Punkte ist notwendig
-        # Bildpunkte werden entsprechend der benötigten vertikalen Flugstreifen eingefügt
-        vektor_lokal.vertikale_flugstreifen_punkte_einfuegen(
-            schraege_flugstreifen_liste,
-            vertikal_streifen_bereich_inland,
-            main_featureclasses_info,
+    # Lösche alle Raster der Operate, die zur Gänze außerhalb von Ö liegen
+    raster_global.operate_ausserhalb_loeschen(
+        mosaic_dataset,
+        operate_ausserhalb
+    )"""
+
+    return workspace_info
+
+
+@func_info
+def main_batch(speicherort, mehrere_operate_input, meridianstreifen_pfad, dgm_pfad, externe_prj_sammlung, datenquelle,
+               vereinfachung_toleranz, max_stuetzpunkte, stereo_pruefung_info, bildauswahl_optimieren=False,
+               hilbert_kompaktierung=0, abdeckung_zellgroesse=0,
+               abdeckung_index_erstellen=False, lokal_kachelgroesse=0) -> list:
+    """
+    Batch-Modus für "mehrere_operate": zuerst werden die lokalen Bearbeitungsschritte aller Operate ausgeführt, danach
+    werden je Meridian alle neuen Operate gemeinsam gegen die bestehenden Operate aufgelöst (lokal in der bestehenden
+    Partition, beim ersten Einfügen in einem einzigen globalen Durchgang) und "punkte_sammlung" einmal aktualisiert.
+    Das Ergebnis entspricht dem schrittweisen Einfügen in der Reihenfolge von "mehrere_operate_input".
+    Parameter:
+        - speicherort (str): Pfad des Speicherorts sämtlicher Ergebnisse und Zwischenergebnisse
+        - mehrere_operate_input (list): Liste von Operaten, die auf einmal hinzugefügt werden sollen
+        - meridianstreifen_pfad (str): Pfad zur Meridianstreifen-Featureclass
+        - dgm_pfad (str): Pfad zum aktuellen digitalen Geländemodell
+        - externe_prj_sammlung (str): Pfad zu Verzeichnis mit zusätzlichen .prj-Dateien
+        - datenquelle (str): Pfad des Verzeichnisses, in dem sich die Basisdaten, prj-Dateien und Luftbilder, befinden.
+        - vereinfachung_toleranz (float): Toleranz der Vereinfachung der Operatsflächen in Metern (0 = keine)
+        - max_stuetzpunkte (int): maximale Anzahl an Stützpunkten je Polygon nach der Vereinfachung
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m) und
+                                       Mindest-Längsüberdeckung der Stereo-Prüfung (None = keine Prüfung)
+        - bildauswahl_optimieren (bool): bei "True" werden die Bildpunkte auf eine nahezu minimale Auswahl mit
+                                         durchgehender Stereoabdeckung reduziert (benötigt "stereo_pruefung_info")
+        - hilbert_kompaktierung (int): Anzahl eingefügter Operate je Meridian zwischen zwei Kompaktierungen in
+                                       Hilbert-Reihenfolge (0 = keine Hilbert-Sortierung)
+        - abdeckung_zellgroesse (float): Zellgröße (m) der Karte von Alter und Dichte der Bildabdeckung (0 = keine)
+        - abdeckung_index_erstellen (bool): bei "True" wird der Abfrage-Index der Abdeckung fortgeführt
+        - lokal_kachelgroesse (float): Kantenlänge (m) der Kacheln der Auswahl der relevanten Bildpunkte (0 = keine)
+    Rückgabewert:
+        - bearbeitete_meridiane (list): Liste der Meridiane, deren Operate eingefügt wurden
+    """
+
+    # Wird ein Operat mehrmals angeführt, zählt (wie beim schrittweisen Einfügen) das zuletzt geladene
+    operate_input = []
+    for meridian_operat in mehrere_operate_input:
+        if meridian_operat in operate_input:
+            operate_input.remove(meridian_operat)
+        operate_input.append(meridian_operat)
+
+    # Lokale Bearbeitungsschritte aller Operate, gruppiert nach Meridian (Lade-Reihenfolge bleibt erhalten)
+    meridian_batches = {}
+    for meridian_operat in operate_input:
+        workspace_info, main_featureclasses_info, global_info, operatsflaeche = lokale_bearbeitung(
+            speicherort,
+            True,
+            meridian_operat,
+            meridianstreifen_pfad,
+            externe_prj_sammlung,
+            datenquelle,
+            vereinfachung_toleranz,
+            max_stuetzpunkte,
+            stereo_pruefung_info,
+            bildauswahl_optimieren,
+            hilbert_kompaktierung,
+            lokal_kachelgroesse
+        )
+        meridian_batches.setdefault(meridian_operat[0], []).append(
+            [workspace_info, main_featureclasses_info, global_info, operatsflaeche]
+        )
+
+    for meridian, batch in meridian_batches.items():
+        workspace_info, main_featureclasses_info, global_info, operatsflaeche = batch[-1]
+
+        # Hinzufügen aller Operatsflächen zu "flaechen_sammlung" in Lade-Reihenfolge (Attribut "zeitpunkt"), je Operat
+        # wird ein Ledger-Eintrag begonnen
+        ledger_versionen = operate_eintragen(
+            batch,
+            global_info
+        )
+
+        geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+        if arcpy.Exists(rf"{fds_output_global}\flaechen_partition"):
+            # Die Partition der Operatsflächen existiert bereits, die Operate werden in Lade-Reihenfolge lokal
+            # eingefügt (alle Batch-Operate sind bereits in "flaechen_sammlung" und werden dabei berücksichtigt)
+            for operat_workspace_info, operat_featureclasses_info, operat_global_info, operat_flaeche in batch:
+                zu_input_anfuegen, nicht_zu_input_anfuegen, flaechen_sammlung_final, \
+                    input_operat_ohne_ueberschneidungen = vektor_global.flaechen_partition_aktualisieren(
+                        operat_flaeche,
+                        global_info,
+                        operat_workspace_info
+                    )
+
+        else:
+            # Ein globaler Durchgang: Überschneidungen aller Operate des Meridians werden aufgelöst, die Partition der
+            # Operatsflächen wird einmalig erstellt (Grundlage für Punkte und spätere Operate)
+            zu_input_anfuegen, nicht_zu_input_anfuegen, flaechen_sammlung_final, input_operat_ohne_ueberschneidungen = \
+                ueberschneidungen_aufloesen(
+                    global_info,
+                    workspace_info,
+                    vereinfachung_toleranz,
+                    max_stuetzpunkte
+                )
+
+        # "punkte_sammlung" wird einmal für alle Operate des Meridians aktualisiert
+        loesch_punkte, hinzugefuegt_punkte = vektor_global.punkte_batch_aktualisieren(
+            [[operat_info[0], operat_info[1]] for operat_info in batch],
+            global_info,
             workspace_info
         )
 
-    # Talstreifen-Bildpunkte werden freigeschnitten
-    vektor_lokal.punkte_talstreifen_ausschneiden(
-        main_featureclasses_info,
-        schraege_flugstreifen_liste,
-        workspace_info
-    )
+        # Ledger-Einträge abschließen (gelöschte Punkte je Operat), Kompaktierung und Nachführung aller abgeleiteten
+        # Ergebnisse des Meridians
+        einfuegen_abschliessen(
+            batch,
+            ledger_versionen,
+            loesch_punkte,
+            hinzugefuegt_punkte,
+            flaechen_sammlung_final,
+            global_info,
+            workspace_info,
+            stereo_pruefung_info,
+            hilbert_kompaktierung,
+            abdeckung_zellgroesse,
+            abdeckung_index_erstellen
+        )
 
-    # Erstellung aller nötigen gdb, fds und fc für die Zusammenführung
-    global_info = workspace_funktionen.global_gdb_erstellen(
-        workspace_info
-    )
+    return list(meridian_batches.keys())
 
-    # Erstellung der Operatsfläche des aktuellen Operates
-    operatsflaeche = vektor_global.operat_flaeche_erstellen(
-        main_featureclasses_info,
-        workspace_info
-    )
 
-    # Hinzufügen der aktuellen Operatsfläche zu "flaechen_sammlung"
-    vektor_global.flaechen_sammlung_befuellen(
-        operatsflaeche,
+@func_info
+def operate_eintragen(operate, global_info):
+    """
+    Diese Funktion fügt die Operatsflächen in Lade-Reihenfolge (Attribut "zeitpunkt") in "flaechen_sammlung" ein und
+    beginnt je Operat einen Ledger-Eintrag, bevor Partition und "punkte_sammlung" verändert werden. Der Ledger des
+    Meridians wird bei bestehenden Meridianen vorher einmalig aus dem aktuellen Stand erstellt.
+    Parameter:
+        - operate (list): Liste aus [workspace_info, main_featureclasses_info, global_info, operatsflaeche] je Operat
+                          eines Meridians in Lade-Reihenfolge
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+    Rückgabewert:
+        - ledger_versionen (list): Version des begonnenen Ledger-Eintrags je Operat
+    """
+
+    abdeckung_ledger.ledger_initialisieren(
         global_info,
-        workspace_info
+        operate[-1][0]
     )
 
+    ledger_versionen = []
+    for operat_workspace_info, operat_featureclasses_info, operat_global_info, operat_flaeche in operate:
+        vektor_global.flaechen_sammlung_befuellen(
+            operat_flaeche,
+            global_info,
+            operat_workspace_info
+        )
+        ledger_versionen.append(abdeckung_ledger.einfuegen_beginnen(
+            global_info,
+            operat_featureclasses_info,
+            operat_workspace_info
+        ))
+    return ledger_versionen
+
+
+@func_info
+def ueberschneidungen_aufloesen(global_info, workspace_info, vereinfachung_toleranz, max_stuetzpunkte):
+    """
+    Diese Funktion löst die Überschneidungen aller Operate in "flaechen_sammlung" in einem Durchgang auf, erstellt
+    die Partition der Operatsflächen und "flaechen_sammlung_final" (gegebenenfalls beide vereinfacht).
+    Parameter:
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace des Input-Operates
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - vereinfachung_toleranz (float): Toleranz der Vereinfachung der Operatsflächen in Metern (0 = keine)
+        - max_stuetzpunkte (int): maximale Anzahl an Stützpunkten je Polygon nach der Vereinfachung
+    Rückgabewerte (tuple):
+        - zu_input_anfuegen (list): Überschneidungen, die dem Input Operat angefügt werden sollen
+        - nicht_zu_input_anfuegen (list): Überschneidungen, die nicht dem Input Operat angefügt werden sollen
+        - flaechen_sammlung_final (str): Pfad zu "flaechen_sammlung_final"
+        - input_operat_ohne_ueberschneidungen (str): Pfad zur Fläche des Input-Operates ohne Überschneidungen
+    """
+
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
     # Erstellung einer Featureclass mit Geometrie der Überschneidung und Informationen zu den schneidenden Operaten
     kombininierte_operat_ueberschneidungen = vektor_global.operat_ueberschneidungen(
         global_info
@@ -321,21 +849,125 @@ def main(speicherort, mehrere_operate, mehrere_operate_input, meridianstreifen_p
         workspace_info
     )
 
-    # Featureclasses mit Information zu Flächen des Input-Operates werden erstellt
-    fc_zu_input_anfuegen, fc_input_operat_ohne_ueberschneidungen = vektor_global.input_operat_aufteilen(
-        zu_input_anfuegen,
-        input_operat_ohne_ueberschneidungen,
+    # Partition der Operatsflächen
+    flaechen_partition = vektor_global.flaechen_partition_erstellen(
         global_info
     )
 
-    # Alle Punkte, die gelöscht werden müssen, oder neu hinzugefügt werden, werden in Listen gespeichert
-    loesch_punkte_liste, hinzugefuegt_punkte_liste = vektor_global.punkte_ausschneiden_hinzufuegen(
-        fc_zu_input_anfuegen,
-        fc_input_operat_ohne_ueberschneidungen,
+    # Vereinfachung der Partition (Bögen aus Erase), "flaechen_sammlung_final" wird aus der vereinfachten Partition
+    # gebildet, damit beide dieselben Grenzen haben
+    if vereinfachung_toleranz > 0:
+        flaechen_partition_vereinfacht = rf"{fds_temp_global}\flaechen_partition_vereinfacht"
+        vektor_global.flaechen_vereinfachen(
+            flaechen_partition,
+            flaechen_partition_vereinfacht,
+            vereinfachung_toleranz,
+            max_stuetzpunkte
+        )
+        arcpy.CopyFeatures_management(flaechen_partition_vereinfacht, flaechen_partition)
+        arcpy.Dissolve_management(flaechen_partition, flaechen_sammlung_final, dissolve_field="operat_nr")
+
+    return zu_input_anfuegen, nicht_zu_input_anfuegen, flaechen_sammlung_final, input_operat_ohne_ueberschneidungen
+
+
+@func_info
+def einfuegen_abschliessen(operate, ledger_versionen, loesch_punkte, hinzugefuegt_punkte, flaechen_sammlung_final,
+                           global_info, workspace_info, stereo_pruefung_info, hilbert_kompaktierung,
+                           abdeckung_zellgroesse, abdeckung_index_erstellen):
+    """
+    Diese Funktion schließt die Ledger-Einträge der eingefügten Operate mit dem Delta von "punkte_sammlung" ab,
+    kompaktiert die Sammlungen regelmäßig in Hilbert-Reihenfolge und führt alle abgeleiteten Ergebnisse des Meridians
+    nach (siehe "abdeckung_nachfuehren").
+    Parameter:
+        - operate (list): Liste aus [workspace_info, main_featureclasses_info, global_info, operatsflaeche] je Operat
+        - ledger_versionen (list): Version des begonnenen Ledger-Eintrags je Operat (siehe "operate_eintragen")
+        - loesch_punkte (dict): key = Operat, value = Schlüssel der aus "punkte_sammlung" entfernten Punkte
+        - hinzugefuegt_punkte (dict): key = Operat, value = Bildnamen der in "punkte_sammlung" eingefügten Punkte
+        - flaechen_sammlung_final (str): Pfad zu "flaechen_sammlung_final"
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace des Meridians
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m) und
+                                       Mindest-Längsüberdeckung der Stereo-Prüfung (None = keine Prüfung)
+        - hilbert_kompaktierung (int): Anzahl eingefügter Operate je Meridian zwischen zwei Kompaktierungen in
+                                       Hilbert-Reihenfolge (0 = keine Hilbert-Sortierung)
+        - abdeckung_zellgroesse (float): Zellgröße (m) der Karte von Alter und Dichte der Bildabdeckung (0 = keine)
+        - abdeckung_index_erstellen (bool): bei "True" wird der Abfrage-Index der Abdeckung fortgeführt
+    Rückgabewerte (tuple): siehe "abdeckung_nachfuehren"
+    """
+
+    # Ledger-Einträge mit gewonnenen Flächen und Delta von "punkte_sammlung" je Operat abschließen
+    for ledger_version, (operat_workspace_info, *_) in zip(ledger_versionen, operate):
+        operat = operat_workspace_info[2]
+        abdeckung_ledger.einfuegen_abschliessen(
+            ledger_version,
+            loesch_punkte.get(operat, []),
+            [bild_schluessel.schluessel_bilden(img_name, operat) for img_name in hinzugefuegt_punkte[operat]],
+            global_info,
+            operat_workspace_info
+        )
+
+    # Regelmäßige Kompaktierung von "punkte_sammlung" und "flaechen_sammlung" in Hilbert-Reihenfolge
+    if hilbert_kompaktierung:
+        hilbert_sortierung.sammlungen_kompaktieren(
+            global_info,
+            workspace_info,
+            hilbert_kompaktierung,
+            len(operate)
+        )
+
+    # Stereo-Prüfung, Operate außerhalb von Ö, .prj-Dateien, Manifest, Karte und Index der Abdeckung, Mosaic Dataset
+    return abdeckung_nachfuehren(
         global_info,
-        main_featureclasses_info
+        workspace_info,
+        flaechen_sammlung_final,
+        [schluessel for operat_schluessel in loesch_punkte.values() for schluessel in operat_schluessel],
+        {operat_workspace_info[2]: hinzugefuegt_punkte[operat_workspace_info[2]]
+         for operat_workspace_info, *_ in operate},
+        stereo_pruefung_info,
+        abdeckung_zellgroesse,
+        abdeckung_index_erstellen
     )
 
+
+@func_info
+def abdeckung_nachfuehren(global_info, workspace_info, flaechen_sammlung_final, loesch_punkte_liste,
+                          hinzugefuegt_punkte, stereo_pruefung_info, abdeckung_zellgroesse, abdeckung_index_erstellen):
+    """
+    Diese Funktion führt nach jeder Änderung von "punkte_sammlung" (Einfügen und Zurücksetzen von Operaten) alle
+    daraus abgeleiteten Ergebnisse des Meridians nach.
+    Parameter:
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace des Meridians
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - flaechen_sammlung_final (str): Pfad zu "flaechen_sammlung_final"
+        - loesch_punkte_liste (list): Schlüssel der aus "punkte_sammlung" entfernten Punkte
+        - hinzugefuegt_punkte (dict): key = Operat, value = Bildnamen der in "punkte_sammlung" eingefügten Punkte
+                                      (alle eingefügten Operate, auch ohne eingefügte Punkte)
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m) und
+                                       Mindest-Längsüberdeckung der Stereo-Prüfung (None = keine Prüfung)
+        - abdeckung_zellgroesse (float): Zellgröße (m) der Karte von Alter und Dichte der Bildabdeckung (0 = keine)
+        - abdeckung_index_erstellen (bool): bei "True" wird der Abfrage-Index der Abdeckung fortgeführt
+    Rückgabewerte (tuple):
+        - operate_ausserhalb (list): Operate, die zur Gänze außerhalb von Ö liegen
+        - prj_dateien (list): Pfade der angepassten .prj-Dateien
+        - mosaic_dataset (str): Pfad zum Mosaic Dataset des Meridians
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    # Stereo-Prüfung von "punkte_sammlung" nach der Auflösung der Überschneidungen
+    if stereo_pruefung_info:
+        stereo_bericht = stereo_pruefung.stereo_ketten_pruefen(
+            vektor_lokal.bildpunkte_lesen(punkte_sammlung, "operat_nr"),
+            stereo_pruefung_info
+        )
+        stereo_pruefung.stereo_bericht_schreiben(
+            stereo_bericht,
+            rf"{speicherort}\stereo_pruefung_punkte_sammlung.json"
+        )
+
     # Alle Namen der Operate, die zur Gänze ausserhalb von Ö liegen, werden in "operate_ausserhalb" gespeichert
     operate_ausserhalb = vektor_global.ausland_operate_bestimmen(
         flaechen_sammlung_final,
@@ -343,39 +975,210 @@ def main(speicherort, mehrere_operate, mehrere_operate_input, meridianstreifen_p
         workspace_info
     )
 
-    # Die Pfade in der .prj-Datei werden angepasst anhand von "hinzugefuegt_punkte_liste"
-    prj_dateien = prj_funktionen.prj_umschreiben(
-        hinzugefuegt_punkte_liste,
-        workspace_info
+    # Die Pfade in den .prj-Dateien jedes Operates werden angepasst
+    prj_dateien = []
+    for operat_nr, img_namen in hinzugefuegt_punkte.items():
+        operat_workspace_info = workspace_funktionen.workspace_info_ermitteln(meridian, operat_nr, speicherort)
+        if os.path.exists(operat_workspace_info[5]):
+            prj_dateien += prj_funktionen.prj_umschreiben(
+                img_namen,
+                operat_workspace_info
+            )
+
+    # Manifest der Bildauswahl des Meridians (Grundlage für den Neuaufbau des Mosaic Datasets)
+    bild_manifest.manifest_schreiben(
+        global_info,
+        workspace_info,
+        loesch_punkte_liste,
+        hinzugefuegt_punkte
     )
 
+    # Karte von Alter und Dichte der Bildabdeckung fortführen
+    if abdeckung_zellgroesse:
+        abdeckung_karte.karte_aktualisieren(
+            global_info,
+            workspace_info,
+            abdeckung_zellgroesse
+        )
+
+    # Abfrage-Index der Abdeckung fortführen
+    if abdeckung_index_erstellen:
+        abdeckung_index.index_fortfuehren(
+            global_info,
+            workspace_info,
+            loesch_punkte_liste,
+            hinzugefuegt_punkte,
+            stereo_pruefung_info
+        )
+
     # Erstelle Geodatabase und Mosaic Dataset
     mosaic_dataset = raster_global.raster_workspace_erstellen(
         workspace_info
     )
 
-    """    
-    # Lösche veraltete Bilder aus Mosaic Dataset
-    raster_global.bilder_aus_mosaic_entfernen(
-        mosaic_dataset,
-        loesch_punkte_liste
+    return operate_ausserhalb, prj_dateien, mosaic_dataset
+
+
+@func_info
+def ledger_bearbeitung(speicherort, zuruecksetzen_input, stichtag_input, stereo_pruefung_info=None,
+                       abdeckung_zellgroesse=0, abdeckung_index_erstellen=False):
+    """
+    Diese Funktion setzt Operate anhand des Ledgers zurück und erzeugt den Stand der Abdeckung zu Stichtagen, ohne
+    Operate neu zu berechnen. Nach jedem Zurücksetzen werden die abgeleiteten Ergebnisse wie nach dem Einfügen
+    nachgeführt (siehe "abdeckung_nachfuehren"), das Mosaic Dataset wird über "synchronisierung_input" abgeglichen.
+    Parameter:
+        - speicherort (str): Pfad des Speicherorts sämtlicher Ergebnisse und Zwischenergebnisse
+        - zuruecksetzen_input (list): Liste von Operaten (mit Meridian), die zurückgesetzt werden sollen
+        - stichtag_input (list): Liste von Stichtagen (mit Meridian), deren Stand der Abdeckung erzeugt werden soll
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m) und
+                                       Mindest-Längsüberdeckung der Stereo-Prüfung (None = keine Prüfung)
+        - abdeckung_zellgroesse (float): Zellgröße (m) der Karte von Alter und Dichte der Bildabdeckung (0 = keine)
+        - abdeckung_index_erstellen (bool): bei "True" wird der Abfrage-Index der Abdeckung fortgeführt
+    """
+
+    # Operate in der angegebenen Reihenfolge zurücksetzen
+    for meridian, operat in zuruecksetzen_input:
+        workspace_info = workspace_funktionen.workspace_info_ermitteln(meridian, operat, speicherort)
+        global_info = workspace_funktionen.global_gdb_erstellen(workspace_info)
+        abdeckung_ledger.ledger_initialisieren(
+            global_info,
+            workspace_info
+        )
+        loesch_punkte_liste, hinzugefuegt_abgleich_liste, hinzugefuegt_punkte = \
+            abdeckung_ledger.operat_zuruecksetzen(
+                operat,
+                global_info,
+                workspace_info
+            )
+        abdeckung_nachfuehren(
+            global_info,
+            workspace_info,
+            rf"{global_info[1]}\flaechen_sammlung_final",
+            loesch_punkte_liste,
+            hinzugefuegt_punkte,
+            stereo_pruefung_info,
+            abdeckung_zellgroesse,
+            abdeckung_index_erstellen
+        )
+
+    # Stand der Abdeckung zu den Stichtagen erzeugen
+    for meridian, stichtag in stichtag_input:
+        workspace_info = workspace_funktionen.workspace_info_ermitteln(meridian, " ", speicherort)
+        global_info = workspace_funktionen.global_gdb_erstellen(workspace_info)
+        abdeckung_ledger.abdeckung_materialisieren(
+            stichtag,
+            global_info,
+            workspace_info
+        )
+
+
+@func_info
+def neuaufbau(speicherort, meridian, kachelgroesse, vereinfachung_toleranz=0, max_stuetzpunkte=2000,
+              stereo_pruefung_info=None, abdeckung_zellgroesse=0, abdeckung_index_erstellen=False,
+              hilbert_kompaktierung=0):
+    """
+    Diese Funktion baut die Zuordnung aller Operate eines Meridians gekachelt und parallel neu auf (siehe
+    "meridian_neuaufbau.py") und führt danach die abgeleiteten Ergebnisse wie nach dem Einfügen nach (siehe
+    "abdeckung_nachfuehren", inklusive Bestimmung der Operate, die zur Gänze außerhalb von Ö liegen).
+    Parameter:
+        - speicherort (str): Pfad des Speicherorts sämtlicher Ergebnisse und Zwischenergebnisse
+        - meridian (str): Meridian-Bezeichnung
+        - kachelgroesse (float): Kantenlänge der Kacheln in Metern
+        - vereinfachung_toleranz (float): Toleranz der Vereinfachung der Partition in Metern (0 = keine)
+        - max_stuetzpunkte (int): maximale Anzahl an Stützpunkten je Polygon nach der Vereinfachung
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m) und
+                                       Mindest-Längsüberdeckung der Stereo-Prüfung (None = keine Prüfung)
+        - abdeckung_zellgroesse (float): Zellgröße (m) der Karte von Alter und Dichte der Bildabdeckung (0 = keine)
+        - abdeckung_index_erstellen (bool): bei "True" wird der Abfrage-Index der Abdeckung fortgeführt
+        - hilbert_kompaktierung (int): bei einem Wert ungleich 0 wird "punkte_sammlung" in Hilbert-Reihenfolge
+                                       geschrieben (siehe "hilbert_sortierung.py")
+    """
+
+    workspace_info = workspace_funktionen.workspace_info_ermitteln(meridian, " ", speicherort)
+    global_info = workspace_funktionen.global_gdb_erstellen(workspace_info)
+
+    flaechen_sammlung_final, loesch_punkte_liste, hinzugefuegt_abgleich_liste, hinzugefuegt_punkte = \
+        meridian_neuaufbau.meridian_neu_aufbauen(
+            global_info,
+            workspace_info,
+            kachelgroesse,
+            vereinfachung_toleranz=vereinfachung_toleranz,
+            max_stuetzpunkte=max_stuetzpunkte,
+            hilbert_sortieren=bool(hilbert_kompaktierung)
+        )
+
+    abdeckung_nachfuehren(
+        global_info,
+        workspace_info,
+        flaechen_sammlung_final,
+        loesch_punkte_liste,
+        hinzugefuegt_punkte,
+        stereo_pruefung_info,
+        abdeckung_zellgroesse,
+        abdeckung_index_erstellen
     )
 
-    # Alle benötigten Raster werden zum Mosaic Dataset hinzugefügt
-    raster_global.raster_zu_mosaic_hinzufuegen(
-        mosaic_dataset,
-        prj_dateien,
+
+@func_info
+def mosaic_abgleichen(speicherort, meridian, dgm_pfad, dgm_cache_info=None, mosaic_worker=1):
+    """
+    Diese Funktion gleicht das Mosaic Dataset eines Meridians mit "punkte_sammlung" ab (siehe
+    "mosaic_synchronisierung.py"), nur die Differenz wird entfernt bzw. eingefügt.
+    Parameter:
+        - speicherort (str): Pfad des Speicherorts sämtlicher Ergebnisse und Zwischenergebnisse
+        - meridian (str): Meridian-Bezeichnung
+        - dgm_pfad (str): Pfad zum aktuellen digitalen Geländemodell
+        - dgm_cache_info (list): Zellgröße (m) und maximale Größe (GB) des lokalen DGM (None = DGM aus "dgm_pfad")
+        - mosaic_worker (int): Anzahl der Worker-Prozesse beim Einfügen (1 = seriell, None = Anzahl der Prozessorkerne)
+    """
+
+    workspace_info = workspace_funktionen.workspace_info_ermitteln(meridian, " ", speicherort)
+    global_info = workspace_funktionen.global_gdb_erstellen(workspace_info)
+
+    mosaic_synchronisierung.mosaic_synchronisieren(
         dgm_pfad,
-        workspace_info
+        global_info,
+        workspace_info,
+        dgm_cache_info=dgm_cache_info,
+        max_worker=mosaic_worker
     )
 
-    # Lösche alle Raster der Operate, die zur Gänze außerhalb von Ö liegen
-    raster_global.operate_ausserhalb_loeschen(
-        mosaic_dataset,
-        operate_ausserhalb
-    )"""
 
-    return workspace_info
+@func_info
+def mosaic_aus_manifest(speicherort, meridian, dgm_pfad, dgm_cache_info=None, mosaic_worker=1):
+    """
+    Diese Funktion baut das Mosaic Dataset eines Meridians allein aus dem Manifest der Bildauswahl neu auf (siehe
+    "bild_manifest.py"), ohne Vektor-Bearbeitung.
+    Parameter:
+        - speicherort (str): Pfad des Speicherorts sämtlicher Ergebnisse und Zwischenergebnisse
+        - meridian (str): Meridian-Bezeichnung
+        - dgm_pfad (str): Pfad zum aktuellen digitalen Geländemodell
+        - dgm_cache_info (list): Zellgröße (m) und maximale Größe (GB) des lokalen DGM (None = DGM aus "dgm_pfad")
+        - mosaic_worker (int): Anzahl der Worker-Prozesse beim Einfügen (1 = seriell, None = Anzahl der Prozessorkerne)
+    """
+
+    workspace_info = workspace_funktionen.workspace_info_ermitteln(meridian, " ", speicherort)
+
+    bild_manifest.mosaic_aus_manifest_aufbauen(
+        dgm_pfad,
+        workspace_info,
+        dgm_cache_info,
+        mosaic_worker
+    )
+
+
+@func_info
+def stereo_modell_aktualisieren(speicherort, meridian, stereo_modell_erstellen):
+    """
+    Diese Funktion erstellt auf Wunsch das Stereo Modell des Mosaic Datasets eines Meridians.
+    Parameter:
+        - speicherort (str): Pfad des Speicherorts sämtlicher Ergebnisse und Zwischenergebnisse
+        - meridian (str): Meridian-Bezeichnung
+        - stereo_modell_erstellen (bool): bei "True" wird das Stereo Modell über "BuildStereoModel" erstellt
+    """
+
+    if stereo_modell_erstellen:
+        create_stereo_model(rf"{speicherort}\{meridian}_mosaic.gdb\mosaic")
 
 
 @func_info
@@ -0,0 +1,154 @@
+# Dieses Python-Skript prüft, ob die verbleibenden Bildpunkte je Flugstreifen noch durchgehende Stereopaare bilden.
+# Der Abstand aufeinanderfolgender Bilder wird mit der Längsüberdeckung verglichen, die sich aus Flughöhe über Grund,
+# Brennweite und Bildformat in Flugrichtung ergibt. Unterbrechungen werden je Operat und Flugstreifen als json-Bericht
+# ausgegeben, bevor sie erst bei "BuildStereoModel" oder bei der Interpretation auffallen.
+# Der Workflow wird durch das Starten von "main.py" initiiert, "stereo_pruefung.py" kann vom User ignoriert werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import json
+import numpy as np
+import flugstreifen_geometrie
+import ueberschneidung_regeln
+from info_wrapper import *
+
+
+def ueberlappung_berechnen(bildpunkte: np.ndarray, stereo_pruefung_info: list) -> tuple:
+    """
+    Die Funktion berechnet für jedes Bild den Abstand zum vorherigen Bild desselben Operates und Flugstreifens sowie
+    die daraus geschätzte Längsüberdeckung. Innerhalb eines Flugstreifens werden die Bilder nach "img_name" gereiht.
+    Parameter:
+        - bildpunkte (np.ndarray): strukturiertes Array mit den Feldern "img_name", "operat", "flugstreifen",
+                                   "flughoehe", "x" und "y"
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m),
+                                       Mindest-Längsüberdeckung (0-1)
+    Rückgabewert (tuple):
+        - flugstreifen (dict): Geometrie der Flugstreifen (siehe "flugstreifen_geometrie.flugstreifen_aufbauen"),
+                               Name = "operat|flugstreifen"
+        - ueberlappung (np.ndarray): geschätzte Längsüberdeckung zum vorherigen Bild je Stützpunkt (1 beim ersten Bild,
+                                     NaN, wenn die Flughöhe eines der beiden Bilder fehlt)
+    """
+
+    brennweite, bildformat_laengs, gelaendehoehe, mindest_ueberlappung = stereo_pruefung_info
+
+    daten = np.zeros(len(bildpunkte), dtype=[("schluessel", "U128"), ("img_name", "U128"), ("x", "f8"), ("y", "f8")])
+    daten["schluessel"] = np.char.add(np.char.add(bildpunkte["operat"].astype(str), "|"),
+                                      bildpunkte["flugstreifen"].astype(str))
+    daten["img_name"] = bildpunkte["img_name"]
+    daten["x"] = bildpunkte["x"]
+    daten["y"] = bildpunkte["y"]
+    flugstreifen = flugstreifen_geometrie.flugstreifen_aufbauen(daten, "schluessel", "img_name")
+
+    # Bodenabdeckung in Flugrichtung je Bild (Maßstabszahl * Bildformat)
+    flughoehe = ueberschneidung_regeln.zahlen_lesen(bildpunkte["flughoehe"])[flugstreifen["index"]]
+    bodenlaenge = np.maximum(flughoehe - gelaendehoehe, 0) * bildformat_laengs / brennweite
+
+    # Überdeckung zweier aufeinanderfolgender Bilder mit mittlerer Bodenabdeckung
+    mittlere_bodenlaenge = bodenlaenge.copy()
+    mittlere_bodenlaenge[1:] = (bodenlaenge[1:] + bodenlaenge[:-1]) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ueberlappung = np.where(mittlere_bodenlaenge > 0, 1 - flugstreifen["abstand"] / mittlere_bodenlaenge, 0)
+    ueberlappung[np.isnan(mittlere_bodenlaenge)] = np.nan
+    ueberlappung[flugstreifen["anfang"]] = 1
+
+    return flugstreifen, ueberlappung
+
+
+@func_info
+def stereo_ketten_pruefen(bildpunkte: np.ndarray, stereo_pruefung_info: list) -> dict:
+    """
+    Die Funktion ermittelt je Flugstreifen, ob die Bilder eine durchgehende Stereokette bilden. Eine Unterbrechung
+    liegt vor, wenn die Längsüberdeckung zweier aufeinanderfolgender Bilder kleiner als die Mindest-Längsüberdeckung
+    ist. Bildpaare ohne Flughöhe werden nicht bewertet, sondern je Flugstreifen gezählt ("ohne_flughoehe").
+    Parameter:
+        - bildpunkte (np.ndarray): strukturiertes Array mit den Feldern "img_name", "operat", "flugstreifen",
+                                   "flughoehe", "x" und "y"
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m),
+                                       Mindest-Längsüberdeckung (0-1)
+    Rückgabewert:
+        - bericht (dict): maschinenlesbarer Bericht mit den Schlüsseln "operate" (Zusammenfassung je Operat),
+                          "flugstreifen" (Kennzahlen je Flugstreifen) und "unterbrechungen" (Bildpaare)
+    """
+
+    mindest_ueberlappung = stereo_pruefung_info[3]
+    flugstreifen, ueberlappung = ueberlappung_berechnen(bildpunkte, stereo_pruefung_info)
+    anfang = flugstreifen["anfang"]
+    anzahl = flugstreifen["anzahl"]
+
+    # Unterbrechungen: zu geringe Überdeckung zum vorherigen Bild (erstes Bild eines Flugstreifens ausgenommen)
+    # Bildpaare ohne Flughöhe (NaN) sind weder Unterbrechung noch Stereopaar
+    ohne_flughoehe = np.isnan(ueberlappung)
+    unterbrochen = ~ohne_flughoehe & (ueberlappung < mindest_ueberlappung)
+    streifen_index = np.repeat(np.arange(len(anfang)), anzahl)
+    if len(anfang):
+        anzahl_unterbrechungen = np.add.reduceat(unterbrochen.astype(int), anfang)
+        anzahl_ohne_flughoehe = np.add.reduceat(ohne_flughoehe.astype(int), anfang)
+        min_ueberlappung = np.fmin.reduceat(np.where(np.arange(len(ueberlappung)) == anfang[streifen_index],
+                                                     np.inf, ueberlappung), anfang)
+    else:
+        anzahl_unterbrechungen = np.empty(0, dtype=int)
+        anzahl_ohne_flughoehe = np.empty(0, dtype=int)
+        min_ueberlappung = np.empty(0)
+
+    bericht = {
+        "mindest_ueberlappung": mindest_ueberlappung,
+        "operate": {},
+        "flugstreifen": [],
+        "unterbrechungen": []
+    }
+
+    for i, name in enumerate(flugstreifen["namen"]):
+        operat, streifen = str(name).split("|", 1)
+        eintrag = {
+            "operat": operat,
+            "flugstreifen": streifen,
+            "anzahl_bilder": int(anzahl[i]),
+            "stereopaare": int(anzahl[i] - 1 - anzahl_unterbrechungen[i] - anzahl_ohne_flughoehe[i]),
+            "stereoketten": int(anzahl_unterbrechungen[i] + 1),
+            "ohne_flughoehe": int(anzahl_ohne_flughoehe[i]),
+            "min_ueberlappung": round(float(min_ueberlappung[i]), 3)
+            if anzahl[i] > 1 and np.isfinite(min_ueberlappung[i]) else None,
+            "laenge": round(float(flugstreifen["laenge"][i]), 1)
+        }
+        bericht["flugstreifen"].append(eintrag)
+
+        zusammenfassung = bericht["operate"].setdefault(
+            operat, {"flugstreifen": 0, "unterbrochene_flugstreifen": 0, "unterbrechungen": 0,
+                     "flugstreifen_ohne_stereopaar": 0, "bildpaare_ohne_flughoehe": 0})
+        zusammenfassung["flugstreifen"] += 1
+        zusammenfassung["unterbrochene_flugstreifen"] += int(anzahl_unterbrechungen[i] > 0)
+        zusammenfassung["unterbrechungen"] += int(anzahl_unterbrechungen[i])
+        zusammenfassung["flugstreifen_ohne_stereopaar"] += int(eintrag["stereopaare"] == 0)
+        zusammenfassung["bildpaare_ohne_flughoehe"] += eintrag["ohne_flughoehe"]
+
+    # Bildpaare an den Unterbrechungen
+    img_name = bildpunkte["img_name"][flugstreifen["index"]]
+    for j in np.flatnonzero(unterbrochen):
+        operat, streifen = str(flugstreifen["namen"][streifen_index[j]]).split("|", 1)
+        bericht["unterbrechungen"].append({
+            "operat": operat,
+            "flugstreifen": streifen,
+            "bild_von": str(img_name[j - 1]),
+            "bild_bis": str(img_name[j]),
+            "abstand": round(float(flugstreifen["abstand"][j]), 1),
+            "ueberlappung": round(float(ueberlappung[j]), 3)
+        })
+
+    for operat, zusammenfassung in bericht["operate"].items():
+        print(f"Stereo-Prüfung {operat}: {zusammenfassung['unterbrechungen']} Unterbrechungen in "
+              f"{zusammenfassung['unterbrochene_flugstreifen']} von {zusammenfassung['flugstreifen']} Flugstreifen")
+
+    return bericht
+
+
+def stereo_bericht_schreiben(bericht: dict, json_datei: str) -> None:
+    """
+    Die Funktion schreibt den Bericht der Stereo-Prüfung in eine json-Datei.
+    Parameter:
+        - bericht (dict): Ergebnis von "stereo_ketten_pruefen"
+        - json_datei (str): Pfad der json-Datei
+    """
+    with open(json_datei, "w") as datei:
+        json.dump(bericht, datei, indent=2)
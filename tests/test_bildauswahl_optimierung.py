@@ -0,0 +1,76 @@
+# Tests zur Reduktion der Bildpunkte auf eine Auswahl mit Stereoabdeckung ("bildauswahl_optimierung.py").
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bildauswahl_optimierung  # noqa: E402
+import numpy_geometrie  # noqa: E402
+import stereo_pruefung  # noqa: E402
+
+# Brennweite 100 mm, Bildformat 60 mm, Geländehöhe 0 m: Bodenlänge = Flughöhe * 0,6
+KAMERA = [100.0, 60.0, 0.0, 0.5]
+# Operatsfläche 0..1500 x -200..700
+RINGE = [np.array([[0, -200], [1500, -200], [1500, 700], [0, 700]], dtype=float)]
+ZELLGROESSE = 25.0
+
+
+def _bildpunkte(flughoehe: str = "1000") -> np.ndarray:
+    # zwei Flugstreifen (y = 0 und y = 500) mit je 16 Bildern im Abstand von 100 m, Bodenlänge 600 m
+    x = np.tile(np.arange(0, 1600, 100), 2)
+    bildpunkte = np.zeros(len(x), dtype=[("img_name", "U16"), ("operat", "U16"), ("flugstreifen", "U16"),
+                                         ("flughoehe", "U16"), ("x", "f8"), ("y", "f8")])
+    bildpunkte["img_name"] = [f"bild_{i:02d}" for i in range(len(x))]
+    bildpunkte["operat"] = "2020260"
+    bildpunkte["flugstreifen"] = np.repeat(["1", "2"], 16)
+    bildpunkte["flughoehe"] = flughoehe
+    bildpunkte["x"] = x
+    bildpunkte["y"] = np.repeat([0.0, 500.0], 16)
+    return bildpunkte
+
+
+def _abdeckung(bildpunkte: np.ndarray, behalten: np.ndarray) -> tuple:
+    # Zellen aller Stereomodelle und Zellen der Stereomodelle, deren beide Bilder behalten werden
+    modelle = bildauswahl_optimierung.stereomodelle_bilden(bildpunkte, KAMERA)
+    spalten, zeilen = int(1500 / ZELLGROESSE), int(900 / ZELLGROESSE)
+    maske = numpy_geometrie.polygon_rasterisieren(RINGE, 0, -200, ZELLGROESSE, zeilen, spalten)
+    zellen = bildauswahl_optimierung.modelle_rastern(modelle, maske, 0, -200, ZELLGROESSE)
+    alle = set(np.concatenate(zellen).tolist())
+    gewaehlt = behalten[modelle["links"]] & behalten[modelle["rechts"]]
+    return alle, set(np.concatenate([zellen[m] for m in np.flatnonzero(gewaehlt)]).tolist())
+
+
+def test_abdeckung_bleibt_erhalten():
+    bildpunkte = _bildpunkte()
+    behalten, bericht = bildauswahl_optimierung.auswahl_optimieren(bildpunkte, RINGE, KAMERA, ZELLGROESSE)
+    alle, gewaehlt = _abdeckung(bildpunkte, behalten)
+    assert gewaehlt == alle
+    assert bericht["anzahl_nachher"] < bericht["anzahl_vorher"]
+    assert bericht["anzahl_nachher"] == int(behalten.sum())
+
+
+def test_stereopaare_bleiben_erhalten():
+    bildpunkte = _bildpunkte()
+    behalten, bericht = bildauswahl_optimierung.auswahl_optimieren(bildpunkte, RINGE, KAMERA, ZELLGROESSE)
+    # beide Flugstreifen bilden weiterhin je eine durchgehende Stereokette
+    pruefung = stereo_pruefung.stereo_ketten_pruefen(bildpunkte[behalten], KAMERA)
+    assert pruefung["unterbrechungen"] == []
+    assert [streifen["stereoketten"] for streifen in pruefung["flugstreifen"]] == [1, 1]
+    assert bericht["unterbrechungen"] == 0
+    # jedes behaltene Bild hat einen behaltenen Stereopartner
+    modelle = bildauswahl_optimierung.stereomodelle_bilden(bildpunkte, KAMERA)
+    gewaehlt = behalten[modelle["links"]] & behalten[modelle["rechts"]]
+    partner = set(modelle["links"][gewaehlt].tolist()) | set(modelle["rechts"][gewaehlt].tolist())
+    assert partner == set(np.flatnonzero(behalten).tolist())
+
+
+def test_flughoehe_als_text():
+    # Dezimalkomma wird gelesen, Bilder ohne Flughöhe bilden kein Stereomodell und werden behalten
+    bildpunkte = _bildpunkte("1000,0")
+    bildpunkte["flughoehe"][[0, 16]] = ""
+    behalten, bericht = bildauswahl_optimierung.auswahl_optimieren(bildpunkte, RINGE, KAMERA, ZELLGROESSE)
+    assert behalten[0] and behalten[16]
+    assert bericht["anzahl_nachher"] < bericht["anzahl_vorher"]
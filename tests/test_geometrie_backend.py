@@ -0,0 +1,106 @@
+# Tests des NumPy-Backends der Geometrie-Schnittstelle ("geometrie_backend.py") anhand bekannter Geometrien.
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geometrie_backend import NumpyBackend, PolygonFlaeche, RasterFlaeche  # noqa: E402
+
+QUADRAT = [np.array([[0, 0], [1000, 0], [1000, 1000], [0, 1000]], dtype=float)]
+
+
+def _punkte(x: list, y: list, streifen: list) -> np.ndarray:
+    daten = np.zeros(len(x), dtype=[("flugstreifen", "U8"), ("x", "f8"), ("y", "f8")])
+    daten["flugstreifen"] = streifen
+    daten["x"] = x
+    daten["y"] = y
+    return daten
+
+
+def _flaeche(raster: RasterFlaeche) -> float:
+    return raster.maske.sum() * raster.zellgroesse ** 2
+
+
+def test_punkte_filtern_und_lesen():
+    backend = NumpyBackend(10.0)
+    punkte = backend.punkte_erstellen(_punkte([100, 2000, 500], [100, 100, 900], ["a", "b", "c"]))
+    innen = backend.auswahl_nach_lage(punkte, backend.flaeche_laden(QUADRAT))
+    assert list(innen) == [True, False, True]
+    gefiltert = backend.filtern(punkte, innen)
+    assert backend.anzahl(gefiltert) == 2
+    assert list(backend.lesen(gefiltert, ["flugstreifen"])["flugstreifen"]) == ["a", "c"]
+    assert backend.anzahl(backend.ausschneiden(punkte, backend.flaeche_laden(QUADRAT))) == 2
+
+
+def test_punkte_zu_linien_und_richtungsmittel():
+    backend = NumpyBackend(10.0)
+    # "n": Richtung Norden, 300 m; "o": Richtung Osten, 200 m
+    punkte = backend.punkte_erstellen(_punkte([0, 0, 0, 0, 100, 200, 300], [0, 100, 200, 300, 500, 500, 500],
+                                              ["n"] * 4 + ["o"] * 3))
+    linien = backend.punkte_zu_linien(punkte, "flugstreifen")
+    assert list(linien.attribute["flugstreifen"]) == ["n", "o"]
+    assert np.allclose(linien.attribute["laenge"], [300, 200])
+    richtung = backend.lesen(backend.richtungsmittel(linien, "flugstreifen"),
+                             ["flugstreifen", "kompass_winkel", "laenge"])
+    assert np.allclose(richtung["kompass_winkel"], [0, 90])
+    assert np.allclose(richtung["laenge"], [300, 200])
+
+    nur_ost = backend.filtern(linien, np.array([False, True]))
+    assert backend.anzahl(nur_ost) == 1
+    assert np.allclose(nur_ost.x, [100, 200, 300]) and np.allclose(nur_ost.y, 500)
+
+
+def test_linien_ausschneiden():
+    backend = NumpyBackend(10.0)
+    # 2000 m lange Linie, davon 1000 m innerhalb des Quadrats
+    punkte = backend.punkte_erstellen(_punkte([-500, 1500], [500, 500], ["a", "a"]))
+    linien = backend.punkte_zu_linien(punkte, "flugstreifen")
+    ausgeschnitten = backend.ausschneiden(linien, backend.flaeche_laden(QUADRAT))
+    assert np.isclose(backend.lesen(ausgeschnitten, ["laenge"])["laenge"][0], 1000, atol=10)
+    # das Original bleibt unverändert
+    assert np.isclose(linien.attribute["laenge"][0], 2000)
+
+
+def test_puffern_punkte():
+    backend = NumpyBackend(10.0)
+    puffer = backend.puffern(backend.punkte_erstellen(_punkte([0], [0], ["a"])), 100)
+    assert list(puffer.enthaelt(np.array([0.0, 70.0, 71.0]), np.array([99.0, 70.0, 71.0]))) == [True, True, False]
+    assert np.isclose(_flaeche(puffer.rastern(10.0)), np.pi * 100 ** 2, rtol=0.05)
+
+
+def test_puffern_negativ_und_loeschen():
+    backend = NumpyBackend(10.0)
+    quadrat = backend.flaeche_laden(QUADRAT)
+    assert np.isclose(_flaeche(quadrat.rastern(10.0)), 1000 ** 2)
+    verkleinert = backend.puffern(quadrat, -100)
+    assert np.isclose(_flaeche(verkleinert), 800 ** 2, rtol=0.02)
+    rand = backend.loeschen(quadrat, verkleinert)
+    assert np.isclose(_flaeche(rand), 1000 ** 2 - 800 ** 2, rtol=0.02)
+    assert backend.ist_leer(backend.puffern(quadrat, -600))
+    assert not backend.ist_leer(verkleinert)
+
+
+def test_einzelteile_und_vereinigen():
+    backend = NumpyBackend(10.0)
+    # zwei Quadrate mit 500 m Abstand: getrennt, nach 300 m Puffer verbunden
+    zweites = [QUADRAT[0] + [1500, 0]]
+    beide = backend.vereinigen([backend.flaeche_laden(QUADRAT), backend.flaeche_laden(zweites)])
+    assert len(backend.einzelteile(beide)) == 2
+    assert len(backend.einzelteile(backend.puffern(beide, 300))) == 1
+    assert np.isclose(_flaeche(beide), 2 * 1000 ** 2)
+
+
+def test_huellen_nach_puffern():
+    backend = NumpyBackend(10.0)
+    # "gross": Hülle 1000 x 1000 m, "klein": Hülle 100 x 100 m verschwindet beim Puffern um -100 m
+    punkte = backend.punkte_erstellen(_punkte([0, 1000, 1000, 0, 0, 100, 100, 0], [0, 0, 1000, 1000, 0, 0, 100, 100],
+                                              ["gross"] * 4 + ["klein"] * 4))
+    assert list(backend.huellen_nach_puffern(punkte, "flugstreifen", -100)) == ["gross"]
+
+
+def test_polygon_flaeche_ausdehnung():
+    assert PolygonFlaeche(QUADRAT).ausdehnung() == (0, 0, 1000, 1000)
+    assert PolygonFlaeche([]).ausdehnung() is None
@@ -0,0 +1,95 @@
+# Tests der lokalen Bildauswahl mit dem NumPy-Backend ("lokale_pipeline.py") an einem konstruierten Operat.
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lokale_pipeline  # noqa: E402
+from geometrie_backend import NumpyBackend  # noqa: E402
+
+# Ö mit Puffer und Meridianstreifen: Quadrat 0..100 km, gepufferter Meridianstreifen etwas größer
+OESTERREICH = [np.array([[0, 0], [100000, 0], [100000, 100000], [0, 100000]], dtype=float)]
+MERIDIANSTREIFEN_BUFFER = [np.array([[-5000, -5000], [105000, -5000], [105000, 105000], [-5000, 105000]],
+                                    dtype=float)]
+
+
+def _streifen(bild_info: dict, name: str, x: np.ndarray, y: np.ndarray):
+    for i, (xi, yi) in enumerate(zip(x, y)):
+        bild_info[f"{name}_{i:03d}"] = [float(xi), float(yi), 3000.0]
+
+
+def _operat(talstreifen: bool = False) -> np.ndarray:
+    """
+    Operat mit 10 horizontalen Flugstreifen "H..", einem Block aus 6 vertikalen Flugstreifen "V.." ohne horizontale
+    Flugstreifen, einem einzelnen vertikalen Randstreifen "R01", einem Flugstreifen außerhalb von Ö "A01" und einem
+    langen schrägen Flugstreifen "S01". Optional kommt ein kurzer schräger Talstreifen "T01" quer über die
+    horizontalen Flugstreifen hinzu.
+    """
+    bild_info = {}
+    if talstreifen:
+        _streifen(bild_info, "T01", np.arange(15000, 30001, 500), np.arange(12000, 27001, 500))
+    for i in range(10):
+        _streifen(bild_info, f"H{i:02d}", np.arange(10000, 40001, 1000), np.full(31, 10000 + i * 2000))
+    for i in range(6):
+        _streifen(bild_info, f"V{i:02d}", np.full(31, 60000 + i * 2000), np.arange(10000, 40001, 1000))
+    _streifen(bild_info, "R01", np.full(31, 5000), np.arange(10000, 40001, 1000))
+    _streifen(bild_info, "A01", np.arange(10000, 40001, 1000), np.full(31, 150000))
+    _streifen(bild_info, "S01", np.arange(50000, 80001, 1000), np.arange(50000, 80001, 1000))
+    return lokale_pipeline.bildpunkte_array(bild_info, [{"0": "Flugstreifen"}, "_"], "2020260")
+
+
+def test_bildpunkte_array():
+    bildpunkte = _operat()
+    assert len(bildpunkte) == 19 * 31
+    assert bildpunkte["flugstreifen"][0] == "H00"
+    assert bildpunkte["img_name"][0] == "H00_000"
+    assert (bildpunkte["operat"] == "2020260").all()
+    assert (bildpunkte["flughoehe"] == 3000).all()
+
+
+def test_flugstreifen_klassifizieren():
+    backend = NumpyBackend(50.0)
+    klassifikation, _ = lokale_pipeline.flugstreifen_klassifizieren(
+        backend, _operat(), backend.flaeche_laden(OESTERREICH), backend.flaeche_laden(OESTERREICH))
+    assert klassifikation["ausserhalb"] == ["A01"]
+    assert klassifikation["ungunst"] == ["S01"]
+    assert klassifikation["horizontal"] == [f"H{i:02d}" for i in range(10)]
+    assert klassifikation["vertikal"] == ["R01"] + [f"V{i:02d}" for i in range(6)]
+    assert klassifikation["vertikal_benoetigt"] == [f"V{i:02d}" for i in range(6)]
+    assert klassifikation["schraeg"] == []
+
+
+def test_bildpunkte_auswaehlen():
+    backend = NumpyBackend(50.0)
+    bildpunkte = _operat()
+    klassifikation, richtung = lokale_pipeline.flugstreifen_klassifizieren(
+        backend, bildpunkte, backend.flaeche_laden(OESTERREICH), backend.flaeche_laden(OESTERREICH))
+    extrahiert = lokale_pipeline.bildpunkte_auswaehlen(backend, bildpunkte, klassifikation, richtung,
+                                                       backend.flaeche_laden(MERIDIANSTREIFEN_BUFFER))
+    streifen = bildpunkte["flugstreifen"].astype("U1")
+    # horizontale Flugstreifen und der Block vertikaler Flugstreifen bleiben vollständig erhalten
+    assert extrahiert[(streifen == "H") | (streifen == "V")].all()
+    # Randstreifen, Flugstreifen außerhalb von Ö und lange schräge Flugstreifen werden gelöscht
+    assert not extrahiert[(streifen == "R") | (streifen == "A") | (streifen == "S")].any()
+
+
+def test_gekachelt_unabhaengig_von_kachelgroesse():
+    backend = NumpyBackend(100.0)
+    bildpunkte = _operat(talstreifen=True)
+    klassifikation, richtung = lokale_pipeline.flugstreifen_klassifizieren(
+        backend, bildpunkte, backend.flaeche_laden(OESTERREICH), backend.flaeche_laden(OESTERREICH))
+    assert klassifikation["schraeg"] == ["T01"]
+    ohne_kacheln = bildpunkte[lokale_pipeline.bildpunkte_auswaehlen(
+        backend, bildpunkte, klassifikation, richtung, backend.flaeche_laden(MERIDIANSTREIFEN_BUFFER))]
+    # der Talstreifen bleibt erhalten, Bildpunkte anderer Flugstreifen in seiner Nähe werden gelöscht
+    assert (ohne_kacheln["flugstreifen"] == "T01").sum() == 31
+    assert len(ohne_kacheln) < len(bildpunkte[np.isin(bildpunkte["flugstreifen"].astype("U1"), ["H", "V", "T"])])
+
+    for kachelgroesse in [3000.0, 7000.0]:
+        gekachelt = lokale_pipeline.lokale_bildauswahl_gekachelt(
+            bildpunkte, OESTERREICH, OESTERREICH, MERIDIANSTREIFEN_BUFFER, kachelgroesse=kachelgroesse,
+            zellgroesse=100.0, max_worker=2)
+        assert np.array_equal(gekachelt, ohne_kacheln)
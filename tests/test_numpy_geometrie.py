@@ -0,0 +1,144 @@
+# Tests der reinen NumPy-Geometriefunktionen ("numpy_geometrie.py") anhand bekannter Geometrien.
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy_geometrie  # noqa: E402
+
+# Quadrat 0..100 mit einem Loch 40..60
+QUADRAT = np.array([[0, 0], [100, 0], [100, 100], [0, 100]], dtype=float)
+LOCH = np.array([[40, 40], [60, 40], [60, 60], [40, 60]], dtype=float)
+
+
+def test_punkte_in_polygon_mit_loch():
+    x = np.array([10.0, 50.0, 150.0, 90.0, -1.0])
+    y = np.array([10.0, 50.0, 50.0, 50.0, 50.0])
+    innen = numpy_geometrie.punkte_in_polygon(x, y, [QUADRAT, LOCH])
+    assert list(innen) == [True, False, False, True, False]
+    assert not numpy_geometrie.punkte_in_polygon(x, y, []).any()
+
+
+def test_punkte_in_polygon_in_bloecken(monkeypatch):
+    # kleine Blöcke liefern dasselbe Ergebnis wie ein einziger Block
+    x = np.linspace(-10, 110, 97)
+    y = np.linspace(110, -10, 97)
+    erwartet = numpy_geometrie.punkte_in_polygon(x, y, [QUADRAT, LOCH])
+    monkeypatch.setattr(numpy_geometrie, "BLOCK_ELEMENTE", 8)
+    assert np.array_equal(numpy_geometrie.punkte_in_polygon(x, y, [QUADRAT, LOCH]), erwartet)
+
+
+def test_erstes_polygon():
+    # das Loch des ersten Polygons wird vom zweiten Polygon abgedeckt
+    kleines_quadrat = [np.array([[30, 30], [70, 30], [70, 70], [30, 70]], dtype=float)]
+    index = numpy_geometrie.erstes_polygon([10.0, 50.0, 35.0, 150.0], [10.0, 50.0, 35.0, 50.0],
+                                           [[QUADRAT, LOCH], kleines_quadrat])
+    assert list(index) == [0, 1, 0, -1]
+
+
+def test_kacheln_einteilen():
+    rng = np.random.default_rng(3)
+    x, y = rng.uniform(-50, 250, 500), rng.uniform(-50, 250, 500)
+    kacheln = numpy_geometrie.kacheln_einteilen([[0, 0, 100, 100], [120, 120, 180, 140]], x, y, 50)
+    # 3 x 3 Kacheln (die Kante bei 100 berührt die dritte Reihe) und eine weitere Kachel der zweiten Fläche
+    assert len(kacheln) == 10
+    alle = np.concatenate([indices for kachel, beruehrt, indices in kacheln])
+    # jeder Punkt höchstens einmal, alle Punkte innerhalb der berührten Kacheln
+    assert len(alle) == len(np.unique(alle))
+    innen = ((x >= 0) & (x < 150) & (y >= 0) & (y < 150)) | ((x >= 150) & (x < 200) & (y >= 100) & (y < 150))
+    assert np.array_equal(np.sort(alle), np.flatnonzero(innen))
+    for (xmin, ymin, xmax, ymax), beruehrt, indices in kacheln:
+        assert ((x[indices] >= xmin) & (x[indices] < xmax) & (y[indices] >= ymin) & (y[indices] < ymax)).all()
+
+
+def test_kacheln_parallel_wie_seriell():
+    # Zuordnung der Punkte zum ersten Polygon: gekachelt in Worker-Prozessen wie in einem Durchgang
+    rng = np.random.default_rng(5)
+    polygone, ausdehnung = [], []
+    for xmin, ymin in rng.uniform(0, 900, (25, 2)):
+        breite, hoehe = rng.uniform(50, 300, 2)
+        ring = np.array([[xmin, ymin], [xmin + breite, ymin], [xmin + breite, ymin + hoehe], [xmin, ymin + hoehe]])
+        polygone.append([ring])
+        ausdehnung.append([xmin, ymin, xmin + breite, ymin + hoehe])
+    x, y = rng.uniform(0, 1200, 3000), rng.uniform(0, 1200, 3000)
+    seriell = numpy_geometrie.erstes_polygon(x, y, polygone)
+
+    kacheln = numpy_geometrie.kacheln_einteilen(ausdehnung, x, y, 170)
+    gekachelt = np.full(len(x), -1, dtype=np.int64)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        ergebnisse = executor.map(numpy_geometrie.erstes_polygon, [x[indices] for kachel, beruehrt, indices in kacheln],
+                                  [y[indices] for kachel, beruehrt, indices in kacheln],
+                                  [[polygone[i] for i in beruehrt] for kachel, beruehrt, indices in kacheln])
+        for (kachel, beruehrt, indices), index in zip(kacheln, ergebnisse):
+            gekachelt[indices] = np.append(beruehrt, -1)[index]
+    assert np.array_equal(gekachelt, seriell)
+
+
+def test_abstand_zu_strecken():
+    # Strecke (0, 0) - (10, 0) und ein einzelner Punkt (Strecke der Länge 0) bei (20, 20)
+    ax, ay = np.array([0.0, 20.0]), np.array([0.0, 20.0])
+    bx, by = np.array([10.0, 20.0]), np.array([0.0, 20.0])
+    abstand = numpy_geometrie.abstand_zu_strecken([5.0, -3.0, 14.0, 20.0], [2.0, 4.0, 0.0, 23.0], ax, ay, bx, by)
+    assert np.allclose(abstand, [2.0, 5.0, 4.0, 3.0])
+    assert np.isinf(numpy_geometrie.abstand_zu_strecken([0.0], [0.0], *[np.empty(0)] * 4)).all()
+
+
+def test_kompasswinkel():
+    winkel = numpy_geometrie.kompasswinkel(np.array([0.0, 1.0, 0.0, -1.0]), np.array([1.0, 0.0, -1.0, 0.0]))
+    assert np.allclose(winkel, [0.0, 90.0, 180.0, 270.0])
+
+
+def test_strecken_abtasten():
+    x, y, strecke, anteil = numpy_geometrie.strecken_abtasten(np.array([0.0]), np.array([0.0]), np.array([10.0]),
+                                                              np.array([0.0]), 3.0)
+    assert len(x) == 4
+    assert np.allclose(x, [1.25, 3.75, 6.25, 8.75])
+    assert np.allclose(y, 0.0)
+    assert list(strecke) == [0, 0, 0, 0]
+    assert np.isclose(anteil.sum(), 10.0)
+
+
+def test_polygon_rasterisieren():
+    # Zellgröße 10: 10 x 10 Zellen im Quadrat, davon 2 x 2 im Loch
+    maske = numpy_geometrie.polygon_rasterisieren([QUADRAT, LOCH], -10.0, -10.0, 10.0, 12, 12)
+    assert maske.sum() == 100 - 4
+    assert not maske[0].any() and not maske[:, 0].any()
+    assert maske[1, 1] and not maske[5, 5]
+
+
+def test_abstandsfeld():
+    saat = np.zeros((7, 7), dtype=bool)
+    saat[3, 3] = True
+    abstand = numpy_geometrie.abstandsfeld(saat, 5)
+    i, j = np.indices(saat.shape)
+    assert np.allclose(abstand, np.hypot(i - 3, j - 3))
+
+
+def test_komponenten_beschriften():
+    maske = np.zeros((5, 6), dtype=bool)
+    maske[0:2, 0:2] = True
+    # diagonal verbunden (8er-Nachbarschaft)
+    maske[2, 2] = True
+    maske[4, 4:6] = True
+    beschriftung, anzahl = numpy_geometrie.komponenten_beschriften(maske)
+    assert anzahl == 2
+    assert beschriftung[0, 0] == beschriftung[2, 2] != beschriftung[4, 5]
+    assert (beschriftung[~maske] == 0).all()
+
+
+def test_konvexe_huelle():
+    punkte = np.vstack((QUADRAT, [[50, 50], [20, 70], [100, 50]]))
+    huelle = numpy_geometrie.konvexe_huelle(punkte)
+    assert sorted(map(tuple, huelle)) == sorted(map(tuple, QUADRAT))
+
+
+def test_huelle_puffern():
+    huelle = numpy_geometrie.konvexe_huelle(QUADRAT)
+    verkleinert = numpy_geometrie.huelle_puffern(huelle, -10)
+    assert np.allclose(verkleinert.min(axis=0), [10, 10])
+    assert np.allclose(verkleinert.max(axis=0), [90, 90])
+    assert len(numpy_geometrie.huelle_puffern(huelle, -60)) == 0
@@ -0,0 +1,51 @@
+# Tests zur Stereo-Prüfung der Bildpunkte je Flugstreifen ("stereo_pruefung.py").
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stereo_pruefung  # noqa: E402
+
+# Brennweite 100 mm, Bildformat 60 mm, Geländehöhe 0 m: Bodenlänge = Flughöhe * 0,6
+KAMERA = [100.0, 60.0, 0.0, 0.5]
+
+
+def _bildpunkte(x: list, flughoehe: list) -> np.ndarray:
+    bildpunkte = np.zeros(len(x), dtype=[("img_name", "U16"), ("operat", "U16"), ("flugstreifen", "U16"),
+                                         ("flughoehe", "U16"), ("x", "f8"), ("y", "f8")])
+    bildpunkte["img_name"] = [f"bild_{i:02d}" for i in range(len(x))]
+    bildpunkte["operat"] = "2020260"
+    bildpunkte["flugstreifen"] = "1"
+    bildpunkte["flughoehe"] = flughoehe
+    bildpunkte["x"] = x
+    return bildpunkte
+
+
+def test_durchgehende_kette():
+    # Bodenlänge 600 m, Abstand 200 m: Überdeckung 2/3
+    bericht = stereo_pruefung.stereo_ketten_pruefen(_bildpunkte([0, 200, 400], ["1000"] * 3), KAMERA)
+    streifen = bericht["flugstreifen"][0]
+    assert streifen["stereopaare"] == 2
+    assert streifen["stereoketten"] == 1
+    assert abs(streifen["min_ueberlappung"] - 2 / 3) < 1e-3
+    assert bericht["unterbrechungen"] == []
+
+
+def test_unterbrechung():
+    bericht = stereo_pruefung.stereo_ketten_pruefen(_bildpunkte([0, 200, 900], ["1000"] * 3), KAMERA)
+    assert bericht["flugstreifen"][0]["stereoketten"] == 2
+    assert [(eintrag["bild_von"], eintrag["bild_bis"]) for eintrag in bericht["unterbrechungen"]] == \
+        [("bild_01", "bild_02")]
+
+
+def test_fehlende_flughoehe():
+    # leere Flughöhe (null_value = "") wird nicht bewertet, statt die Prüfung abzubrechen
+    bericht = stereo_pruefung.stereo_ketten_pruefen(_bildpunkte([0, 200, 900], ["1000", "", "1000,0"]), KAMERA)
+    streifen = bericht["flugstreifen"][0]
+    assert streifen["ohne_flughoehe"] == 2
+    assert streifen["stereopaare"] == 0
+    assert bericht["unterbrechungen"] == []
+    assert bericht["operate"]["2020260"]["bildpaare_ohne_flughoehe"] == 2
@@ -0,0 +1,54 @@
+# Tests zum Regelwerk der Zuordnung von Überschneidungsflächen ("ueberschneidung_regeln.py").
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ueberschneidung_regeln  # noqa: E402
+
+
+def test_leere_eingabe():
+    kandidaten = ueberschneidung_regeln.kandidaten_zerlegen([], [], [])
+    assert kandidaten["anzahl_flaechen"] == 0
+    assert len(kandidaten["flaeche"]) == 0
+    assert len(ueberschneidung_regeln.gewinner_ermitteln(kandidaten)) == 0
+    assert len(ueberschneidung_regeln.operate_reihen([], [])) == 0
+
+
+def test_einzelner_kandidat():
+    kandidaten = ueberschneidung_regeln.kandidaten_zerlegen(["2020260"], ["2020"], ["1,5"])
+    assert list(ueberschneidung_regeln.gewinner_ermitteln(kandidaten)) == [0]
+    assert kandidaten["zeitpunkt"][0] == 1.5
+
+
+def test_neuestes_jahr_gewinnt():
+    kandidaten = ueberschneidung_regeln.kandidaten_erstellen([0, 0, 1, 1], ["a", "b", "c", "d"],
+                                                             np.array([2019, 2021, 2022, 2020]),
+                                                             np.array([5.0, 1.0, 1.0, 5.0]))
+    assert list(ueberschneidung_regeln.gewinner_ermitteln(kandidaten)) == [1, 2]
+
+
+def test_gleichstand():
+    # gleiches Jahr: späterer Lade-Zeitpunkt gewinnt
+    kandidaten = ueberschneidung_regeln.kandidaten_zerlegen(["a;b"], ["2020;2020"], ["1.0;2.0"])
+    assert list(ueberschneidung_regeln.gewinner_ermitteln(kandidaten)) == [1]
+    # vollständiger Gleichstand: zuerst angeführter Kandidat gewinnt
+    kandidaten = ueberschneidung_regeln.kandidaten_zerlegen(["a;b"], ["2020;2020"], ["1.0;1.0"])
+    assert list(ueberschneidung_regeln.gewinner_ermitteln(kandidaten)) == [0]
+    # Zusatz-Kriterium entscheidet den Gleichstand
+    assert list(ueberschneidung_regeln.gewinner_ermitteln(kandidaten, [np.array([0, 1])])) == [1]
+
+
+def test_fehlende_werte_reihen_zuletzt():
+    kandidaten = ueberschneidung_regeln.kandidaten_erstellen([0, 0], ["a", "b"], np.array(["", "2018"]),
+                                                             np.array(["None", "1"]))
+    assert list(ueberschneidung_regeln.gewinner_ermitteln(kandidaten)) == [1]
+    assert list(ueberschneidung_regeln.operate_reihen(["", "2018", "2020"], ["1", "1", "1"])) == [2, 1, 0]
+
+
+def test_flaeche_ohne_kandidat():
+    kandidaten = ueberschneidung_regeln.kandidaten_erstellen([1], ["a"], [2020.0], [1.0], 3)
+    assert list(ueberschneidung_regeln.gewinner_ermitteln(kandidaten)) == [-1, 0, -1]
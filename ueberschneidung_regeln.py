@@ -0,0 +1,135 @@
+# Dieses Python-Skript enthält das Regelwerk, nach dem eine Überschneidungsfläche mehrerer Operate dem aktuellsten
+# Operat zugeordnet wird. Die Kandidaten aller Überschneidungsflächen werden als flache, typisierte NumPy-Arrays
+# gespeichert (Flächen-Index je Kandidat, eine Zeile je Kandidat aus "SpatialJoin_analysis" mit "JOIN_ONE_TO_MANY")
+# und in einem einzigen Sortiervorgang entschieden.
+# Reihung: 1. neuestes Flugjahr, 2. spätester Lade-Zeitpunkt, 3. optionale Zusatz-Kriterien (höherer Wert gewinnt)
+# in der angegebenen Reihenfolge, 4. bei vollständigem Gleichstand der zuerst angeführte Kandidat.
+# Der Workflow wird durch das Starten von "main.py" initiiert, "ueberschneidung_regeln.py" kann vom User ignoriert
+# werden.
+
+# Autor: Daniel Seisenbacher
+# Interpreter: Python 3.9 (arcgispro-py3)
+# Datum: 20. Jänner 2024
+
+import numpy as np
+
+
+def zahlen_lesen(texte) -> np.ndarray:
+    """
+    Die Funktion wandelt Text-Attribute (z.B. "jahr", "zeitpunkt" aus "flaechen_sammlung") vektorisiert in Zahlen um.
+    Dezimaltrennzeichen "." oder ",", leere Werte werden zu NaN (reihen hinter allen gültigen Werten).
+    """
+    texte = np.char.replace(np.asarray(texte, dtype=str), ",", ".")
+    return np.where((texte == "") | (texte == "None"), "nan", texte).astype(float)
+
+
+def kandidaten_erstellen(flaeche: np.ndarray, operat_nr: np.ndarray, jahr: np.ndarray, zeitpunkt: np.ndarray,
+                         anzahl_flaechen: int = None) -> dict:
+    """
+    Die Funktion erstellt die flachen, typisierten Kandidaten-Arrays (ein Eintrag je Kandidat einer Fläche).
+    Parameter:
+        - flaeche (np.ndarray): Flächen-Index je Kandidat (0 bis anzahl_flaechen - 1)
+        - operat_nr (np.ndarray): Operatsnummer je Kandidat
+        - jahr (np.ndarray): Flugjahr je Kandidat (Zahl oder Text)
+        - zeitpunkt (np.ndarray): Lade-Zeitpunkt je Kandidat (Zahl oder Text)
+        - anzahl_flaechen (int): Anzahl der Flächen (None = größter Flächen-Index + 1)
+    Rückgabewert:
+        - kandidaten (dict): "flaeche" (int), "operat_nr" (str), "jahr" (float), "zeitpunkt" (float),
+                             "anzahl_flaechen" (int)
+    """
+    flaeche = np.asarray(flaeche, dtype=np.int64)
+    if anzahl_flaechen is None:
+        anzahl_flaechen = int(flaeche.max()) + 1 if len(flaeche) else 0
+    return {
+        "flaeche": flaeche,
+        "operat_nr": np.asarray(operat_nr, dtype=str),
+        "jahr": zahlen_lesen(jahr) if np.asarray(jahr).dtype.kind in "US" else np.asarray(jahr, dtype=float),
+        "zeitpunkt": zahlen_lesen(zeitpunkt) if np.asarray(zeitpunkt).dtype.kind in "US"
+        else np.asarray(zeitpunkt, dtype=float),
+        "anzahl_flaechen": anzahl_flaechen
+    }
+
+
+def kandidaten_zerlegen(operat_nr: list, jahr: list, zeitpunkt: list, trennzeichen: str = ";") -> dict:
+    """
+    Die Funktion zerlegt verkettete Attribute (Feld-Mapping "Join" von "SpatialJoin_analysis", z.B. aus älteren
+    Zwischenergebnissen) in flache Kandidaten-Arrays (siehe "kandidaten_erstellen").
+    Parameter:
+        - operat_nr (list): verkettete Operatsnummern je Fläche, z.B. "2020260;2021370"
+        - jahr (list): verkettete Flugjahre je Fläche
+        - zeitpunkt (list): verkettete Lade-Zeitpunkte je Fläche (Dezimaltrennzeichen "." oder ",")
+        - trennzeichen (str): Trennzeichen der Verkettung
+    Rückgabewert:
+        - kandidaten (dict): siehe "kandidaten_erstellen"
+    """
+
+    operat_nr = np.asarray(operat_nr, dtype=str)
+    if len(operat_nr) == 0:
+        return kandidaten_erstellen(np.empty(0, dtype=np.int64), np.empty(0, dtype=str), np.empty(0),
+                                    np.empty(0), 0)
+    anzahl = np.char.count(operat_nr, trennzeichen) + 1
+
+    def zerlegen(texte) -> np.ndarray:
+        werte = np.array(trennzeichen.join(np.asarray(texte, dtype=str)).split(trennzeichen))
+        if len(werte) != anzahl.sum():
+            raise ValueError("Anzahl der verketteten Attribute stimmt nicht überein")
+        return werte
+
+    return kandidaten_erstellen(np.repeat(np.arange(len(operat_nr)), anzahl), zerlegen(operat_nr), zerlegen(jahr),
+                                zerlegen(zeitpunkt), len(operat_nr))
+
+
+def operate_reihen(jahr: np.ndarray, zeitpunkt: np.ndarray, zusatz_kriterien: list = None) -> np.ndarray:
+    """
+    Die Funktion reiht Operate (ein Kandidat je Operat, eine gemeinsame Fläche), aktuellstes Operat zuerst.
+    Rückgabewert:
+        - reihenfolge (np.ndarray): Indizes der Operate in gereihter Reihenfolge (leer bei leerer Eingabe)
+    """
+    kandidaten = kandidaten_erstellen(np.zeros(len(jahr), dtype=np.int64), np.empty(len(jahr), dtype=str), jahr,
+                                      zeitpunkt)
+    return rangfolge(kandidaten["flaeche"], kandidaten["jahr"], kandidaten["zeitpunkt"], zusatz_kriterien)
+
+
+def rangfolge(flaeche: np.ndarray, jahr: np.ndarray, zeitpunkt: np.ndarray,
+              zusatz_kriterien: list = None) -> np.ndarray:
+    """
+    Die Funktion reiht alle Kandidaten: nach Fläche aufsteigend, innerhalb einer Fläche der beste Kandidat zuerst.
+    Parameter:
+        - flaeche (np.ndarray): Flächen-Index je Kandidat
+        - jahr (np.ndarray): Flugjahr je Kandidat
+        - zeitpunkt (np.ndarray): Lade-Zeitpunkt je Kandidat
+        - zusatz_kriterien (list): optionale Arrays je Kandidat, höherer Wert gewinnt, erstes Kriterium zuerst
+    Rückgabewert:
+        - reihenfolge (np.ndarray): Indizes der Kandidaten in gereihter Reihenfolge
+    """
+
+    zusatz_kriterien = zusatz_kriterien or []
+    # np.lexsort: letzter Schlüssel ist der wichtigste, aufsteigend sortiert (daher negierte Werte)
+    schluessel = [np.arange(len(flaeche))]
+    schluessel += [-np.asarray(kriterium, dtype=float) for kriterium in reversed(zusatz_kriterien)]
+    schluessel += [-np.asarray(zeitpunkt, dtype=float), -np.asarray(jahr, dtype=float), np.asarray(flaeche)]
+    return np.lexsort(schluessel)
+
+
+def gewinner_ermitteln(kandidaten: dict, zusatz_kriterien: list = None) -> np.ndarray:
+    """
+    Die Funktion entscheidet alle Überschneidungsflächen in einem Durchgang.
+    Parameter:
+        - kandidaten (dict): Ergebnis von "kandidaten_erstellen" (mindestens "flaeche", "jahr", "zeitpunkt",
+                             "anzahl_flaechen")
+        - zusatz_kriterien (list): optionale Arrays je Kandidat, höherer Wert gewinnt, erstes Kriterium zuerst
+    Rückgabewert:
+        - gewinner (np.ndarray): Index des gewinnenden Kandidaten je Fläche (-1 bei Flächen ohne Kandidat)
+    """
+
+    flaeche = kandidaten["flaeche"]
+    reihenfolge = rangfolge(flaeche, kandidaten["jahr"], kandidaten["zeitpunkt"], zusatz_kriterien)
+
+    # erster Kandidat jeder Fläche in der Reihenfolge
+    gereihte_flaeche = flaeche[reihenfolge]
+    erster = np.ones(len(reihenfolge), dtype=bool)
+    erster[1:] = gereihte_flaeche[1:] != gereihte_flaeche[:-1]
+
+    gewinner = np.full(kandidaten["anzahl_flaechen"], -1, dtype=np.int64)
+    gewinner[gereihte_flaeche[erster]] = reihenfolge[erster]
+    return gewinner
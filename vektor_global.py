@@ -8,8 +8,14 @@
 # Datum: 20. Jänner 2024
 
 import arcpy
+import bild_schluessel
+import hashlib
+import json
+import os
+import numpy as np
+import punkt_index
+import ueberschneidung_regeln
 from info_wrapper import *
-from statistics import mean
 from time import time
 
 
@@ -46,6 +52,82 @@ def operat_flaeche_erstellen(main_featureclasses_info, workspace_info) -> str:
     return operatsflaeche
 
 
+@func_info
+def flaechen_vereinfachen(flaechen: str, flaechen_vereinfacht: str, toleranz: float, max_stuetzpunkte: int,
+                          algorithmus: str = "POINT_REMOVE", max_durchlaeufe: int = 5) -> dict:
+    """
+    Die Funktion vereinfacht die Polygone aus "flaechen" (z.B. Operatsfläche, "flaechen_partition"), bevor diese
+    gespeichert werden. Die runden Puffer und Dissolves erzeugen tausende Bogen-Stützpunkte, die jede spätere
+    Verschneidung verlangsamen. "SimplifyPolygon" behält dabei gemeinsame Grenzen benachbarter Polygone bei und löst
+    topologische Fehler auf. Überschreitet ein Polygon das Stützpunkt-Budget, wird die Toleranz verdoppelt und die
+    Vereinfachung wiederholt.
+    Parameter:
+        - flaechen (str): Pfad zur Featureclass mit den Polygonen, die vereinfacht werden sollen
+        - flaechen_vereinfacht (str): Pfad zur Featureclass mit den vereinfachten Polygonen
+        - toleranz (float): Toleranz der Vereinfachung in Metern
+        - max_stuetzpunkte (int): maximale Anzahl an Stützpunkten je Polygon
+        - algorithmus (str): "POINT_REMOVE" (Douglas-Peucker) oder "EFFECTIVE_AREA" (Visvalingam-Whyatt)
+        - max_durchlaeufe (int): maximale Anzahl an Vereinfachungen (mindestens 1, danach wird die Toleranz jeweils
+                                 verdoppelt)
+    Rückgabewert:
+        - bericht (dict): Stützpunkte vorher/nachher, verwendete Toleranz und eingeführter Flächenfehler
+    """
+
+    if max_durchlaeufe < 1:
+        raise Exception(f"max_durchlaeufe muss mindestens 1 sein (erhalten: {max_durchlaeufe})")
+
+    # Originalgeometrien für die Berechnung des Flächenfehlers speichern
+    originale = {}
+    with arcpy.da.SearchCursor(flaechen, ["OID@", "SHAPE@"]) as cursor:
+        for row in cursor:
+            originale[row[0]] = row[1]
+    stuetzpunkte_vorher = sum(shape.pointCount for shape in originale.values())
+    flaeche_vorher = sum(shape.area for shape in originale.values())
+
+    # Vereinfachen, bis jedes Polygon das Stützpunkt-Budget einhält
+    aktuelle_toleranz = toleranz
+    for durchlauf in range(max_durchlaeufe):
+        arcpy.cartography.SimplifyPolygon(flaechen, flaechen_vereinfacht, algorithmus, f"{aktuelle_toleranz} Meters",
+                                          error_option="RESOLVE_ERRORS", collapsed_point_option="NO_KEEP")
+        with arcpy.da.SearchCursor(flaechen_vereinfacht, ["SHAPE@"]) as cursor:
+            max_stuetzpunkte_ist = max([row[0].pointCount for row in cursor], default=0)
+        if max_stuetzpunkte_ist <= max_stuetzpunkte or durchlauf == max_durchlaeufe - 1:
+            break
+        aktuelle_toleranz *= 2
+
+    # Stützpunkt-Reduktion und Flächenfehler (symmetrische Differenz zum Original) ermitteln
+    stuetzpunkte_nachher = 0
+    flaeche_nachher = 0
+    flaechenfehler = 0
+    with arcpy.da.SearchCursor(flaechen_vereinfacht, ["InPoly_FID", "SHAPE@"]) as cursor:
+        for row in cursor:
+            stuetzpunkte_nachher += row[1].pointCount
+            flaeche_nachher += row[1].area
+            original = originale.get(row[0])
+            if original is not None:
+                flaechenfehler += original.symmetricDifference(row[1]).area
+
+    bericht = {
+        "toleranz": aktuelle_toleranz,
+        "stuetzpunkte_vorher": stuetzpunkte_vorher,
+        "stuetzpunkte_nachher": stuetzpunkte_nachher,
+        "stuetzpunkte_reduktion": 1 - stuetzpunkte_nachher / stuetzpunkte_vorher if stuetzpunkte_vorher else 0,
+        "max_stuetzpunkte_polygon": max_stuetzpunkte_ist,
+        "flaeche_vorher": flaeche_vorher,
+        "flaeche_nachher": flaeche_nachher,
+        "flaechenfehler": flaechenfehler,
+        "flaechenfehler_relativ": flaechenfehler / flaeche_vorher if flaeche_vorher else 0
+    }
+    print(f"Stützpunkte: {stuetzpunkte_vorher} → {stuetzpunkte_nachher} "
+          f"(-{bericht['stuetzpunkte_reduktion']:.1%}), Toleranz {aktuelle_toleranz} m, "
+          f"Flächenfehler {flaechenfehler:.1f} m² ({bericht['flaechenfehler_relativ']:.4%})")
+
+    # Hilfsfelder von "SimplifyPolygon" entfernen, damit sie nicht in die gespeicherten Featureclasses übernommen werden
+    arcpy.DeleteField_management(flaechen_vereinfacht, ["InPoly_FID", "MaxSimpErr"])
+
+    return bericht
+
+
 @func_info
 def flaechen_sammlung_befuellen(operatsflaeche: str, global_info: list, workspace_info: list):
     """
@@ -87,9 +169,9 @@ def flaechen_sammlung_befuellen(operatsflaeche: str, global_info: list, workspac
 @func_info
 def operat_ueberschneidungen(global_info: list) -> str:
     """
-    Funktion erstellt die Featureclass "kombininierte_operat_ueberschneidungen", in der die Geometrie der
-    Überschneidung und Informationen zu den schneidenden Operaten (inklusive Flugjahr und Lade-Zeitpunkt) gespeichert
-    sind.
+    Funktion erstellt die Featureclass "kombininierte_operat_ueberschneidungen" mit einer Zeile je
+    Überschneidungsfläche und schneidendem Operat ("TARGET_FID" = Überschneidungsfläche, Attribute "operat_nr", "jahr"
+    und "zeitpunkt" des Operates), d.h. mit flachen Kandidaten-Listen anstatt verketteter Texte.
     Parameter:
         - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
     Rückgabewert:
@@ -116,14 +198,18 @@ def operat_ueberschneidungen(global_info: list) -> str:
                                     statistics_fields=[],
                                     multi_part="SINGLE_PART",
                                     concatenation_separator="")
-    # Information zu Überschneidungsflächen hinzufügen; Attribute "operat_nr", "jahr" und "zeitpunkt" der einzelnen
-    # überlagernden Flächen verkettet auf im vorigen Schritt erstellte Fläche übertragen
+    # Information zu Überschneidungsflächen hinzufügen; je überlagernder Fläche eine Zeile mit "operat_nr", "jahr" und
+    # "zeitpunkt" (Kandidat der im vorigen Schritt erstellten Fläche "TARGET_FID")
+    feld_mapping = ";".join(
+        f"{feld} \"{feld}\" true true false 255 Text 0 0,First,#,{flaechen_ueberschneidungen_singlepart},{feld},0,255"
+        for feld in ("operat_nr", "jahr", "zeitpunkt")
+    )
     arcpy.SpatialJoin_analysis(target_features=einzelne_flaechen_ueberschneidungen,
                                join_features=flaechen_ueberschneidungen_singlepart,
                                out_feature_class=kombininierte_operat_ueberschneidungen,
-                               join_operation="JOIN_ONE_TO_ONE",
-                               join_type="KEEP_ALL",
-                               field_mapping=f"operat_nr \"operat_nr\" true true false 255 Text 0 0,Join,\";\",{flaechen_ueberschneidungen_singlepart},operat_nr,0,255;jahr \"jahr\" true true false 255 Text 0 0,Join,\";\",{flaechen_ueberschneidungen_singlepart},jahr,0,255;zeitpunkt \"zeitpunkt\" true true false 255 Text 0 0,Join,\";\",{flaechen_ueberschneidungen_singlepart},zeitpunkt,0,255",
+                               join_operation="JOIN_ONE_TO_MANY",
+                               join_type="KEEP_COMMON",
+                               field_mapping=feld_mapping,
                                match_option="ARE_IDENTICAL_TO",
                                search_radius="",
                                distance_field_name="")
@@ -133,11 +219,13 @@ def operat_ueberschneidungen(global_info: list) -> str:
 
 @func_info
 def aktuelle_operate_extrahieren(kombininierte_operat_ueberschneidungen: str, global_info: list,
-                                 workspace_info: list) -> tuple:
+                                 workspace_info: list, zusatz_kriterien: list = None) -> tuple:
     """
-    Die Funktion liest die verketteten Informationen aus "kombininierte_operat_ueberschneidungen" aus.
-    Anhand des Attributes Jahr wird die Überschneidungsfläche dem neusten Operat zugeordnet. Sollten das Jahr gleich
-    sein, wird das neuer-geladene Operat anhand des Attributes "zeitpunkt" als richtiges Operat angenommen.
+    Die Funktion liest die Kandidaten (eine Zeile je Überschneidungsfläche und Operat) aus
+    "kombininierte_operat_ueberschneidungen" und ordnet jede Überschneidungsfläche dem aktuellsten Operat zu
+    (Regelwerk in "ueberschneidung_regeln"): neuestes Flugjahr, bei gleichem Flugjahr das zuletzt geladene Operat,
+    danach optionale Zusatz-Kriterien. Je Fläche bleibt nur die Zeile des Gewinners erhalten. Alle
+    Flächen werden in einem NumPy-Durchgang entschieden.
     Die Listen "zu_input_anfuegen" und "nicht_zu_input_anfuegen" liefern Information in Bezug auf das Input-Operat.
     Parameter:
         - kombininierte_operat_ueberschneidungen (str): Pfad zu Featureclass mit Geometrie der Überschneidung und
@@ -145,6 +233,8 @@ def aktuelle_operate_extrahieren(kombininierte_operat_ueberschneidungen: str, gl
         - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
         - workspace_info (list): Liste aus Informationen zum Workspace
                                  (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - zusatz_kriterien (list): optionale Funktionen, die für ein Array von Operatsnummern je Kandidat einen Wert
+                                   liefern (höherer Wert gewinnt)
     Rückgabewerte (tuple):
         - zu_input_anfuegen (list): Überschneidungen, die dem Input Operat angefügt werden sollen
         - nicht_zu_input_anfuegen (list): Überschneidungen, die nicht dem Input Operat angefügt werden sollen
@@ -160,73 +250,49 @@ def aktuelle_operate_extrahieren(kombininierte_operat_ueberschneidungen: str, gl
     # kopiere "kombininierte_operat_ueberschneidungen"
     arcpy.CopyFeatures_management(kombininierte_operat_ueberschneidungen, extrahierte_operat_ueberschneidungen)
 
+    # Kandidaten aller Überschneidungsflächen als flache Arrays (Flächen-Index aus "TARGET_FID")
+    zeilen = arcpy.da.FeatureClassToNumPyArray(extrahierte_operat_ueberschneidungen,
+                                               ["OID@", "TARGET_FID", "operat_nr", "jahr", "zeitpunkt"],
+                                               null_value="")
+    flaechen_fid, flaeche = np.unique(zeilen["TARGET_FID"], return_inverse=True)
+    kandidaten = ueberschneidung_regeln.kandidaten_erstellen(flaeche, zeilen["operat_nr"], zeilen["jahr"],
+                                                             zeilen["zeitpunkt"], len(flaechen_fid))
+    kriterien = [kriterium(kandidaten["operat_nr"]) for kriterium in zusatz_kriterien or []]
+
+    # Gewinner je Fläche und Beteiligung des Input-Operates; je Fläche bleibt nur die Zeile des Gewinners
+    gewinner = ueberschneidung_regeln.gewinner_ermitteln(kandidaten, kriterien)
+    input_beteiligt = np.zeros(len(flaechen_fid), dtype=bool)
+    input_beteiligt[kandidaten["flaeche"][kandidaten["operat_nr"] == operat]] = True
+    gewinner_info = {}
+    for kandidat, beteiligt in zip(gewinner, input_beteiligt):
+        gewinner_info[int(zeilen["OID@"][kandidat])] = [
+            str(kandidaten["operat_nr"][kandidat]), float(kandidaten["jahr"][kandidat]),
+            float(kandidaten["zeitpunkt"][kandidat]), beteiligt]
+
     # Jene Überschneidungen, die dem Input Operat angefügt werden
     zu_input_anfuegen = []
     # Jene Überschneidungen, die nicht dem Input Operat angefügt werden
     nicht_zu_input_anfuegen = []
 
     with arcpy.da.UpdateCursor(extrahierte_operat_ueberschneidungen,
-                               ["operat_nr", "jahr", "zeitpunkt", "SHAPE@"]) as cursor:
+                               ["OID@", "operat_nr", "jahr", "zeitpunkt", "SHAPE@"]) as cursor:
         for row in cursor:
-            # verkettete operatsnamen aufspalten
-            operatsnamen = row[0].split(";")
-            # verkettete jahre aufspalten
-            jahre_input = row[1].replace(",", ".").split(";")
-            jahre = []
-            for x in jahre_input:
-                jahr = float(x)
-                jahre.append(jahr)
-            # maximales Flugjahr und durchschnittliches Flugjahr ermitteln
-            jahr_max = max(jahre)
-            jahr_mean = mean(jahre)
-            # besitzen mehrere Operate dasselbe (aktuellste) Flugjahr?
-            quantity_jahr_max = 0
-            for item in jahre:
-                if item == jahr_max:
-                    quantity_jahr_max += 1
-            # Lade-Zeitpunkte der Operate ermitteln und aktuellstes Operat
-            zeitpunkte_input = row[2].replace(",", ".").split(";")
-            zeitpunkte = []
-            for x in zeitpunkte_input:
-                zeitpunkt = float(x)
-                zeitpunkte.append(zeitpunkt)
-            zeitpunkt_max = max(zeitpunkte)
-
-            if jahr_max == jahr_mean:
-                # bei Operaten des gleichen Flugjahres wird das aktueller geladene gewählt
-                stelle_mit_korrekter_info = zeitpunkte.index(zeitpunkt_max)
-            else:
-                if quantity_jahr_max == 1:
-                    # aktuellstes Flugjahr kommt nur einmal vor
-                    stelle_mit_korrekter_info = jahre.index(jahr_max)
-                else:
-                    # aktuellstes flugjahr kommt mehrmals vor, ältere flugjahre existieren auch
-                    multiple_max_values = []
-                    count = 0
-                    # das am neuesten reingeladene operat von den operaten mit aktuellstem flugjahr wird ermittelt
-                    for item in jahre:
-                        if item == jahr_max:
-                            x = zeitpunkte[count]
-                            multiple_max_values.append(x)
-                        count += 1
-                    max_multiple_max_values = max(multiple_max_values)
-                    stelle_mit_korrekter_info = zeitpunkte.index(max_multiple_max_values)
-
-            if operat in operatsnamen:
-                if operat == operatsnamen[stelle_mit_korrekter_info]:
+            if row[0] not in gewinner_info:
+                cursor.deleteRow()
+                continue
+            gewinner_operat, gewinner_jahr, gewinner_zeitpunkt, beteiligt = gewinner_info[row[0]]
+            zeile = [gewinner_operat, gewinner_jahr, gewinner_zeitpunkt, row[4]]
+            if beteiligt:
+                if gewinner_operat == operat:
                     # Jene Überschneidungen, die dem Input Operat angefügt werden
-                    zu_input_anfuegen.append(row)
+                    zu_input_anfuegen.append(zeile)
                 else:
                     # Jene Überschneidungen, die nicht dem Input Operat angefügt werden
-                    nicht_zu_input_anfuegen.append(row)
-            else:
-                # Jene, die nichts mit dem Input Operat zu tun haben werden ignoriert
-                pass
+                    nicht_zu_input_anfuegen.append(zeile)
+            # Jene, die nichts mit dem Input Operat zu tun haben, werden nur aktualisiert
 
             # update Überschneidungsflächen mit korrekter Information
-            cursor.updateRow([operatsnamen[stelle_mit_korrekter_info],
-                              jahre[stelle_mit_korrekter_info],
-                              zeitpunkte[stelle_mit_korrekter_info], row[3]])
+            cursor.updateRow([row[0]] + zeile)
 
     return zu_input_anfuegen, nicht_zu_input_anfuegen, extrahierte_operat_ueberschneidungen
 
@@ -275,6 +341,256 @@ def flaechen_sammlung_zusammenfuegen(extrahierte_operat_ueberschneidungen: str,
     return flaechen_sammlung_final, input_operat_ohne_ueberschneidungen
 
 
+def _operate_reihen(operate: list) -> list:
+    """
+    Reiht Zeilen [operat_nr, jahr, zeitpunkt, ...] nach dem Regelwerk in "ueberschneidung_regeln" (aktuellstes Operat
+    zuerst).
+    """
+    reihenfolge = ueberschneidung_regeln.operate_reihen([str(row[1]) for row in operate],
+                                                        [str(row[2]) for row in operate])
+    return [operate[i] for i in reihenfolge]
+
+
+def geometrien_vereinigen(geometrien: list):
+    """
+    Vereinigt eine Liste von Polygonen (arcpy-Geometrien), bei einer leeren Liste wird None zurückgegeben.
+    """
+    vereinigt = None
+    for geometrie in geometrien:
+        vereinigt = geometrie if vereinigt is None else vereinigt.union(geometrie)
+    return vereinigt
+
+
+def polygon_ringe(geometrie) -> list:
+    """
+    Die Funktion wandelt ein Polygon (arcpy-Geometrie) in eine Liste von Ringen ((n, 2) Arrays) für
+    "numpy_geometrie.punkte_in_polygon" um, innere Ringe (Löcher) sind durch "None" im Teil getrennt.
+    """
+    ringe = []
+    for teil in geometrie:
+        ring = []
+        for punkt in teil:
+            if punkt is None:
+                ringe.append(np.array(ring, dtype=float))
+                ring = []
+            else:
+                ring.append((punkt.X, punkt.Y))
+        if ring:
+            ringe.append(np.array(ring, dtype=float))
+    return ringe
+
+
+def auswahl_abfragen(layer: str, featureclass: str) -> list:
+    """
+    Die Funktion liefert SQL-Abfragen auf die OBJECTIDs der ausgewählten Zeilen eines Layers. Cursor und Werkzeuge
+    verwenden bei einem Layer ohne ausgewählte Zeilen alle Zeilen, daher wird bei leerer Auswahl keine Abfrage
+    geliefert (die Cursor werden dann nicht geöffnet).
+    Parameter:
+        - layer (str): Feature Layer mit Auswahl
+        - featureclass (str): Pfad zur Featureclass des Layers
+    Rückgabewert:
+        - abfragen (list): SQL-Abfragen für "where_clause" (siehe "oid_abfragen")
+    """
+    oids = [int(oid) for oid in arcpy.Describe(layer).FIDSet.split(";") if oid.strip()]
+    return oid_abfragen(featureclass, oids)
+
+
+def oid_abfragen(featureclass: str, oids) -> list:
+    """
+    Die Funktion liefert SQL-Abfragen "OBJECTID IN (...)" auf eine Liste von OBJECTIDs, aufgeteilt in Blöcke von
+    höchstens 1000 OBJECTIDs (wie "bild_schluessel.id_abfragen"). Bei leerer Liste wird keine Abfrage geliefert.
+    """
+    oids = list(oids)
+    if not oids:
+        return []
+    return bild_schluessel.id_abfragen(oids, arcpy.Describe(featureclass).OIDFieldName)
+
+
+def flaechen_zuordnen(operate: list, bereich=None) -> list:
+    """
+    Die Funktion ordnet jede Stelle dem aktuellsten Operat zu, das sie abdeckt: jedes Operat erhält seine Fläche
+    (innerhalb von "bereich") abzüglich der Flächen aller aktuelleren Operate, die es berühren.
+    Parameter:
+        - operate (list): Zeilen [operat_nr, jahr, zeitpunkt, SHAPE@] (Reihenfolge beliebig)
+        - bereich: optionales Polygon (arcpy-Geometrie), auf das die Zuordnung beschränkt wird
+    Rückgabewert:
+        - flaechen (list): Zeilen [operat_nr, jahr, zeitpunkt, SHAPE@] der zugeordneten Flächen (ohne Überlappung)
+    """
+
+    operate = _operate_reihen(operate)
+    flaechen = []
+    for i, row in enumerate(operate):
+        teil = row[3]
+        if bereich is not None:
+            if bereich.disjoint(teil):
+                continue
+            teil = teil.intersect(bereich, 4)
+        aktuellere = geometrien_vereinigen([besser[3] for besser in operate[:i] if not besser[3].disjoint(teil)])
+        if aktuellere is not None:
+            teil = teil.difference(aktuellere)
+        if teil.area > 0:
+            flaechen.append([row[0], row[1], row[2], teil])
+    return flaechen
+
+
+def flaechen_sammlung_final_anpassen(flaechen_sammlung_final: str, bereich, alte_flaechen: list,
+                                     neue_flaechen: list):
+    """
+    Die Funktion ersetzt in "flaechen_sammlung_final" den Bereich "bereich" durch die neu zugeordneten Flächen. Nur die
+    Operate, die im Bereich Flächen verloren oder gewonnen haben, werden gelesen und geschrieben.
+    Parameter:
+        - flaechen_sammlung_final (str): Pfad zur fc mit allen korrekt zugeordneten Operaten
+        - bereich: Polygon (arcpy-Geometrie) des neu zugeordneten Bereichs
+        - alte_flaechen (list): Zeilen [operat_nr, SHAPE@] der bisherigen Flächen im Bereich
+        - neue_flaechen (list): Zeilen [operat_nr, jahr, zeitpunkt, SHAPE@] der neuen Flächen im Bereich
+    """
+
+    neue_teile = {}
+    for row in neue_flaechen:
+        neue_teile[row[0]] = geometrien_vereinigen([neue_teile[row[0]], row[3]]) if row[0] in neue_teile else row[3]
+    betroffene_operate = set(row[0] for row in alte_flaechen) | set(neue_teile.keys())
+    sql_operate = ", ".join(f"'{x}'" for x in betroffene_operate) or "''"
+    aktualisiert = []
+    with arcpy.da.UpdateCursor(flaechen_sammlung_final, ["operat_nr", "SHAPE@"],
+                               where_clause=f"operat_nr IN ({sql_operate})") as cursor:
+        for row in cursor:
+            geometrie = row[1].difference(bereich)
+            if row[0] in neue_teile and row[0] not in aktualisiert:
+                geometrie = geometrie.union(neue_teile[row[0]])
+            aktualisiert.append(row[0])
+            if geometrie.area > 0:
+                cursor.updateRow([row[0], geometrie])
+            else:
+                cursor.deleteRow()
+    with arcpy.da.InsertCursor(flaechen_sammlung_final, ["operat_nr", "SHAPE@"]) as cursor:
+        for neues_operat, geometrie in neue_teile.items():
+            if neues_operat not in aktualisiert:
+                cursor.insertRow([neues_operat, geometrie])
+
+
+@func_info
+def flaechen_partition_erstellen(global_info: list) -> str:
+    """
+    Die Funktion erstellt die dauerhafte Partition der Operatsflächen "flaechen_partition" aus dem Ergebnis von
+    "flaechen_sammlung_zusammenfuegen": Flächen ohne Überlappung, jeweils mit Operatsnummer, Flugjahr und
+    Lade-Zeitpunkt des aktuellsten Operates. Ab dann wird die Partition mit "flaechen_partition_aktualisieren" lokal
+    fortgeführt.
+    Parameter:
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+    Rückgabewert:
+        - flaechen_partition (str): Pfad zur Featureclass mit der Partition
+    """
+
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    # benötigte Pfade
+    operat_ueberschneidungen_ausgeschnitten = rf"{fds_temp_global}\operat_ueberschneidungen_ausgeschnitten"
+    flaechen_partition = rf"{fds_output_global}\flaechen_partition"
+
+    # Flächen ohne Überschneidung und korrekt zugeordnete Überschneidungsflächen als Einzelteile speichern
+    arcpy.MultipartToSinglepart_management(operat_ueberschneidungen_ausgeschnitten, flaechen_partition)
+    return flaechen_partition
+
+
+@func_info
+def flaechen_partition_aktualisieren(operatsflaeche: str, global_info: list, workspace_info: list) -> tuple:
+    """
+    Die Funktion fügt das Input-Operat lokal in die Partition "flaechen_partition" ein und ersetzt damit
+    "operat_ueberschneidungen", "aktuelle_operate_extrahieren" und "flaechen_sammlung_zusammenfuegen". Über den
+    räumlichen Index der Geodatabase werden nur jene Flächen der Partition gelesen, die das Input-Operat schneiden
+    oder bisher dem Input-Operat gehört haben. In diesem Bereich wird jede Stelle dem aktuellsten Operat zugeordnet,
+    das sie abdeckt. "flaechen_sammlung_final" wird nur für die betroffenen Operate angepasst. Der Aufwand hängt daher
+    von der lokalen Überlappung ab, nicht von der Anzahl aller Operate im Meridian.
+    Parameter:
+        - operatsflaeche (str): Pfad zur Featureclass mit der Operatsfläche des Input-Operates
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    Rückgabewerte (tuple):
+        - zu_input_anfuegen (list): Überschneidungen, die dem Input Operat angefügt werden sollen
+        - nicht_zu_input_anfuegen (list): Überschneidungen, die nicht dem Input Operat angefügt werden sollen
+        - flaechen_sammlung_final (str): Pfad zur fc mit allen korrekt zugeordneten Operaten
+        - input_operat_ohne_ueberschneidungen (List): Liste der aktuellen Operatsfläche ohne Überschneidungsflächen
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    # benötigte Pfade
+    flaechen_partition = rf"{fds_output_global}\flaechen_partition"
+    flaechen_sammlung_final = rf"{fds_output_global}\flaechen_sammlung_final"
+    partition_layer = "flaechen_partition_layer"
+    sammlung_layer = "flaechen_sammlung_layer"
+
+    # Input-Operat mit Flugjahr und Lade-Zeitpunkt aus "flaechen_sammlung"
+    with arcpy.da.SearchCursor(flaechen_sammlung, ["operat_nr", "jahr", "zeitpunkt", "SHAPE@"],
+                               where_clause=f"operat_nr = '{operat}'") as cursor:
+        input_operat = [list(row) for row in cursor]
+    input_geometrie = geometrien_vereinigen([row[3] for row in input_operat])
+    operat_nr, jahr, zeitpunkt, shape = input_operat[0]
+
+    # Flächen der Partition, die das Input-Operat schneiden oder bisher dem Input-Operat gehört haben, werden entfernt
+    arcpy.Delete_management(partition_layer)
+    arcpy.MakeFeatureLayer_management(flaechen_partition, partition_layer)
+    arcpy.SelectLayerByLocation_management(partition_layer, "INTERSECT", operatsflaeche,
+                                           selection_type="NEW_SELECTION")
+    arcpy.SelectLayerByAttribute_management(partition_layer, "ADD_TO_SELECTION", f"operat_nr = '{operat}'")
+    alte_flaechen = []
+    for abfrage in auswahl_abfragen(partition_layer, flaechen_partition):
+        with arcpy.da.UpdateCursor(flaechen_partition, ["operat_nr", "SHAPE@"], where_clause=abfrage) as cursor:
+            for row in cursor:
+                alte_flaechen.append(row)
+                cursor.deleteRow()
+
+    # betroffener Bereich und alle Operate, die diesen Bereich abdecken (nach Aktualität gereiht)
+    bereich = geometrien_vereinigen([input_geometrie] + [row[1] for row in alte_flaechen])
+    arcpy.Delete_management(sammlung_layer)
+    arcpy.MakeFeatureLayer_management(flaechen_sammlung, sammlung_layer)
+    arcpy.SelectLayerByLocation_management(sammlung_layer, "INTERSECT", [bereich], selection_type="NEW_SELECTION")
+    operate = []
+    for abfrage in auswahl_abfragen(sammlung_layer, flaechen_sammlung):
+        with arcpy.da.SearchCursor(flaechen_sammlung, ["operat_nr", "jahr", "zeitpunkt", "SHAPE@"],
+                                   where_clause=abfrage) as cursor:
+            operate.extend(list(row) for row in cursor)
+    operate = _operate_reihen(operate)
+
+    # Neue Flächen der Partition: jedes Operat erhält den noch freien Teil des Bereichs, den es abdeckt
+    neue_flaechen = flaechen_zuordnen(operate, bereich)
+    with arcpy.da.InsertCursor(flaechen_partition, ["operat_nr", "jahr", "zeitpunkt", "SHAPE@"]) as cursor:
+        for row in neue_flaechen:
+            cursor.insertRow(row)
+
+    # Überschneidungen des Input-Operates, gleiche Bedeutung wie in "aktuelle_operate_extrahieren"
+    andere_operate = [row for row in operate if row[0] != operat]
+    input_position = [row[0] for row in operate].index(operat)
+    aktueller = geometrien_vereinigen([row[3] for row in operate[:input_position]])
+    alle_anderen = geometrien_vereinigen([row[3] for row in andere_operate])
+
+    zu_input_anfuegen = []
+    nicht_zu_input_anfuegen = []
+    input_operat_ohne_ueberschneidungen = []
+    input_gewonnen = input_geometrie
+    if aktueller is not None:
+        input_gewonnen = input_geometrie.difference(aktueller)
+        input_verloren = input_geometrie.intersect(aktueller, 4)
+        if input_verloren.area > 0:
+            nicht_zu_input_anfuegen.append([operat, jahr, zeitpunkt, input_verloren])
+    input_ohne = input_gewonnen
+    if alle_anderen is not None:
+        ueberschneidung = input_gewonnen.intersect(alle_anderen, 4)
+        if ueberschneidung.area > 0:
+            zu_input_anfuegen.append([operat, jahr, zeitpunkt, ueberschneidung])
+        input_ohne = input_gewonnen.difference(alle_anderen)
+    if input_ohne.area > 0:
+        input_operat_ohne_ueberschneidungen.append([operat, jahr, zeitpunkt, input_ohne])
+
+    # "flaechen_sammlung_final" nur für die betroffenen Operate aktualisieren
+    flaechen_sammlung_final_anpassen(flaechen_sammlung_final, bereich, alte_flaechen, neue_flaechen)
+
+    print(f"{len(alte_flaechen)} Flächen der Partition ersetzt, {len(operate)} Operate im betroffenen Bereich")
+    return zu_input_anfuegen, nicht_zu_input_anfuegen, flaechen_sammlung_final, input_operat_ohne_ueberschneidungen
+
+
 @func_info
 def input_operat_aufteilen(zu_input_anfuegen: list, input_operat_ohne_ueberschneidungen: list,
                            global_info: list) -> tuple:
@@ -333,10 +649,13 @@ def input_operat_aufteilen(zu_input_anfuegen: list, input_operat_ohne_ueberschne
 
 @func_info
 def punkte_ausschneiden_hinzufuegen(fc_zu_input_anfuegen: str, fc_input_operat_ohne_ueberschneidungen: str,
-                                    global_info: list, main_featureclasses_info: list) -> tuple:
+                                    global_info: list, main_featureclasses_info: list, workspace_info: list) -> tuple:
     """
-    Die Funktion fügt alle korrekten Punkte in "punkte_sammlung" zusammen und erstellt 2 Listen, die die gelöschten bzw.
-    neu hinzugefügten Namen der Bildpunkte enthalten
+    Die Funktion aktualisiert "punkte_sammlung" mit einem Delta: nur die Punkte in den Überschneidungsflächen, die dem
+    Input-Operat zugeordnet wurden, werden gezielt gelöscht, und die Punkte des Input-Operates werden eingefügt. Die
+    übrigen Punkte des Meridians werden nicht neu geschrieben. Das Delta wird zusätzlich im Änderungsprotokoll
+    gespeichert (siehe "aenderungsprotokoll_schreiben"). Zurückgegeben werden 2 Listen, die die gelöschten bzw. neu
+    hinzugefügten Namen der Bildpunkte enthalten.
     Parameter:
         - fc_zu_input_anfuegen (str): Featureclass, die die Überschneidungsflächen des Input-Operates enthält,
                                       bei denen die Bildpunkte hinzugefügt werden sollen
@@ -344,6 +663,8 @@ def punkte_ausschneiden_hinzufuegen(fc_zu_input_anfuegen: str, fc_input_operat_o
         - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
         - main_featureclasses_info (list): Pfade zu den wichtigsten Featureclasses
                                            (bildpunkte_unbearbeitet, bildpunkte_extrahiert)
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
     Rückgabewerte (tuple):
         - loesch_punkte_liste (list): Liste mit allen Punkten die aus "punkte_sammlung" entfernt wurden
         - hinzugefuegt_punkte_liste (list): Liste mit allen Punkten, die in "punkte_sammlung" hinzugefügt wurden
@@ -353,61 +674,215 @@ def punkte_ausschneiden_hinzufuegen(fc_zu_input_anfuegen: str, fc_input_operat_o
     geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
 
     # benötigte Pfade
-    punkte_sammlung_unfertig = rf"{fds_temp_global}\punkte_sammlung_unfertig"
     punkte_input_operat_ueberschneidungen = rf"{fds_temp_global}\punkte_input_operat_ueberschneidungen"
     punkte_input_operat_ohne_ueberschneidungen = rf"{fds_temp_global}\punkte_input_operat_ohne_ueberschneidungen"
-    loesch_punkte = rf"{fds_temp_global}\loesch_punkte"
 
     # fc wird angepasst
     arcpy.AlterField_management(bildpunkte_extrahiert, "operat", new_field_name="operat_nr")
 
-    # Erstelle Featureclass mit Punkten, die gelöscht werden sollen
-    arcpy.PairwiseClip_analysis(punkte_sammlung, fc_zu_input_anfuegen, loesch_punkte)
+    # Punkte in "punkte_sammlung", die in den Überschneidungsflächen des Input-Operates liegen (Gitter-Index, es werden
+    # nur die Zellen innerhalb der Überschneidungsflächen gelesen)
+    index = punkt_index.index_laden(punkte_sammlung, workspace_info)
+    loesch_oids = punkt_index.punkte_abfragen(index, fc_zu_input_anfuegen)
 
-    # Liste mit allen Punkten die aus Mosaic Dataset gelöscht werden sollen
+    # Liste mit allen Punkten die aus Mosaic Dataset gelöscht werden sollen, gezieltes Löschen der ausgewählten Punkte
     loesch_punkte_liste = []
-    with arcpy.da.SearchCursor(loesch_punkte, ["img_name", "operat_nr"]) as cursor:
-        for row in cursor:
-            abgleich = row[0] + row[1]
-            loesch_punkte_liste.append(abgleich)
+    for abfrage in oid_abfragen(punkte_sammlung, loesch_oids):
+        with arcpy.da.UpdateCursor(punkte_sammlung, ["img_name", "operat_nr"], where_clause=abfrage) as cursor:
+            for row in cursor:
+                abgleich = bild_schluessel.schluessel_bilden(row[0], row[1])
+                loesch_punkte_liste.append(abgleich)
+                cursor.deleteRow()
 
-    # aus "punkte_sammlung_unfertig" werden die Punkte gelöscht, anstelle deren jene des Input-Operates hinkommen
-    arcpy.PairwiseErase_analysis(punkte_sammlung, fc_zu_input_anfuegen, punkte_sammlung_unfertig)
-    # Die Punkte, welche vom Input stammen und in den Überschneidungsflächen liegen werden ermittelt
+    # Die Punkte, welche vom Input stammen und in den Überschneidungsflächen liegen, werden eingefügt
     arcpy.PairwiseClip_analysis(bildpunkte_extrahiert, fc_zu_input_anfuegen, punkte_input_operat_ueberschneidungen)
-    # Die korrekten Punkte der Überschneidungsflächen werden eingefügt
-    arcpy.Append_management(punkte_input_operat_ueberschneidungen, punkte_sammlung_unfertig)
+    arcpy.Append_management(punkte_input_operat_ueberschneidungen, punkte_sammlung)
 
-    # Die "punkte_input_operat_ohne_ueberschneidungen" werden aus den Punkten von "bildpunkte_extrahiert" ausgeschnitten
+    # Da in den Flächen ohne Überschneidung keine Punkte in der "punkte_sammlung" liegen, können die Punkte des Input
+    # Operates einfach eingefügt werden
     arcpy.PairwiseClip_analysis(bildpunkte_extrahiert, fc_input_operat_ohne_ueberschneidungen,
                                 punkte_input_operat_ohne_ueberschneidungen)
-    # Da hier keine Punkte in der "punkte_sammlung" liegen, können die Punkte des Input Operates ohne Überschneidung
-    # einfach eingefügt werden
-    arcpy.Append_management(punkte_input_operat_ohne_ueberschneidungen, punkte_sammlung_unfertig)
+    arcpy.Append_management(punkte_input_operat_ohne_ueberschneidungen, punkte_sammlung)
+
+    # Index fortführen (gelöschte Punkte entfernen, eingefügte Punkte eintragen)
+    punkt_index.index_fortfuehren(index, punkte_sammlung, loesch_oids, workspace_info)
 
     # Liste mit allen Punkten, die hinzugefügt wurden
     hinzugefuegt_punkte_liste = []
-    # bei Überschneidungen
-    with arcpy.da.SearchCursor(punkte_input_operat_ohne_ueberschneidungen, "img_name") as cursor:
-        for row in cursor:
-            hinzugefuegt_punkte_liste.append(row[0])
-    # alles außer Überschneidungen
-    with arcpy.da.SearchCursor(punkte_input_operat_ueberschneidungen, "img_name") as cursor:
-        for row in cursor:
-            hinzugefuegt_punkte_liste.append(row[0])
+    hinzugefuegt_abgleich_liste = []
+    for punkte_input in [punkte_input_operat_ohne_ueberschneidungen, punkte_input_operat_ueberschneidungen]:
+        with arcpy.da.SearchCursor(punkte_input, ["img_name", "operat_nr"]) as cursor:
+            for row in cursor:
+                hinzugefuegt_punkte_liste.append(row[0])
+                hinzugefuegt_abgleich_liste.append(bild_schluessel.schluessel_bilden(row[0], row[1]))
 
-    # "punkte_sammlung" wird aktualisiert
-    arcpy.DeleteFeatures_management(punkte_sammlung)
-    arcpy.Append_management(punkte_sammlung_unfertig, punkte_sammlung)
+    # Delta im Änderungsprotokoll speichern
+    aenderungsprotokoll_schreiben(
+        loesch_punkte_liste,
+        hinzugefuegt_abgleich_liste,
+        workspace_info
+    )
 
     return loesch_punkte_liste, hinzugefuegt_punkte_liste
 
 
+def aenderungsprotokoll_schreiben(loesch_punkte_liste: list, hinzugefuegt_abgleich_liste: list,
+                                  workspace_info: list, operat_bezeichnung: str = None) -> str:
+    """
+    Die Funktion hängt das Delta von "punkte_sammlung" als eine json-Zeile an das Änderungsprotokoll des Meridians an
+    ("{meridian}_punkte_aenderungen.jsonl" im Speicherort). Die Schlüssel bestehen aus Bildname und Operatsnummer
+    (siehe "bild_schluessel.py"). Eingefügte Schlüssel werden im Register des Meridians eingetragen, über deren
+    bild_ids gleicht "mosaic_synchronisierung.py" das Mosaic Dataset ab.
+    Parameter:
+        - loesch_punkte_liste (list): Schlüssel der aus "punkte_sammlung" entfernten Punkte
+        - hinzugefuegt_abgleich_liste (list): Schlüssel der in "punkte_sammlung" eingefügten Punkte
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+        - operat_bezeichnung (str): Bezeichnung im Protokoll, falls abweichend vom Operat in "workspace_info"
+                                    (z.B. mehrere Operate im Batch-Modus)
+    Rückgabewert:
+        - protokoll_datei (str): Pfad zum Änderungsprotokoll
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+
+    protokoll_datei = rf"{speicherort}\{meridian}_punkte_aenderungen.jsonl"
+    eintrag = {
+        "zeitpunkt": time(),
+        "meridian": meridian,
+        "operat": operat_bezeichnung or operat,
+        "entfernt": loesch_punkte_liste,
+        "hinzugefuegt": hinzugefuegt_abgleich_liste
+    }
+    with open(protokoll_datei, "a") as datei:
+        datei.write(json.dumps(eintrag) + "\n")
+
+    # neue Schlüssel im Register eintragen (bild_id für das Mosaic Dataset)
+    register = bild_schluessel.register_laden(workspace_info)
+    anzahl_registriert = len(register["schluessel"])
+    bild_schluessel.ids_vergeben(register, hinzugefuegt_abgleich_liste)
+    if len(register["schluessel"]) > anzahl_registriert:
+        bild_schluessel.register_speichern(register, workspace_info)
+    print(f"Delta punkte_sammlung: {len(loesch_punkte_liste)} entfernt, "
+          f"{len(hinzugefuegt_abgleich_liste)} hinzugefügt")
+    return protokoll_datei
+
+
+@func_info
+def punkte_batch_aktualisieren(batch_operate: list, global_info: list, workspace_info: list) -> tuple:
+    """
+    Batch-Modus für mehrere Operate eines Meridians: nachdem alle Operate in "flaechen_sammlung" eingefügt und die
+    Überschneidungen aufgelöst wurden ("flaechen_partition"), wird "punkte_sammlung" einmal
+    aktualisiert. Gelöscht werden alle Punkte in den Flächen, die ein Batch-Operat gewonnen hat, sowie alte Punkte der
+    Batch-Operate. Eingefügt werden die Punkte jedes Batch-Operates innerhalb seiner gewonnenen Flächen. Da die
+    Zuordnung nur von Flugjahr und Lade-Reihenfolge abhängt, entspricht das Ergebnis dem schrittweisen Einfügen in
+    Lade-Reihenfolge. Gelöschte Punkte werden dem Operat zugeschrieben, dessen gewonnene Fläche sie enthält (bzw. dem
+    Operat selbst bei seinen alten Punkten).
+    Parameter:
+        - batch_operate (list): Liste aus [workspace_info, main_featureclasses_info] je Operat in Lade-Reihenfolge
+        - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
+        - workspace_info (list): Liste aus Informationen zum Workspace eines Operates des Meridians
+    Rückgabewerte (tuple):
+        - loesch_punkte (dict): key = Operatsnummer, value = Schlüssel der aus "punkte_sammlung" entfernten Punkte
+        - hinzugefuegt_punkte (dict): key = Operatsnummer, value = Liste der hinzugefügten Bildnamen
+    """
+
+    geodatabase_global, fds_output_global, fds_temp_global, flaechen_sammlung, punkte_sammlung = global_info
+
+    # benötigte Pfade
+    flaechen_partition = rf"{fds_output_global}\flaechen_partition"
+    punkte_input_operat = rf"{fds_temp_global}\punkte_input_operat"
+    partition_layer = "flaechen_partition_batch_layer"
+    punkte_layer = "punkte_sammlung_batch_layer"
+
+    operate = [operat_info[0][2] for operat_info in batch_operate]
+
+    # je Batch-Operat: Punkte in seinen gewonnenen Flächen und seine alten Punkte löschen
+    arcpy.Delete_management(partition_layer)
+    arcpy.MakeFeatureLayer_management(flaechen_partition, partition_layer)
+    arcpy.Delete_management(punkte_layer)
+    arcpy.MakeFeatureLayer_management(punkte_sammlung, punkte_layer)
+    loesch_punkte = {}
+    for operat in operate:
+        arcpy.SelectLayerByAttribute_management(partition_layer, "NEW_SELECTION", f"operat_nr = '{operat}'")
+        if not auswahl_abfragen(partition_layer, flaechen_partition):
+            arcpy.SelectLayerByAttribute_management(punkte_layer, "CLEAR_SELECTION")
+        else:
+            arcpy.SelectLayerByLocation_management(punkte_layer, "INTERSECT", partition_layer,
+                                                   selection_type="NEW_SELECTION")
+        arcpy.SelectLayerByAttribute_management(punkte_layer, "ADD_TO_SELECTION", f"operat_nr = '{operat}'")
+        loesch_punkte[operat] = []
+        for abfrage in auswahl_abfragen(punkte_layer, punkte_sammlung):
+            with arcpy.da.UpdateCursor(punkte_sammlung, ["img_name", "operat_nr"], where_clause=abfrage) as cursor:
+                for row in cursor:
+                    loesch_punkte[operat].append(bild_schluessel.schluessel_bilden(row[0], row[1]))
+                    cursor.deleteRow()
+
+    # Punkte jedes Batch-Operates innerhalb seiner gewonnenen Flächen einfügen
+    hinzugefuegt_punkte = {}
+    hinzugefuegt_abgleich_liste = []
+    for operat_workspace_info, main_featureclasses_info in batch_operate:
+        operat = operat_workspace_info[2]
+        bildpunkte_unbearbeitet, bildpunkte_extrahiert = main_featureclasses_info
+        arcpy.AlterField_management(bildpunkte_extrahiert, "operat", new_field_name="operat_nr")
+
+        # Operate ohne gewonnene Fläche werden übersprungen (bei leerer Auswahl würde mit allen Flächen geclippt)
+        hinzugefuegt_punkte[operat] = []
+        arcpy.SelectLayerByAttribute_management(partition_layer, "NEW_SELECTION", f"operat_nr = '{operat}'")
+        if not auswahl_abfragen(partition_layer, flaechen_partition):
+            continue
+        arcpy.PairwiseClip_analysis(bildpunkte_extrahiert, partition_layer, punkte_input_operat)
+        arcpy.Append_management(punkte_input_operat, punkte_sammlung)
+
+        with arcpy.da.SearchCursor(punkte_input_operat, ["img_name", "operat_nr"]) as cursor:
+            for row in cursor:
+                hinzugefuegt_punkte[operat].append(row[0])
+                hinzugefuegt_abgleich_liste.append(bild_schluessel.schluessel_bilden(row[0], row[1]))
+
+    # Delta im Änderungsprotokoll speichern
+    aenderungsprotokoll_schreiben(
+        [schluessel for operat in operate for schluessel in loesch_punkte[operat]],
+        hinzugefuegt_abgleich_liste,
+        workspace_info,
+        ";".join(operate)
+    )
+
+    return loesch_punkte, hinzugefuegt_punkte
+
+
+# zwischengespeicherte Meridianflächen je Pfad (siehe "_meridian_puffer_laden")
+_MERIDIAN_PUFFER = {}
+
+
+def _meridian_puffer_laden(meridianflaeche_gepuffert: str) -> tuple:
+    """
+    Liest die gepufferte Meridianfläche einmal je Prozess als eine Geometrie (vereinigt) und liefert sie mit ihrer
+    Ausdehnung und Signatur. Weitere Aufrufe verwenden die zwischengespeicherte Geometrie.
+    """
+    if meridianflaeche_gepuffert not in _MERIDIAN_PUFFER:
+        with arcpy.da.SearchCursor(meridianflaeche_gepuffert, ["SHAPE@"]) as cursor:
+            puffer = geometrien_vereinigen([row[0] for row in cursor])
+        ausdehnung = (puffer.extent.XMin, puffer.extent.YMin, puffer.extent.XMax, puffer.extent.YMax)
+        _MERIDIAN_PUFFER[meridianflaeche_gepuffert] = (puffer, ausdehnung, _geometrie_signatur(puffer))
+    return _MERIDIAN_PUFFER[meridianflaeche_gepuffert]
+
+
+def _geometrie_signatur(geometrie) -> str:
+    """
+    Liefert eine Signatur der Geometrie (Hash der WKB-Darstellung), ändert sich mit jeder Änderung des Polygons.
+    """
+    return hashlib.sha1(bytes(geometrie.WKB)).hexdigest()
+
+
 @func_info
 def ausland_operate_bestimmen(flaechen_sammlung_final: str, global_info: list, workspace_info: list) -> list:
     """
     Alle Operate, die zur Gänze ausserhalb von Ö liegen werden aus "flaechen_sammlung_final" gelöscht und die
-    Operats-Nummer wird in einer Liste gespeichert.
+    Operats-Nummer wird in einer Liste gespeichert. Getestet wird in 2D gegen die gepufferte Meridianfläche: Operate,
+    deren Ausdehnung die Ausdehnung der Meridianfläche nicht berührt, liegen sicher außerhalb, alle anderen werden
+    exakt geprüft. Das Ergebnis wird je Operat mit der Signatur seines Polygons in
+    "{meridian}_ausland_status.json" gespeichert und nur neu berechnet, wenn sich das Polygon oder die Meridianfläche
+    geändert hat.
     Parameter:
         - flaechen_sammlung_final (str): Pfad zur fc mit allen korrekt zugeordneten Operaten
         - global_info (list): Liste aus Pfaden zu gdb, fds und fc für die Zusammenführung der Operate
@@ -422,24 +897,50 @@ def ausland_operate_bestimmen(flaechen_sammlung_final: str, global_info: list, w
 
     # benötigte Pfade
     meridianflaeche_gepuffert = rf"{speicherort}\meridianstreifen.gdb\meridianstreifen_{meridian}_buffer"
-    operate_ausland = rf"{fds_temp_global}\operate_ausland"
-
-    # Lösche Daten vom letzten Durchlauf
-    arcpy.Delete_management(operate_ausland)
+    status_datei = rf"{speicherort}\{meridian}_ausland_status.json"
+
+    puffer, puffer_ausdehnung, puffer_signatur = _meridian_puffer_laden(meridianflaeche_gepuffert)
+
+    # gespeicherter Status, ungültig bei geänderter Meridianfläche
+    status = {}
+    if os.path.exists(status_datei):
+        with open(status_datei, "r") as datei:
+            gespeichert = json.load(datei)
+        if gespeichert.get("meridianflaeche") == puffer_signatur:
+            status = gespeichert["operate"]
+
+    # Status je Operat: nur bei geändertem Polygon neu berechnen
+    neuer_status = {}
+    neu_berechnet = 0
+    with arcpy.da.SearchCursor(flaechen_sammlung_final, ["operat_nr", "SHAPE@"]) as cursor:
+        for operat_nr, geometrie in cursor:
+            signatur = _geometrie_signatur(geometrie)
+            if operat_nr in status and status[operat_nr]["signatur"] == signatur:
+                neuer_status[operat_nr] = status[operat_nr]
+                continue
+            ausdehnung = geometrie.extent
+            if (ausdehnung.XMax < puffer_ausdehnung[0] or ausdehnung.XMin > puffer_ausdehnung[2] or
+                    ausdehnung.YMax < puffer_ausdehnung[1] or ausdehnung.YMin > puffer_ausdehnung[3]):
+                ausserhalb = True
+            else:
+                ausserhalb = puffer.disjoint(geometrie)
+            neuer_status[operat_nr] = {"signatur": signatur, "ausserhalb": ausserhalb}
+            neu_berechnet += 1
 
-    # Wähle alle Operate die zur gänze außerhalb von Österreich liegen aus
-    arcpy.MakeFeatureLayer_management(flaechen_sammlung_final, operate_ausland)
-    arcpy.SelectLayerByLocation_management(operate_ausland, "INTERSECT_3D", meridianflaeche_gepuffert,
-                                           None, "NEW_SELECTION", "INVERT")
+    with open(status_datei + ".temp", "w") as datei:
+        json.dump({"meridianflaeche": puffer_signatur, "operate": neuer_status}, datei)
+    os.replace(status_datei + ".temp", status_datei)
 
-    # Füge alle Operats-Nummern der Liste "operat_ausserhalb" hinzu, diese müssen gelöscht werden
-    operate_ausserhalb = []
-    try:
-        with arcpy.da.SearchCursor(operate_ausland, ["operat_nr"]) as cursor:
+    # lösche Operate, die nur im Ausland liegen
+    operate_ausserhalb = [operat_nr for operat_nr, eintrag in neuer_status.items() if eintrag["ausserhalb"]]
+    if operate_ausserhalb:
+        sql_operate = ", ".join(f"'{x}'" for x in operate_ausserhalb)
+        with arcpy.da.UpdateCursor(flaechen_sammlung_final, ["operat_nr"],
+                                   where_clause=f"operat_nr IN ({sql_operate})") as cursor:
             for row in cursor:
-                operate_ausserhalb.append(row[0])
-    except:
+                cursor.deleteRow()
+    else:
         print("keine Flächen außerhalb gefunden!")
-    # lösche Operate, die nur im Ausland liegen
-    arcpy.DeleteRows_management(operate_ausland)
+
+    print(f"{len(neuer_status)} Operate geprüft, {neu_berechnet} neu berechnet, {len(operate_ausserhalb)} außerhalb")
     return operate_ausserhalb
@@ -8,6 +8,12 @@
 # Datum: 20. Jänner 2024
 
 import arcpy
+import json
+import numpy as np
+import bildauswahl_optimierung
+import flugstreifen_geometrie
+import lokale_pipeline
+import vektor_global
 from info_wrapper import *
 
 
@@ -79,17 +85,66 @@ def bildpunkte_inkl_flugstreifen_info(bild_info: dict, flugstreifen_info: list,
     arcpy.CopyFeatures_management(bildpunkte_extrahiert, bildpunkte_unbearbeitet)
 
 
+def flugstreifen_schreiben(flugstreifen: dict, flugstreifen_fc: str, epsg: int) -> str:
+    """
+    Die Funktion schreibt die Flugstreifen aus "flugstreifen_geometrie.flugstreifen_aufbauen" in eine Featureclass
+    (Felder "flugstreifen" und "Shape"). Wie bei "PointsToLine_management" werden nur Flugstreifen mit mindestens zwei
+    Bildpunkten als Linie geschrieben.
+    Parameter:
+        - flugstreifen (dict): Geometrie und Kennzahlen der Flugstreifen
+        - flugstreifen_fc (str): Pfad der zu erstellenden Featureclass
+        - epsg (int): epsg-Nummer des Koordinatensystems
+    Rückgabewert:
+        - flugstreifen_fc (str): Pfad zur Featureclass
+    """
+
+    spatial_reference = arcpy.SpatialReference(int(epsg))
+    ordner, name = flugstreifen_fc.rsplit("\\", 1)
+    arcpy.CreateFeatureclass_management(ordner, name, "POLYLINE", spatial_reference=spatial_reference)
+    arcpy.AddField_management(flugstreifen_fc, "flugstreifen", "TEXT", field_length=255)
+
+    with arcpy.da.InsertCursor(flugstreifen_fc, ["flugstreifen", "SHAPE@"]) as cursor:
+        for name, xy in zip(flugstreifen["namen"], flugstreifen_geometrie.stuetzpunkte(flugstreifen)):
+            if len(xy) < 2:
+                continue
+            linie = arcpy.Polyline(arcpy.Array([arcpy.Point(x, y) for x, y in xy]), spatial_reference)
+            cursor.insertRow([str(name), linie])
+
+    return flugstreifen_fc
+
+
+def bildpunkte_lesen(bildpunkte_fc: str, operat_feld: str, where_clause: str = None) -> np.ndarray:
+    """
+    Die Funktion liest Bildpunkte ("bildpunkte_extrahiert" oder "punkte_sammlung") in ein strukturiertes Array mit den
+    Feldern "img_name", "operat", "flugstreifen", "flughoehe", "x" und "y".
+    Parameter:
+        - bildpunkte_fc (str): Pfad zur Featureclass mit Bildpunkten
+        - operat_feld (str): Feld mit der Operatsnummer ("operat" bzw. "operat_nr")
+        - where_clause (str): optionale SQL-Abfrage (z.B. nur einzelne Flugstreifen)
+    Rückgabewert:
+        - bildpunkte (np.ndarray): Bildpunkte
+    """
+    bildpunkte = arcpy.da.FeatureClassToNumPyArray(
+        bildpunkte_fc, ["img_name", operat_feld, "flugstreifen", "flughoehe", "SHAPE@X", "SHAPE@Y"],
+        where_clause=where_clause, null_value=""
+    )
+    bildpunkte.dtype.names = ("img_name", "operat", "flugstreifen", "flughoehe", "x", "y")
+    return bildpunkte
+
+
 @func_info
-def flugstreifen_erstellen(main_featureclasses_info: list, workspace_info: list) -> str:
+def flugstreifen_erstellen(main_featureclasses_info: list, workspace_info: list) -> tuple:
     """
     Die Funktion erstellt die Flugstreifen anhand des Feldes "flugstreifen" aus der Featureclass "bildpunkte_extrahiert"
+    im Arbeitsspeicher und schreibt sie in die Featureclass "flugstreifen_unbearbeitet".
     Parameter:
         - main_featureclasses_info (list): Pfade zu den wichtigsten Featureclasses
                                            (bildpunkte_unbearbeitet, bildpunkte_extrahiert)
         - workspace_info (list): Liste aus Informationen zum Workspace
                                  (Meridian, Operatsnummer, Pfade, epsg-Nummer)
-    Rückgabewert:
+    Rückgabewert (tuple):
         - flugstreifen_unbearbeitet (str): Pfad zur Featureclass mit allen unbearbeiteten Flugstreifen
+        - flugstreifen (dict): Geometrie und Kennzahlen der Flugstreifen (Wiederverwendung in späteren Schritten)
     """
 
     meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
@@ -97,13 +152,14 @@ def flugstreifen_erstellen(main_featureclasses_info: list, workspace_info: list)
 
     flugstreifen_unbearbeitet = rf"{fds_final}\flugstreifen_unbearbeitet"
 
-    # Erstellen der Flugstreifen Featureclass, Verbinden der Punkte
-    arcpy.PointsToLine_management(
-        bildpunkte_extrahiert,
-        flugstreifen_unbearbeitet,
-        Line_Field="flugstreifen"
-    )
-    return flugstreifen_unbearbeitet
+    # Bildpunkte in Einfüge-Reihenfolge lesen und Flugstreifen im Arbeitsspeicher bilden
+    bildpunkte = arcpy.da.FeatureClassToNumPyArray(bildpunkte_extrahiert, ["flugstreifen", "SHAPE@X", "SHAPE@Y"])
+    bildpunkte.dtype.names = ("flugstreifen", "x", "y")
+    flugstreifen = flugstreifen_geometrie.flugstreifen_aufbauen(bildpunkte)
+
+    # Erstellen der Flugstreifen Featureclass
+    flugstreifen_schreiben(flugstreifen, flugstreifen_unbearbeitet, epsg)
+    return flugstreifen_unbearbeitet, flugstreifen
 
 
 @func_info
@@ -460,13 +516,14 @@ def vertikale_flugstreifen_punkte_einfuegen(schraege_flugstreifen_liste: list, v
 
 @func_info
 def punkte_talstreifen_ausschneiden(main_featureclasses_info: list, schraege_flugstreifen_liste: list,
-                                    workspace_info: list):
+                                    flugstreifen: dict, workspace_info: list):
     """
     Die Funktion löscht alle Bildpunkte, die sich im Bereich eines Talstreifens befinden und nicht Teil von diesem sind.
     Parameter:
         - main_featureclasses_info (list): Pfade zu den wichtigsten Featureclasses
                                            (bildpunkte_unbearbeitet, bildpunkte_extrahiert)
         - schraege_flugstreifen_liste (list): Liste mit schrägen Flugstreifen (potenzielle Talstreifen)
+        - flugstreifen (dict): Geometrie der Flugstreifen aus "flugstreifen_erstellen"
         - workspace_info (list): Liste aus Informationen zum Workspace
                                  (Meridian, Operatsnummer, Pfade, epsg-Nummer)
     """
@@ -476,24 +533,21 @@ def punkte_talstreifen_ausschneiden(main_featureclasses_info: list, schraege_flu
 
     talstreifen = rf"{fds_temp}\talstreifen_{operat}"
 
-    # Erstelle Flugstreifen
-    arcpy.PointsToLine_management(bildpunkte_extrahiert, talstreifen, Line_Field="flugstreifen", Close_Line="NO_CLOSE")
-
-    # Speichere relevante Flugstreifen-Namen und lösche alle anderen aus "talstreifen"
-    aktuelle_talstreifen_liste = []
-    with arcpy.da.UpdateCursor(talstreifen, ["flugstreifen", "Shape_Length"]) as cursor:
-        for row in cursor:
-            if row[0] in schraege_flugstreifen_liste:
-                aktuelle_talstreifen_liste.append(row[0])
-                pass
-            else:
-                cursor.deleteRow()
-
-    # Falls keine schrägen Streifen benötigt werden, ist count == 0
-    count = arcpy.GetCount_management(talstreifen)
-    if count == 0:
+    # Schräge Flugstreifen werden nur als Ganzes gelöscht, ihre Geometrie entspricht daher jener aus
+    # "flugstreifen_erstellen". Relevant sind jene, die noch in "bildpunkte_extrahiert" enthalten sind.
+    flugstreifen_aktuell = arcpy.da.FeatureClassToNumPyArray(bildpunkte_extrahiert, ["flugstreifen"])["flugstreifen"]
+    flugstreifen_aktuell = set(flugstreifen_aktuell)
+    aktuelle_talstreifen_liste = [x for x in schraege_flugstreifen_liste if x in flugstreifen_aktuell]
+    if not aktuelle_talstreifen_liste:
         return
 
+    # Nur die benötigten Talstreifen werden geschrieben
+    flugstreifen_schreiben(
+        flugstreifen_geometrie.flugstreifen_auswaehlen(flugstreifen, aktuelle_talstreifen_liste),
+        talstreifen,
+        epsg
+    )
+
     # Talstreifen werden gepuffert und alle Punkte ausgeschnitten, die sich innerhalb des Puffers befinden
     fc_schraege_flugstreifen_final_buffer = rf"{fds_temp}\schraege_flugstreifen_final_buffer_{operat}"
     fc_talstreifen_punkte_ausgeschnitten = rf"{fds_temp}\talstreifen_punkte_ausgeschnitten_{operat}"
@@ -517,3 +571,93 @@ def punkte_talstreifen_ausschneiden(main_featureclasses_info: list, schraege_flu
         for row in cursor:
             if row[0] in delete_list:
                 cursor.deleteRow()
+
+
+@func_info
+def bildpunkte_gekachelt_auswaehlen(main_featureclasses_info: list, oesterreich_buffer: str, meridianstreifen: str,
+                                    kachelgroesse: float, workspace_info: list):
+    """
+    Die Funktion ersetzt die Schritte von "flugstreifen_erstellen" bis "punkte_talstreifen_ausschneiden" bei sehr großen
+    Operaten: die relevanten Bildpunkte werden mit "lokale_pipeline.lokale_bildauswahl_gekachelt" in räumlichen
+    Kacheln parallel ermittelt (ohne arcpy), danach werden alle anderen Bildpunkte aus "bildpunkte_extrahiert"
+    gelöscht.
+    Parameter:
+        - main_featureclasses_info (list): Pfade zu den wichtigsten Featureclasses
+                                           (bildpunkte_unbearbeitet, bildpunkte_extrahiert)
+        - oesterreich_buffer (str): Pfad zur Featureclass mit gepufferter Fläche von Österreich
+        - meridianstreifen (str): Pfad zur Featureclass des Meridianstreifens
+        - kachelgroesse (float): Kantenlänge der Kacheln in Metern
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    bildpunkte_unbearbeitet, bildpunkte_extrahiert = main_featureclasses_info
+    fc_meridianstreifen_buffer = rf"{speicherort}\meridianstreifen.gdb\meridianstreifen_{meridian}_buffer"
+
+    # Flächen als Ringe für die Worker-Prozesse
+    flaechen = []
+    for featureclass in [oesterreich_buffer, meridianstreifen, fc_meridianstreifen_buffer]:
+        ringe = []
+        with arcpy.da.SearchCursor(featureclass, ["SHAPE@"]) as cursor:
+            for row in cursor:
+                if row[0] is not None:
+                    ringe.extend(vektor_global.polygon_ringe(row[0]))
+        flaechen.append(ringe)
+
+    bildpunkte = lokale_pipeline.lokale_bildauswahl_gekachelt(
+        bildpunkte_lesen(bildpunkte_unbearbeitet, "operat"),
+        *flaechen,
+        kachelgroesse=kachelgroesse
+    )
+
+    # "bildpunkte_extrahiert" enthält noch alle Bildpunkte, nicht ausgewählte werden gelöscht
+    relevant = set(bildpunkte["img_name"])
+    with arcpy.da.UpdateCursor(bildpunkte_extrahiert, ["img_name"]) as cursor:
+        for row in cursor:
+            if row[0] not in relevant:
+                cursor.deleteRow()
+    print(f"{len(relevant)} relevante Bildpunkte (gekachelt)")
+
+
+@func_info
+def bildauswahl_anwenden(main_featureclasses_info: list, operatsflaeche: str, stereo_pruefung_info: list,
+                         workspace_info: list) -> dict:
+    """
+    Die Funktion optimiert die Bildauswahl des Operates ("bildauswahl_optimierung.auswahl_optimieren") und löscht
+    die nicht benötigten Bildpunkte aus "bildpunkte_extrahiert". Der Bericht wird als json-Datei im Operats-Ordner
+    gespeichert.
+    Parameter:
+        - main_featureclasses_info (list): Pfade zu den wichtigsten Featureclasses
+                                           (bildpunkte_unbearbeitet, bildpunkte_extrahiert)
+        - operatsflaeche (str): Pfad zur Featureclass mit der Operatsfläche
+        - stereo_pruefung_info (list): Brennweite (mm), Bildformat in Flugrichtung (mm), mittlere Geländehöhe (m),
+                                       Mindest-Längsüberdeckung (0-1)
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    Rückgabewert:
+        - bericht (dict): Ergebnis von "bildauswahl_optimierung.auswahl_optimieren"
+    """
+
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+    bildpunkte_unbearbeitet, bildpunkte_extrahiert = main_featureclasses_info
+
+    bildpunkte = bildpunkte_lesen(bildpunkte_extrahiert, "operat")
+    with arcpy.da.SearchCursor(operatsflaeche, ["SHAPE@"]) as cursor:
+        flaeche = vektor_global.geometrien_vereinigen([row[0] for row in cursor])
+    ringe = vektor_global.polygon_ringe(flaeche) if flaeche is not None else []
+
+    behalten, bericht = bildauswahl_optimierung.auswahl_optimieren(bildpunkte, ringe, stereo_pruefung_info)
+
+    # nicht benötigte Bildpunkte löschen
+    entfernen = set(bildpunkte["img_name"][~behalten].tolist())
+    if entfernen:
+        with arcpy.da.UpdateCursor(bildpunkte_extrahiert, ["img_name"]) as cursor:
+            for row in cursor:
+                if row[0] in entfernen:
+                    cursor.deleteRow()
+
+    with open(rf"{operat_ordner}\bildauswahl_{operat}.json", "w") as datei:
+        json.dump(bericht, datei, indent=2)
+    print(f"Bildauswahl {operat}: {bericht['anzahl_vorher']} -> {bericht['anzahl_nachher']} Bilder")
+    return bericht
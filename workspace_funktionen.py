@@ -46,10 +46,10 @@ def operat_abfragen() -> str:
             continue
 
 
-@func_info
-def workspace_info_konfigurieren(meridian: str, operat: str, speicherort: str) -> list:
+def workspace_info_ermitteln(meridian: str, operat: str, speicherort: str) -> list:
     """
-    Funktion erstellt Aufbau des Datei-Verzeichnisses + wichtige Kennzahlen (Meridian, EPSG, Operat).
+    Funktion ermittelt Aufbau des Datei-Verzeichnisses + wichtige Kennzahlen (Meridian, EPSG, Operat), ohne Ordner oder
+    Geodatabases zu erstellen (z.B. für bereits bearbeitete Operate).
     Parameter:
         - meridian (str): Meridian-Bezeichnung
         - operat (str): Operatsnummer
@@ -67,19 +67,10 @@ def workspace_info_konfigurieren(meridian: str, operat: str, speicherort: str) -
         epsg = 31256
 
     meridian_ordner = rf"{speicherort}\{meridian}"
-    os.makedirs(meridian_ordner, exist_ok=True)                 # Meridian-Ordner erstellen
-
     operat_ordner = rf"{meridian_ordner}\{operat}"
-    os.makedirs(operat_ordner, exist_ok=True)                   # Operat-Ordner erstellen
-
     gdb = rf"{operat_ordner}\{operat}.gdb"
-    arcpy.CreateFileGDB_management(operat_ordner, operat)       # Geodatabase erstellen
-
     fds_final = rf"{gdb}\output"
-    arcpy.CreateFeatureDataset_management(gdb, "output", epsg)  # "output" Featuredataset erstellen
-
     fds_temp = rf"{gdb}\temp"
-    arcpy.CreateFeatureDataset_management(gdb, "temp", epsg)    # "temp" Featuredataset erstellen
 
     # kompakte Liste mit Informationen zu Workspace
     workspace_info = [meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp]
@@ -87,6 +78,30 @@ def workspace_info_konfigurieren(meridian: str, operat: str, speicherort: str) -
     return workspace_info
 
 
+@func_info
+def workspace_info_konfigurieren(meridian: str, operat: str, speicherort: str) -> list:
+    """
+    Funktion erstellt Aufbau des Datei-Verzeichnisses + wichtige Kennzahlen (Meridian, EPSG, Operat).
+    Parameter:
+        - meridian (str): Meridian-Bezeichnung
+        - operat (str): Operatsnummer
+        - speicherort (str): Pfad des Speicherortes
+    Rückgabewert:
+        - workspace_info (list): Liste aus Informationen zum Workspace
+                                 (Meridian, Operatsnummer, Pfade, epsg-Nummer)
+    """
+    workspace_info = workspace_info_ermitteln(meridian, operat, speicherort)
+    meridian, epsg, operat, speicherort, meridian_ordner, operat_ordner, gdb, fds_final, fds_temp = workspace_info
+
+    os.makedirs(meridian_ordner, exist_ok=True)                 # Meridian-Ordner erstellen
+    os.makedirs(operat_ordner, exist_ok=True)                   # Operat-Ordner erstellen
+    arcpy.CreateFileGDB_management(operat_ordner, operat)       # Geodatabase erstellen
+    arcpy.CreateFeatureDataset_management(gdb, "output", epsg)  # "output" Featuredataset erstellen
+    arcpy.CreateFeatureDataset_management(gdb, "temp", epsg)    # "temp" Featuredataset erstellen
+
+    return workspace_info
+
+
 @func_info
 def featureclasses_erstellen(workspace_info: list) -> list:
     """